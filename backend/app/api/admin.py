@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from app.core.profiling import admin_enabled, get_profile_store, token_matches
+from typing import Optional
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin routes need X-Admin-Token to match ADMIN_TOKEN, and are off when it's unset"""
+    if not admin_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token_matches(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/profiles")
+def list_profiles():
+    """Stored request profiles, newest first (without SQL and profiler output)"""
+    profiles = get_profile_store().list()
+    return {"profiles": profiles, "count": len(profiles)}
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """A stored profile report with its SQL statements and profiler output"""
+    report = get_profile_store().get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return report
+
+@router.delete("/profiles")
+def clear_profiles():
+    return {"deleted": get_profile_store().clear()}
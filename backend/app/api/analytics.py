@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Query, HTTPException
+from app.services.analytics_service import get_shared_analytics_service
+from typing import Dict, List, Optional
+
+router = APIRouter()
+
+def _parse_symbols(symbols: Optional[str]) -> Optional[List[str]]:
+    if not symbols:
+        return None
+    return [s.strip().upper() for s in symbols.split(",") if s.strip()]
+
+def _compute(days: int, window: int = 30, max_lag: int = 5, threshold: float = 2.0,
+             pre: int = 5, post: int = 5, symbols: Optional[str] = None) -> Dict:
+    results = get_shared_analytics_service().compute(
+        days=days, window=window, max_lag=max_lag,
+        threshold=threshold, pre=pre, post=post,
+        symbols=_parse_symbols(symbols)
+    )
+    if not results["symbols"]:
+        raise HTTPException(status_code=404, detail=f"No price data stored for the last {days} days")
+    return results
+
+@router.get("/correlation")
+def get_sentiment_price_correlation(
+    days: int = Query(365, ge=30, le=3650, description="Days of history to analyze"),
+    window: int = Query(30, ge=5, le=250, description="Rolling window in trading days"),
+    symbols: Optional[str] = Query(None, description="Comma separated symbols (default: all)")
+):
+    """Full-sample and latest rolling correlation between daily sentiment and returns"""
+    results = _compute(days, window=window, symbols=symbols)
+    return {
+        "days": days,
+        "window": window,
+        "trading_days": results["dates"],
+        "correlation": results["correlation"]
+    }
+
+@router.get("/lead-lag")
+def get_sentiment_lead_lag(
+    days: int = Query(365, ge=30, le=3650),
+    max_lag: int = Query(5, ge=1, le=20, description="Largest lead/lag in trading days"),
+    symbols: Optional[str] = Query(None)
+):
+    """Correlation of sentiment today with returns k days later (positive k: sentiment leads)"""
+    results = _compute(days, max_lag=max_lag, symbols=symbols)
+    return {
+        "days": days,
+        "max_lag": max_lag,
+        "universe": results["universe_lead_lag"],
+        "symbols": results["lead_lag"]
+    }
+
+@router.get("/event-study")
+def get_sentiment_event_study(
+    days: int = Query(365, ge=30, le=3650),
+    threshold: float = Query(2.0, ge=0.5, le=5.0, description="Spike threshold in standard deviations"),
+    pre: int = Query(5, ge=0, le=20),
+    post: int = Query(5, ge=1, le=20),
+    symbols: Optional[str] = Query(None)
+):
+    """Average cumulative returns around sentiment spikes"""
+    results = _compute(days, threshold=threshold, pre=pre, post=post, symbols=symbols)
+    return dict(results["event_study"], days=days, threshold=threshold)
@@ -1,16 +1,32 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
-from app.core.database import get_db
-from app.models.database import NewsArticle
-from app.services.sentiment_service import SentimentService
+from fastapi import APIRouter, Body, Depends, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.search_index import SEARCH_RANK_WINDOW
+from app.core.response_cache import GLOBAL_TAG, cached_json_response_async, get_response_cache, symbol_tag
+from app.ml.inference_client import InferenceRequestError, InferenceUnavailable
+from app.services.sentiment_service import get_shared_sentiment_service
 from app.services.database_service import DatabaseService
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from app.services.async_database_service import AsyncDatabaseService
+from app.services.article_archive import get_article_archive, iter_all_articles
+from app.services.broadcaster import event_stream, get_broadcaster
+from app.services.refresh_scheduler import record_view_async
+from datetime import date, datetime, timedelta
+from typing import Any, Iterator, List, Dict, Optional
+import base64
+import csv
+import io
+import json
+import os
 from pydantic import BaseModel
 
 router = APIRouter()
 
+# Most texts accepted by one /analyze/batch call
+ANALYZE_BATCH_MAX_ITEMS = int(os.getenv("ANALYZE_BATCH_MAX_ITEMS", "256"))
+# Seconds of silence before a /stream keep-alive comment
+STREAM_HEARTBEAT = float(os.getenv("STREAM_HEARTBEAT", "15"))
+
 # Response models
 class SentimentResponse(BaseModel):
     symbol: str
@@ -25,6 +41,18 @@ class TrendingStock(BaseModel):
     avg_sentiment: float
     sentiment_label: str
 
+class SearchResult(BaseModel):
+    id: int
+    symbol: str
+    title: str
+    url: str
+    published_at: Optional[datetime]
+    sentiment_score: Optional[float]
+    sentiment_label: Optional[str]
+    source: Optional[str]
+    snippet: str
+    score: float
+
 class ArticleResponse(BaseModel):
     id: int
     title: str
@@ -35,16 +63,25 @@ class ArticleResponse(BaseModel):
     source: str
 
 @router.get("/stock/{symbol}", response_model=SentimentResponse)
-def get_stock_sentiment(
+async def get_stock_sentiment(
+    request: Request,
     symbol: str,
     days: int = Query(7, ge=1, le=30, description="Number of days to analyze"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get sentiment analysis for a specific stock symbol"""
     
-    # Get sentiment data using database service
-    db_service = DatabaseService()
-    sentiment_data = db_service.get_stock_sentiment_data(symbol, days)
+    response = await cached_json_response_async(
+        request, "stock_sentiment", {"symbol": symbol.upper(), "days": days}, [symbol_tag(symbol)],
+        lambda: _build_stock_sentiment(symbol, days, db)
+    )
+    # Counted only once the symbol has data (unknown ones 404 above), so arbitrary paths can't grow the view counts
+    await record_view_async(symbol)
+    return response
+
+async def _build_stock_sentiment(symbol: str, days: int, db: AsyncSession) -> SentimentResponse:
+    db_service = AsyncDatabaseService(db)
+    sentiment_data = await db_service.get_stock_sentiment_data(symbol, days)
     
     if not sentiment_data:
         raise HTTPException(
@@ -52,22 +89,7 @@ def get_stock_sentiment(
             detail=f"No sentiment data found for symbol {symbol} in the last {days} days"
         )
     
-    # Get sentiment distribution
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    distribution = db.query(
-        NewsArticle.sentiment_label,
-        func.count(NewsArticle.id).label('count')
-    ).filter(
-        and_(
-            NewsArticle.symbol == symbol.upper(),
-            NewsArticle.published_at >= start_date,
-            NewsArticle.sentiment_score.isnot(None)
-        )
-    ).group_by(NewsArticle.sentiment_label).all()
-    
-    sentiment_distribution = {item.sentiment_label or 'neutral': item.count for item in distribution}
+    sentiment_distribution = await db_service.get_sentiment_distribution(symbol, days)
     
     return SentimentResponse(
         symbol=sentiment_data["symbol"],
@@ -78,19 +100,25 @@ def get_stock_sentiment(
     )
 
 @router.get("/trending", response_model=List[TrendingStock])
-def get_trending_stocks(
+async def get_trending_stocks(
+    request: Request,
     hours: int = Query(24, ge=1, le=168, description="Hours to look back"),
     limit: int = Query(10, ge=1, le=50, description="Number of stocks to return"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get stocks with most sentiment activity in recent hours"""
     
-    db_service = DatabaseService()
-    trending_data = db_service.get_trending_stocks(hours)
+    return await cached_json_response_async(
+        request, "trending", {"hours": hours, "limit": limit}, [GLOBAL_TAG],
+        lambda: _build_trending_stocks(hours, limit, db)
+    )
+
+async def _build_trending_stocks(hours: int, limit: int, db: AsyncSession) -> List[TrendingStock]:
+    trending_data = await AsyncDatabaseService(db).get_trending_stocks(hours, limit)
     
     # Convert to response model and add sentiment labels
     trending_stocks = []
-    for stock in trending_data[:limit]:
+    for stock in trending_data:
         sentiment_score = stock["avg_sentiment"]
         if sentiment_score > 0.1:
             label = "positive"
@@ -109,38 +137,38 @@ def get_trending_stocks(
     return trending_stocks
 
 @router.get("/stock/{symbol}/articles", response_model=List[ArticleResponse])
-def get_stock_articles(
+async def get_stock_articles(
+    request: Request,
+    response: Response,
     symbol: str,
     days: int = Query(7, ge=1, le=30),
     limit: int = Query(20, ge=1, le=100),
     sentiment_filter: Optional[str] = Query(None, description="Filter by sentiment: positive, negative, neutral"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get recent articles for a stock with sentiment scores"""
+    """Get recent articles for a stock with sentiment scores, newest first"""
     
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
+    start_date = datetime.now() - timedelta(days=days)
     
-    query = db.query(NewsArticle).filter(
-        and_(
-            NewsArticle.symbol == symbol.upper(),
-            NewsArticle.published_at >= start_date,
-            NewsArticle.sentiment_score.isnot(None)
-        )
+    # Keyset pagination: continue strictly after the last (published_at, id) served
+    after = _decode_cursor(cursor) if cursor else None
+    articles = await AsyncDatabaseService(db).get_articles_page(
+        symbol, start_date, limit + 1, sentiment_filter, after
     )
     
-    # Apply sentiment filter if provided
-    if sentiment_filter:
-        query = query.filter(NewsArticle.sentiment_label == sentiment_filter)
-    
-    articles = query.order_by(desc(NewsArticle.published_at)).limit(limit).all()
-    
-    if not articles:
+    if not articles and not cursor:
         raise HTTPException(
             status_code=404,
             detail=f"No articles found for {symbol}"
         )
     
+    if len(articles) > limit:
+        articles = articles[:limit]
+        next_cursor = _encode_cursor(articles[-1].published_at, articles[-1].id)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    
     return [
         ArticleResponse(
             id=article.id,
@@ -154,6 +182,134 @@ def get_stock_articles(
         for article in articles
     ]
 
+def _encode_cursor(published_at: datetime, article_id: int) -> str:
+    raw = f"{published_at.isoformat()}|{article_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        published_at, article_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(published_at), int(article_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/search", response_model=List[SearchResult])
+async def search_articles(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=200, description='Words, "quoted phrases", prefix* and OR'),
+    symbols: Optional[str] = Query(None, description="Comma separated symbols (defaults to all)"),
+    start: Optional[date] = Query(None, description="First publication date, YYYY-MM-DD"),
+    end: Optional[date] = Query(None, description="Last publication date, YYYY-MM-DD"),
+    sentiment_filter: Optional[str] = Query(None, pattern="^(positive|negative|neutral)$"),
+    sort: str = Query("relevance", pattern="^(relevance|recent)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Full-text search over article titles and descriptions, best match or newest first
+    
+    Only the most recently stored matches, up to the X-Ranked-Window header,
+    are ranked and paged through. X-Ranked-Truncated is "true" when the
+    query matched more articles than that; narrow it with symbols or a date
+    range to reach older ones.
+    """
+    
+    service = AsyncDatabaseService(db)
+    if not service.search_available():
+        raise HTTPException(status_code=503, detail="Full-text search is not available on this database")
+    
+    after = _decode_search_cursor(cursor, sort) if cursor else None
+    symbol_list = [s.strip().upper() for s in symbols.split(",") if s.strip()] if symbols else None
+    try:
+        results = await service.search_articles(
+            q, symbols=symbol_list,
+            start_date=datetime.combine(start, datetime.min.time()) if start else None,
+            end_date=datetime.combine(end + timedelta(days=1), datetime.min.time()) if end else None,
+            sentiment_filter=sentiment_filter, sort=sort, limit=limit + 1,
+            after=after[:2] if after else None, window_floor=after[2] if after else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response.headers["X-Ranked-Window"] = str(SEARCH_RANK_WINDOW)
+    response.headers["X-Ranked-Truncated"] = "true" if results and results[0]["window_truncated"] else "false"
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        next_cursor = _encode_search_cursor(
+            sort, last["published_at"] if sort == "recent" else last["score"], last["id"], last["window_floor"]
+        )
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return results
+
+def _encode_search_cursor(sort: str, key, article_id: int, window_floor: int) -> str:
+    # repr() round-trips floats exactly, so the next page resumes at the same score
+    raw = f"{sort}|{key.isoformat() if sort == 'recent' else repr(key)}|{article_id}|{window_floor}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_search_cursor(cursor: str, sort: str):
+    """(key, id, window floor); the floor keeps later pages on the first page's ranking window"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        cursor_sort, key, article_id, window_floor = raw.split("|")
+        if cursor_sort != sort:
+            raise ValueError("cursor belongs to another sort order")
+        return (datetime.fromisoformat(key) if sort == "recent" else float(key)), int(article_id), int(window_floor)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+EXPORT_COLUMNS = ["id", "symbol", "published_at", "title", "url", "source", "sentiment_score", "sentiment_label"]
+
+@router.get("/export")
+def export_articles(
+    symbols: Optional[str] = Query(None, description="Comma separated symbols (defaults to all)"),
+    start: Optional[date] = Query(None, description="First publication date, YYYY-MM-DD"),
+    end: Optional[date] = Query(None, description="Last publication date, YYYY-MM-DD"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    scored_only: bool = Query(True, description="Only include articles with sentiment scores")
+):
+    """Stream matching articles as NDJSON or CSV, oldest first"""
+    
+    symbol_list = [s.strip().upper() for s in symbols.split(",") if s.strip()] if symbols else None
+    # Ranges older than the retention cutoff are read back from the Parquet archive
+    partitions = iter_all_articles(
+        DatabaseService(), get_article_archive(),
+        symbols=symbol_list,
+        start=datetime.combine(start, datetime.min.time()) if start else None,
+        end=datetime.combine(end + timedelta(days=1), datetime.min.time()) if end else None,
+        scored_only=scored_only,
+        columns=EXPORT_COLUMNS
+    )
+    
+    if format == "csv":
+        body, media_type = _csv_chunks(partitions), "text/csv"
+    else:
+        body, media_type = _ndjson_chunks(partitions), "application/x-ndjson"
+    filename = f"articles.{format}"
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    })
+
+def _ndjson_chunks(partitions: Iterator[List[Dict]]) -> Iterator[str]:
+    for rows in partitions:
+        yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+
+def _csv_chunks(partitions: Iterator[List[Dict]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
 @router.post("/analyze")
 def analyze_text_sentiment(text: str):
     """Analyze sentiment of custom text"""
@@ -161,8 +317,13 @@ def analyze_text_sentiment(text: str):
     if not text or len(text.strip()) < 3:
         raise HTTPException(status_code=400, detail="Text must be at least 3 characters long")
     
-    sentiment_service = SentimentService()
-    result = sentiment_service.analyze_single_text(text)
+    sentiment_service = get_shared_sentiment_service()
+    try:
+        result = sentiment_service.analyze_single_text(text)
+    except InferenceRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InferenceUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
     return {
         "text": text[:100] + "..." if len(text) > 100 else text,
@@ -171,38 +332,94 @@ def analyze_text_sentiment(text: str):
         "confidence": result["confidence"]
     }
 
-@router.get("/summary")
-def get_sentiment_summary(db: Session = Depends(get_db)):
-    """Get overall sentiment summary across all stocks"""
+@router.post("/analyze/batch")
+def analyze_text_sentiment_batch(texts: List[Any] = Body(..., description="JSON array of texts to score")):
+    """Analyze sentiment of many texts in one batched inference call"""
+    
+    if not texts:
+        raise HTTPException(status_code=400, detail="Provide at least one text")
+    if len(texts) > ANALYZE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {ANALYZE_BATCH_MAX_ITEMS} texts per request, got {len(texts)}"
+        )
     
-    # Get summary stats
-    total_articles = db.query(func.count(NewsArticle.id)).filter(
-        NewsArticle.sentiment_score.isnot(None)
-    ).scalar()
+    results: List[Dict] = [{"index": i} for i in range(len(texts))]
+    valid_positions = []
+    for i, text in enumerate(texts):
+        if not isinstance(text, str):
+            results[i]["error"] = "Text must be a string"
+        elif len(text.strip()) < 3:
+            results[i]["error"] = "Text must be at least 3 characters long"
+        else:
+            valid_positions.append(i)
+    
+    if valid_positions:
+        sentiment_service = get_shared_sentiment_service()
+        try:
+            scored = sentiment_service.analyze_batch([texts[i] for i in valid_positions])
+        except InferenceRequestError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except InferenceUnavailable as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        for i, result in zip(valid_positions, scored):
+            text = texts[i]
+            results[i].update({
+                "text": text[:100] + "..." if len(text) > 100 else text,
+                "sentiment_score": result["score"],
+                "sentiment_label": result["label"],
+                "confidence": result["confidence"]
+            })
     
-    avg_sentiment = db.query(func.avg(NewsArticle.sentiment_score)).filter(
-        NewsArticle.sentiment_score.isnot(None)
-    ).scalar()
+    return {
+        "results": results,
+        "analyzed": len(valid_positions),
+        "errors": len(texts) - len(valid_positions)
+    }
+
+@router.get("/summary")
+async def get_sentiment_summary(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get overall sentiment summary across all stocks"""
     
-    # Get sentiment distribution
-    distribution = db.query(
-        NewsArticle.sentiment_label,
-        func.count(NewsArticle.id).label('count')
-    ).filter(
-        NewsArticle.sentiment_score.isnot(None)
-    ).group_by(NewsArticle.sentiment_label).all()
+    return await cached_json_response_async(
+        request, "summary", {}, [GLOBAL_TAG], lambda: _build_sentiment_summary(db)
+    )
+
+async def _build_sentiment_summary(db: AsyncSession) -> Dict:
+    # Totals are maintained by the scoring paths, so this is a single-row read
+    summary = await AsyncDatabaseService(db).get_sentiment_stats()
+    summary["last_updated"] = datetime.now().isoformat()
+    return summary
+
+@router.get("/stream")
+async def stream_sentiment(
+    request: Request,
+    symbols: Optional[str] = Query(None, description="Comma separated symbols to follow (defaults to all)")
+):
+    """Server-Sent Events of newly scored articles ('article') and updated daily rollups ('rollup')"""
     
-    sentiment_dist = {item.sentiment_label or 'neutral': item.count for item in distribution}
+    symbol_list = [s.strip() for s in symbols.split(",") if s.strip()] if symbols else None
+    broadcaster = get_broadcaster()
+    subscriber = broadcaster.subscribe(symbol_list)
     
-    # Get unique symbols count
-    unique_symbols = db.query(func.count(func.distinct(NewsArticle.symbol))).filter(
-        NewsArticle.sentiment_score.isnot(None)
-    ).scalar()
+    async def body():
+        try:
+            async for chunk in event_stream(subscriber, STREAM_HEARTBEAT, request.is_disconnected):
+                yield chunk
+        finally:
+            broadcaster.unsubscribe(subscriber)
     
-    return {
-        "total_articles_analyzed": total_articles or 0,
-        "average_sentiment": round(avg_sentiment or 0, 3),
-        "sentiment_distribution": sentiment_dist,
-        "stocks_tracked": unique_symbols or 0,
-        "last_updated": datetime.now().isoformat()
-    }
\ No newline at end of file
+    return StreamingResponse(body(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+@router.get("/stream/stats")
+def get_stream_stats():
+    """Subscriber and delivery counters for the live stream"""
+    return get_broadcaster().stats()
+
+@router.get("/cache/stats")
+def get_response_cache_stats():
+    """Hit/miss counters for the response cache"""
+    return get_response_cache().stats()
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.models.database import StockInfo
+import math
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.services.async_database_service import AsyncDatabaseService
 from app.services.stock_service import StockService
-from app.services.news_service import NewsService
-from app.services.database_service import DatabaseService
-from typing import List, Dict
+from app.services.job_queue import enqueue_refresh_all, get_job_queue
+from app.services.refresh_scheduler import get_scheduler
+from typing import List, Dict, Optional
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -20,6 +21,12 @@ class StockInfoResponse(BaseModel):
     market_cap: float = None
     description: str = None
 
+class SymbolMatch(BaseModel):
+    symbol: str
+    name: Optional[str] = None
+    sector: Optional[str] = None
+    match: str
+
 class StockPriceResponse(BaseModel):
     symbol: str
     current_price: float
@@ -60,10 +67,10 @@ def get_stock_price(symbol: str):
     )
 
 @router.get("/list", response_model=List[Dict])
-def get_tracked_stocks(db: Session = Depends(get_db)):
+async def get_tracked_stocks(db: AsyncSession = Depends(get_async_db)):
     """Get list of all tracked stocks"""
     
-    stocks = db.query(StockInfo).filter(StockInfo.is_active == True).all()
+    stocks = await AsyncDatabaseService(db).get_tracked_stocks()
     
     return [
         {
@@ -75,28 +82,71 @@ def get_tracked_stocks(db: Session = Depends(get_db)):
         for stock in stocks
     ]
 
-@router.post("/refresh/{symbol}")
-def refresh_stock_news(symbol: str):
-    """Manually refresh news for a specific stock"""
-    
-    try:
-        # Fetch latest news
-        news_service = NewsService()
-        news_data = news_service.get_stock_news(symbol, days_back=3)
-        
-        # Store in database
-        db_service = DatabaseService()
-        new_articles = db_service.store_news_articles(symbol, news_data)
-        
-        return {
-            "symbol": symbol.upper(),
-            "new_articles_found": new_articles,
-            "total_articles_fetched": len(news_data.get("articles", [])),
-            "message": f"Successfully refreshed news for {symbol}"
-        }
+@router.post("/refresh/{symbol}", status_code=202)
+def refresh_stock_news(symbol: str, days_back: int = Query(3, ge=1, le=30)):
+    """Queue a news refresh (fetch, store, score) for a specific stock, charged to the scheduler's API budget"""
+    
+    scheduler = get_scheduler()
+    if not scheduler.try_spend():
+        raise _over_budget(scheduler)
+    job, created = get_job_queue().enqueue("refresh", {"symbol": symbol.upper(), "days_back": days_back})
+    if not created:
+        # The pending job makes the API calls; this request made none
+        scheduler.refund()
+    
+    return {
+        "symbol": symbol.upper(),
+        "job_id": job["id"],
+        "status": job["status"],
+        "deduplicated": not created,
+        "status_url": f"/api/stocks/jobs/{job['id']}",
+        "message": f"Refresh queued for {symbol.upper()}" if created else f"Refresh already pending for {symbol.upper()}"
+    }
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error refreshing news: {str(e)}")
+@router.post("/refresh-all", status_code=202)
+def refresh_all_stocks(days_back: int = Query(3, ge=1, le=30)):
+    """Queue a news refresh for every active tracked stock, as far as the scheduler's API budget allows"""
+    
+    scheduler = get_scheduler()
+    result = enqueue_refresh_all(days_back, budget=scheduler)
+    if result["over_budget"] and not result["jobs"]:
+        raise _over_budget(scheduler)
+    return result
+
+def _over_budget(scheduler) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="NewsAPI budget exhausted, try again later",
+        headers={"Retry-After": str(math.ceil(scheduler.seconds_until_refresh()))}
+    )
+
+@router.get("/jobs/{job_id}")
+def get_job_status(job_id: str):
+    """Status (queued, running, succeeded, failed) and result of a background job"""
+    
+    job = get_job_queue().get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.get("/schedule")
+def get_refresh_schedule():
+    """Adaptive refresh intervals per tracked stock and API budget consumption"""
+    
+    scheduler = get_scheduler()
+    if not scheduler.plan:
+        scheduler.replan()
+    return scheduler.snapshot()
+
+@router.get("/search", response_model=List[SymbolMatch])
+def search_stocks(
+    q: str = Query(..., min_length=1, max_length=50, description="Ticker or company name"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Search the local symbol universe by ticker prefix or (fuzzy) company name"""
+    
+    stock_service = StockService()
+    return stock_service.search_symbols(q, limit)
 
 @router.get("/validate/{symbol}")
 def validate_stock_symbol(symbol: str):
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Returned by TTLCache.get when a key is absent or expired
+MISSING = object()
+
+class _Flight:
+    """A load in progress that other callers for the same key wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry and single-flight loading
+    
+    When several threads miss on the same key at once, only the first runs
+    the loader; the rest block until it finishes and share its result (or
+    its exception, which is not cached).
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Any:
+        """Cached value for key, or MISSING"""
+        with self._lock:
+            return self._get_locked(key)
+    
+    def _get_locked(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        
+        value, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.misses += 1
+            return MISSING
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._set_locked(key, value, ttl)
+    
+    def _set_locked(self, key: Hashable, value: Any, ttl: Optional[float]):
+        self._entries[key] = (value, self.clock() + (self.ttl if ttl is None else ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value, calling loader at most once per key across concurrent misses"""
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not MISSING:
+                return value
+            
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        
+        try:
+            flight.value = loader()
+            with self._lock:
+                self.loads += 1
+                self._set_locked(key, flight.value, ttl)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+    
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads
+            }
@@ -1,32 +1,123 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 import os
 from dotenv import load_dotenv
+from app.core.metrics import instrument_engine
 
 load_dotenv()
 
 # Database URL from environment or default to SQLite for development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sentiment.db")
 
-# Handle SQLite vs PostgreSQL differences
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-else:
-    engine = create_engine(DATABASE_URL)
+# Connection pool settings (Postgres, and file-backed SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Postgres statement_timeout in milliseconds, 0 disables it
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+# SQLite pragmas applied to every new connection. WAL lets readers run
+# alongside the scorer's writes; busy_timeout makes writers wait for the
+# lock instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),  # negative means KiB, so 64MB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": "MEMORY"
+}
+
+def is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+def set_sqlite_pragmas(dbapi_connection, connection_record=None, pragmas: dict = None):
+    """Apply SQLITE_PRAGMAS to a raw DBAPI connection (sqlite3 or aiosqlite)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in (pragmas or SQLITE_PRAGMAS).items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def engine_options(url: str, async_driver: bool = False) -> dict:
+    """create_engine keyword arguments for a URL"""
+    if make_url(url).get_backend_name() == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}}
+        if is_memory_sqlite(url):
+            # One shared connection, otherwise every connection gets its own empty database
+            options["poolclass"] = StaticPool
+        else:
+            # Each thread checks out its own connection from the pool
+            options["poolclass"] = AsyncAdaptedQueuePool if async_driver else QueuePool
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+        return options
+    
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING
+    }
+    if DB_STATEMENT_TIMEOUT_MS > 0 and make_url(url).get_backend_name() == "postgresql":
+        if async_driver:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def make_engine(url: str, **overrides):
+    """Sync engine with the configured pool, plus SQLite pragmas on each connection"""
+    engine = create_engine(url, **{**engine_options(url), **overrides})
+    if engine.dialect.name == "sqlite" and not is_memory_sqlite(url):
+        event.listen(engine, "connect", set_sqlite_pragmas)
+    instrument_engine(engine)
+    return engine
+
+def make_async_engine(url: str, **overrides):
+    """Async counterpart of make_engine"""
+    engine = create_async_engine(url, **{**engine_options(url, async_driver=True), **overrides})
+    if engine.dialect.name == "sqlite" and not is_memory_sqlite(url):
+        event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+    instrument_engine(engine.sync_engine)
+    return engine
+
+engine = make_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def async_url(url: str) -> str:
+    """The async driver equivalent of a sync database URL (aiosqlite / asyncpg)"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg:", 1)
+    return url
+
+# Async engine for the read-only API routes
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", async_url(DATABASE_URL))
+async_engine = make_async_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async database session, one per request
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
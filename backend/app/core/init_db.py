@@ -1,11 +1,46 @@
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal, engine
+from app.core.search_index import create_search_index
 from app.models.database import Base, StockInfo
+from app.services.partition_maintenance import NEWS_ARTICLES_PARTITIONING, PartitionMaintenance
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+# Schema that Base.metadata.create_all produced before migrations were introduced
+BASELINE_REVISION = "0001"
+
+def alembic_config(connection=None) -> Config:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "migrations"))
+    config.attributes["connection"] = connection
+    return config
+
+def upgrade_database(bind=None, revision: str = "head"):
+    """Bring the schema up to `revision`, adopting databases created before migrations existed"""
+    bind = bind or engine
+    with bind.begin() as connection:
+        inspector = inspect(connection)
+        if inspector.has_table("news_articles") and not inspector.has_table("alembic_version"):
+            # Fill in any tables added since it was created, then mark it as the baseline
+            Base.metadata.create_all(bind=connection)
+            create_search_index(connection)
+            command.stamp(alembic_config(connection), BASELINE_REVISION)
+    # A fresh connection, so each migration runs in its own transaction
+    with bind.connect() as connection:
+        command.upgrade(alembic_config(connection), revision)
 
 # Create all tables
 def create_tables():
     print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    upgrade_database()
+    if NEWS_ARTICLES_PARTITIONING:
+        # One-time conversion, done here rather than by the API processes' maintenance timer
+        maintenance = PartitionMaintenance(engine)
+        maintenance.convert_table()
+        print(maintenance.run())
     print("✓ Tables created successfully!")
 
 # Initialize with some popular stocks
@@ -0,0 +1,345 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond DB queries to slow upstream calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+# (name, type, help, [(labels, value), ...]) as returned by collectors
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+class _Metric:
+    """A named metric with one child per combination of label values"""
+    
+    kind = ""
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+    
+    def labels(self, *values):
+        """The child for these label values, created on first use"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def _label_dict(self, values: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            lines.extend(self._render_child(self._label_dict(values), child))
+        return lines
+    
+    def _render_child(self, labels: Dict[str, str], child) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(child.value)}"]
+
+class _Value:
+    __slots__ = ("value", "_lock")
+    
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+    
+    def set(self, value: float):
+        self.value = value
+
+class Counter(_Metric):
+    kind = "counter"
+    
+    def _new_child(self):
+        return _Value()
+    
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+class Gauge(_Metric):
+    kind = "gauge"
+    
+    def _new_child(self):
+        return _Value()
+    
+    def set(self, value: float):
+        self.labels().set(value)
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+    
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # Per-bucket (not cumulative) counts; the last slot is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+    
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+class Histogram(_Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+    
+    def observe(self, value: float):
+        self.labels().observe(value)
+    
+    @contextmanager
+    def time(self, *values):
+        """Observe the duration of the with-block"""
+        child = self.labels(*values)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            child.observe(time.perf_counter() - start)
+    
+    def _render_child(self, labels: Dict[str, str], child: _HistogramChild) -> List[str]:
+        counts, total, count = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            bucket_labels = {**labels, "le": _format_value(float(bound))}
+            lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """
+    Metrics exposed on /metrics in the Prometheus text format
+    
+    Metrics are updated in place on the hot path (a dict lookup and a
+    short lock per observation). Collectors are callables run only at
+    scrape time, for values that are cheaper to read on demand such as
+    cache counters or the scoring backlog.
+    """
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._lock = threading.Lock()
+    
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+    
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+    
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+    
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+    
+    def register_collector(self, collector: Callable[[], Iterable[Family]]):
+        with self._lock:
+            self._collectors.append(collector)
+    
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(float(value))}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+UPSTREAM_DURATION = REGISTRY.histogram(
+    "upstream_request_duration_seconds", "Latency of calls to external data providers",
+    ["service", "operation"]
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "upstream_errors_total", "Failed calls to external data providers",
+    ["service", "operation"]
+)
+DB_QUERY_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds", "Database statement execution time",
+    ["operation"]
+)
+INFERENCE_BATCH_SIZE = REGISTRY.histogram(
+    "inference_batch_size", "Texts per sentiment inference call",
+    ["backend"], buckets=BATCH_SIZE_BUCKETS
+)
+INFERENCE_DURATION = REGISTRY.histogram(
+    "inference_duration_seconds", "Sentiment inference time per call",
+    ["backend"]
+)
+INFERENCE_TEXTS = REGISTRY.counter(
+    "inference_texts_total", "Texts scored by sentiment inference",
+    ["backend"]
+)
+
+@contextmanager
+def track_upstream(service: str, operation: str):
+    """Time a call to an external provider, counting it as an error if it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        UPSTREAM_ERRORS.labels(service, operation).inc()
+        raise
+    finally:
+        UPSTREAM_DURATION.labels(service, operation).observe(time.perf_counter() - start)
+
+def record_upstream_error(service: str, operation: str):
+    """Count a failed upstream call that was handled without raising"""
+    UPSTREAM_ERRORS.labels(service, operation).inc()
+
+def record_inference(backend: str, texts: int, seconds: float):
+    INFERENCE_BATCH_SIZE.labels(backend).observe(texts)
+    INFERENCE_DURATION.labels(backend).observe(seconds)
+    INFERENCE_TEXTS.labels(backend).inc(texts)
+
+def _inference_throughput() -> List[Family]:
+    """Texts per second of inference time, per backend"""
+    samples = []
+    for (backend,), texts in list(INFERENCE_TEXTS._children.items()):
+        _, seconds, _ = INFERENCE_DURATION.labels(backend).snapshot()
+        if seconds > 0:
+            samples.append(({"backend": backend}, round(texts.value / seconds, 3)))
+    return [("inference_texts_per_second", "gauge", "Texts scored per second of inference time", samples)]
+
+REGISTRY.register_collector(_inference_throughput)
+
+# Database timing
+
+def _statement_operation(statement: str) -> str:
+    verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return verb if verb in ("select", "insert", "update", "delete") else "other"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if starts:
+        DB_QUERY_DURATION.labels(_statement_operation(statement)).observe(time.perf_counter() - starts.pop())
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    starts = context.connection.info.get("query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+def instrument_engine(engine):
+    """Time every statement executed on a sync engine (or an async engine's sync_engine)"""
+    from sqlalchemy import event
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+# HTTP middleware
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template
+    
+    Labelled with the matched route's path (e.g. /api/sentiment/stock/{symbol})
+    so label cardinality stays bounded; unmatched paths share one label.
+    Plain ASGI rather than BaseHTTPMiddleware so streaming and SSE
+    responses pass through untouched.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status = ["500"]
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(scope["method"], path, status[0]).observe(time.perf_counter() - start)
+
+def render_metrics() -> str:
+    return REGISTRY.render()
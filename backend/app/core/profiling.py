@@ -0,0 +1,268 @@
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Shared secret for the admin endpoints and for triggering a profile by header; unset disables both
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+# Fraction of requests profiled without the header (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# "cprofile" traces the event loop thread (async routes, serialization);
+# "sampling" takes stack samples of every thread, which also covers sync routes on the threadpool
+PROFILE_MODE = os.getenv("PROFILE_MODE", "cprofile")
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.001"))
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "50"))
+# Lines of profiler output kept per report
+PROFILE_TOP = 40
+
+# Stdlib modules whose frames mean a thread is idle rather than doing work
+IDLE_MODULES = ("threading.py", "selectors.py", "queue.py")
+
+def admin_enabled() -> bool:
+    return bool(ADMIN_TOKEN)
+
+def token_matches(candidate: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and bool(candidate) and hmac.compare_digest(candidate, ADMIN_TOKEN)
+
+class ProfileStore:
+    """The most recent profile reports, oldest evicted first"""
+    
+    def __init__(self, maxsize: int = PROFILE_STORE_SIZE):
+        self.maxsize = maxsize
+        self._reports: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def add(self, report: Dict):
+        with self._lock:
+            self._reports[report["id"]] = report
+            while len(self._reports) > self.maxsize:
+                self._reports.popitem(last=False)
+    
+    def get(self, report_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._reports.get(report_id)
+    
+    def list(self) -> List[Dict]:
+        """Summaries of stored reports, newest first"""
+        with self._lock:
+            reports = list(self._reports.values())
+        return [
+            {key: value for key, value in report.items() if key not in ("sql", "profile")}
+            for report in reversed(reports)
+        ]
+    
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._reports)
+            self._reports.clear()
+            return count
+
+_store = ProfileStore()
+
+def get_profile_store() -> ProfileStore:
+    return _store
+
+# SQL capture
+
+# The report of the profiled request running in this context, if any
+_current_report: ContextVar[Optional[Dict]] = ContextVar("current_profile_report", default=None)
+_listeners_lock = threading.Lock()
+_active_profiles = 0
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_report.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    report = _current_report.get()
+    starts = conn.info.get("profile_query_start")
+    if report is not None and starts:
+        report["sql"].append({
+            "statement": statement,
+            "duration_ms": round((time.perf_counter() - starts.pop()) * 1000, 3),
+            "executemany": executemany
+        })
+
+def _attach_sql_listeners():
+    """Listen on every engine while at least one profile is running"""
+    global _active_profiles
+    with _listeners_lock:
+        _active_profiles += 1
+        if _active_profiles == 1:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+def _detach_sql_listeners():
+    global _active_profiles
+    with _listeners_lock:
+        _active_profiles -= 1
+        if _active_profiles == 0:
+            event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+
+def sql_listeners_attached() -> bool:
+    return event.contains(Engine, "before_cursor_execute", _before_cursor_execute)
+
+# Profilers
+
+class StackSampler:
+    """Samples the stacks of every other thread on a background thread"""
+    
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+    
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or frame.f_code.co_filename.endswith(IDLE_MODULES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self) -> str:
+        """Collapsed stacks (flame graph input), most sampled first"""
+        self._stop.set()
+        self._thread.join()
+        lines = [f"{count} {stack}" for stack, count in self.stacks.most_common(PROFILE_TOP)]
+        return f"# {self.samples} samples every {self.interval * 1000:g}ms\n" + "\n".join(lines)
+
+class _CProfiler:
+    # One cProfile per thread, and every profile runs on the event loop thread
+    _busy = threading.Lock()
+    
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.active = False
+    
+    def start(self):
+        self.active = self._busy.acquire(blocking=False)
+        if self.active:
+            self.profile.enable()
+    
+    def stop(self) -> str:
+        if not self.active:
+            return "# cProfile skipped: another profiled request was running"
+        self.profile.disable()
+        self._busy.release()
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        return out.getvalue()
+
+def _make_profiler(mode: str):
+    return StackSampler() if mode == "sampling" else _CProfiler()
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected requests
+    
+    A request is profiled when it carries PROFILE_HEADER set to ADMIN_TOKEN,
+    or when it falls in the PROFILE_SAMPLE_RATE sample. The report holds the
+    profiler output plus every SQL statement the request ran with its
+    timing, and is stored for the admin endpoints; the response carries its
+    id in X-Profile-Id.
+    
+    Untriggered requests pass straight through: no profiler runs and no
+    SQL listeners are attached. cProfile only sees the event loop thread,
+    so use PROFILE_MODE=sampling for sync routes; either way, other
+    requests running concurrently can show up in the profile.
+    """
+    
+    def __init__(self, app, store: Optional[ProfileStore] = None):
+        self.app = app
+        self.store = store or _store
+        self.header = PROFILE_HEADER.lower().encode("latin-1")
+    
+    def _triggered(self, scope) -> Optional[str]:
+        if ADMIN_TOKEN:
+            for name, value in scope["headers"]:
+                if name == self.header:
+                    return "header" if token_matches(value.decode("latin-1")) else None
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            return "sample"
+        return None
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self._triggered(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        await self._profile(scope, receive, send, trigger)
+    
+    async def _profile(self, scope, receive, send, trigger: str):
+        report = {
+            "id": uuid.uuid4().hex[:16],
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "trigger": trigger,
+            "mode": PROFILE_MODE,
+            "started_at": datetime.now().isoformat(),
+            "status": None,
+            "sql": []
+        }
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                report["status"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", report["id"].encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        profiler = _make_profiler(PROFILE_MODE)
+        token = _current_report.set(report)
+        _attach_sql_listeners()
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            output = profiler.stop()
+            duration = time.perf_counter() - start
+            _detach_sql_listeners()
+            _current_report.reset(token)
+            
+            route = scope.get("route")
+            report["route"] = getattr(route, "path", None)
+            report["duration_ms"] = round(duration * 1000, 3)
+            report["sql_count"] = len(report["sql"])
+            report["sql_ms"] = round(sum(query["duration_ms"] for query in report["sql"]), 3)
+            report["profile"] = output
+            self.store.add(report)
+            logger.info(f"Profiled {report['method']} {report['path']} in {report['duration_ms']}ms: {report['id']}")
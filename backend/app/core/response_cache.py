@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.cache import MISSING, TTLCache
+from app.core.metrics import REGISTRY
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "4096"))
+# Backstop only: entries are normally retired by invalidation, but time-window
+# queries ("last 24 hours") also drift as the clock moves
+RESPONSE_CACHE_MAX_AGE = float(os.getenv("RESPONSE_CACHE_MAX_AGE", "600"))
+
+# Tag bumped by every ingest, for responses that aggregate across all symbols
+GLOBAL_TAG = "global"
+
+def symbol_tag(symbol: str) -> str:
+    return f"symbol:{symbol.upper()}"
+
+class ResponseCache:
+    """
+    Serialized API responses keyed by route, parameters and tag generations
+    
+    Every response is stored under the current generation number of each
+    tag it depends on (a symbol, or GLOBAL_TAG). Invalidating a tag just
+    bumps its generation, so later lookups build a new key and the stale
+    entries age out of the LRU. With Redis configured, generations and
+    bodies are shared by every worker and by out-of-process writers such as
+    the ingestion pipeline; otherwise invalidation is local to this process.
+    """
+    
+    def __init__(self, redis_url: Optional[str] = REDIS_URL, maxsize: int = RESPONSE_CACHE_SIZE,
+                 max_age: float = RESPONSE_CACHE_MAX_AGE):
+        self.memory = TTLCache(maxsize=maxsize, ttl=max_age)
+        self.max_age = max_age
+        self.redis = None
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.counters = {
+            "memory_hits": 0, "redis_hits": 0, "misses": 0,
+            "not_modified": 0, "invalidations": 0, "redis_errors": 0
+        }
+        
+        if redis_url:
+            try:
+                import redis
+                self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.25)
+            except Exception as e:
+                logger.error(f"Response cache running without Redis: {e}")
+    
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+    
+    # Tag generations
+    
+    def generations(self, tags: List[str]) -> Tuple[int, ...]:
+        if self.redis is not None:
+            try:
+                values = self.redis.mget([f"rc:gen:{tag}" for tag in tags])
+                return tuple(int(v or 0) for v in values)
+            except Exception as e:
+                self._redis_failed(e)
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+    
+    def invalidate(self, tags: Iterable[str]):
+        tags = list(set(tags))
+        if not tags:
+            return
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            self.counters["invalidations"] += len(tags)
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline()
+                for tag in tags:
+                    pipe.incr(f"rc:gen:{tag}")
+                pipe.execute()
+            except Exception as e:
+                self._redis_failed(e)
+    
+    def _redis_failed(self, error: Exception):
+        self._count("redis_errors")
+        logger.warning(f"Response cache Redis error: {error}")
+    
+    # Lookup
+    
+    def get_or_build(self, route: str, params: Dict[str, Any], tags: List[str],
+                     build: Callable[[], Any]) -> Tuple[bytes, str, bool]:
+        """
+        Cached (body, etag, hit) for a route call, building it on a miss
+        
+        Exceptions from build (e.g. 404s) propagate and are not cached.
+        """
+        key = self._key(route, params, tags)
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry[0], entry[1], True
+        
+        self._count("misses")
+        entry = self.memory.get_or_load(key, lambda: self._render(build()))
+        self._store_shared(key, entry)
+        return entry[0], entry[1], False
+    
+    async def aget_or_build(self, route: str, params: Dict[str, Any], tags: List[str],
+                            build: Callable[[], Awaitable[Any]]) -> Tuple[bytes, str, bool]:
+        """get_or_build for async builders; Redis round trips run off the event loop"""
+        if self.redis is not None:
+            key = await asyncio.to_thread(self._key, route, params, tags)
+            entry = await asyncio.to_thread(self._lookup, key)
+        else:
+            key = self._key(route, params, tags)
+            entry = self._lookup(key)
+        if entry is not None:
+            return entry[0], entry[1], True
+        
+        self._count("misses")
+        entry = self._render(await build())
+        self.memory.set(key, entry)
+        if self.redis is not None:
+            await asyncio.to_thread(self._store_shared, key, entry)
+        return entry[0], entry[1], False
+    
+    def _lookup(self, key: str) -> Optional[Tuple[bytes, str]]:
+        entry = self.memory.get(key)
+        if entry is not MISSING:
+            self._count("memory_hits")
+            return entry
+        
+        if self.redis is not None:
+            try:
+                stored = self.redis.get(f"rc:body:{key}")
+                if stored is not None:
+                    etag, body = stored.split(b"\n", 1)
+                    entry = (body, etag.decode())
+                    self.memory.set(key, entry)
+                    self._count("redis_hits")
+                    return entry
+            except Exception as e:
+                self._redis_failed(e)
+        return None
+        
+    def _store_shared(self, key: str, entry: Tuple[bytes, str]):
+        if self.redis is not None:
+            body, etag = entry
+            try:
+                self.redis.setex(f"rc:body:{key}", int(self.max_age), etag.encode() + b"\n" + body)
+            except Exception as e:
+                self._redis_failed(e)
+    
+    def _key(self, route: str, params: Dict[str, Any], tags: List[str]) -> str:
+        generations = self.generations(tags)
+        raw = json.dumps([route, sorted(params.items()), tags, generations], default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+    
+    @staticmethod
+    def _render(data: Any) -> Tuple[bytes, str]:
+        body = json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+        return body, f'"{hashlib.sha1(body).hexdigest()}"'
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["memory_hits"] + counters["redis_hits"] + counters["misses"]
+        counters["hit_rate"] = round(
+            (counters["memory_hits"] + counters["redis_hits"]) / lookups, 3
+        ) if lookups else 0.0
+        counters["memory_entries"] = self.memory.stats()["size"]
+        counters["redis_enabled"] = self.redis is not None
+        return counters
+
+_response_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        with _cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
+
+def invalidate_symbols(symbols: Iterable[str]):
+    """Retire cached responses for these symbols and every cross-symbol aggregate"""
+    tags = {symbol_tag(symbol) for symbol in symbols if symbol}
+    if tags:
+        get_response_cache().invalidate(tags | {GLOBAL_TAG})
+
+def cached_json_response(request: Request, route: str, params: Dict[str, Any],
+                         tags: List[str], build: Callable[[], Any]) -> Response:
+    """Serve a JSON response from the cache, answering 304 when the client's ETag still matches"""
+    body, etag, hit = get_response_cache().get_or_build(route, params, tags, build)
+    return _etag_response(request, body, etag, hit)
+
+async def cached_json_response_async(request: Request, route: str, params: Dict[str, Any],
+                                     tags: List[str], build: Callable[[], Awaitable[Any]]) -> Response:
+    """cached_json_response for async route handlers"""
+    body, etag, hit = await get_response_cache().aget_or_build(route, params, tags, build)
+    return _etag_response(request, body, etag, hit)
+
+def _etag_response(request: Request, body: bytes, etag: str, hit: bool) -> Response:
+    headers = {
+        "ETag": etag,
+        # Let browsers keep the body but always revalidate with If-None-Match
+        "Cache-Control": "no-cache",
+        "X-Cache": "HIT" if hit else "MISS"
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        get_response_cache()._count("not_modified")
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _response_cache_metrics():
+    if _response_cache is None:
+        return []
+    stats = _response_cache.stats()
+    lookups = [
+        ({"result": result}, stats[key])
+        for result, key in (("memory_hit", "memory_hits"), ("redis_hit", "redis_hits"), ("miss", "misses"))
+    ]
+    return [
+        ("response_cache_lookups_total", "counter", "Response cache lookups by result", lookups),
+        ("response_cache_not_modified_total", "counter", "Responses answered 304 Not Modified", [({}, stats["not_modified"])]),
+        ("response_cache_invalidations_total", "counter", "Tag invalidations", [({}, stats["invalidations"])]),
+        ("response_cache_redis_errors_total", "counter", "Failed Redis calls", [({}, stats["redis_errors"])]),
+        ("response_cache_entries", "gauge", "Responses held in process memory", [({}, stats["memory_entries"])])
+    ]
+
+REGISTRY.register_collector(_response_cache_metrics)
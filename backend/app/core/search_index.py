@@ -0,0 +1,123 @@
+"""
+Full-text index over news_articles.title and content
+
+SQLite gets an external-content FTS5 table kept in sync by triggers, so
+every write path (ORM, Core bulk inserts, the ingestion pipeline) is indexed
+without application code. Postgres gets a generated, weighted tsvector
+column with a GIN index. Both are created with the news_articles table and
+can be added to an existing database with create_search_index().
+"""
+import logging
+import os
+import re
+from typing import List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "news_articles_fts"
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_VECTOR_INDEX = "ix_news_articles_search_vector"
+# Text search configuration for Postgres (stemming and stop words)
+SEARCH_LANGUAGE = "english"
+# Broad queries only consider this many of the most recently stored matches,
+# which keeps ranking cost bounded however large the corpus grows
+SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "20000"))
+# bm25 column weights for (title, content, symbol); symbol is only there for filtering
+FTS_WEIGHTS = (10.0, 1.0, 0.0)
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, content, symbol,
+        content='news_articles', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS news_articles_fts_insert AFTER INSERT ON news_articles BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content, symbol) VALUES (new.id, new.title, new.content, new.symbol);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS news_articles_fts_delete AFTER DELETE ON news_articles BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content, symbol)
+        VALUES ('delete', old.id, old.title, old.content, old.symbol);
+    END""",
+    # Scoring only touches the sentiment columns, so it never reindexes the text
+    f"""CREATE TRIGGER IF NOT EXISTS news_articles_fts_update AFTER UPDATE OF title, content, symbol ON news_articles BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content, symbol)
+        VALUES ('delete', old.id, old.title, old.content, old.symbol);
+        INSERT INTO {FTS_TABLE}(rowid, title, content, symbol) VALUES (new.id, new.title, new.content, new.symbol);
+    END""",
+]
+
+POSTGRES_DDL = [
+    f"""ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(content, '')), 'B')
+        ) STORED""",
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_VECTOR_INDEX} ON news_articles USING GIN ({SEARCH_VECTOR_COLUMN})",
+]
+
+def search_supported(dialect_name: str) -> bool:
+    return dialect_name in ("sqlite", "postgresql")
+
+def is_search_index_object(name: str, type_: str) -> bool:
+    """True for the tables, column and index owned by the search index, which the ORM models don't declare"""
+    if type_ == "table":
+        # FTS5 keeps its data in shadow tables named after the virtual table
+        return name.startswith(FTS_TABLE)
+    if type_ == "column":
+        return name == SEARCH_VECTOR_COLUMN
+    if type_ == "index":
+        return name == SEARCH_VECTOR_INDEX
+    return False
+
+def create_search_index(connection):
+    """Create the index and its triggers if missing, backfilling existing rows; idempotent"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.execute(text(statement))
+    else:
+        logger.warning(f"Full-text search is not supported on {dialect}; /api/sentiment/search will be unavailable")
+
+def drop_search_index(connection):
+    if connection.dialect.name == "sqlite":
+        # The triggers go with news_articles, the virtual table does not
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+def fts5_query(query: str, symbols: Optional[List[str]] = None) -> str:
+    """
+    Translate a user query into an FTS5 MATCH expression
+    
+    Words and "quoted phrases" must all match, `word*` matches a prefix and
+    OR between terms matches either. Everything else is quoted, so user input
+    can never be a syntax error. Returns "" when nothing searchable is left.
+    """
+    parts = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        if word == "OR":
+            if parts and parts[-1] != "OR":
+                parts.append("OR")
+            continue
+        value = phrase if phrase else word.rstrip("*")
+        # Skip tokens with nothing the tokenizer would index, e.g. "-" or "*"
+        if not re.search(r"\w", value):
+            continue
+        suffix = "*" if word.endswith("*") else ""
+        parts.append('"' + value.replace('"', '""') + '"' + suffix)
+    while parts and parts[-1] == "OR":
+        parts.pop()
+    if not parts:
+        return ""
+    expression = " ".join(parts)
+    if symbols:
+        quoted = " OR ".join('"' + symbol.replace('"', '""') + '"' for symbol in symbols)
+        expression = f"({expression}) AND symbol : ({quoted})"
+    return expression
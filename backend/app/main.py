@@ -1,6 +1,11 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import sentiment, stocks
+from app.api import sentiment, stocks, analytics, admin
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.services.partition_maintenance import NEWS_ARTICLES_PARTITIONING, get_partition_maintenance_timer
+from app.services.refresh_scheduler import SCHEDULER_ENABLED, get_scheduler
 
 # Create FastAPI app
 app = FastAPI(
@@ -18,9 +23,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request latency, exposed on /metrics
+app.add_middleware(MetricsMiddleware)
+# Opt-in request profiles (X-Profile header or PROFILE_SAMPLE_RATE), read back via /api/admin
+app.add_middleware(ProfilingMiddleware)
+
+@app.on_event("startup")
+def start_scheduler():
+    # Enable in one process only; every enabled worker would spend the API budget independently
+    if SCHEDULER_ENABLED:
+        get_scheduler().start()
+
+@app.on_event("startup")
+def start_partition_maintenance():
+    # Upcoming months need their partitions whether or not the scheduler runs
+    if NEWS_ARTICLES_PARTITIONING:
+        get_partition_maintenance_timer().start()
+
+@app.on_event("shutdown")
+def stop_scheduler():
+    get_scheduler().stop()
+
+@app.on_event("shutdown")
+def stop_partition_maintenance():
+    get_partition_maintenance_timer().stop()
+
 # Include API routers
 app.include_router(sentiment.router, prefix="/api/sentiment", tags=["sentiment"])
 app.include_router(stocks.router, prefix="/api/stocks", tags=["stocks"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 @app.get("/")
 def read_root():
@@ -30,10 +62,16 @@ def read_root():
         "endpoints": {
             "sentiment": "/api/sentiment",
             "stocks": "/api/stocks",
+            "analytics": "/api/analytics",
             "docs": "/docs"
         }
     }
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "message": "API is running"}
\ No newline at end of file
+    return {"status": "healthy", "message": "API is running"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of request, upstream, DB and inference metrics"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Client for the shared inference server (app.ml.inference_server)
+
+With INFERENCE_SERVER set, SentimentService scores through a
+RemoteSentimentAnalyzer instead of loading a model in every web worker.
+Requests are length-prefixed JSON frames over a Unix socket ("/path" or
+"unix:/path") or localhost TCP ("127.0.0.1:8765"). This module only uses
+the standard library, so processes that use it never import torch.
+"""
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.core.metrics import record_inference
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Empty means every process loads its own analyzer
+INFERENCE_SERVER = os.getenv("INFERENCE_SERVER", "")
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "30"))
+
+# 4-byte big-endian payload length, then UTF-8 JSON
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+# error_type of a response rejecting the request itself; anything else is a server failure
+INVALID_REQUEST = "invalid_request"
+
+class InferenceUnavailable(ConnectionError):
+    """The inference server could not be reached or failed the request"""
+
+class InferenceRequestError(ValueError):
+    """The inference server rejected the request (bad texts, unknown model); retrying won't help"""
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """(socket family, address) for "unix:/path", "/path" or "host:port" """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    if address.startswith("/") or address.startswith("."):
+        return socket.AF_UNIX, address
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Inference server address must be a socket path or host:port, got {address!r}")
+    return socket.AF_INET, (host, int(port))
+
+def encode_frame(message: Dict) -> bytes:
+    payload = json.dumps(message).encode()
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+def decode_payload(payload: bytes) -> Dict:
+    return json.loads(payload.decode())
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Inference server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+class InferenceClient:
+    """Blocking client; each thread keeps its own connection, so requests from worker threads run in parallel"""
+    
+    def __init__(self, address: str = INFERENCE_SERVER, timeout: float = INFERENCE_TIMEOUT):
+        self.family, self.address = parse_address(address)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._next_id = 0
+        self._id_lock = threading.Lock()
+    
+    def request(self, message: Dict) -> Dict:
+        """
+        Send one request and wait for its response
+        
+        A connection that went stale while idle (e.g. the server restarted)
+        is replaced and the request sent once more. A request that timed
+        out is not resent, since the server may still be working on it.
+        """
+        with self._id_lock:
+            self._next_id += 1
+            message = dict(message, id=self._next_id)
+        frame = encode_frame(message)
+        if len(frame) - FRAME_HEADER.size > MAX_FRAME_SIZE:
+            raise InferenceRequestError(f"Request of {len(frame)} bytes exceeds the {MAX_FRAME_SIZE}-byte frame limit")
+        for attempt in range(2):
+            reused = getattr(self._local, "sock", None) is not None
+            sock = self._connection()
+            try:
+                sock.sendall(frame)
+                (size,) = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+                response = decode_payload(_recv_exactly(sock, size))
+                break
+            except socket.timeout as e:
+                self.close()
+                raise InferenceUnavailable(f"Inference server at {self.address} timed out: {e}") from e
+            except OSError as e:
+                self.close()
+                if attempt or not reused:
+                    raise InferenceUnavailable(f"Inference server at {self.address} is unavailable: {e}") from e
+        if "error" in response:
+            if response.get("error_type") == INVALID_REQUEST:
+                raise InferenceRequestError(response["error"])
+            raise InferenceUnavailable(f"Inference server error: {response['error']}")
+        return response
+    
+    def analyze_batch(self, texts: List[str], model_type: str) -> Tuple[List[Dict], str]:
+        """Results in input order, and the backend that actually scored them"""
+        response = self.request({"op": "analyze", "model": model_type, "texts": texts})
+        return response["results"], response["model"]
+    
+    def ping(self) -> Dict:
+        return self.request({"op": "ping"})
+    
+    def stats(self) -> Dict:
+        return self.request({"op": "stats"})
+    
+    def close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+    
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(self.family, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.address)
+            except OSError as e:
+                sock.close()
+                raise InferenceUnavailable(f"Inference server at {self.address} is unavailable: {e}") from e
+            self._local.sock = sock
+        return sock
+
+class RemoteSentimentAnalyzer:
+    """Drop-in for SentimentAnalyzer that scores on the inference server"""
+    
+    def __init__(self, model_type: str = "finbert", client: Optional[InferenceClient] = None):
+        self.model_type = model_type
+        self.client = client or InferenceClient()
+    
+    def analyze_text(self, text: str) -> Dict[str, float]:
+        return self.analyze_batch([text])[0]
+    
+    def analyze_batch(self, texts: List[str], batch_size: int = 32) -> List[Dict[str, float]]:
+        # batch_size is the server's concern; it batches across every worker's requests
+        if not texts:
+            return []
+        start = time.perf_counter()
+        results, model = self.client.analyze_batch(texts, self.model_type)
+        # Round trip as seen by this process, so /metrics still shows inference latency per worker
+        record_inference(model, len(texts), time.perf_counter() - start)
+        return results
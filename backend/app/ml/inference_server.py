@@ -0,0 +1,302 @@
+"""
+Shared local inference server for sentiment scoring
+
+One process per host owns the SentimentAnalyzer models, so running several
+uvicorn workers costs one copy of FinBERT instead of one per worker. Web
+workers, the job queue and the ingestion pipeline reach it via
+RemoteSentimentAnalyzer (app.ml.inference_client) when INFERENCE_SERVER is
+set. The address is a Unix socket path or a localhost host:port.
+
+Requests from every connection are queued per model and scored together:
+a batch closes at INFERENCE_MAX_BATCH texts, or INFERENCE_MAX_WAIT_MS
+after its first request. Batches run one at a time on a single thread,
+with torch limited to INFERENCE_TORCH_THREADS intra-op threads, so
+inference never oversubscribes the cores the web workers need.
+
+    cd backend && INFERENCE_SERVER=/tmp/sentiment-inference.sock python -m app.ml.inference_server --models finbert
+"""
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import torch
+from dotenv import load_dotenv
+
+from app.ml.inference_client import (
+    FRAME_HEADER, INFERENCE_SERVER, INVALID_REQUEST, MAX_FRAME_SIZE, decode_payload, encode_frame, parse_address
+)
+from app.ml.sentiment_analyzer import MODEL_TYPES, SentimentAnalyzer
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Models loaded at startup; others load on their first request
+INFERENCE_MODELS = os.getenv("INFERENCE_MODELS", os.getenv("SENTIMENT_MODEL", "vader"))
+INFERENCE_TORCH_THREADS = int(os.getenv("INFERENCE_TORCH_THREADS", str(os.cpu_count() or 1)))
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "64"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+
+def configure_torch_threads(threads: int):
+    """Cap torch's thread pools; has to run before the first model is loaded"""
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only settable once per process, before any parallel work
+        pass
+
+class MicroBatcher:
+    """Collects requests for one model and scores them as a single analyze_batch call"""
+    
+    def __init__(self, analyzer: SentimentAnalyzer, executor: ThreadPoolExecutor,
+                 max_batch: int = INFERENCE_MAX_BATCH, max_wait_ms: float = INFERENCE_MAX_WAIT_MS):
+        self.analyzer = analyzer
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "largest_batch": 0}
+    
+    async def submit(self, texts: List[str]) -> List[Dict]:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+    
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            # Requests that arrived while the previous batch ran are already queued and join at once
+            while size < self.max_batch:
+                try:
+                    item = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                batch.append(item)
+                size += len(item[0])
+            
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                results = await loop.run_in_executor(self.executor, self.analyzer.analyze_batch, texts)
+            except Exception as e:
+                logger.error(f"Batch of {len(texts)} texts failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            offset = 0
+            for request_texts, future in batch:
+                # A client that disconnected has its future cancelled
+                if not future.done():
+                    future.set_result(results[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+            self.stats["requests"] += len(batch)
+            self.stats["texts"] += len(texts)
+            self.stats["batches"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(texts))
+
+class InferenceServer:
+    """Serves analyze requests for every process on the host over one socket"""
+    
+    def __init__(self, address: str = INFERENCE_SERVER, models: Optional[List[str]] = None,
+                 threads: int = INFERENCE_TORCH_THREADS, max_batch: int = INFERENCE_MAX_BATCH,
+                 max_wait_ms: float = INFERENCE_MAX_WAIT_MS):
+        if not address:
+            raise ValueError("Set INFERENCE_SERVER (or pass an address) to a socket path or host:port")
+        self.address = address
+        self.family, self.bind_address = parse_address(address)
+        self.models = models if models is not None else [m.strip() for m in INFERENCE_MODELS.split(",") if m.strip()]
+        self.threads = threads
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        # One inference at a time; torch parallelises within it
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.batchers: Dict[str, MicroBatcher] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+        # Requested model -> the model it actually loaded as (finbert falls back to vader)
+        self._loaded_as: Dict[str, str] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._server = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.started = threading.Event()
+    
+    async def serve(self):
+        """Load the models, then serve until cancelled"""
+        configure_torch_threads(self.threads)
+        for model_type in self.models:
+            await self._batcher(model_type)
+        
+        if self.family == socket.AF_UNIX:
+            self._remove_stale_socket()
+            self._server = await asyncio.start_unix_server(self._handle, path=self.bind_address)
+        else:
+            host, port = self.bind_address
+            self._server = await asyncio.start_server(self._handle, host=host, port=port)
+        self._loop = asyncio.get_running_loop()
+        logger.info(f"✅ Inference server on {self.address} with {', '.join(self.batchers)} "
+                    f"({self.threads} torch threads)")
+        self.started.set()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        except asyncio.CancelledError:
+            # stop() closes the server, which cancels serve_forever
+            pass
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            if self.family == socket.AF_UNIX and os.path.exists(self.bind_address):
+                os.unlink(self.bind_address)
+    
+    def start_background(self, timeout: float = 60) -> threading.Thread:
+        """Serve on a daemon thread, e.g. for tests; returns once the socket is listening"""
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.serve()), daemon=True)
+        self._thread.start()
+        if not self.started.wait(timeout):
+            raise RuntimeError(f"Inference server did not start on {self.address}")
+        return self._thread
+    
+    def stop(self):
+        if self._server is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+    
+    def stats(self) -> Dict:
+        return {
+            "address": self.address,
+            "models": {model_type: dict(batcher.stats, backend=batcher.analyzer.model_type)
+                       for model_type, batcher in self.batchers.items()},
+            "torch_threads": self.threads,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait_ms
+        }
+    
+    async def _batcher(self, model_type: str) -> MicroBatcher:
+        if model_type not in MODEL_TYPES:
+            # Checked here because SentimentAnalyzer would quietly fall back to VADER
+            raise ValueError(f"Unknown model: {model_type!r} (expected one of {', '.join(MODEL_TYPES)})")
+        batcher = self.batchers.get(self._loaded_as.get(model_type, model_type))
+        if batcher is not None:
+            return batcher
+        # Concurrent first requests for a model wait on the same load
+        if model_type not in self._loading:
+            self._loading[model_type] = asyncio.ensure_future(self._load(model_type))
+        return await asyncio.shield(self._loading[model_type])
+    
+    async def _load(self, model_type: str) -> MicroBatcher:
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            analyzer = await loop.run_in_executor(self.executor, SentimentAnalyzer, model_type)
+        finally:
+            self._loading.pop(model_type, None)
+        self._loaded_as[model_type] = analyzer.model_type
+        batcher = self.batchers.get(analyzer.model_type)
+        if batcher is None:
+            batcher = MicroBatcher(analyzer, self.executor, self.max_batch, self.max_wait_ms)
+            self._tasks.append(asyncio.ensure_future(batcher.run()))
+            self.batchers[analyzer.model_type] = batcher
+        logger.info(f"Loaded {model_type} as {analyzer.model_type} in {time.perf_counter() - started:.1f}s")
+        return batcher
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(FRAME_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                (size,) = FRAME_HEADER.unpack(header)
+                if size > MAX_FRAME_SIZE:
+                    logger.warning(f"Dropping connection after a {size}-byte frame")
+                    break
+                payload = await reader.readexactly(size)
+                try:
+                    message = decode_payload(payload)
+                except ValueError as e:
+                    # The whole frame was read, so the connection can carry on after the error reply
+                    response = {"id": None, "error": f"Malformed request: {e}", "error_type": INVALID_REQUEST}
+                else:
+                    response = await self._respond(message)
+                writer.write(encode_frame(response))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _respond(self, message) -> Dict:
+        if not isinstance(message, dict):
+            return {"id": None, "error": "Request must be a JSON object", "error_type": INVALID_REQUEST}
+        request_id = message.get("id")
+        op = message.get("op")
+        try:
+            if op == "analyze":
+                texts = message.get("texts")
+                if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                    raise ValueError("texts must be a list of strings")
+                batcher = await self._batcher(message.get("model") or self.models[0])
+                results = await batcher.submit(texts) if texts else []
+                return {"id": request_id, "results": results, "model": batcher.analyzer.model_type}
+            if op == "ping":
+                return {"id": request_id, "ok": True, "models": list(self.batchers)}
+            if op == "stats":
+                return {"id": request_id, "stats": self.stats()}
+            raise ValueError(f"Unknown op: {op!r}")
+        except ValueError as e:
+            # Bad texts, op or model name: the client's fault, and resending won't help
+            return {"id": request_id, "error": str(e), "error_type": INVALID_REQUEST}
+        except Exception as e:
+            return {"id": request_id, "error": str(e), "error_type": "server_error"}
+    
+    def _remove_stale_socket(self):
+        """Unlink a socket file left by a server that is no longer running"""
+        if not os.path.exists(self.bind_address):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.bind_address)
+        except OSError:
+            os.unlink(self.bind_address)
+        else:
+            raise RuntimeError(f"Another inference server is listening on {self.bind_address}")
+        finally:
+            probe.close()
+
+# Command line entry point
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Serve sentiment inference for every worker on this host")
+    parser.add_argument("--address", default=INFERENCE_SERVER or "/tmp/sentiment-inference.sock",
+                        help="Unix socket path or host:port (defaults to INFERENCE_SERVER)")
+    parser.add_argument("--models", default=INFERENCE_MODELS, help="Comma-separated models to load at startup")
+    parser.add_argument("--threads", type=int, default=INFERENCE_TORCH_THREADS, help="torch intra-op threads")
+    parser.add_argument("--max-batch", type=int, default=INFERENCE_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=INFERENCE_MAX_WAIT_MS)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    server = InferenceServer(args.address, [m.strip() for m in args.models.split(",") if m.strip()],
+                             args.threads, args.max_batch, args.max_wait_ms)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
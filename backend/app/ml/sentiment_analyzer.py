@@ -4,12 +4,16 @@ from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import re
 import logging
-from typing import Dict, Tuple
+import time
+from typing import Dict, List, Tuple
+from app.core.metrics import record_inference
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MODEL_TYPES = ("finbert", "vader", "textblob")
+
 class SentimentAnalyzer:
     def __init__(self, model_type: str = "finbert"):
         """
@@ -73,17 +77,63 @@ class SentimentAnalyzer:
         clean_text = self.preprocess_text(text)
         
         try:
+            start = time.perf_counter()
             if self.model_type == "finbert":
-                return self._analyze_with_finbert(clean_text)
+                result = self._analyze_with_finbert(clean_text)
             elif self.model_type == "vader":
-                return self._analyze_with_vader(clean_text)
+                result = self._analyze_with_vader(clean_text)
             elif self.model_type == "textblob":
-                return self._analyze_with_textblob(clean_text)
+                result = self._analyze_with_textblob(clean_text)
+            record_inference(self.model_type, 1, time.perf_counter() - start)
+            return result
         except Exception as e:
             logger.error(f"Error in sentiment analysis: {e}")
             # Fallback to neutral
             return {"score": 0.0, "label": "neutral", "confidence": 0.0}
     
+    def analyze_batch(self, texts: List[str], batch_size: int = 32) -> List[Dict[str, float]]:
+        """
+        Analyze sentiment of many texts at once
+        
+        FinBERT runs the whole list through the pipeline in batches of
+        `batch_size`; VADER and TextBlob score each text in turn.
+        
+        Returns:
+            One result dict per input text, in the same order
+        """
+        neutral = {"score": 0.0, "label": "neutral", "confidence": 0.0}
+        results = [dict(neutral) for _ in texts]
+        
+        # Empty texts stay neutral and are not sent to the model
+        positions = []
+        clean_texts = []
+        for i, text in enumerate(texts):
+            if text and text.strip():
+                positions.append(i)
+                clean_texts.append(self.preprocess_text(text))
+        
+        if not clean_texts:
+            return results
+        
+        start = time.perf_counter()
+        try:
+            if self.model_type == "finbert":
+                outputs = self.classifier(clean_texts, batch_size=batch_size, truncation=True)
+                scored = [self._finbert_scores_to_result(output) for output in outputs]
+            elif self.model_type == "vader":
+                scored = [self._analyze_with_vader(text) for text in clean_texts]
+            else:
+                scored = [self._analyze_with_textblob(text) for text in clean_texts]
+        except Exception as e:
+            logger.error(f"Error in batch sentiment analysis, scoring individually: {e}")
+            scored = [self.analyze_text(text) for text in clean_texts]
+        else:
+            record_inference(self.model_type, len(clean_texts), time.perf_counter() - start)
+        
+        for i, result in zip(positions, scored):
+            results[i] = result
+        return results
+    
     def preprocess_text(self, text: str) -> str:
         """Clean and preprocess text for analysis"""
         # Remove URLs
@@ -99,7 +149,10 @@ class SentimentAnalyzer:
     def _analyze_with_finbert(self, text: str) -> Dict[str, float]:
         """Analyze with FinBERT model"""
         results = self.classifier(text)[0]  # Get all scores
+        return self._finbert_scores_to_result(results)
         
+    def _finbert_scores_to_result(self, results) -> Dict[str, float]:
+        """Collapse FinBERT's per-label scores into a single score and label"""
         # FinBERT returns: positive, negative, neutral
         positive_score = 0
         negative_score = 0
@@ -1,17 +1,18 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, Index
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, Index, event, text
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.core.search_index import create_search_index, drop_search_index
 from datetime import datetime
 
 class NewsArticle(Base):
     __tablename__ = "news_articles"
     
-    id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String(10), index=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String(10), nullable=False)
     title = Column(String(500), nullable=False)
     content = Column(Text)
     url = Column(String(1000), unique=True, index=True)
-    published_at = Column(DateTime, index=True)
+    published_at = Column(DateTime)
     sentiment_score = Column(Float, nullable=True)
     sentiment_label = Column(String(20), nullable=True)  # positive, negative, neutral
     source = Column(String(100))
@@ -19,12 +20,21 @@ class NewsArticle(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
-    # Indexes for better query performance
+    # Indexes for the API's query patterns; change them with a migration (see migrations/versions)
     __table_args__ = (
-        Index('idx_symbol_published', 'symbol', 'published_at'),
-        Index('idx_sentiment_created', 'sentiment_score', 'created_at'),
+        # Scoring backlog, only the unscored rows are in it
+        Index('ix_news_articles_unscored', 'id',
+              sqlite_where=text('sentiment_score IS NULL'), postgresql_where=text('sentiment_score IS NULL')),
+        # Per-stock sentiment, distribution and article pages, covering score and label
+        Index('ix_news_articles_symbol_published', 'symbol', 'published_at', 'sentiment_score', 'sentiment_label'),
+        # Trending and other all-symbol time ranges
+        Index('ix_news_articles_published_symbol', 'published_at', 'symbol', 'sentiment_score'),
     )
 
+# Full-text index for /api/sentiment/search, created and dropped with the table
+event.listen(NewsArticle.__table__, "after_create", lambda target, connection, **kw: create_search_index(connection))
+event.listen(NewsArticle.__table__, "before_drop", lambda target, connection, **kw: drop_search_index(connection))
+
 class StockPrice(Base):
     __tablename__ = "stock_prices"
     
@@ -40,7 +50,8 @@ class StockPrice(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     __table_args__ = (
-        Index('idx_symbol_date', 'symbol', 'date'),
+        # One bar per symbol and day; PriceStore.upsert_bars upserts against it
+        Index('uq_stock_prices_symbol_date', 'symbol', 'date', unique=True),
     )
 
 class StockInfo(Base):
@@ -71,4 +82,36 @@ class SentimentSummary(Base):
     
     __table_args__ = (
         Index('idx_symbol_date_summary', 'symbol', 'date'),
-    )
\ No newline at end of file
+    )
+
+class SentimentStats(Base):
+    """Running totals over all scored articles, kept in a single row by the scoring paths"""
+    __tablename__ = "sentiment_stats"
+    
+    id = Column(Integer, primary_key=True)
+    scored_articles = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    stocks_tracked = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class SymbolStats(Base):
+    """Scored article count per symbol, used to keep SentimentStats.stocks_tracked current"""
+    __tablename__ = "symbol_stats"
+    
+    symbol = Column(String(10), primary_key=True)
+    scored_articles = Column(Integer, nullable=False, default=0)
+
+class ArchivedSentiment(Base):
+    """Daily totals of scored articles moved to the Parquet archive, so rollups and stats still count them"""
+    __tablename__ = "archived_sentiment"
+    
+    symbol = Column(String(10), primary_key=True)
+    date = Column(DateTime, primary_key=True)
+    article_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,402 @@
+import logging
+import os
+import threading
+import warnings
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import and_, func
+
+from app.core.cache import TTLCache
+from app.core.database import SessionLocal
+from app.models.database import NewsArticle, SentimentSummary, StockPrice
+from app.services.price_cache import PRICE_CACHE_DIR, PriceCache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "300"))
+
+# Whole-universe results keyed by query parameters
+_results_cache = TTLCache(maxsize=32, ttl=ANALYTICS_CACHE_TTL)
+
+@dataclass
+class Panel:
+    """Aligned dates × symbols matrices (NaN where there is no data)"""
+    dates: np.ndarray          # datetime64[D], trading days
+    symbols: List[str]
+    returns: np.ndarray        # daily log returns
+    sentiment: np.ndarray      # article-weighted daily sentiment
+    article_counts: np.ndarray
+
+# Vectorized statistics (all operate column-wise on T × N arrays)
+
+def _masked(x: np.ndarray, y: np.ndarray):
+    valid = ~(np.isnan(x) | np.isnan(y))
+    return valid, np.where(valid, x, 0.0), np.where(valid, y, 0.0)
+
+def _corr_from_sums(n, sx, sy, sxx, syy, sxy, min_periods: int) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        corr = cov / np.sqrt(var)
+    corr[(n < min_periods) | ~(var > 0)] = np.nan
+    return corr
+
+def column_correlation(x: np.ndarray, y: np.ndarray, min_periods: int = 10) -> np.ndarray:
+    """Pearson correlation of each column pair over rows where both are present"""
+    valid, x0, y0 = _masked(x, y)
+    return _corr_from_sums(
+        valid.sum(axis=0), x0.sum(axis=0), y0.sum(axis=0),
+        (x0 * x0).sum(axis=0), (y0 * y0).sum(axis=0), (x0 * y0).sum(axis=0),
+        min_periods
+    )
+
+def rolling_correlation(x: np.ndarray, y: np.ndarray, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+    """Trailing-window correlation for every date and column, via cumulative sums"""
+    min_periods = min_periods or max(3, window // 2)
+    valid, x0, y0 = _masked(x, y)
+    
+    def windowed(a: np.ndarray) -> np.ndarray:
+        c = np.cumsum(a, axis=0, dtype=np.float64)
+        out = c.copy()
+        out[window:] -= c[:-window]
+        return out
+    
+    return _corr_from_sums(
+        windowed(valid.astype(np.float64)), windowed(x0), windowed(y0),
+        windowed(x0 * x0), windowed(y0 * y0), windowed(x0 * y0),
+        min_periods
+    )
+
+def shift_rows(a: np.ndarray, k: int) -> np.ndarray:
+    """Row k of the result is row t+k of a (NaN past the edges)"""
+    out = np.full_like(a, np.nan)
+    if k > 0:
+        out[:-k] = a[k:]
+    elif k < 0:
+        out[-k:] = a[:k]
+    else:
+        out[:] = a
+    return out
+
+def lagged_correlation(sentiment: np.ndarray, returns: np.ndarray, max_lag: int, min_periods: int = 10) -> np.ndarray:
+    """
+    corr(sentiment_t, returns_t+k) for k in -max_lag..max_lag
+    
+    Positive k means sentiment leads returns by k days.
+    
+    Returns:
+        (2 * max_lag + 1) × N array
+    """
+    return np.vstack([
+        column_correlation(sentiment, shift_rows(returns, k), min_periods)
+        for k in range(-max_lag, max_lag + 1)
+    ])
+
+def sentiment_zscores(sentiment: np.ndarray) -> np.ndarray:
+    """Per-symbol z-score of daily sentiment"""
+    # Symbols with no news at all produce all-NaN columns; their z-scores stay NaN
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(sentiment, axis=0)
+        std = np.nanstd(sentiment, axis=0)
+        return (sentiment - mean) / np.where(std > 0, std, np.nan)
+
+def event_study(sentiment: np.ndarray, returns: np.ndarray, threshold: float = 2.0, pre: int = 5, post: int = 5) -> Dict:
+    """
+    Cumulative log returns around sentiment spikes (|z| >= threshold)
+    
+    For each event day t the profile at offset h is the cumulative return
+    from the close of day t to the close of day t+h (negative h looks back).
+    """
+    z = sentiment_zscores(sentiment)
+    cumulative = np.cumsum(np.nan_to_num(returns), axis=0)
+    rows, cols = np.nonzero(np.abs(np.nan_to_num(z)) >= threshold)
+    
+    # Keep events whose whole window fits inside the sample
+    inside = (rows - pre >= 0) & (rows + post < len(returns))
+    rows, cols = rows[inside], cols[inside]
+    direction = np.sign(z[rows, cols])
+    
+    offsets = np.arange(-pre, post + 1)
+    profiles = cumulative[rows[:, None] + offsets, cols[:, None]] - cumulative[rows, cols][:, None]
+    
+    result = {"offsets": offsets.tolist()}
+    for name, mask in (("positive", direction > 0), ("negative", direction < 0)):
+        events = profiles[mask]
+        result[name] = {
+            "events": int(mask.sum()),
+            "mean_cumulative_return": events.mean(axis=0).tolist() if len(events) else [],
+            "hit_rate": float(
+                (np.sign(events[:, -1]) == (1 if name == "positive" else -1)).mean()
+            ) if len(events) else None
+        }
+    result["events_by_symbol"] = np.bincount(cols, minlength=sentiment.shape[1]).tolist()
+    return result
+
+def _json_float(value) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), 4)
+
+class AnalyticsService:
+    """Joins daily sentiment rollups with stored prices and analyzes the whole universe at once"""
+    
+    def __init__(self, session_factory=None, price_cache_dir: Optional[str] = PRICE_CACHE_DIR):
+        self.session_factory = session_factory or SessionLocal
+        self.price_cache_dir = price_cache_dir
+        self._price_cache: Optional[PriceCache] = None
+    
+    # Loading
+    
+    def load_panel(self, start: date, end: Optional[date] = None, symbols: Optional[List[str]] = None) -> Panel:
+        end = end or date.today()
+        start_dt = datetime.combine(start, datetime.min.time())
+        end_dt = datetime.combine(end + timedelta(days=1), datetime.min.time())
+        symbol_filter = [s.upper() for s in symbols] if symbols else None
+        
+        # Prefer the memory-mapped price cache when it covers the start of the range
+        price_cache = self.price_cache()
+        use_cache = price_cache is not None and price_cache.covers(start)
+        tail_dt = None
+        if use_cache and not price_cache.covers(start, end):
+            # Bars stored since the cache was last rebuilt come from the database
+            last_cached = pd.Timestamp(price_cache.dates[-1]).date()
+            tail_dt = datetime.combine(last_cached + timedelta(days=1), datetime.min.time())
+        
+        db = self.session_factory()
+        try:
+            sentiment = self._load_daily_sentiment(db, start_dt, end_dt, symbol_filter)
+            if not use_cache:
+                prices = self._load_prices(db, start_dt, end_dt, symbol_filter)
+            elif tail_dt is not None:
+                tail = self._load_prices(db, tail_dt, end_dt, symbol_filter)
+        finally:
+            db.close()
+        
+        if not use_cache:
+            return build_panel(prices, sentiment)
+        
+        rows = price_cache.row_range(start, end)
+        closes = price_cache.fields["adj_close"][rows]
+        if symbol_filter:
+            columns = price_cache.columns(symbol_filter)
+            present = columns >= 0
+            symbols_out = [s for s, keep in zip(symbol_filter, present) if keep]
+            closes = closes[:, columns[present]]
+        else:
+            symbols_out = price_cache.symbols
+        # Fall back to close where adjusted close is missing
+        raw_closes = price_cache.fields["close"][rows]
+        if symbol_filter:
+            raw_closes = raw_closes[:, columns[present]]
+        closes = np.where(np.isnan(closes), raw_closes, closes)
+        dates = price_cache.dates[rows]
+        if tail_dt is not None and not tail.empty:
+            dates, symbols_out, closes = append_closes(dates, symbols_out, closes, tail)
+        return build_panel_from_closes(dates, symbols_out, closes, sentiment)
+    
+    def _load_prices(self, db, start_dt: datetime, end_dt: datetime, symbols: Optional[List[str]]) -> pd.DataFrame:
+        """Long (symbol, date, close) rows from stock_prices, preferring adjusted closes"""
+        query = db.query(
+            StockPrice.symbol, StockPrice.date,
+            func.coalesce(StockPrice.adj_close, StockPrice.close_price)
+        ).filter(and_(StockPrice.date >= start_dt, StockPrice.date < end_dt))
+        if symbols:
+            query = query.filter(StockPrice.symbol.in_(symbols))
+        return pd.DataFrame(query.all(), columns=["symbol", "date", "close"])
+    
+    def price_cache(self) -> Optional[PriceCache]:
+        """The memory-mapped price cache, if one has been built; remapped after a rebuild"""
+        if not self.price_cache_dir:
+            return None
+        try:
+            current = PriceCache.current_directory(self.price_cache_dir)
+            if current is None:
+                self._price_cache = None
+            elif self._price_cache is None or self._price_cache.directory != current:
+                self._price_cache = PriceCache.open(self.price_cache_dir)
+        except Exception as e:
+            logger.error(f"Error opening price cache at {self.price_cache_dir}: {e}")
+        return self._price_cache
+    
+    def _load_daily_sentiment(self, db, start_dt: datetime, end_dt: datetime, symbols: Optional[List[str]]) -> pd.DataFrame:
+        """
+        Daily rollups, plus article aggregates for every (symbol, day) without a rollup
+        
+        Rollups can lag behind the articles (e.g. right after a backfill), so
+        the fallback is per symbol-day rather than all-or-nothing.
+        """
+        columns = ["symbol", "date", "sentiment", "article_count"]
+        query = db.query(
+            SentimentSummary.symbol, SentimentSummary.date,
+            SentimentSummary.avg_sentiment, SentimentSummary.article_count
+        ).filter(and_(SentimentSummary.date >= start_dt, SentimentSummary.date < end_dt))
+        if symbols:
+            query = query.filter(SentimentSummary.symbol.in_(symbols))
+        rollups = pd.DataFrame(query.all(), columns=columns)
+        
+        day = func.date(NewsArticle.published_at)
+        query = db.query(
+            NewsArticle.symbol, day,
+            func.avg(NewsArticle.sentiment_score), func.count(NewsArticle.id)
+        ).filter(
+            and_(
+                NewsArticle.published_at >= start_dt,
+                NewsArticle.published_at < end_dt,
+                NewsArticle.sentiment_score.isnot(None)
+            )
+        )
+        if symbols:
+            query = query.filter(NewsArticle.symbol.in_(symbols))
+        articles = pd.DataFrame(query.group_by(NewsArticle.symbol, day).all(), columns=columns)
+        
+        if rollups.empty or articles.empty:
+            return articles if rollups.empty else rollups
+        
+        def keys(frame: pd.DataFrame) -> pd.Series:
+            return frame["symbol"] + "|" + frame["date"].astype(str).str[:10]
+        
+        uncovered = articles[~keys(articles).isin(set(keys(rollups)))]
+        return pd.concat([rollups, uncovered], ignore_index=True)
+    
+    # Queries
+    
+    def compute(self, days: int = 365, window: int = 30, max_lag: int = 5,
+                threshold: float = 2.0, pre: int = 5, post: int = 5,
+                symbols: Optional[List[str]] = None) -> Dict:
+        """All analytics for the universe, cached per parameter set"""
+        key = (days, window, max_lag, threshold, pre, post, tuple(sorted(symbols or [])))
+        return _results_cache.get_or_load(
+            key,
+            lambda: self._compute(days, window, max_lag, threshold, pre, post, symbols)
+        )
+    
+    def _compute(self, days, window, max_lag, threshold, pre, post, symbols) -> Dict:
+        panel = self.load_panel(date.today() - timedelta(days=days), symbols=symbols)
+        return analyze_panel(panel, window, max_lag, threshold, pre, post)
+
+# One service per process, so its price cache mapping outlives a request
+_shared_service: Optional[AnalyticsService] = None
+_shared_lock = threading.Lock()
+
+def get_shared_analytics_service() -> AnalyticsService:
+    global _shared_service
+    if _shared_service is None:
+        with _shared_lock:
+            if _shared_service is None:
+                _shared_service = AnalyticsService()
+    return _shared_service
+
+def build_panel(prices: pd.DataFrame, sentiment: pd.DataFrame) -> Panel:
+    """Pivot long price rows into a close matrix, then align sentiment to it"""
+    if prices.empty:
+        empty = np.empty((0, 0))
+        return Panel(np.array([], dtype="datetime64[D]"), [], empty, empty, empty)
+    
+    dates, symbols, closes = _pivot_closes(prices)
+    return build_panel_from_closes(dates, symbols, closes, sentiment)
+
+def _pivot_closes(prices: pd.DataFrame):
+    price_dates = pd.to_datetime(prices["date"]).values.astype("datetime64[D]")
+    dates = np.unique(price_dates)
+    symbol_index, symbols = pd.factorize(prices["symbol"], sort=True)
+    
+    closes = np.full((len(dates), len(symbols)), np.nan)
+    closes[np.searchsorted(dates, price_dates), symbol_index] = prices["close"].astype(float).values
+    return dates, list(symbols), closes
+
+def append_closes(dates: np.ndarray, symbols: List[str], closes: np.ndarray, prices: pd.DataFrame):
+    """Extend a close matrix with later long price rows; symbols new in the tail get NaN history"""
+    tail_dates, tail_symbols, tail_closes = _pivot_closes(prices)
+    all_symbols = list(symbols) + [s for s in tail_symbols if s not in set(symbols)]
+    combined = np.full((len(dates) + len(tail_dates), len(all_symbols)), np.nan)
+    combined[:len(dates), :len(symbols)] = closes
+    combined[len(dates):, pd.Index(all_symbols).get_indexer(tail_symbols)] = tail_closes
+    return np.concatenate([dates, tail_dates]), all_symbols, combined
+
+def build_panel_from_closes(dates: np.ndarray, symbols: List[str], closes: np.ndarray, sentiment: pd.DataFrame) -> Panel:
+    """
+    Turn a dates × symbols close matrix plus long sentiment rows into a Panel
+    
+    Sentiment from non-trading days is credited to the next trading day,
+    weighted by article count.
+    """
+    symbols = pd.Index(symbols)
+    closes = np.asarray(closes, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.full_like(closes, np.nan)
+        returns[1:] = np.log(closes[1:] / closes[:-1])
+    
+    weighted = np.zeros_like(closes)
+    counts = np.zeros_like(closes)
+    if not sentiment.empty:
+        sentiment = sentiment[sentiment["symbol"].isin(symbols)]
+        sentiment_dates = pd.to_datetime(sentiment["date"].astype(str).str[:10]).values.astype("datetime64[D]")
+        rows = np.searchsorted(dates, sentiment_dates, side="left")
+        cols = symbols.get_indexer(sentiment["symbol"])
+        keep = rows < len(dates)
+        n = sentiment["article_count"].astype(float).values
+        np.add.at(weighted, (rows[keep], cols[keep]), (sentiment["sentiment"].astype(float).values * n)[keep])
+        np.add.at(counts, (rows[keep], cols[keep]), n[keep])
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        daily_sentiment = np.where(counts > 0, weighted / counts, np.nan)
+    
+    return Panel(dates, list(symbols), returns, daily_sentiment, counts)
+
+def analyze_panel(panel: Panel, window: int = 30, max_lag: int = 5,
+                  threshold: float = 2.0, pre: int = 5, post: int = 5) -> Dict:
+    """Rolling correlation, lead/lag correlation and event study in one pass over the panel"""
+    if not panel.symbols:
+        return {"symbols": [], "dates": 0, "correlation": {}, "lead_lag": {}, "event_study": {}}
+    
+    full_corr = column_correlation(panel.sentiment, panel.returns)
+    rolling = rolling_correlation(panel.sentiment, panel.returns, window)
+    # Most recent defined rolling value per symbol
+    defined = ~np.isnan(rolling)
+    last_rows = np.where(defined.any(axis=0), len(rolling) - 1 - np.argmax(defined[::-1], axis=0), -1)
+    latest_rolling = np.where(last_rows >= 0, rolling[np.maximum(last_rows, 0), np.arange(len(panel.symbols))], np.nan)
+    
+    lags = np.arange(-max_lag, max_lag + 1)
+    lagged = lagged_correlation(panel.sentiment, panel.returns, max_lag)
+    has_lag = ~np.isnan(lagged).all(axis=0)
+    best = np.nanargmax(np.where(np.isnan(lagged), -np.inf, np.abs(lagged)), axis=0)
+    
+    correlation = {}
+    lead_lag = {}
+    for i, symbol in enumerate(panel.symbols):
+        correlation[symbol] = {
+            "correlation": _json_float(full_corr[i]),
+            "rolling_correlation": _json_float(latest_rolling[i]),
+            "days_with_news": int((panel.article_counts[:, i] > 0).sum())
+        }
+        lead_lag[symbol] = {
+            "by_lag": {int(k): _json_float(c) for k, c in zip(lags, lagged[:, i])},
+            "best_lag": int(lags[best[i]]) if has_lag[i] else None,
+            "best_correlation": _json_float(lagged[best[i], i]) if has_lag[i] else None
+        }
+    
+    # Cross-sectional mean correlation at each lag
+    lag_counts = (~np.isnan(lagged)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        universe_by_lag = np.where(lag_counts > 0, np.nansum(lagged, axis=1) / lag_counts, np.nan)
+    
+    events = event_study(panel.sentiment, panel.returns, threshold, pre, post)
+    events["events_by_symbol"] = {
+        symbol: count for symbol, count in zip(panel.symbols, events["events_by_symbol"]) if count
+    }
+    
+    return {
+        "symbols": panel.symbols,
+        "dates": len(panel.dates),
+        "window": window,
+        "correlation": correlation,
+        "lead_lag": lead_lag,
+        "universe_lead_lag": {int(k): _json_float(c) for k, c in zip(lags, universe_by_lag)},
+        "event_study": events
+    }
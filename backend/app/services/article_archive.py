@@ -0,0 +1,327 @@
+"""
+Cold-tier retention for news_articles
+
+Scored articles older than ARTICLE_RETENTION_DAYS are written to Parquet
+under ARCHIVE_DIR, partitioned hive-style by month and symbol
+(news_articles/month=2024-01/symbol=AAPL/part-<first id>-<last id>.parquet),
+then deleted from the hot table in batches. Each delete batch records the
+articles' daily totals in archived_sentiment in the same transaction, so
+SentimentSummary rollups and the global stats keep counting them and
+long-horizon analytics (which read the rollups) are unaffected. Unscored
+articles stay in the hot table until the scorer has seen them.
+
+Exports read archived ranges back through iter_all_articles(), which merges
+a pyarrow dataset scan with the hot table. pyarrow is optional: without it
+the retention job refuses to run and exports only see the hot table.
+
+    cd backend && python -m app.services.article_archive --older-than-days 365
+"""
+import heapq
+import logging
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, func, select
+
+from app.core.database import SessionLocal
+from app.models.database import ArchivedSentiment, NewsArticle
+from app.services.database_service import LOOKUP_CHUNK_SIZE, DatabaseService
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive")
+ARTICLE_RETENTION_DAYS = int(os.getenv("ARTICLE_RETENTION_DAYS", "365"))
+# Articles deleted from the hot table per transaction
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+
+# Columns kept in the archive; symbol and month come from the partition path
+ARCHIVE_COLUMNS = [
+    "id", "title", "content", "url", "published_at",
+    "sentiment_score", "sentiment_label", "source", "author"
+]
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+def _next_month(value: datetime) -> datetime:
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+class ArticleArchive:
+    """Parquet files of archived articles, written per (month, symbol) and read back as a dataset"""
+    
+    def __init__(self, root: str = ARCHIVE_DIR):
+        self.pa = _pyarrow()
+        if self.pa is None:
+            raise RuntimeError("The article archive needs pyarrow (pip install pyarrow)")
+        self.root = os.path.join(root, "news_articles")
+        self.schema = self.pa.schema([
+            ("id", self.pa.int64()),
+            ("title", self.pa.string()),
+            ("content", self.pa.string()),
+            ("url", self.pa.string()),
+            ("published_at", self.pa.timestamp("us")),
+            ("sentiment_score", self.pa.float64()),
+            ("sentiment_label", self.pa.string()),
+            ("source", self.pa.string()),
+            ("author", self.pa.string()),
+        ])
+        self.partitioning = self.pa.dataset.partitioning(
+            self.pa.schema([("month", self.pa.string()), ("symbol", self.pa.string())]), flavor="hive"
+        )
+    
+    def write(self, symbol: str, month: datetime, rows: List[Dict]) -> str:
+        """Write one symbol-month of rows; file names are unique per id range, so reruns never clobber"""
+        directory = os.path.join(self.root, f"month={month:%Y-%m}", f"symbol={symbol}")
+        os.makedirs(directory, exist_ok=True)
+        ids = [row["id"] for row in rows]
+        path = os.path.join(directory, f"part-{min(ids)}-{max(ids)}.parquet")
+        table = self.pa.Table.from_pylist([{name: row[name] for name in ARCHIVE_COLUMNS} for row in rows],
+                                          schema=self.schema)
+        # Write then rename, so a crash never leaves a truncated file in the dataset
+        self.pa.parquet.write_table(table, path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
+        return path
+    
+    def months(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name.split("=", 1)[1] for name in os.listdir(self.root) if name.startswith("month="))
+    
+    def dataset(self):
+        """The whole archive as a pyarrow dataset, for ad-hoc scans (or duckdb.arrow())"""
+        return self.pa.dataset.dataset(self.root, format="parquet", schema=self.schema.append(
+            self.pa.field("month", self.pa.string())).append(self.pa.field("symbol", self.pa.string())),
+            partitioning=self.partitioning, exclude_invalid_files=True)
+    
+    def iter_articles(self, symbols: Optional[List[str]] = None, start: Optional[datetime] = None,
+                      end: Optional[datetime] = None, columns: Optional[List[str]] = None,
+                      chunk_size: int = 1000) -> Iterator[List[Dict]]:
+        """Archived articles in (published_at, id) order, like DatabaseService.iter_articles"""
+        columns = columns or ["symbol"] + ARCHIVE_COLUMNS
+        months = [
+            month for month in self.months()
+            if (start is None or month >= f"{start:%Y-%m}") and (end is None or month <= f"{end:%Y-%m}")
+        ]
+        if not months:
+            return
+        dataset = self.dataset()
+        field = self.pa.dataset.field
+        chunk, last_id = [], None
+        for month in months:
+            condition = field("month") == month
+            if symbols:
+                condition &= field("symbol").isin(symbols)
+            if start:
+                condition &= field("published_at") >= self.pa.scalar(start, self.pa.timestamp("us"))
+            if end:
+                condition &= field("published_at") < self.pa.scalar(end, self.pa.timestamp("us"))
+            # One month at a time bounds memory while still sorting across symbols
+            table = dataset.to_table(columns=list(dict.fromkeys(columns + ["published_at", "id"])), filter=condition)
+            table = table.sort_by([("published_at", "ascending"), ("id", "ascending")])
+            for row in table.to_pylist():
+                # A run interrupted between writing and deleting archives some rows twice
+                if row["id"] == last_id:
+                    continue
+                last_id = row["id"]
+                chunk.append({name: row[name] for name in columns})
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+_archive: Optional[ArticleArchive] = None
+
+def get_article_archive() -> Optional[ArticleArchive]:
+    """The archive under ARCHIVE_DIR, or None when pyarrow is missing or nothing was archived yet"""
+    global _archive
+    if _archive is None and _pyarrow() is not None:
+        _archive = ArticleArchive()
+    if _archive is None or not _archive.months():
+        return None
+    return _archive
+
+def iter_all_articles(db_service: DatabaseService, archive: Optional[ArticleArchive] = None,
+                      symbols: Optional[List[str]] = None, start: Optional[datetime] = None,
+                      end: Optional[datetime] = None, scored_only: bool = True,
+                      columns: Optional[List[str]] = None, chunk_size: int = 1000) -> Iterator[List[Dict]]:
+    """
+    DatabaseService.iter_articles over the hot table and the archive together
+    
+    Both sides stream in (published_at, id) order and are merged lazily, so
+    an export spanning years holds one archived month and one chunk in memory.
+    """
+    hot = db_service.iter_articles(symbols=symbols, start=start, end=end, scored_only=scored_only,
+                                   columns=columns, chunk_size=chunk_size)
+    if archive is None:
+        yield from hot
+        return
+    
+    names = columns or [column.name for column in NewsArticle.__table__.columns]
+    archived_columns = [name for name in names if name in ARCHIVE_COLUMNS or name == "symbol"]
+    
+    def rows(partitions: Iterable[List[Dict]]) -> Iterator[Dict]:
+        for partition in partitions:
+            yield from partition
+    
+    def key(row: Dict):
+        return (row["published_at"] or datetime.min, row["id"])
+    
+    merged = heapq.merge(
+        rows(hot),
+        ({name: row.get(name) for name in names} for row in rows(archive.iter_articles(
+            symbols=symbols, start=start, end=end, columns=archived_columns, chunk_size=chunk_size
+        ))),
+        key=key
+    )
+    chunk, last_id = [], None
+    for row in merged:
+        # Rows from an interrupted run can still be in both tiers
+        if row["id"] == last_id:
+            continue
+        last_id = row["id"]
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class RetentionService:
+    """Moves scored articles past the retention age from news_articles into the archive"""
+    
+    def __init__(self, session_factory=None, archive: Optional[ArticleArchive] = None,
+                 retention_days: int = ARTICLE_RETENTION_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE):
+        self.session_factory = session_factory or SessionLocal
+        self.archive = archive or ArticleArchive()
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.db_service = DatabaseService(self.session_factory)
+    
+    def cutoff(self, today: Optional[date] = None) -> datetime:
+        return datetime.combine((today or date.today()) - timedelta(days=self.retention_days), time.min)
+    
+    def run(self, today: Optional[date] = None) -> Dict:
+        """Archive everything eligible, one symbol-month at a time; returns counts"""
+        cutoff = self.cutoff(today)
+        report = {"cutoff": cutoff.isoformat(), "archived": 0, "files": 0, "held_back_unscored": 0}
+        db = self.session_factory()
+        try:
+            oldest = db.execute(select(func.min(NewsArticle.published_at)).where(
+                NewsArticle.published_at < cutoff, NewsArticle.sentiment_score.isnot(None)
+            )).scalar()
+            report["held_back_unscored"] = db.execute(select(func.count()).where(
+                NewsArticle.published_at < cutoff, NewsArticle.sentiment_score.is_(None)
+            )).scalar()
+        finally:
+            db.close()
+        if oldest is None:
+            return report
+        
+        month = _month_start(oldest)
+        while month < cutoff:
+            month_end = min(_next_month(month), cutoff)
+            keys = set()
+            for symbol in self._symbols(month, month_end):
+                report["archived"] += self._archive_symbol_month(symbol, month, month_end, keys)
+                report["files"] += 1
+            # Rebuild the month's rollups from what is left plus the archived totals
+            self.db_service.update_sentiment_summaries(keys)
+            month = _next_month(month)
+        logger.info(f"Archived {report['archived']} articles older than {cutoff:%Y-%m-%d} into {report['files']} files")
+        return report
+    
+    def _eligible(self, month: datetime, month_end: datetime):
+        return (
+            NewsArticle.published_at >= month,
+            NewsArticle.published_at < month_end,
+            NewsArticle.sentiment_score.isnot(None)
+        )
+    
+    def _symbols(self, month: datetime, month_end: datetime) -> List[str]:
+        db = self.session_factory()
+        try:
+            return list(db.execute(
+                select(NewsArticle.symbol).where(*self._eligible(month, month_end)).distinct()
+            ).scalars())
+        finally:
+            db.close()
+    
+    def _archive_symbol_month(self, symbol: str, month: datetime, month_end: datetime, keys: set) -> int:
+        db = self.session_factory()
+        try:
+            rows = [dict(row) for row in db.execute(
+                select(*[getattr(NewsArticle, name) for name in ARCHIVE_COLUMNS])
+                .where(NewsArticle.symbol == symbol, *self._eligible(month, month_end))
+                .order_by(NewsArticle.id)
+            ).mappings()]
+        finally:
+            db.close()
+        
+        # The file is durable before any row leaves the hot table
+        self.archive.write(symbol, month, rows)
+        for i in range(0, len(rows), self.batch_size):
+            self._retire(symbol, rows[i:i + self.batch_size])
+        keys.update((symbol, row["published_at"]) for row in rows)
+        return len(rows)
+    
+    def _retire(self, symbol: str, rows: List[Dict]):
+        """Delete one batch and record its daily totals, atomically"""
+        totals: Dict[datetime, Dict] = {}
+        for row in rows:
+            day = datetime.combine(row["published_at"].date(), time.min)
+            entry = totals.setdefault(day, {"article_count": 0, "score_sum": 0.0, "positive_count": 0,
+                                            "negative_count": 0, "neutral_count": 0})
+            entry["article_count"] += 1
+            entry["score_sum"] += row["sentiment_score"]
+            label = row["sentiment_label"] if row["sentiment_label"] in ("positive", "negative") else "neutral"
+            entry[f"{label}_count"] += 1
+        
+        db = self.session_factory()
+        try:
+            existing = {row.date: row for row in db.execute(select(ArchivedSentiment).where(
+                ArchivedSentiment.symbol == symbol, ArchivedSentiment.date.in_(list(totals))
+            )).scalars()}
+            for day, entry in totals.items():
+                if day in existing:
+                    for name, value in entry.items():
+                        setattr(existing[day], name, getattr(existing[day], name) + value)
+                else:
+                    db.add(ArchivedSentiment(symbol=symbol, date=day, **entry))
+            ids = [row["id"] for row in rows]
+            for i in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+                db.execute(delete(NewsArticle).where(NewsArticle.id.in_(ids[i:i + LOOKUP_CHUNK_SIZE])))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+# Command line entry point
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Move old scored articles from the database to Parquet")
+    parser.add_argument("--older-than-days", type=int, default=ARTICLE_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="Rows deleted per transaction")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    service = RetentionService(archive=ArticleArchive(args.archive_dir), retention_days=args.older_than_days,
+                               batch_size=args.batch_size)
+    print(service.run())
@@ -0,0 +1,250 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Float, and_, column, desc, func, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.search_index import (
+    FTS_TABLE, FTS_WEIGHTS, SEARCH_LANGUAGE, SEARCH_RANK_WINDOW, SEARCH_VECTOR_COLUMN, fts5_query, search_supported
+)
+from app.models.database import NewsArticle, SentimentStats, StockInfo
+from app.services.database_service import STATS_ROW_ID, sentiment_totals, stats_to_dict
+
+SEARCH_COLUMNS = [
+    NewsArticle.id, NewsArticle.symbol, NewsArticle.title, NewsArticle.url, NewsArticle.published_at,
+    NewsArticle.sentiment_score, NewsArticle.sentiment_label, NewsArticle.source
+]
+
+class AsyncDatabaseService:
+    """
+    Read paths of DatabaseService for async routes
+    
+    Works on the request's AsyncSession instead of opening sessions of its
+    own, so each request holds exactly one connection.
+    """
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def get_stock_sentiment_data(self, symbol: str, days: int = 7) -> Optional[Dict]:
+        """Get aggregated sentiment data for a stock"""
+        start_date = datetime.now() - timedelta(days=days)
+        daily = (await self.session.execute(
+            select(
+                func.date(NewsArticle.published_at).label('date'),
+                func.avg(NewsArticle.sentiment_score).label('avg_sentiment'),
+                func.count(NewsArticle.id).label('article_count')
+            ).where(
+                and_(
+                    NewsArticle.symbol == symbol.upper(),
+                    NewsArticle.published_at >= start_date,
+                    NewsArticle.sentiment_score.isnot(None)
+                )
+            ).group_by(func.date(NewsArticle.published_at)).order_by('date')
+        )).all()
+        
+        if not daily:
+            return None
+        
+        # The overall average is the article-weighted mean of the daily ones
+        total = sum(day.article_count for day in daily)
+        avg_sentiment = sum(day.avg_sentiment * day.article_count for day in daily) / total
+        return {
+            "symbol": symbol.upper(),
+            "avg_sentiment": round(avg_sentiment, 3),
+            "total_articles": total,
+            "daily_trends": [
+                {
+                    "date": str(day.date),
+                    "sentiment": round(day.avg_sentiment, 3),
+                    "article_count": day.article_count
+                }
+                for day in daily
+            ]
+        }
+    
+    async def get_sentiment_distribution(self, symbol: str, days: int = 7) -> Dict[str, int]:
+        start_date = datetime.now() - timedelta(days=days)
+        rows = (await self.session.execute(
+            select(
+                NewsArticle.sentiment_label,
+                func.count(NewsArticle.id).label('count')
+            ).where(
+                and_(
+                    NewsArticle.symbol == symbol.upper(),
+                    NewsArticle.published_at >= start_date,
+                    NewsArticle.sentiment_score.isnot(None)
+                )
+            ).group_by(NewsArticle.sentiment_label)
+        )).all()
+        
+        distribution: Dict[str, int] = {}
+        for row in rows:
+            label = row.sentiment_label or 'neutral'
+            distribution[label] = distribution.get(label, 0) + row.count
+        return distribution
+    
+    async def get_trending_stocks(self, hours: int = 24, limit: int = 10) -> List[Dict]:
+        """Get stocks with most sentiment activity in recent hours"""
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        trending = (await self.session.execute(
+            select(
+                NewsArticle.symbol,
+                func.count(NewsArticle.id).label('article_count'),
+                func.avg(NewsArticle.sentiment_score).label('avg_sentiment')
+            ).where(
+                and_(
+                    NewsArticle.published_at >= cutoff_time,
+                    NewsArticle.sentiment_score.isnot(None)
+                )
+            ).group_by(NewsArticle.symbol).order_by(desc('article_count')).limit(limit)
+        )).all()
+        
+        return [
+            {
+                "symbol": stock.symbol,
+                "article_count": stock.article_count,
+                "avg_sentiment": round(stock.avg_sentiment, 3) if stock.avg_sentiment else 0
+            }
+            for stock in trending
+        ]
+    
+    async def get_sentiment_stats(self) -> Dict:
+        """Global totals from the maintained stats row"""
+        stats = await self.session.get(SentimentStats, STATS_ROW_ID)
+        if stats is None:
+            # Not seeded yet (schema built with create_all): compute the totals without creating the row
+            totals, per_symbol = await self.session.run_sync(sentiment_totals)
+            stats = SentimentStats(id=STATS_ROW_ID, stocks_tracked=len(per_symbol), **totals)
+        return stats_to_dict(stats)
+    
+    async def get_articles_page(self, symbol: str, start_date: datetime, limit: int,
+                                sentiment_filter: Optional[str] = None,
+                                after: Optional[Tuple[datetime, int]] = None) -> List[NewsArticle]:
+        """Scored articles newest first, continuing after the (published_at, id) keyset position"""
+        stmt = select(NewsArticle).where(
+            and_(
+                NewsArticle.symbol == symbol.upper(),
+                NewsArticle.published_at >= start_date,
+                NewsArticle.sentiment_score.isnot(None)
+            )
+        )
+        if sentiment_filter:
+            stmt = stmt.where(NewsArticle.sentiment_label == sentiment_filter)
+        if after:
+            published_at, article_id = after
+            stmt = stmt.where(
+                or_(
+                    NewsArticle.published_at < published_at,
+                    and_(NewsArticle.published_at == published_at, NewsArticle.id < article_id)
+                )
+            )
+        stmt = stmt.order_by(desc(NewsArticle.published_at), desc(NewsArticle.id)).limit(limit)
+        return list((await self.session.execute(stmt)).scalars())
+    
+    async def get_tracked_stocks(self) -> List[StockInfo]:
+        return list((await self.session.execute(
+            select(StockInfo).where(StockInfo.is_active == True)
+        )).scalars())
+
+    def search_available(self) -> bool:
+        return search_supported(self.session.bind.dialect.name)
+    
+    async def search_articles(self, query: str, symbols: Optional[List[str]] = None,
+                              start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                              sentiment_filter: Optional[str] = None, sort: str = "relevance", limit: int = 20,
+                              after: Optional[Tuple[Any, int]] = None,
+                              window_floor: Optional[int] = None) -> List[Dict]:
+        """
+        Full-text matches with a relevance score and highlighted snippet
+        
+        sort="relevance" orders by score (higher is better) then id and takes
+        a (score, id) keyset position; sort="recent" orders newest first and
+        takes (published_at, id). Only the SEARCH_RANK_WINDOW most recently
+        stored articles matching the query and filters are ordered, so a
+        query matching a large share of the corpus costs the same as one
+        matching a few thousand rows. Every row carries the window's lowest
+        id as window_floor; pass it back with `after` so later pages rank
+        the same window while new articles arrive. Rows also carry
+        window_truncated, True when older matches fell outside the window
+        and can't be reached on any page.
+        Raises ValueError for a query with no searchable terms.
+        """
+        symbols = [symbol.upper() for symbol in symbols] if symbols else None
+        filters = []
+        if start_date:
+            filters.append(NewsArticle.published_at >= start_date)
+        if end_date:
+            filters.append(NewsArticle.published_at < end_date)
+        if sentiment_filter:
+            filters.append(NewsArticle.sentiment_label == sentiment_filter)
+        
+        if self.session.bind.dialect.name == "sqlite":
+            match = fts5_query(query, symbols)
+            if not match:
+                raise ValueError("Query has no searchable terms")
+            fts = table(FTS_TABLE, column("rowid"))
+            fts_ref = literal_column(FTS_TABLE)
+            # bm25 is lower-is-better, negate it so both backends sort by score descending
+            score = -func.bm25(fts_ref, *FTS_WEIGHTS, type_=Float)
+            snippet = func.snippet(fts_ref, -1, "<mark>", "</mark>", "…", 16)
+            window = select(fts.c.rowid).where(fts_ref.op("MATCH")(match)).order_by(desc(fts.c.rowid))
+            if filters:
+                window = window.select_from(fts.join(NewsArticle.__table__, NewsArticle.id == fts.c.rowid))
+            stmt = select(*SEARCH_COLUMNS, score.label("score"), snippet.label("snippet")).select_from(
+                fts.join(NewsArticle.__table__, NewsArticle.id == fts.c.rowid)
+            ).where(fts_ref.op("MATCH")(match))
+            window_column = fts.c.rowid
+        else:
+            if not query.strip():
+                raise ValueError("Query has no searchable terms")
+            language = literal_column(f"'{SEARCH_LANGUAGE}'::regconfig")
+            tsquery = func.websearch_to_tsquery(language, query)
+            vector = literal_column(f"news_articles.{SEARCH_VECTOR_COLUMN}")
+            score = func.ts_rank_cd(vector, tsquery, type_=Float)
+            snippet = func.ts_headline(
+                language, func.concat_ws(" ", NewsArticle.title, NewsArticle.content), tsquery,
+                "StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=8"
+            )
+            window = select(NewsArticle.id).where(vector.op("@@")(tsquery)).order_by(desc(NewsArticle.id))
+            stmt = select(*SEARCH_COLUMNS, score.label("score"), snippet.label("snippet")).where(
+                vector.op("@@")(tsquery)
+            )
+            if symbols:
+                filters.append(NewsArticle.symbol.in_(symbols))
+            window_column = NewsArticle.id
+        
+        if filters:
+            window = window.where(*filters)
+            stmt = stmt.where(*filters)
+        if window_floor is None:
+            # Id of the oldest match in the window, 0 (no floor) when there are fewer matches;
+            # a match past it means the window left some out
+            edge = (await self.session.execute(
+                window.offset(SEARCH_RANK_WINDOW - 1).limit(2)
+            )).scalars().all()
+            window_floor = edge[0] if edge else 0
+            truncated = len(edge) > 1
+        else:
+            truncated = window_floor > 0 and (await self.session.execute(
+                window.where(window_column < window_floor).limit(1)
+            )).first() is not None
+        stmt = stmt.where(window_column >= window_floor)
+        
+        if sort == "recent":
+            stmt = stmt.where(NewsArticle.published_at.isnot(None))
+            if after:
+                published_at, article_id = after
+                stmt = stmt.where(or_(
+                    NewsArticle.published_at < published_at,
+                    and_(NewsArticle.published_at == published_at, NewsArticle.id < article_id)
+                ))
+            stmt = stmt.order_by(desc(NewsArticle.published_at), desc(NewsArticle.id))
+        else:
+            if after:
+                last_score, article_id = after
+                stmt = stmt.where(or_(score < last_score, and_(score == last_score, NewsArticle.id > article_id)))
+            stmt = stmt.order_by(desc(score), NewsArticle.id)
+        
+        rows = (await self.session.execute(stmt.limit(limit))).mappings().all()
+        return [dict(row, window_floor=window_floor, window_truncated=truncated) for row in rows]
@@ -0,0 +1,324 @@
+import csv
+import io
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.ml.sentiment_analyzer import SentimentAnalyzer
+from app.services.database_service import DatabaseService
+from app.services.ingestion_pipeline import StageStats, articles_from_record
+from app.services.sentiment_service import SentimentService
+
+logger = logging.getLogger(__name__)
+
+# Analyzer owned by each scoring worker process
+_worker_analyzer: Optional[SentimentAnalyzer] = None
+
+def _init_worker(model_type: str):
+    global _worker_analyzer
+    _worker_analyzer = SentimentAnalyzer(model_type=model_type)
+
+def _score_chunk(texts: List[str]) -> List[Dict]:
+    return _worker_analyzer.analyze_batch(texts)
+
+class DumpReader:
+    """
+    Streams NewsAPI-shaped records out of a JSONL or CSV dump
+    
+    The file is read line by line in binary mode so every record comes with
+    the byte offset a resumed read should restart from, which is what the
+    checkpoint stores. A JSONL line may also be a NewsAPI response envelope
+    ({"status": ..., "articles": [...]}); its articles carry the line's
+    start offset until the last one, so a checkpoint never lands halfway
+    through an envelope. CSV dumps need a header row; nested 'source' may be given as a plain
+    'source' or 'source_name' column.
+    """
+    
+    def __init__(self, path: str, fmt: Optional[str] = None):
+        self.path = path
+        self.fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+        if self.fmt not in ("jsonl", "csv"):
+            raise ValueError(f"Unknown dump format: {self.fmt}")
+    
+    def read(self, start_offset: int = 0) -> Iterator[Tuple[Dict, int]]:
+        """Yield (article, offset to resume from) starting at start_offset"""
+        with open(self.path, "rb") as f:
+            if self.fmt == "jsonl":
+                yield from self._read_jsonl(f, start_offset)
+            else:
+                yield from self._read_csv(f, start_offset)
+    
+    def _read_jsonl(self, f, start_offset: int) -> Iterator[Tuple[Dict, int]]:
+        f.seek(start_offset)
+        while True:
+            line = f.readline()
+            if not line:
+                break
+            offset = f.tell()
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping bad JSON at byte {offset - len(line)} of {self.path}: {e}")
+                continue
+            articles = list(articles_from_record(record))
+            for i, article in enumerate(articles, 1):
+                yield article, offset if i == len(articles) else offset - len(line)
+    
+    def _read_csv(self, f, start_offset: int) -> Iterator[Tuple[Dict, int]]:
+        header = next(csv.reader([f.readline().decode("utf-8-sig")]))
+        f.seek(max(start_offset, f.tell()))
+        
+        pending = b""
+        while True:
+            line = f.readline()
+            if not line:
+                break
+            pending += line
+            # A quoted field may span lines; wait until the quotes balance
+            if pending.count(b'"') % 2:
+                continue
+            record, pending = pending, b""
+            if not record.strip():
+                continue
+            
+            values = next(csv.reader(io.StringIO(record.decode("utf-8"))))
+            yield self._csv_record(dict(zip(header, values))), f.tell()
+    
+    @staticmethod
+    def _csv_record(row: Dict) -> Dict:
+        source = row.pop("source_name", None) or row.pop("source", None)
+        row["source"] = {"name": source or ""}
+        return row
+
+class BackfillCheckpoint:
+    """
+    Per-file byte offsets, rewritten atomically after every committed batch
+    
+    Before a batch is stored, its end offset is written as 'pending'. Rows
+    up to that offset may be in the database unscored if the run dies, so a
+    resumed run rechecks every batch that starts before it.
+    """
+    
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                self.files = json.load(f).get("files", {})
+    
+    def offset(self, dump_path: str) -> int:
+        return self.files.get(os.path.abspath(dump_path), {}).get("offset", 0)
+    
+    def is_done(self, dump_path: str) -> bool:
+        return self.files.get(os.path.abspath(dump_path), {}).get("done", False)
+    
+    def pending(self, dump_path: str) -> int:
+        return self.files.get(os.path.abspath(dump_path), {}).get("pending", 0)
+    
+    def mark_pending(self, dump_path: str, offset: int):
+        """Record that rows up to offset are about to be stored"""
+        entry = self.files.setdefault(os.path.abspath(dump_path), {"rows": 0})
+        entry["pending"] = max(offset, entry.get("pending") or 0)
+        self._write()
+    
+    def save(self, dump_path: str, offset: int, rows: int, done: bool = False):
+        entry = self.files.setdefault(os.path.abspath(dump_path), {"rows": 0})
+        entry.update(offset=offset, rows=entry["rows"] + rows, done=done)
+        self._write()
+    
+    def _write(self):
+        if not self.path:
+            return
+        
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"files": self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+class BackfillService:
+    """
+    Loads archived NewsAPI dumps into news_articles and scores them
+    
+    Each batch is parsed, bulk inserted, scored across a pool of worker
+    processes and rolled up before its end offset is checkpointed, so an
+    interrupted run resumes at the first batch that wasn't fully finished.
+    """
+    
+    def __init__(
+        self,
+        db_service: Optional[DatabaseService] = None,
+        model_type: str = "vader",
+        batch_size: int = 1000,
+        score_batch_size: int = 64,
+        workers: int = 0,
+        checkpoint_path: Optional[str] = None,
+        default_symbol: Optional[str] = None
+    ):
+        self.db_service = db_service or DatabaseService()
+        self.model_type = model_type
+        self.batch_size = batch_size
+        self.score_batch_size = score_batch_size
+        self.workers = workers
+        self.checkpoint = BackfillCheckpoint(checkpoint_path)
+        self.default_symbol = default_symbol
+        self.stats = {name: StageStats(name) for name in ("parse", "store", "score", "rollup")}
+        self._local_analyzer: Optional[SentimentAnalyzer] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def run(self, paths: List[str], fmt: Optional[str] = None) -> List[Dict]:
+        """Backfill every dump in order, returning per-stage stats"""
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.model_type,)
+            )
+        else:
+            self._local_analyzer = SentimentAnalyzer(model_type=self.model_type)
+        
+        try:
+            for path in paths:
+                if self.checkpoint.is_done(path):
+                    logger.info(f"Skipping {path}, already backfilled")
+                    continue
+                self.backfill_file(path, fmt)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        
+        return self.report()
+    
+    def backfill_file(self, path: str, fmt: Optional[str] = None):
+        reader = DumpReader(path, fmt)
+        start_offset = self.checkpoint.offset(path)
+        # Rows up to here may have been stored but not scored by an interrupted run
+        recheck_until = self.checkpoint.pending(path)
+        if start_offset > 0:
+            logger.info(f"Resuming {path} from byte {start_offset}, rechecking up to byte {recheck_until}")
+        
+        batch: List[Dict] = []
+        offset = batch_start = start_offset
+        # Records read for the current batch, including those skipped
+        records = 0
+        no_symbol = 0
+        parse_started = time.monotonic()
+        for record, offset in reader.read(start_offset):
+            records += 1
+            if not (record.get("symbol") or self.default_symbol):
+                no_symbol += 1
+                continue
+            row = self._normalize(record)
+            if row:
+                batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.stats["parse"].record(records, len(batch), time.monotonic() - parse_started)
+                self.checkpoint.mark_pending(path, offset)
+                self._process_batch(batch, recheck_unscored=batch_start < recheck_until)
+                self.checkpoint.save(path, offset, len(batch))
+                self._log_progress(path, offset)
+                batch = []
+                records = 0
+                batch_start = offset
+                parse_started = time.monotonic()
+        
+        if records:
+            self.stats["parse"].record(records, len(batch), time.monotonic() - parse_started)
+        if batch:
+            self.checkpoint.mark_pending(path, offset)
+            self._process_batch(batch, recheck_unscored=batch_start < recheck_until)
+        self.checkpoint.save(path, offset, len(batch), done=True)
+        if no_symbol:
+            logger.warning(f"Skipped {no_symbol} records without a symbol in {path}; pass --symbol to load them")
+        self._log_progress(path, offset)
+    
+    def _normalize(self, record: Dict) -> Optional[Dict]:
+        symbol = record.get("symbol") or self.default_symbol
+        row = self.db_service.normalize_article(symbol, record)
+        if row and row["title"]:
+            return row
+        return None
+    
+    def _process_batch(self, rows: List[Dict], recheck_unscored: bool = False):
+        started = time.monotonic()
+        stored = self.db_service.store_articles_bulk(rows)
+        if recheck_unscored:
+            # Rows stored by an interrupted run before its checkpoint was written
+            stored_urls = {row["url"] for row in stored}
+            stored += self.db_service.get_unscored_articles_by_url(
+                [row["url"] for row in rows if row["url"] not in stored_urls]
+            )
+        self.stats["store"].record(len(rows), len(stored), time.monotonic() - started)
+        if not stored:
+            return
+        
+        started = time.monotonic()
+        texts = [SentimentService.article_text(row["title"], row["content"]) for row in stored]
+        results = self._score(texts)
+        self.db_service.update_article_sentiments([
+            {"id": row["id"], "sentiment_score": result["score"], "sentiment_label": result["label"]}
+            for row, result in zip(stored, results)
+        ])
+        self.stats["score"].record(len(stored), len(stored), time.monotonic() - started)
+        
+        started = time.monotonic()
+        keys = {(row["symbol"], row["published_at"]) for row in stored}
+        written = self.db_service.update_sentiment_summaries(keys)
+        self.stats["rollup"].record(len(stored), written, time.monotonic() - started)
+    
+    def _score(self, texts: List[str]) -> List[Dict]:
+        if self._pool is None:
+            return self._local_analyzer.analyze_batch(texts, batch_size=self.score_batch_size)
+        
+        chunks = [
+            texts[i:i + self.score_batch_size]
+            for i in range(0, len(texts), self.score_batch_size)
+        ]
+        results = []
+        for chunk_results in self._pool.map(_score_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+    
+    def report(self) -> List[Dict]:
+        return [stats.snapshot() for stats in self.stats.values()]
+    
+    def _log_progress(self, path: str, offset: int):
+        rates = ", ".join(
+            f"{s['stage']} {s['busy_items_per_sec']} rows/s" for s in self.report()
+        )
+        logger.info(f"{os.path.basename(path)} @ byte {offset}: {rates}")
+
+# Command line entry point
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Backfill archived news dumps into the database")
+    parser.add_argument("paths", nargs="+", help="JSONL or CSV dump files")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Override format detection")
+    parser.add_argument("--symbol", help="Symbol for records that don't carry one")
+    parser.add_argument("--model", default="vader", help="finbert, vader or textblob")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--score-batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Scoring processes (0 scores in-process)")
+    parser.add_argument("--checkpoint", default="backfill.checkpoint.json")
+    args = parser.parse_args()
+    
+    service = BackfillService(
+        model_type=args.model,
+        batch_size=args.batch_size,
+        score_batch_size=args.score_batch_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        default_symbol=args.symbol
+    )
+    for stage in service.run(args.paths, fmt=args.format):
+        print(
+            f"{stage['stage']:>7}: {stage['items_in']} rows, "
+            f"{stage['busy_items_per_sec']} rows/s busy, {stage['items_per_sec']} rows/s wall"
+        )
@@ -0,0 +1,259 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from app.core.metrics import REGISTRY
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+# Redis pub/sub channel relaying events from scoring processes (pipeline, backfill) to web workers
+BROADCAST_CHANNEL = os.getenv("BROADCAST_CHANNEL", "sentiment-events")
+# Events buffered per subscriber before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SUBSCRIBER_QUEUE_SIZE", "100"))
+# Longest wait, in seconds, between attempts to resubscribe after Redis drops the relay
+RELAY_MAX_BACKOFF = float(os.getenv("RELAY_MAX_BACKOFF", "30"))
+
+class Subscriber:
+    """One connected client: a bounded queue on its event loop plus the symbols it follows"""
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, symbols: Optional[Set[str]], maxsize: int):
+        self.loop = loop
+        self.symbols = symbols
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+    
+    def offer(self, event: Dict):
+        """Queue an event, dropping the oldest one if the client has fallen behind"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+class SentimentBroadcaster:
+    """
+    Fans scoring events out to subscribed clients
+    
+    Subscribers are indexed by symbol, so publishing touches only the
+    clients following that symbol (plus those following everything), and
+    idle clients cost nothing but their queue. publish() may be called from
+    any thread; delivery is handed to each subscriber's event loop with one
+    call_soon_threadsafe per loop.
+    
+    With REDIS_URL set, events go through a Redis channel so that scoring
+    done in other processes reaches every web worker; a relay thread in
+    each process delivers them locally, resubscribing with backoff when the
+    Redis connection drops.
+    """
+    
+    def __init__(self, redis_url: Optional[str] = REDIS_URL, channel: str = BROADCAST_CHANNEL,
+                 queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.channel = channel
+        self.queue_size = queue_size
+        self.by_symbol: Dict[str, Set[Subscriber]] = {}
+        self.all_symbols: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.redis = None
+        self._relay: Optional[threading.Thread] = None
+        
+        if redis_url:
+            try:
+                import redis
+                self.redis = redis.Redis.from_url(redis_url)
+            except Exception as e:
+                logger.error(f"Broadcaster running without Redis: {e}")
+    
+    # Subscriptions
+    
+    def subscribe(self, symbols: Optional[Iterable[str]] = None) -> Subscriber:
+        """Register a client on the running event loop; no symbols means every symbol"""
+        symbol_set = {symbol.upper() for symbol in symbols} if symbols else None
+        subscriber = Subscriber(asyncio.get_running_loop(), symbol_set, self.queue_size)
+        with self._lock:
+            if symbol_set is None:
+                self.all_symbols.add(subscriber)
+            else:
+                for symbol in symbol_set:
+                    self.by_symbol.setdefault(symbol, set()).add(subscriber)
+        self._ensure_relay()
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self.all_symbols.discard(subscriber)
+            for symbol in subscriber.symbols or ():
+                followers = self.by_symbol.get(symbol)
+                if followers is not None:
+                    followers.discard(subscriber)
+                    if not followers:
+                        del self.by_symbol[symbol]
+    
+    # Publishing
+    
+    def publish(self, event: Dict):
+        """Send an event (a dict with 'type' and 'symbol') to its subscribers"""
+        self.publish_many([event])
+    
+    def publish_many(self, events: List[Dict]):
+        """Send several events, in one Redis round trip when Redis is enabled"""
+        if not events:
+            return
+        if self.redis is not None:
+            try:
+                pipeline = self.redis.pipeline(transaction=False)
+                for event in events:
+                    pipeline.publish(self.channel, json.dumps(event, default=str))
+                pipeline.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Broadcast via Redis failed, delivering locally: {e}")
+        for event in events:
+            self.deliver(event)
+    
+    def deliver(self, event: Dict):
+        """Hand an event to this process's subscribers"""
+        symbol = (event.get("symbol") or "").upper()
+        with self._lock:
+            targets = list(self.all_symbols) + list(self.by_symbol.get(symbol, ()))
+            self.published += 1
+        if not targets:
+            return
+        
+        by_loop: Dict[asyncio.AbstractEventLoop, List[Subscriber]] = {}
+        for subscriber in targets:
+            by_loop.setdefault(subscriber.loop, []).append(subscriber)
+        for loop, subscribers in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self._offer_all, subscribers, event)
+            except RuntimeError:
+                # The loop has shut down; its subscribers are gone with it
+                for subscriber in subscribers:
+                    self.unsubscribe(subscriber)
+    
+    def _offer_all(self, subscribers: List[Subscriber], event: Dict):
+        for subscriber in subscribers:
+            subscriber.offer(event)
+        with self._lock:
+            self.delivered += len(subscribers)
+    
+    def _ensure_relay(self):
+        if self.redis is None or self._relay is not None:
+            return
+        with self._lock:
+            if self._relay is None:
+                self._relay = threading.Thread(target=self._run_relay, name="broadcast-relay", daemon=True)
+                self._relay.start()
+    
+    def _run_relay(self):
+        backoff = 0.5
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                backoff = 0.5
+                for message in pubsub.listen():
+                    try:
+                        self.deliver(json.loads(message["data"]))
+                    except Exception as e:
+                        logger.error(f"Error relaying broadcast event: {e}")
+            except Exception as e:
+                logger.warning(f"Broadcast relay lost Redis, resubscribing in {backoff:.1f}s: {e}")
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, RELAY_MAX_BACKOFF)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            subscribers = set(self.all_symbols)
+            for followers in self.by_symbol.values():
+                subscribers.update(followers)
+            return {
+                "subscribers": len(subscribers),
+                "symbols_followed": len(self.by_symbol),
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped": sum(subscriber.dropped for subscriber in subscribers),
+                "redis_enabled": self.redis is not None
+            }
+
+_broadcaster: Optional[SentimentBroadcaster] = None
+_broadcaster_lock = threading.Lock()
+
+def get_broadcaster() -> SentimentBroadcaster:
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                _broadcaster = SentimentBroadcaster()
+    return _broadcaster
+
+def publish_scored_articles(articles: Iterable[Dict]):
+    """Publish one 'article' event per newly scored article"""
+    try:
+        get_broadcaster().publish_many([
+            {
+                "type": "article",
+                "symbol": article["symbol"],
+                "id": article["id"],
+                "title": article.get("title"),
+                "url": article.get("url"),
+                "published_at": article.get("published_at"),
+                "sentiment_score": article["sentiment_score"],
+                "sentiment_label": article["sentiment_label"]
+            }
+            for article in articles
+        ])
+    except Exception as e:
+        logger.error(f"Error publishing scored articles: {e}")
+
+def publish_rollups(rollups: Iterable[Dict]):
+    """Publish one 'rollup' event per recomputed daily summary"""
+    try:
+        get_broadcaster().publish_many([dict(rollup, type="rollup") for rollup in rollups])
+    except Exception as e:
+        logger.error(f"Error publishing rollups: {e}")
+
+async def event_stream(subscriber: Subscriber, heartbeat: float = 15.0, is_disconnected=None):
+    """
+    Server-Sent Events for a subscriber
+    
+    Sends a comment line every `heartbeat` seconds of silence so proxies
+    keep the connection open and disconnected clients are noticed.
+    """
+    yield "retry: 5000\n\n"
+    while True:
+        try:
+            event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+        except asyncio.TimeoutError:
+            if is_disconnected is not None and await is_disconnected():
+                return
+            yield ": keep-alive\n\n"
+            continue
+        yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+def _broadcaster_metrics():
+    if _broadcaster is None:
+        return []
+    stats = _broadcaster.stats()
+    return [
+        ("stream_subscribers", "gauge", "Connected event stream subscribers", [({}, stats["subscribers"])]),
+        ("stream_events_published_total", "counter", "Events published to the broadcaster", [({}, stats["published"])]),
+        ("stream_events_delivered_total", "counter", "Events queued to subscribers", [({}, stats["delivered"])]),
+        ("stream_events_dropped_total", "counter", "Events dropped from full subscriber queues", [({}, stats["dropped"])])
+    ]
+
+REGISTRY.register_collector(_broadcaster_metrics)
@@ -1,63 +1,368 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
-from app.models.database import NewsArticle, StockPrice, StockInfo, SentimentSummary
+from sqlalchemy import and_, or_, case, func, desc, insert, update, delete, select
+from sqlalchemy.exc import IntegrityError
+from app.models.database import (
+    ArchivedSentiment, NewsArticle, StockPrice, StockInfo, SentimentSummary, SentimentStats, SymbolStats
+)
 from app.core.database import SessionLocal
+from app.core.metrics import REGISTRY
+from app.core.response_cache import invalidate_symbols
+from app.services.broadcaster import publish_rollups, publish_scored_articles
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Iterable, Iterator, Tuple
+
+# Max bound parameters per IN (...) lookup; keeps SQLite under its variable limit
+LOOKUP_CHUNK_SIZE = 500
+
+# SentimentStats column per sentiment label (missing/unknown labels count as neutral)
+LABEL_COUNT_COLUMNS = {
+    'positive': 'positive_count',
+    'negative': 'negative_count',
+    'neutral': 'neutral_count',
+}
+
+# The single SentimentStats row
+STATS_ROW_ID = 1
 
 class DatabaseService:
-    def __init__(self):
-        pass
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or SessionLocal
+    
+    @staticmethod
+    def parse_published_at(value: Optional[str]) -> Optional[datetime]:
+        """Parse a NewsAPI publishedAt timestamp"""
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except (TypeError, ValueError):
+            return datetime.now()
+    
+    def normalize_article(self, symbol: str, article: Dict) -> Optional[Dict]:
+        """Map a NewsAPI-shaped article onto NewsArticle column values"""
+        if not article.get('url'):
+            return None
+        
+        source = article.get('source') or {}
+        return {
+            "symbol": symbol.upper(),
+            "title": (article.get('title') or '')[:500],  # Truncate if too long
+            "content": article.get('description') or article.get('content') or '',
+            "url": article['url'],
+            "published_at": self.parse_published_at(article.get('publishedAt')),
+            "source": source.get('name', '') if isinstance(source, dict) else str(source),
+            "author": article.get('author') or ''
+        }
     
     def store_news_articles(self, symbol: str, articles_data: Dict) -> int:
         """Store news articles in database, return count of new articles"""
-        db = SessionLocal()
-        new_articles_count = 0
+        rows = []
+        for article in articles_data.get('articles', []):
+            row = self.normalize_article(symbol, article)
+            if row:
+                rows.append(row)
         
         try:
-            for article in articles_data.get('articles', []):
-                # Check if article already exists (by URL)
-                existing = db.query(NewsArticle).filter(
-                    NewsArticle.url == article['url']
-                ).first()
+            stored = self.store_articles_bulk(rows)
+            print(f"✓ Stored {len(stored)} new articles for {symbol}")
+            return len(stored)
+        except Exception as e:
+            print(f"Error storing articles for {symbol}: {e}")
+            return 0
                 
-                if not existing:
-                    # Parse published date
-                    published_at = None
-                    if article.get('publishedAt'):
-                        try:
-                            published_at = datetime.fromisoformat(
-                                article['publishedAt'].replace('Z', '+00:00')
-                            )
-                        except:
-                            published_at = datetime.now()
+    def store_articles_bulk(self, rows: List[Dict]) -> List[Dict]:
+        """
+        Insert normalized article rows, skipping URLs that already exist
                     
-                    new_article = NewsArticle(
-                        symbol=symbol.upper(),
-                        title=article.get('title', '')[:500],  # Truncate if too long
-                        content=article.get('description') or article.get('content', ''),
-                        url=article['url'],
-                        published_at=published_at,
-                        source=article.get('source', {}).get('name', ''),
-                        author=article.get('author', '')
-                    )
-                    db.add(new_article)
-                    new_articles_count += 1
+        Returns:
+            The inserted rows, each with its new 'id'
+        """
+        # Drop duplicates within the batch itself
+        unique_rows = {}
+        for row in rows:
+            unique_rows.setdefault(row['url'], row)
+        if not unique_rows:
+            return []
+        
+        db = self.session_factory()
+        try:
+            urls = list(unique_rows)
+            for i in range(0, len(urls), LOOKUP_CHUNK_SIZE):
+                existing = db.query(NewsArticle.url).filter(
+                    NewsArticle.url.in_(urls[i:i + LOOKUP_CHUNK_SIZE])
+                ).all()
+                for (url,) in existing:
+                    unique_rows.pop(url, None)
+            
+            new_rows = list(unique_rows.values())
+            if not new_rows:
+                return []
             
+            try:
+                inserted = db.execute(
+                    insert(NewsArticle).returning(NewsArticle.id, NewsArticle.url),
+                    new_rows
+                ).all()
+                db.commit()
+            except IntegrityError:
+                # A concurrent writer stored some of these URLs first; fall back to row-by-row
+                db.rollback()
+                inserted = self._insert_rows_individually(db, new_rows)
+            
+            ids = {url: article_id for article_id, url in inserted}
+            invalidate_symbols({row['symbol'] for row in new_rows if row['url'] in ids})
+            return [
+                dict(row, id=ids[row['url']])
+                for row in new_rows
+                if row['url'] in ids
+            ]
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _insert_rows_individually(self, db: Session, rows: List[Dict]) -> List[Tuple[int, str]]:
+        """Insert rows one at a time, skipping any that violate the unique URL constraint"""
+        inserted = []
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    result = db.execute(
+                        insert(NewsArticle).returning(NewsArticle.id, NewsArticle.url),
+                        [row]
+                    ).first()
+                inserted.append(tuple(result))
+            except IntegrityError:
+                continue
+        db.commit()
+        return inserted
+    
+    def get_unscored_articles_by_url(self, urls: List[str]) -> List[Dict]:
+        """Look up stored but not yet scored articles among the given URLs"""
+        db = self.session_factory()
+        try:
+            rows = []
+            for i in range(0, len(urls), LOOKUP_CHUNK_SIZE):
+                articles = db.query(
+                    NewsArticle.id,
+                    NewsArticle.symbol,
+                    NewsArticle.title,
+                    NewsArticle.content,
+                    NewsArticle.url,
+                    NewsArticle.published_at
+                ).filter(
+                    and_(
+                        NewsArticle.url.in_(urls[i:i + LOOKUP_CHUNK_SIZE]),
+                        NewsArticle.sentiment_score.is_(None)
+                    )
+                ).all()
+                rows.extend(dict(article._mapping) for article in articles)
+            return rows
+        finally:
+            db.close()
+    
+    def update_article_sentiments(self, results: List[Dict]) -> int:
+        """
+        Bulk update sentiment scores
+        
+        Args:
+            results: dicts with 'id', 'sentiment_score' and 'sentiment_label'
+        """
+        if not results:
+            return 0
+        
+        db = self.session_factory()
+        try:
+            previous = lock_articles_for_scoring(db, [result['id'] for result in results])
+            # Articles deleted (or archived) since they were read have nothing to update
+            results = [result for result in results if result['id'] in previous]
+            if results:
+                db.execute(update(NewsArticle), results)
+            apply_score_changes(db, [
+                (
+                    previous[result['id']].symbol,
+                    previous[result['id']].sentiment_score,
+                    previous[result['id']].sentiment_label,
+                    result['sentiment_score'],
+                    result['sentiment_label']
+                )
+                for result in results
+            ])
             db.commit()
-            print(f"✓ Stored {new_articles_count} new articles for {symbol}")
-            return new_articles_count
+            # Global stats changed even when no rollup day is touched (e.g. articles without published_at)
+            invalidate_symbols({previous[result['id']].symbol for result in results})
             
-        except Exception as e:
+            publish_scored_articles(dict(previous[result['id']]._mapping, **result) for result in results)
+            return len(results)
+        except Exception:
             db.rollback()
-            print(f"Error storing articles for {symbol}: {e}")
+            raise
+        finally:
+            db.close()
+    
+    def update_sentiment_summaries(self, keys: Iterable[Tuple[str, datetime]]) -> int:
+        """
+        Recompute daily SentimentSummary rows for the given (symbol, day) pairs
+        
+        Returns:
+            Number of summary rows written
+        """
+        days_by_symbol: Dict[str, set] = {}
+        for symbol, day in keys:
+            if day is None:
+                continue
+            day = datetime(day.year, day.month, day.day)
+            days_by_symbol.setdefault(symbol.upper(), set()).add(day)
+        if not days_by_symbol:
             return 0
+        
+        db = self.session_factory()
+        rollups = []
+        try:
+            for symbol, days in days_by_symbol.items():
+                start_date = min(days)
+                end_date = max(days) + timedelta(days=1)
+                
+                daily = db.query(
+                    func.date(NewsArticle.published_at).label('date'),
+                    func.sum(NewsArticle.sentiment_score).label('score_sum'),
+                    func.count(NewsArticle.id).label('article_count'),
+                    func.sum(case_label('positive')).label('positive_count'),
+                    func.sum(case_label('negative')).label('negative_count'),
+                    func.sum(case_label('neutral')).label('neutral_count')
+                ).filter(
+                    and_(
+                        NewsArticle.symbol == symbol,
+                        NewsArticle.published_at >= start_date,
+                        NewsArticle.published_at < end_date,
+                        NewsArticle.sentiment_score.isnot(None)
+                    )
+                ).group_by(func.date(NewsArticle.published_at)).all()
+                
+                aggregates = {}
+                for row in daily:
+                    day = datetime.strptime(str(row.date)[:10], "%Y-%m-%d")
+                    if day in days:
+                        aggregates[day] = _rollup_totals(row)
+                # Articles already moved to the archive still belong to their day
+                for row in db.query(ArchivedSentiment).filter(
+                    ArchivedSentiment.symbol == symbol, ArchivedSentiment.date.in_(list(days))
+                ):
+                    totals = aggregates.setdefault(row.date, _rollup_totals(None))
+                    for name in totals:
+                        totals[name] += getattr(row, name)
+                
+                db.execute(
+                    delete(SentimentSummary).where(
+                        and_(
+                            SentimentSummary.symbol == symbol,
+                            SentimentSummary.date.in_(list(days))
+                        )
+                    )
+                )
+                for day, totals in aggregates.items():
+                    rollup = {
+                        "symbol": symbol,
+                        "date": day,
+                        "avg_sentiment": round(totals["score_sum"] / totals["article_count"], 3),
+                        "article_count": totals["article_count"],
+                        "positive_count": totals["positive_count"],
+                        "negative_count": totals["negative_count"],
+                        "neutral_count": totals["neutral_count"]
+                    }
+                    db.add(SentimentSummary(**rollup))
+                    rollups.append(rollup)
+            
+            db.commit()
+            publish_rollups(rollups)
+            return len(rollups)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+            # Scores for these symbols changed whether or not the rollup succeeded
+            invalidate_symbols(days_by_symbol)
+    
+    def get_sentiment_stats(self) -> Dict:
+        """Global totals over scored articles, read from the maintained stats row"""
+        db = self.session_factory()
+        try:
+            stats = db.get(SentimentStats, STATS_ROW_ID)
+            if stats is None:
+                # Migration 0003 seeds the row; a schema built with create_all instead gets it
+                # from the first reconcile, and until then reads only compute the totals
+                totals, per_symbol = sentiment_totals(db)
+                stats = SentimentStats(id=STATS_ROW_ID, stocks_tracked=len(per_symbol), **totals)
+            return stats_to_dict(stats)
+        finally:
+            db.close()
+    
+    def reconcile_sentiment_stats(self) -> Dict:
+        """
+        Recompute SentimentStats and SymbolStats from news_articles and the archived totals
+        
+        Runs from the CLI and the scheduler's maintenance jobs. The stats row
+        is locked before the scan (BEGIN IMMEDIATE on SQLite, SELECT ... FOR
+        UPDATE elsewhere), and apply_score_changes takes the same lock first,
+        so a scorer's delta lands either in the scan or on top of its result.
+        """
+        db = self.session_factory()
+        try:
+            if db.get_bind().dialect.name == "sqlite":
+                db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            locked = db.execute(
+                select(SentimentStats.id).where(SentimentStats.id == STATS_ROW_ID).with_for_update()
+            ).first()
+            write_sentiment_stats(db, exists=locked is not None)
+            db.commit()
+            return stats_to_dict(db.get(SentimentStats, STATS_ROW_ID))
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def iter_articles(self, symbols: Optional[List[str]] = None, start: Optional[datetime] = None,
+                      end: Optional[datetime] = None, scored_only: bool = True,
+                      columns: Optional[List[str]] = None, chunk_size: int = 1000) -> Iterator[List[Dict]]:
+        """
+        Stream articles in (published_at, id) order, chunk_size rows at a time
+        
+        Uses a server-side cursor (stream_results) so only one chunk is held
+        in memory. The session stays open until the generator is exhausted
+        or closed.
+        
+        Args:
+            symbols: restrict to these symbols
+            start: first published_at included
+            end: published_at upper bound (exclusive)
+            columns: NewsArticle attribute names to return (defaults to all columns)
+        """
+        columns = columns or [column.name for column in NewsArticle.__table__.columns]
+        stmt = select(*[getattr(NewsArticle, name) for name in columns])
+        if symbols:
+            stmt = stmt.where(NewsArticle.symbol.in_(symbols))
+        if start:
+            stmt = stmt.where(NewsArticle.published_at >= start)
+        if end:
+            stmt = stmt.where(NewsArticle.published_at < end)
+        if scored_only:
+            stmt = stmt.where(NewsArticle.sentiment_score.isnot(None))
+        stmt = stmt.order_by(NewsArticle.published_at, NewsArticle.id)
+        
+        db = self.session_factory()
+        try:
+            result = db.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+            for partition in result.mappings().partitions():
+                yield [dict(row) for row in partition]
         finally:
             db.close()
     
     def get_unanalyzed_articles(self, limit: int = 100) -> List[NewsArticle]:
         """Get articles that don't have sentiment scores yet"""
-        db = SessionLocal()
+        db = self.session_factory()
         try:
             articles = db.query(NewsArticle).filter(
                 NewsArticle.sentiment_score.is_(None)
@@ -68,13 +373,28 @@ class DatabaseService:
     
     def update_article_sentiment(self, article_id: int, sentiment_score: float, sentiment_label: str):
         """Update sentiment score for an article"""
-        db = SessionLocal()
+        db = self.session_factory()
         try:
+            lock_articles_for_scoring(db, [article_id])
             article = db.query(NewsArticle).filter(NewsArticle.id == article_id).first()
             if article:
+                apply_score_changes(db, [(
+                    article.symbol, article.sentiment_score, article.sentiment_label,
+                    sentiment_score, sentiment_label
+                )])
                 article.sentiment_score = sentiment_score
                 article.sentiment_label = sentiment_label
                 db.commit()
+                invalidate_symbols([article.symbol])
+                publish_scored_articles([{
+                    "id": article.id,
+                    "symbol": article.symbol,
+                    "title": article.title,
+                    "url": article.url,
+                    "published_at": article.published_at,
+                    "sentiment_score": sentiment_score,
+                    "sentiment_label": sentiment_label
+                }])
         except Exception as e:
             db.rollback()
             print(f"Error updating sentiment for article {article_id}: {e}")
@@ -83,28 +403,12 @@ class DatabaseService:
     
     def get_stock_sentiment_data(self, symbol: str, days: int = 7) -> Dict:
         """Get aggregated sentiment data for a stock"""
-        db = SessionLocal()
+        db = self.session_factory()
         try:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
-            # Get all articles with sentiment scores
-            articles = db.query(NewsArticle).filter(
-                and_(
-                    NewsArticle.symbol == symbol.upper(),
-                    NewsArticle.published_at >= start_date,
-                    NewsArticle.sentiment_score.isnot(None)
-                )
-            ).all()
-            
-            if not articles:
-                return None
-            
-            # Calculate overall sentiment
-            sentiment_scores = [article.sentiment_score for article in articles]
-            avg_sentiment = sum(sentiment_scores) / len(sentiment_scores)
-            
-            # Get daily breakdown
+            # Daily breakdown, aggregated in the database
             daily_sentiment = db.query(
                 func.date(NewsArticle.published_at).label('date'),
                 func.avg(NewsArticle.sentiment_score).label('avg_sentiment'),
@@ -117,10 +421,17 @@ class DatabaseService:
                 )
             ).group_by(func.date(NewsArticle.published_at)).order_by('date').all()
             
+            if not daily_sentiment:
+                return None
+            
+            # The overall average is the article-weighted mean of the daily ones
+            total_articles = sum(day.article_count for day in daily_sentiment)
+            avg_sentiment = sum(day.avg_sentiment * day.article_count for day in daily_sentiment) / total_articles
+            
             return {
                 "symbol": symbol.upper(),
                 "avg_sentiment": round(avg_sentiment, 3),
-                "total_articles": len(articles),
+                "total_articles": total_articles,
                 "daily_trends": [
                     {
                         "date": str(day.date),
@@ -136,7 +447,7 @@ class DatabaseService:
     
     def get_trending_stocks(self, hours: int = 24) -> List[Dict]:
         """Get stocks with most sentiment activity in recent hours"""
-        db = SessionLocal()
+        db = self.session_factory()
         try:
             cutoff_time = datetime.now() - timedelta(hours=hours)
             
@@ -165,7 +476,200 @@ class DatabaseService:
         finally:
             db.close()
 
-# Test function
+def _rollup_totals(row) -> Dict:
+    """Summable daily totals from an aggregate row (zeros for None)"""
+    names = ("article_count", "score_sum", "positive_count", "negative_count", "neutral_count")
+    return {name: (getattr(row, name) or 0) if row is not None else 0 for name in names}
+
+def case_label(label: str):
+    """1 when an article carries the given sentiment label, else 0 (for SUM aggregates)"""
+    if label == 'neutral':
+        condition = or_(NewsArticle.sentiment_label == label, NewsArticle.sentiment_label.is_(None))
+    else:
+        condition = NewsArticle.sentiment_label == label
+    return case((condition, 1), else_=0)
+
+def lock_articles_for_scoring(db: Session, ids: List[int]) -> Dict[int, Any]:
+    """
+    Lock articles about to be (re)scored and read their current scores
+    
+    Several scorers run at once (the backlog scorer, refresh jobs, the
+    ingestion pipeline, backfill), so the old score a stats delta starts
+    from has to be read under the lock the new score is written under;
+    otherwise two scorers that both saw NULL count the article twice.
+    Takes BEGIN IMMEDIATE on SQLite and SELECT ... FOR UPDATE elsewhere,
+    in id order so concurrent scorers can't deadlock. Call it first in the
+    transaction; apply_score_changes then locks the stats row after it.
+    
+    Returns:
+        Rows (id, symbol, title, url, published_at and the current score and label) by id
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+    ids = sorted(set(ids))
+    rows = {}
+    for i in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+        for row in db.execute(
+            select(
+                NewsArticle.id,
+                NewsArticle.symbol,
+                NewsArticle.title,
+                NewsArticle.url,
+                NewsArticle.published_at,
+                NewsArticle.sentiment_score,
+                NewsArticle.sentiment_label
+            ).where(NewsArticle.id.in_(ids[i:i + LOOKUP_CHUNK_SIZE])).order_by(NewsArticle.id).with_for_update()
+        ):
+            rows[row.id] = row
+    return rows
+
+def apply_score_changes(db: Session, changes: Iterable[Tuple[str, Optional[float], Optional[str], Optional[float], Optional[str]]]):
+    """
+    Fold article score changes into SentimentStats and SymbolStats
+    
+    Runs inside the caller's transaction so the totals commit (or roll back)
+    together with the scores. The stats row is seeded by migration 0003
+    (or the first reconcile_sentiment_stats for a schema built with
+    create_all); until it exists there is nothing to keep current, so this
+    is a no-op.
+    
+    Args:
+        changes: (symbol, old_score, old_label, new_score, new_label) per article
+    """
+    totals = {'scored_articles': 0, 'score_sum': 0.0, 'positive_count': 0, 'negative_count': 0, 'neutral_count': 0}
+    per_symbol: Dict[str, int] = {}
+    for symbol, old_score, old_label, new_score, new_label in changes:
+        for score, label, sign in ((old_score, old_label, -1), (new_score, new_label, 1)):
+            if score is None:
+                continue
+            totals['scored_articles'] += sign
+            totals['score_sum'] += sign * score
+            totals[LABEL_COUNT_COLUMNS.get(label, 'neutral_count')] += sign
+            per_symbol[symbol] = per_symbol.get(symbol, 0) + sign
+    
+    per_symbol = {symbol: delta for symbol, delta in per_symbol.items() if delta}
+    if not per_symbol and not any(totals.values()):
+        return
+    # Lock the stats row first, then symbols in sorted order, the same order as
+    # reconcile_sentiment_stats, so scorers and the reconcile can't deadlock
+    if db.execute(
+        select(SentimentStats.id).where(SentimentStats.id == STATS_ROW_ID).with_for_update()
+    ).first() is None:
+        return
+    
+    for symbol in sorted(per_symbol):
+        delta = per_symbol[symbol]
+        updated = db.execute(
+            update(SymbolStats)
+            .where(SymbolStats.symbol == symbol)
+            .values(scored_articles=SymbolStats.scored_articles + delta)
+        ).rowcount
+        if not updated:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(SymbolStats), [{"symbol": symbol, "scored_articles": delta}])
+            except IntegrityError:
+                # Another scorer created the row first
+                db.execute(
+                    update(SymbolStats)
+                    .where(SymbolStats.symbol == symbol)
+                    .values(scored_articles=SymbolStats.scored_articles + delta)
+                )
+    
+    values = {
+        column: getattr(SentimentStats, column) + delta
+        for column, delta in totals.items()
+        if delta
+    }
+    if per_symbol:
+        values['stocks_tracked'] = select(func.count()).select_from(SymbolStats).where(
+            SymbolStats.scored_articles > 0
+        ).scalar_subquery()
+    if values:
+        db.execute(update(SentimentStats).where(SentimentStats.id == STATS_ROW_ID).values(**values))
+
+def sentiment_totals(db: Session) -> Tuple[Dict, Dict[str, int]]:
+    """SentimentStats column totals and scored articles per symbol, over hot and archived articles"""
+    hot = db.query(
+        func.count(NewsArticle.id).label('scored_articles'),
+        func.sum(NewsArticle.sentiment_score).label('score_sum'),
+        func.sum(case_label('positive')).label('positive_count'),
+        func.sum(case_label('negative')).label('negative_count'),
+        func.sum(case_label('neutral')).label('neutral_count')
+    ).filter(NewsArticle.sentiment_score.isnot(None)).one()
+    archived = db.query(
+        func.sum(ArchivedSentiment.article_count).label('scored_articles'),
+        func.sum(ArchivedSentiment.score_sum).label('score_sum'),
+        func.sum(ArchivedSentiment.positive_count).label('positive_count'),
+        func.sum(ArchivedSentiment.negative_count).label('negative_count'),
+        func.sum(ArchivedSentiment.neutral_count).label('neutral_count')
+    ).one()
+    totals = {name: (getattr(hot, name) or 0) + (getattr(archived, name) or 0) for name in hot._fields}
+    
+    per_symbol: Dict[str, int] = {}
+    for symbol, count in db.query(
+        NewsArticle.symbol,
+        func.count(NewsArticle.id)
+    ).filter(
+        NewsArticle.sentiment_score.isnot(None)
+    ).group_by(NewsArticle.symbol).union_all(
+        db.query(ArchivedSentiment.symbol, func.sum(ArchivedSentiment.article_count))
+        .group_by(ArchivedSentiment.symbol)
+    ).all():
+        per_symbol[symbol] = per_symbol.get(symbol, 0) + count
+    return totals, per_symbol
+
+def write_sentiment_stats(db: Session, exists: bool = True):
+    """Recompute SentimentStats and SymbolStats in db's transaction, creating the stats row unless it exists"""
+    totals, per_symbol = sentiment_totals(db)
+    
+    db.execute(delete(SymbolStats))
+    if per_symbol:
+        db.execute(insert(SymbolStats), [
+            {"symbol": symbol, "scored_articles": count} for symbol, count in per_symbol.items()
+        ])
+    
+    values = dict(totals, stocks_tracked=len(per_symbol))
+    if exists:
+        db.execute(update(SentimentStats).where(SentimentStats.id == STATS_ROW_ID).values(**values))
+    else:
+        db.execute(insert(SentimentStats), [dict(values, id=STATS_ROW_ID)])
+
+def stats_to_dict(stats: SentimentStats) -> Dict:
+    """Summary response fields from a SentimentStats row"""
+    distribution = {
+        label: getattr(stats, column)
+        for label, column in LABEL_COUNT_COLUMNS.items()
+        if getattr(stats, column)
+    }
+    return {
+        "total_articles_analyzed": stats.scored_articles,
+        "average_sentiment": round(stats.score_sum / stats.scored_articles, 3) if stats.scored_articles else 0,
+        "sentiment_distribution": distribution,
+        "stocks_tracked": stats.stocks_tracked
+    }
+
+def _scoring_backlog_metrics():
+    """Articles stored but not yet scored, read at scrape time"""
+    db = SessionLocal()
+    try:
+        backlog = db.query(func.count(NewsArticle.id)).filter(NewsArticle.sentiment_score.is_(None)).scalar()
+    finally:
+        db.close()
+    return [("scoring_backlog_articles", "gauge", "Stored articles waiting for a sentiment score", [({}, backlog)])]
+
+REGISTRY.register_collector(_scoring_backlog_metrics)
+
+# Command line entry point
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Database service utilities")
+    parser.add_argument("--reconcile-stats", action="store_true", help="Recompute the global sentiment stats from news_articles")
+    args = parser.parse_args()
+    
     db_service = DatabaseService()
-    print("Database service ready!")
\ No newline at end of file
+    if args.reconcile_stats:
+        print(f"✓ Sentiment stats reconciled: {db_service.reconcile_sentiment_stats()}")
+    else:
+        print("Database service ready!")
\ No newline at end of file
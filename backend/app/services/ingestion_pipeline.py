@@ -0,0 +1,485 @@
+import glob
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.services.database_service import DatabaseService
+from app.services.news_service import NewsService
+from app.services.sentiment_service import SentimentService
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_STOP = object()
+# Article key holding the source's ack callback; called with True once the article is stored (or dropped)
+ACK_KEY = "_ack"
+
+class StageStats:
+    """Thread-safe throughput and latency counters for one pipeline stage"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.batches = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def record(self, items_in: int, items_out: int, seconds: float):
+        with self._lock:
+            self.items_in += items_in
+            self.items_out += items_out
+            self.batches += 1
+            self.busy_seconds += seconds
+    
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+    
+    def snapshot(self, queue_depth: Optional[int] = None) -> Dict:
+        """Current counters plus derived rates"""
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started_at, 1e-9)
+            return {
+                "stage": self.name,
+                "items_in": self.items_in,
+                "items_out": self.items_out,
+                "batches": self.batches,
+                "errors": self.errors,
+                "items_per_sec": round(self.items_in / elapsed, 2),
+                # What the stage sustains while working, ignoring time spent waiting on others
+                "busy_items_per_sec": round(
+                    self.items_in / self.busy_seconds, 2
+                ) if self.busy_seconds else 0.0,
+                "avg_batch_latency_ms": round(
+                    self.busy_seconds / self.batches * 1000, 3
+                ) if self.batches else 0.0,
+                "queue_depth": queue_depth
+            }
+
+# Article sources
+
+def articles_from_record(record: Dict, default_symbol: Optional[str] = None) -> Iterable[Dict]:
+    """
+    Expands one dump/spool record into articles
+
+    A record is either a single article, or a NewsAPI response envelope
+    whose 'articles' inherit the envelope's 'symbol'.
+    """
+    symbol = record.get('symbol') or default_symbol
+    if 'articles' in record:
+        for article in record['articles'] or []:
+            yield dict(article, symbol=article.get('symbol') or symbol)
+    else:
+        yield dict(record, symbol=symbol)
+
+class ArticleSource:
+    """
+    Produces raw NewsAPI-shaped article dicts, each tagged with a 'symbol'
+    
+    A source that has to know when its articles are safely stored puts a
+    callable under ACK_KEY; the pipeline calls it with True once the
+    article's store batch has committed (or the article was dropped as
+    invalid or already stored), or with False if the batch failed.
+    """
+    
+    name = "source"
+    
+    def fetch(self) -> Iterable[Dict]:
+        raise NotImplementedError
+
+class NewsAPISource(ArticleSource):
+    """Pulls recent articles for a fixed set of symbols from NewsAPI"""
+    
+    name = "newsapi"
+    
+    def __init__(self, symbols: List[str], days_back: int = 3, news_service: Optional[NewsService] = None):
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.days_back = days_back
+        self.news_service = news_service or NewsService()
+    
+    def fetch(self) -> Iterable[Dict]:
+        for symbol in self.symbols:
+            news_data = self.news_service.get_stock_news(symbol, days_back=self.days_back)
+            for article in news_data.get('articles', []):
+                yield dict(article, symbol=symbol)
+
+class JsonlSpoolSource(ArticleSource):
+    """
+    Reads articles from *.jsonl files dropped into a local spool directory
+    
+    Each line is either a single article with a 'symbol' field, or a
+    NewsAPI response envelope: {"symbol": "AAPL", "articles": [...]}.
+    A file is moved into a 'processed' subdirectory once every article in
+    it has been stored. If any of its store batches fails, the file stays
+    in the spool and is read again on the next pass.
+    """
+    
+    name = "spool"
+    
+    def __init__(self, directory: str, pattern: str = "*.jsonl", default_symbol: Optional[str] = None):
+        self.directory = directory
+        self.pattern = pattern
+        self.default_symbol = default_symbol
+        self.processed_dir = os.path.join(directory, "processed")
+        # Per file still in flight: articles not yet acked, and whether any failed
+        self._pending: Dict[str, List] = {}
+        self._lock = threading.Lock()
+    
+    def fetch(self) -> Iterable[Dict]:
+        for path in sorted(glob.glob(os.path.join(self.directory, self.pattern))):
+            with self._lock:
+                # Still being stored from an earlier pass
+                if path in self._pending:
+                    continue
+                # The extra count holds the file open until it has been read to the end
+                self._pending[path] = [1, False]
+            ack = partial(self._ack, path)
+            read_ok = False
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line_number, line in enumerate(f, 1):
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError as e:
+                            logger.warning(f"Skipping bad JSON in {path}:{line_number}: {e}")
+                            continue
+                        for article in articles_from_record(record, self.default_symbol):
+                            with self._lock:
+                                self._pending[path][0] += 1
+                            article[ACK_KEY] = ack
+                            yield article
+                read_ok = True
+            finally:
+                ack(read_ok)
+            
+    def _ack(self, path: str, ok: bool):
+        with self._lock:
+            state = self._pending[path]
+            state[0] -= 1
+            state[1] = state[1] or not ok
+            if state[0]:
+                return
+            del self._pending[path]
+            failed = state[1]
+        if failed:
+            logger.warning(f"Keeping {path} in the spool, some of its articles were not stored")
+            return
+        os.makedirs(self.processed_dir, exist_ok=True)
+        shutil.move(path, os.path.join(self.processed_dir, os.path.basename(path)))
+
+def _settle(acks: List[Optional[Callable]], ok: bool):
+    for ack in acks:
+        if ack:
+            ack(ok)
+
+# Pipeline
+
+class Stage:
+    """A pool of worker threads draining a bounded input queue in batches"""
+    
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[List], List],
+        concurrency: int = 1,
+        batch_size: int = 1,
+        queue_size: int = 1000,
+        batch_timeout: float = 0.5
+    ):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.batch_timeout = batch_timeout
+        self.input = queue.Queue(maxsize=queue_size)
+        self.output: Optional["Stage"] = None
+        self.stats = StageStats(name)
+        self._threads: List[threading.Thread] = []
+        self._remaining_workers = self.concurrency
+        self._lock = threading.Lock()
+    
+    def start(self):
+        # Reset, so a pipeline can run() again after draining
+        self._threads = []
+        self._remaining_workers = self.concurrency
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._run, name=f"pipeline-{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+    
+    def put(self, item):
+        # Blocks while the queue is full, which is what pushes back on upstream stages
+        self.input.put(item)
+    
+    def stop(self):
+        for _ in range(self.concurrency):
+            self.input.put(_STOP)
+    
+    def _next_batch(self) -> Tuple[List, bool]:
+        """Block for one item, then gather more until the batch fills or the timeout passes"""
+        first = self.input.get()
+        if first is _STOP:
+            return [], True
+        
+        batch = [first]
+        deadline = time.monotonic() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.input.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+    
+    def _run(self):
+        stopped = False
+        while not stopped:
+            batch, stopped = self._next_batch()
+            if not batch:
+                continue
+            
+            started = time.monotonic()
+            produced = 0
+            waiting = 0.0
+            try:
+                # Handlers may be generators; each result goes downstream as soon as it is produced
+                for result in self.handler(batch) or []:
+                    produced += 1
+                    if self.output is not None:
+                        put_started = time.monotonic()
+                        self.output.put(result)
+                        waiting += time.monotonic() - put_started
+            except Exception as e:
+                logger.error(f"Stage '{self.name}' failed on a batch of {len(batch)}: {e}")
+                self.stats.record_error()
+            self.stats.record(len(batch), produced, time.monotonic() - started - waiting)
+        
+        # The last worker out tells the next stage there is nothing more coming
+        with self._lock:
+            self._remaining_workers -= 1
+            last = self._remaining_workers == 0
+        if last and self.output is not None:
+            self.output.stop()
+
+class IngestionPipeline:
+    """
+    fetch → normalize/dedupe → bulk store → batch score → rollup update
+    
+    Stages run in their own worker threads and are connected by bounded
+    queues, so a slow stage (usually scoring) throttles the ones above it
+    instead of letting work pile up in memory.
+    """
+    
+    def __init__(
+        self,
+        sources: List[ArticleSource],
+        db_service: Optional[DatabaseService] = None,
+        sentiment_service: Optional[SentimentService] = None,
+        fetch_concurrency: int = 2,
+        normalize_concurrency: int = 1,
+        store_concurrency: int = 1,
+        score_concurrency: int = 1,
+        rollup_concurrency: int = 1,
+        store_batch_size: int = 200,
+        score_batch_size: int = 64,
+        queue_size: int = 1000,
+        dedupe_window: int = 100000
+    ):
+        self.sources = sources
+        self.db_service = db_service or DatabaseService()
+        self.sentiment_service = sentiment_service or SentimentService()
+        self.dedupe_window = dedupe_window
+        self._seen_urls: "OrderedDict[str, None]" = OrderedDict()
+        self._seen_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        
+        self.stages = [
+            Stage("fetch", self._fetch, fetch_concurrency, 1, queue_size),
+            Stage("normalize", self._normalize, normalize_concurrency, store_batch_size, queue_size),
+            Stage("store", self._store, store_concurrency, store_batch_size, queue_size),
+            Stage("score", self._score, score_concurrency, score_batch_size, queue_size),
+            Stage("rollup", self._rollup, rollup_concurrency, 500, queue_size, batch_timeout=2.0),
+        ]
+        for upstream, downstream in zip(self.stages, self.stages[1:]):
+            upstream.output = downstream
+    
+    # Stage handlers
+    
+    def _fetch(self, sources: List[ArticleSource]) -> Iterable[Dict]:
+        # A generator, so articles reach the bounded normalize queue as the source yields them
+        for source in sources:
+            try:
+                yield from source.fetch()
+            except Exception as e:
+                logger.error(f"Error fetching from {source.name}: {e}")
+    
+    def _normalize(self, articles: List[Dict]) -> List[Dict]:
+        rows = []
+        for article in articles:
+            ack = article.get(ACK_KEY)
+            symbol = article.get('symbol')
+            try:
+                row = self.db_service.normalize_article(symbol, article) if symbol else None
+            except Exception as e:
+                logger.warning(f"Skipping article that can't be normalized: {e}")
+                row = None
+            if row and row['title'] and not self._already_seen(row['url']):
+                row[ACK_KEY] = ack
+                rows.append(row)
+            elif ack:
+                # Nothing to store for this one
+                ack(True)
+        return rows
+    
+    def _already_seen(self, url: str) -> bool:
+        """True for URLs recently stored by this pipeline, so repeated fetches don't reach the database"""
+        with self._seen_lock:
+            if url in self._seen_urls:
+                self._seen_urls.move_to_end(url)
+                return True
+            return False
+    
+    def _remember_stored(self, urls: Iterable[str]):
+        with self._seen_lock:
+            for url in urls:
+                self._seen_urls[url] = None
+                self._seen_urls.move_to_end(url)
+            while len(self._seen_urls) > self.dedupe_window:
+                self._seen_urls.popitem(last=False)
+    
+    def _store(self, rows: List[Dict]) -> List[Dict]:
+        acks = [row.pop(ACK_KEY, None) for row in rows]
+        try:
+            stored = self.db_service.store_articles_bulk(rows)
+        except Exception:
+            _settle(acks, False)
+            raise
+        # Only now are these URLs safely in the database
+        self._remember_stored(row['url'] for row in rows)
+        _settle(acks, True)
+        return stored
+    
+    def _score(self, rows: List[Dict]) -> List[tuple]:
+        texts = [SentimentService.article_text(row['title'], row['content']) for row in rows]
+        results = self.sentiment_service.analyze_batch(texts)
+        
+        self.db_service.update_article_sentiments([
+            {"id": row['id'], "sentiment_score": result['score'], "sentiment_label": result['label']}
+            for row, result in zip(rows, results)
+        ])
+        return [(row['symbol'], row['published_at']) for row in rows]
+    
+    def _rollup(self, keys: List[tuple]) -> List[tuple]:
+        unique_keys = {(symbol, day.date()) for symbol, day in keys if day is not None}
+        self.db_service.update_sentiment_summaries(unique_keys)
+        return []
+    
+    # Control
+    
+    def run(self, poll_interval: Optional[float] = None, report_interval: float = 30.0):
+        """
+        Run the pipeline until the sources are drained
+        
+        Args:
+            poll_interval: if set, re-poll every source this often until stop() is called
+            report_interval: seconds between stats log lines
+        """
+        self._stop_event.clear()
+        for stage in self.stages:
+            stage.start()
+        
+        reporter = threading.Thread(target=self._report_loop, args=(report_interval,), daemon=True)
+        reporter.start()
+        
+        try:
+            while True:
+                for source in self.sources:
+                    self.stages[0].put(source)
+                if poll_interval is None or self._stop_event.wait(poll_interval):
+                    break
+        finally:
+            self.stages[0].stop()
+            for stage in self.stages:
+                stage.join()
+            self._stop_event.set()
+            reporter.join()
+        
+        self._log_stats()
+        return self.stats()
+    
+    def stop(self):
+        """Ask a polling run() to finish its current pass and drain"""
+        self._stop_event.set()
+    
+    def stats(self) -> List[Dict]:
+        """Per-stage throughput, latency and queue depth"""
+        return [stage.stats.snapshot(stage.input.qsize()) for stage in self.stages]
+    
+    def _report_loop(self, interval: float):
+        while not self._stop_event.wait(interval):
+            self._log_stats()
+    
+    def _log_stats(self):
+        for s in self.stats():
+            logger.info(
+                f"[{s['stage']}] in={s['items_in']} out={s['items_out']} "
+                f"rate={s['items_per_sec']}/s latency={s['avg_batch_latency_ms']}ms "
+                f"queue={s['queue_depth']} errors={s['errors']}"
+            )
+
+# Command line entry point
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Run the streaming news ingestion pipeline")
+    parser.add_argument("--symbols", default="", help="Comma separated symbols to pull from NewsAPI")
+    parser.add_argument("--spool", help="Directory of *.jsonl article files to ingest")
+    parser.add_argument("--poll", type=float, default=None, help="Re-poll sources every N seconds")
+    parser.add_argument("--model", default="vader", help="finbert, vader or textblob")
+    parser.add_argument("--fetch-concurrency", type=int, default=2)
+    parser.add_argument("--store-concurrency", type=int, default=1)
+    parser.add_argument("--score-concurrency", type=int, default=1)
+    parser.add_argument("--score-batch-size", type=int, default=64)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    args = parser.parse_args()
+    
+    sources: List[ArticleSource] = []
+    if args.symbols:
+        sources.append(NewsAPISource(args.symbols.split(",")))
+    if args.spool:
+        sources.append(JsonlSpoolSource(args.spool))
+    if not sources:
+        parser.error("give --symbols and/or --spool")
+    
+    pipeline = IngestionPipeline(
+        sources,
+        sentiment_service=SentimentService(model_type=args.model),
+        fetch_concurrency=args.fetch_concurrency,
+        store_concurrency=args.store_concurrency,
+        score_concurrency=args.score_concurrency,
+        score_batch_size=args.score_batch_size,
+        queue_size=args.queue_size
+    )
+    pipeline.run(poll_interval=args.poll)
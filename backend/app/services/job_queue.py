@@ -0,0 +1,295 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.core.database import SessionLocal
+from app.models.database import StockInfo
+from app.services.database_service import DatabaseService
+from app.services.news_service import NewsService
+from app.services.sentiment_service import get_shared_sentiment_service
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "inprocess" runs jobs on a thread pool in the web process; "celery" hands them to Celery workers
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "inprocess")
+JOB_QUEUE_WORKERS = int(os.getenv("JOB_QUEUE_WORKERS", "4"))
+# Finished jobs remembered for status lookups (in-process backend)
+JOB_HISTORY_SIZE = int(os.getenv("JOB_HISTORY_SIZE", "1000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Longest a Celery dedupe key may outlive a job that never finished
+JOB_DEDUPE_TTL = int(os.getenv("JOB_DEDUPE_TTL", "900"))
+# Celery job records (and results) are kept this long for status lookups
+JOB_RECORD_TTL = JOB_DEDUPE_TTL * 4
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+# Job functions
+
+def refresh_symbol(symbol: str, days_back: int = 3) -> Dict:
+    """Fetch recent news for a symbol, store the new articles and score them"""
+    symbol = symbol.upper()
+    news_data = NewsService().get_stock_news(symbol, days_back=days_back)
+    
+    db_service = DatabaseService()
+    rows = []
+    for article in news_data.get("articles", []):
+        row = db_service.normalize_article(symbol, article)
+        if row:
+            rows.append(row)
+    stored = db_service.store_articles_bulk(rows)
+    scored = get_shared_sentiment_service().score_stored_articles(stored)
+    
+    return {
+        "symbol": symbol,
+        "new_articles_found": len(stored),
+        "articles_scored": scored,
+        "total_articles_fetched": len(news_data.get("articles", []))
+    }
+
+def reconcile_stats() -> Dict:
+    """Rebuild the maintained sentiment totals from the articles"""
+    return DatabaseService().reconcile_sentiment_stats()
+
+JOB_FUNCTIONS: Dict[str, Callable[..., Dict]] = {
+    "refresh": refresh_symbol,
+    "reconcile_stats": reconcile_stats,
+}
+
+def run_job(kind: str, params: Dict) -> Dict:
+    return JOB_FUNCTIONS[kind](**params)
+
+def dedupe_key(kind: str, params: Dict) -> str:
+    return f"{kind}:" + ",".join(f"{k}={params[k]}" for k in sorted(params))
+
+# Backends
+
+class JobQueue:
+    """Runs named jobs in the background and reports their status"""
+    
+    def enqueue(self, kind: str, params: Dict) -> Tuple[Dict, bool]:
+        """
+        Queue a job unless an identical one is still pending
+        
+        Returns:
+            (job, created) where job is the new or already pending job
+        """
+        raise NotImplementedError
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+class InProcessJobQueue(JobQueue):
+    """Thread pool runner for local development and tests"""
+    
+    def __init__(self, workers: int = JOB_QUEUE_WORKERS, history_size: int = JOB_HISTORY_SIZE):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.history_size = history_size
+        self.jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self.pending: Dict[str, str] = {}
+        self._futures = set()
+        self._futures_lock = threading.Lock()
+        self._lock = threading.Lock()
+    
+    def enqueue(self, kind: str, params: Dict) -> Tuple[Dict, bool]:
+        key = dedupe_key(kind, params)
+        with self._lock:
+            existing = self.pending.get(key)
+            if existing is not None:
+                return dict(self.jobs[existing]), False
+            
+            job = {
+                "id": uuid.uuid4().hex,
+                "kind": kind,
+                "params": params,
+                "status": QUEUED,
+                "result": None,
+                "error": None,
+                "created_at": datetime.now().isoformat(),
+                "started_at": None,
+                "finished_at": None
+            }
+            self.jobs[job["id"]] = job
+            self.pending[key] = job["id"]
+            self._trim()
+        future = self.executor.submit(self._run, job["id"], key)
+        with self._futures_lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return dict(job), True
+    
+    def _run(self, job_id: str, key: str):
+        with self._lock:
+            job = self.jobs[job_id]
+            job["status"] = RUNNING
+            job["started_at"] = datetime.now().isoformat()
+        try:
+            result = run_job(job["kind"], job["params"])
+            update = {"status": SUCCEEDED, "result": result}
+        except Exception as e:
+            logger.error(f"Job {job_id} ({key}) failed: {e}")
+            update = {"status": FAILED, "error": str(e)}
+        with self._lock:
+            job.update(update, finished_at=datetime.now().isoformat())
+            self.pending.pop(key, None)
+    
+    def _forget(self, future):
+        with self._futures_lock:
+            self._futures.discard(future)
+    
+    def _trim(self):
+        """Forget the oldest finished jobs beyond history_size"""
+        excess = len(self.jobs) - self.history_size
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self.jobs.items() if job["status"] in (SUCCEEDED, FAILED)][:excess]:
+            del self.jobs[job_id]
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+    
+    def wait(self, timeout: Optional[float] = None):
+        """Block until every submitted job has finished (used by tests)"""
+        with self._futures_lock:
+            futures = list(self._futures)
+        wait(futures, timeout=timeout)
+
+class CeleryJobQueue(JobQueue):
+    """
+    Jobs executed by Celery workers, with Redis keys for deduplication
+    
+    Start workers with:
+        JOB_QUEUE_BACKEND=celery celery -A app.services.job_queue:celery_app worker
+    """
+    
+    STATES = {
+        "PENDING": QUEUED, "RECEIVED": QUEUED, "RETRY": QUEUED,
+        "STARTED": RUNNING, "SUCCESS": SUCCEEDED, "FAILURE": FAILED, "REVOKED": FAILED
+    }
+    
+    def __init__(self, app, task):
+        import redis
+        self.app = app
+        self.task = task
+        self.redis = redis.Redis.from_url(REDIS_URL)
+    
+    def enqueue(self, kind: str, params: Dict) -> Tuple[Dict, bool]:
+        key = f"job:pending:{dedupe_key(kind, params)}"
+        job = {"id": uuid.uuid4().hex, "kind": kind, "params": params, "status": QUEUED,
+               "result": None, "error": None, "created_at": datetime.now().isoformat()}
+        # The record goes in first, so a job found through its pending key always has one
+        self.redis.set(self._record_key(job["id"]), json.dumps(job, default=str), ex=JOB_RECORD_TTL)
+        while not self.redis.set(key, job["id"], nx=True, ex=JOB_DEDUPE_TTL):
+            existing = self.redis.get(key)
+            if existing is None:
+                # The pending job finished (or its key expired) since SET NX; claim the key again
+                continue
+            existing_job = self.get(existing.decode())
+            if existing_job is not None:
+                self.redis.delete(self._record_key(job["id"]))
+                return existing_job, False
+            # A pending key without a record is left over from a lost job; take it over
+            self.redis.set(key, job["id"], ex=JOB_DEDUPE_TTL)
+            break
+        self.task.apply_async(args=[kind, params, key], task_id=job["id"])
+        return job, True
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """The job's record with its Celery state, or None for unknown and expired ids"""
+        from celery.result import AsyncResult
+        record = self.redis.get(self._record_key(job_id))
+        if record is None:
+            # Celery reports PENDING for ids it has never seen, so the record is the source of truth
+            return None
+        job = json.loads(record)
+        result = AsyncResult(job_id, app=self.app)
+        status = self.STATES.get(result.state, QUEUED)
+        job.update(
+            status=status,
+            result=result.result if status == SUCCEEDED else None,
+            error=str(result.result) if status == FAILED else None
+        )
+        return job
+    
+    @staticmethod
+    def _record_key(job_id: str) -> str:
+        return f"job:record:{job_id}"
+
+def _make_celery_app():
+    import redis
+    from celery import Celery
+    
+    dedupe_client = redis.Redis.from_url(REDIS_URL)
+    app = Celery("stock_sentiment", broker=REDIS_URL, backend=REDIS_URL)
+    app.conf.update(task_track_started=True, result_expires=JOB_RECORD_TTL)
+    
+    @app.task(name="jobs.run")
+    def run_celery_job(kind: str, params: Dict, key: str) -> Dict:
+        try:
+            return run_job(kind, params)
+        finally:
+            # Identical requests may queue a fresh job from now on
+            dedupe_client.delete(key)
+    
+    return app, run_celery_job
+
+celery_app, celery_task = _make_celery_app() if JOB_QUEUE_BACKEND == "celery" else (None, None)
+
+_job_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        with _queue_lock:
+            if _job_queue is None:
+                if celery_app is not None:
+                    _job_queue = CeleryJobQueue(celery_app, celery_task)
+                else:
+                    _job_queue = InProcessJobQueue()
+    return _job_queue
+
+def set_job_queue(queue: Optional[JobQueue]):
+    """Replace the process-wide queue (used by tests)"""
+    global _job_queue
+    _job_queue = queue
+
+def active_symbols(session_factory=None) -> List[str]:
+    """Symbols of every active StockInfo row"""
+    db = (session_factory or SessionLocal)()
+    try:
+        return [row.symbol for row in db.query(StockInfo.symbol).filter(StockInfo.is_active == True)]
+    finally:
+        db.close()
+
+def enqueue_refresh_all(days_back: int = 3, budget=None) -> Dict:
+    """
+    Queue one refresh job per active tracked stock
+    
+    With a budget (the RefreshScheduler), each new job is charged to its
+    API quota; symbols left once the budget runs short are not queued and
+    come back under 'over_budget'.
+    """
+    queue = get_job_queue()
+    jobs, created, over_budget = [], 0, []
+    for symbol in active_symbols():
+        if over_budget or (budget is not None and not budget.try_spend()):
+            over_budget.append(symbol)
+            continue
+        job, is_new = queue.enqueue("refresh", {"symbol": symbol, "days_back": days_back})
+        if budget is not None and not is_new:
+            budget.refund()
+        jobs.append({"symbol": symbol, "job_id": job["id"], "status": job["status"]})
+        created += is_new
+    return {"jobs": jobs, "enqueued": created, "deduplicated": len(jobs) - created, "over_budget": over_budget}
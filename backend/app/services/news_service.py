@@ -3,13 +3,17 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
+from app.core.metrics import track_upstream
 
 load_dotenv()
 
+# Overridable so load tests can point at a local stand-in (see loadtest/fake_newsapi.py)
+NEWS_API_BASE_URL = os.getenv('NEWS_API_BASE_URL', "https://newsapi.org/v2")
+
 class NewsService:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         self.api_key = api_key or os.getenv('NEWS_API_KEY')
-        self.base_url = "https://newsapi.org/v2"
+        self.base_url = (base_url or os.getenv('NEWS_API_BASE_URL') or NEWS_API_BASE_URL).rstrip('/')
         
         if not self.api_key:
             print("Warning: No NEWS_API_KEY found. Please set it in .env file")
@@ -43,8 +47,9 @@ class NewsService:
             }
             
             try:
-                response = requests.get(f"{self.base_url}/everything", params=params)
-                response.raise_for_status()
+                with track_upstream("newsapi", "everything"):
+                    response = requests.get(f"{self.base_url}/everything", params=params)
+                    response.raise_for_status()
                 data = response.json()
                 
                 if data.get('articles'):
@@ -77,8 +82,9 @@ class NewsService:
         }
         
         try:
-            response = requests.get(f"{self.base_url}/top-headlines", params=params)
-            response.raise_for_status()
+            with track_upstream("newsapi", "top-headlines"):
+                response = requests.get(f"{self.base_url}/top-headlines", params=params)
+                response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             print(f"Error fetching trending news: {e}")
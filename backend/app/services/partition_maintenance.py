@@ -0,0 +1,340 @@
+"""
+Monthly range partitioning of news_articles on Postgres (optional)
+
+With NEWS_ARTICLES_PARTITIONING=true, news_articles is rebuilt as a table
+partitioned by month on published_at (news_articles_2024_01, ...), plus a
+default partition for rows without a date. Queries over a recent window
+then only touch the last one or two partitions. The ORM model and the
+DatabaseService queries are unchanged; Postgres routes rows and prunes
+partitions on its own.
+
+Partitioning changes two constraints, because unique indexes on a
+partitioned table have to include published_at:
+- id is indexed but no longer a primary key (ids still come from the
+  same sequence)
+- url is unique per published_at. Re-fetched articles keep their
+  publication time, so store_articles_bulk still skips them
+
+The conversion is a one-time step, run once the schema is at the Alembic
+head: it copies every row while holding an exclusive lock on the table,
+so it belongs in a deploy, not in a serving process. init_db runs it
+after the migrations when partitioning is enabled, or run it directly:
+
+    cd backend && python -m app.services.partition_maintenance --convert
+
+The maintenance run creates the partitions for the next
+PARTITION_MONTHS_AHEAD months, plus any month whose rows are waiting in
+the default partition (late or back-dated articles), and moves those rows
+in. While partitioning is enabled, every API process runs it on startup
+and then every PARTITION_MAINTENANCE_INTERVAL seconds, independently of
+the refresh scheduler; an advisory lock keeps concurrent runs from
+overlapping. It detaches and drops partitions that lie
+wholly before the retention cutoff once the archive job (see
+article_archive) has moved their rows out. Until the table is converted
+it only logs a warning. SQLite keeps the plain table and both steps are
+no-ops.
+
+    cd backend && python -m app.services.partition_maintenance
+"""
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from app.core.database import engine as default_engine
+from app.core.search_index import create_search_index
+from app.models.database import NewsArticle
+from app.services.article_archive import ARTICLE_RETENTION_DAYS
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+NEWS_ARTICLES_PARTITIONING = os.getenv("NEWS_ARTICLES_PARTITIONING", "false").lower() == "true"
+# Future months that always have a partition ready
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+# Seconds between maintenance runs in each API process
+PARTITION_MAINTENANCE_INTERVAL = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL", "86400"))
+# pg_advisory_lock key held for the whole of a run
+MAINTENANCE_LOCK_KEY = 0x6E657773
+
+TABLE = NewsArticle.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_PATTERN = re.compile(rf"^{TABLE}_(\d{{4}})_(\d{{2}})$")
+# Indexes that can't be created on a partitioned table as declared on the model
+UNIQUE_URL_INDEX = "ix_news_articles_url"
+ID_INDEX = "ix_news_articles_id"
+PARTITIONED_INDEXES = {UNIQUE_URL_INDEX, ID_INDEX}
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+def _next_month(value: datetime) -> datetime:
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+def partition_name(month: datetime) -> str:
+    return f"{TABLE}_{month:%Y_%m}"
+
+def is_partition_table(name: str) -> bool:
+    """True for news_articles partitions, which the ORM models don't declare"""
+    return name == DEFAULT_PARTITION or bool(PARTITION_PATTERN.match(name))
+
+def partitioning_supported(dialect_name: str) -> bool:
+    return dialect_name == "postgresql"
+
+class PartitionMaintenance:
+    """Converts news_articles to monthly partitions and keeps the partition set current"""
+    
+    def __init__(self, engine=None, months_ahead: int = PARTITION_MONTHS_AHEAD,
+                 retention_days: int = ARTICLE_RETENTION_DAYS):
+        self.engine = engine or default_engine
+        self.months_ahead = months_ahead
+        self.retention_days = retention_days
+    
+    def is_partitioned(self, connection) -> bool:
+        if not partitioning_supported(connection.dialect.name):
+            return False
+        kind = connection.execute(text(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"
+        ), {"table": TABLE}).scalar()
+        return kind == "p"
+    
+    def partitions(self, connection) -> List[datetime]:
+        """Months that have a partition attached, oldest first"""
+        names = connection.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ), {"table": TABLE}).scalars()
+        months = []
+        for name in names:
+            match = PARTITION_PATTERN.match(name)
+            if match:
+                months.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+    
+    def convert_table(self, today: Optional[date] = None) -> bool:
+        """Partition the table if it isn't yet; True when this call converted it"""
+        today = today or date.today()
+        if not partitioning_supported(self.engine.dialect.name):
+            logger.info(f"Partitioning is not supported on {self.engine.dialect.name}; news_articles stays as is")
+            return False
+        with self._locked():
+            with self.engine.begin() as connection:
+                if self.is_partitioned(connection):
+                    return False
+                self.convert(connection, today)
+        return True
+    
+    def run(self, today: Optional[date] = None) -> Dict:
+        """Add future partitions and retire expired ones on a partitioned table; returns counts"""
+        today = today or date.today()
+        report = {"created": [], "dropped": [], "held_back": {}}
+        if not partitioning_supported(self.engine.dialect.name):
+            logger.info(f"Partitioning is not supported on {self.engine.dialect.name}; news_articles stays as is")
+            return report
+        
+        # Every API process runs this; later runs wait, then find the work done
+        with self._locked():
+            with self.engine.connect() as connection:
+                partitioned = self.is_partitioned(connection)
+            if not partitioned:
+                logger.warning(f"{TABLE} is not partitioned yet; run "
+                               f"`python -m app.services.partition_maintenance --convert` first")
+                return report
+            with self.engine.begin() as connection:
+                report["created"] = self.ensure_partitions(connection, today)
+            with self.engine.begin() as connection:
+                report["dropped"], report["held_back"] = self.drop_expired(connection, today)
+        return report
+    
+    @contextmanager
+    def _locked(self):
+        """Hold the maintenance advisory lock for the duration of the block"""
+        with self.engine.connect() as lock:
+            lock.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+            lock.commit()
+            try:
+                yield
+            finally:
+                lock.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+                lock.commit()
+    
+    def convert(self, connection, today: date):
+        """Rebuild news_articles as a partitioned table, copying every row; takes an exclusive lock throughout"""
+        columns = ", ".join(column.name for column in NewsArticle.__table__.columns)
+        old = f"{TABLE}_unpartitioned"
+        started = datetime.now()
+        
+        connection.execute(text(f"ALTER TABLE {TABLE} RENAME TO {old}"))
+        sequence = connection.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": old}).scalar()
+        # Columns, defaults (the id sequence) and the generated search vector, but no indexes
+        connection.execute(text(
+            f"CREATE TABLE {TABLE} (LIKE {old} INCLUDING DEFAULTS INCLUDING GENERATED) "
+            f"PARTITION BY RANGE (published_at)"
+        ))
+        connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+        oldest = connection.execute(text(f"SELECT min(published_at) FROM {old}")).scalar()
+        month = _month_start(oldest) if oldest else _month_start(datetime.combine(today, time.min))
+        while month <= self._last_month(today):
+            self._create_partition(connection, month)
+            month = _next_month(month)
+        
+        copied = connection.execute(text(
+            f"INSERT INTO {TABLE} ({columns}) SELECT {columns} FROM {old}"
+        )).rowcount
+        if sequence:
+            # Keep the sequence (and so the next id) when the old table goes
+            connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+        connection.execute(text(f"DROP TABLE {old}"))
+        if sequence:
+            connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id"))
+        
+        # Indexes on the parent are created on every partition, current and future
+        for index in NewsArticle.__table__.indexes:
+            if index.name != UNIQUE_URL_INDEX:
+                index.create(connection)
+        connection.execute(text(f"CREATE INDEX {ID_INDEX} ON {TABLE} (id)"))
+        nulls_not_distinct = " NULLS NOT DISTINCT" if connection.dialect.server_version_info >= (15,) else ""
+        connection.execute(text(
+            f"CREATE UNIQUE INDEX {UNIQUE_URL_INDEX} ON {TABLE} (url, published_at){nulls_not_distinct}"
+        ))
+        create_search_index(connection)
+        connection.execute(text(f"ANALYZE {TABLE}"))
+        logger.info(f"Partitioned {TABLE}: {copied} rows in {(datetime.now() - started).total_seconds():.1f}s")
+    
+    def ensure_partitions(self, connection, today: date) -> List[str]:
+        """
+        Create missing partitions from the current month through months_ahead,
+        and for every month with rows in the default partition; returns their names
+        """
+        existing = set(self.partitions(connection))
+        months = set(connection.execute(text(
+            f"SELECT DISTINCT date_trunc('month', published_at) FROM {DEFAULT_PARTITION} "
+            f"WHERE published_at IS NOT NULL"
+        )).scalars())
+        month = _month_start(datetime.combine(today, time.min))
+        while month <= self._last_month(today):
+            months.add(month)
+            month = _next_month(month)
+        
+        created = []
+        for month in sorted(months - existing):
+            self._create_partition(connection, month)
+            created.append(partition_name(month))
+        if created:
+            logger.info(f"Created partitions {', '.join(created)}")
+        return created
+    
+    def drop_expired(self, connection, today: date):
+        """Detach and drop empty partitions wholly before the retention cutoff"""
+        cutoff = datetime.combine(today - timedelta(days=self.retention_days), time.min)
+        dropped, held_back = [], {}
+        for month in self.partitions(connection):
+            if _next_month(month) > cutoff:
+                break
+            name = partition_name(month)
+            # Scored rows go once the archive job has moved them, unscored ones once they are scored and archived
+            remaining = connection.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+            if remaining:
+                held_back[name] = remaining
+                continue
+            connection.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+            connection.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+        if dropped:
+            logger.info(f"Dropped expired partitions {', '.join(dropped)}")
+        if held_back:
+            logger.warning(f"Expired partitions still hold rows, run the article archive job first: {held_back}")
+        return dropped, held_back
+    
+    def _last_month(self, today: date) -> datetime:
+        month = _month_start(datetime.combine(today, time.min))
+        for _ in range(self.months_ahead):
+            month = _next_month(month)
+        return month
+    
+    def _create_partition(self, connection, month: datetime):
+        name = partition_name(month)
+        bounds = f"FROM ('{month:%Y-%m-%d}') TO ('{_next_month(month):%Y-%m-%d}')"
+        in_default = connection.execute(text(
+            f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE published_at >= :start AND published_at < :end"
+        ), {"start": month, "end": _next_month(month)}).scalar()
+        if not in_default:
+            connection.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} FOR VALUES {bounds}"))
+            return
+        # Rows that landed in the default partition move to the new one, which Postgres won't do itself
+        columns = ", ".join(column.name for column in NewsArticle.__table__.columns)
+        where = f"published_at >= '{month:%Y-%m-%d}' AND published_at < '{_next_month(month):%Y-%m-%d}'"
+        connection.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+        connection.execute(text(f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES {bounds}"))
+        connection.execute(text(f"INSERT INTO {TABLE} ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} WHERE {where}"))
+        connection.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {where}"))
+        connection.execute(text(f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+        logger.info(f"Moved {in_default} rows from {DEFAULT_PARTITION} into {name}")
+
+class PartitionMaintenanceTimer:
+    """Runs PartitionMaintenance on a background thread: once at start, then every interval"""
+    
+    def __init__(self, maintenance: Optional[PartitionMaintenance] = None,
+                 interval: float = PARTITION_MAINTENANCE_INTERVAL):
+        self.maintenance = maintenance or PartitionMaintenance()
+        self.interval = interval
+        self.last_report: Optional[Dict] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        
+        def loop():
+            while not self._stop_event.is_set():
+                try:
+                    self.last_report = self.maintenance.run()
+                except Exception as e:
+                    logger.error(f"Partition maintenance failed: {e}")
+                self._stop_event.wait(self.interval)
+        
+        self._thread = threading.Thread(target=loop, name="partition-maintenance", daemon=True)
+        self._thread.start()
+        logger.info("✓ Partition maintenance started")
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+_timer: Optional[PartitionMaintenanceTimer] = None
+
+def get_partition_maintenance_timer() -> PartitionMaintenanceTimer:
+    global _timer
+    if _timer is None:
+        _timer = PartitionMaintenanceTimer()
+    return _timer
+
+# Command line entry point
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Partition news_articles by month and maintain the partitions")
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--retention-days", type=int, default=ARTICLE_RETENTION_DAYS,
+                        help="Partitions wholly older than this are dropped once empty")
+    parser.add_argument("--convert", action="store_true",
+                        help="Convert news_articles to a partitioned table first (one-time, locks the table)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    maintenance = PartitionMaintenance(months_ahead=args.months_ahead, retention_days=args.retention_days)
+    if args.convert:
+        print(f"Converted: {maintenance.convert_table()}")
+    print(maintenance.run())
@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.database import StockPrice
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PRICE_CACHE_DIR = os.getenv("PRICE_CACHE_DIR", "./price_cache")
+
+# Prices fit float32's ~7 significant digits; volumes can exceed 2**24 so stay float64 (NaN = missing)
+FIELD_DTYPES = {
+    "open": np.float32,
+    "high": np.float32,
+    "low": np.float32,
+    "close": np.float32,
+    "adj_close": np.float32,
+    "volume": np.float64,
+}
+
+# StockPrice column for each field
+FIELD_COLUMNS = {
+    "open": StockPrice.open_price,
+    "high": StockPrice.high_price,
+    "low": StockPrice.low_price,
+    "close": StockPrice.close_price,
+    "adj_close": StockPrice.adj_close,
+    "volume": StockPrice.volume,
+}
+
+# Old versions kept around for processes that still have them mapped
+KEEP_VERSIONS = 2
+
+def _to_day(value) -> np.datetime64:
+    return np.datetime64(value if isinstance(value, (date, datetime)) else str(value)[:10], "D")
+
+class PriceCache:
+    """
+    Read-only, memory-mapped dates × symbols arrays of daily OHLCV
+    
+    Each field is a C-ordered .npy file with one row per trading day, so a
+    date range is a contiguous block of rows and slicing it returns a view
+    into the mapping rather than a copy. Pages come from the OS page cache,
+    so every worker process that opens the cache shares the same memory.
+    
+    On disk:
+        <root>/CURRENT            name of the live version directory
+        <root>/<version>/meta.json
+        <root>/<version>/dates.npy, open.npy, ..., volume.npy
+    """
+    
+    def __init__(self, directory: str, dates: np.ndarray, symbols: List[str], fields: Dict[str, np.ndarray]):
+        self.directory = directory
+        self.dates = dates
+        self.symbols = symbols
+        self.fields = fields
+        self._symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+    
+    @staticmethod
+    def current_directory(root: str = PRICE_CACHE_DIR) -> Optional[str]:
+        """Directory of the live version, or None if no cache has been built"""
+        pointer = os.path.join(root, "CURRENT")
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer, "r") as f:
+            return os.path.join(root, f.read().strip())
+    
+    @classmethod
+    def open(cls, root: str = PRICE_CACHE_DIR) -> Optional["PriceCache"]:
+        """Map the current version, or None if no cache has been built"""
+        directory = cls.current_directory(root)
+        if directory is None:
+            return None
+        
+        with open(os.path.join(directory, "meta.json"), "r") as f:
+            meta = json.load(f)
+        dates = np.load(os.path.join(directory, "dates.npy"), mmap_mode="r")
+        fields = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in meta["fields"]
+        }
+        return cls(directory, dates, meta["symbols"], fields)
+    
+    @staticmethod
+    def write(root: str, dates: np.ndarray, symbols: List[str], fields: Dict[str, np.ndarray]) -> str:
+        """Write a new version and atomically make it current"""
+        version = f"v{time.time_ns()}"
+        directory = os.path.join(root, version)
+        os.makedirs(directory)
+        
+        np.save(os.path.join(directory, "dates.npy"), np.asarray(dates, dtype="datetime64[D]"))
+        for name, values in fields.items():
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(values, dtype=FIELD_DTYPES[name]))
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({
+                "symbols": list(symbols),
+                "fields": list(fields),
+                "start": str(dates[0]) if len(dates) else None,
+                "end": str(dates[-1]) if len(dates) else None,
+                "built_at": datetime.now().isoformat()
+            }, f)
+        
+        tmp_pointer = os.path.join(root, "CURRENT.tmp")
+        with open(tmp_pointer, "w") as f:
+            f.write(version)
+        os.replace(tmp_pointer, os.path.join(root, "CURRENT"))
+        
+        PriceCache._prune(root, keep=KEEP_VERSIONS)
+        return directory
+    
+    @staticmethod
+    def _prune(root: str, keep: int):
+        versions = sorted(name for name in os.listdir(root) if name.startswith("v"))
+        for name in versions[:-keep]:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    
+    # Reads
+    
+    def covers(self, start, end=None) -> bool:
+        if not len(self.dates):
+            return False
+        if _to_day(start) < self.dates[0]:
+            return False
+        return end is None or _to_day(end) <= self.dates[-1]
+    
+    def row_range(self, start=None, end=None) -> slice:
+        """Rows for dates in [start, end]"""
+        first = 0 if start is None else int(np.searchsorted(self.dates, _to_day(start), side="left"))
+        last = len(self.dates) if end is None else int(np.searchsorted(self.dates, _to_day(end), side="right"))
+        return slice(first, last)
+    
+    def slice(self, start=None, end=None, field: str = "close") -> np.ndarray:
+        """All symbols for a date range, as a zero-copy view"""
+        return self.fields[field][self.row_range(start, end)]
+    
+    def series(self, symbol: str, start=None, end=None, field: str = "close") -> Optional[np.ndarray]:
+        """One symbol's values for a date range (a strided view)"""
+        column = self._symbol_index.get(symbol.upper())
+        if column is None:
+            return None
+        return self.fields[field][self.row_range(start, end), column]
+    
+    def columns(self, symbols: Sequence[str]) -> np.ndarray:
+        """Column positions of the given symbols (-1 where absent)"""
+        return np.array([self._symbol_index.get(s.upper(), -1) for s in symbols], dtype=np.int64)
+
+def build_price_cache(root: str = PRICE_CACHE_DIR, session_factory=None,
+                      start: Optional[date] = None, fields: Sequence[str] = tuple(FIELD_DTYPES),
+                      chunk_size: int = 50000) -> str:
+    """Rebuild the cache from the stock_prices table, streaming rows"""
+    session_factory = session_factory or SessionLocal
+    db = session_factory()
+    try:
+        symbol_query = db.query(StockPrice.symbol).distinct()
+        date_query = db.query(StockPrice.date).distinct()
+        if start:
+            start_dt = datetime.combine(start, datetime.min.time())
+            symbol_query = symbol_query.filter(StockPrice.date >= start_dt)
+            date_query = date_query.filter(StockPrice.date >= start_dt)
+        symbols = sorted(row[0] for row in symbol_query)
+        dates = np.unique(np.array([_to_day(row[0]) for row in date_query], dtype="datetime64[D]"))
+        column_of = {symbol: i for i, symbol in enumerate(symbols)}
+        
+        arrays = {
+            name: np.full((len(dates), len(symbols)), np.nan, dtype=FIELD_DTYPES[name])
+            for name in fields
+        }
+        
+        stmt = select(StockPrice.symbol, StockPrice.date, *[FIELD_COLUMNS[name] for name in fields])
+        if start:
+            stmt = stmt.where(StockPrice.date >= start_dt)
+        result = db.execute(stmt.execution_options(yield_per=chunk_size))
+        for partition in result.partitions():
+            chunk_symbols, chunk_dates, *chunk_values = zip(*partition)
+            rows = np.searchsorted(dates, np.array(chunk_dates, dtype="datetime64[D]"))
+            cols = np.fromiter((column_of[s] for s in chunk_symbols), dtype=np.int64, count=len(chunk_symbols))
+            for name, values in zip(fields, chunk_values):
+                # None becomes NaN
+                arrays[name][rows, cols] = np.array(values, dtype=np.float64)
+    finally:
+        db.close()
+    
+    os.makedirs(root, exist_ok=True)
+    directory = PriceCache.write(root, dates, symbols, arrays)
+    logger.info(f"✓ Price cache built: {len(symbols)} symbols × {len(dates)} days at {directory}")
+    return directory
+
+# Command line entry point
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Build the memory-mapped price cache from stock_prices")
+    parser.add_argument("--dir", default=PRICE_CACHE_DIR)
+    parser.add_argument("--start", help="First date to include, YYYY-MM-DD")
+    args = parser.parse_args()
+    
+    path = build_price_cache(args.dir, start=date.fromisoformat(args.start) if args.start else None)
+    print(f"✓ Price cache written to {path}")
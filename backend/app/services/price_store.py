@@ -0,0 +1,312 @@
+import logging
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+import yfinance as yf
+from dotenv import load_dotenv
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.database import SessionLocal
+from app.core.metrics import track_upstream
+from app.models.database import StockInfo, StockPrice
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Bars older than this many days don't count as "current" for local reads
+PRICE_STORE_MAX_STALENESS_DAYS = int(os.getenv("PRICE_STORE_MAX_STALENESS_DAYS", "3"))
+
+# Regular US trading hours; exchange holidays aren't modelled
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+
+# yfinance column → StockPrice column
+BAR_COLUMNS = {
+    "Open": "open_price",
+    "High": "high_price",
+    "Low": "low_price",
+    "Close": "close_price",
+    "Adj Close": "adj_close",
+    "Volume": "volume",
+}
+
+# Calendar days covered by each yfinance period string
+PERIOD_DAYS = {
+    "1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183,
+    "1y": 366, "2y": 731, "5y": 1827, "10y": 3653,
+}
+
+def period_start(period: str, today: Optional[date] = None) -> Optional[date]:
+    """First calendar day of a yfinance period string, or None if it has no fixed start"""
+    today = today or date.today()
+    if period == "ytd":
+        return date(today.year, 1, 1)
+    if period in PERIOD_DAYS:
+        return today - timedelta(days=PERIOD_DAYS[period])
+    if period.endswith("d") and period[:-1].isdigit():
+        return today - timedelta(days=int(period[:-1]))
+    return None
+
+def market_now() -> datetime:
+    return datetime.now(MARKET_TIMEZONE)
+
+def session_open(now: Optional[datetime] = None) -> bool:
+    """True during a weekday's regular trading hours"""
+    now = now or market_now()
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+def last_completed_session(now: Optional[datetime] = None) -> date:
+    """Date of the latest weekday session that has closed"""
+    now = now or market_now()
+    day = now.date() if now.time() >= MARKET_CLOSE else now.date() - timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+class PriceDataProvider:
+    """Source of daily OHLCV bars"""
+    
+    def download(self, symbols: List[str], start: date, end: date) -> Dict[str, pd.DataFrame]:
+        """
+        Daily bars for every symbol between start and end (inclusive)
+        
+        Returns:
+            symbol → DataFrame indexed by date with yfinance column names
+        """
+        raise NotImplementedError
+
+class YFinanceProvider(PriceDataProvider):
+    """Downloads many symbols in a single yfinance request"""
+    
+    def download(self, symbols: List[str], start: date, end: date) -> Dict[str, pd.DataFrame]:
+        with track_upstream("yfinance", "download"):
+            data = yf.download(
+                symbols,
+                start=start.isoformat(),
+                end=(end + timedelta(days=1)).isoformat(),  # yfinance's end is exclusive
+                group_by="ticker",
+                auto_adjust=False,
+                threads=True,
+                progress=False
+            )
+        if data.empty:
+            return {}
+        
+        if not isinstance(data.columns, pd.MultiIndex):
+            return {symbols[0]: data}
+        
+        frames = {}
+        for symbol in symbols:
+            if symbol in data.columns.get_level_values(0):
+                frames[symbol] = data[symbol].dropna(how="all")
+        return frames
+
+class PriceStore:
+    """
+    Daily OHLCV bars kept in the stock_prices table
+    
+    ingest() only asks the provider for dates before the earliest or after
+    the latest stored bar of each symbol, and groups symbols with the same
+    missing range into one batched download. It stops at the last closed
+    session, so a stored bar is never a session still trading.
+    """
+    
+    def __init__(self, provider: Optional[PriceDataProvider] = None, session_factory=None):
+        self.provider = provider or YFinanceProvider()
+        self.session_factory = session_factory or SessionLocal
+    
+    def coverage(self, symbols: List[str]) -> Dict[str, Tuple[date, date]]:
+        """First and last stored bar date per symbol"""
+        db = self.session_factory()
+        try:
+            rows = db.query(
+                StockPrice.symbol,
+                func.min(StockPrice.date),
+                func.max(StockPrice.date)
+            ).filter(
+                StockPrice.symbol.in_([symbol.upper() for symbol in symbols])
+            ).group_by(StockPrice.symbol).all()
+            return {symbol: (first.date(), last.date()) for symbol, first, last in rows}
+        finally:
+            db.close()
+    
+    def missing_ranges(self, symbols: List[str], start: date, end: date) -> Dict[Tuple[date, date], List[str]]:
+        """Group symbols by the date range that still needs downloading"""
+        coverage = self.coverage(symbols)
+        ranges: Dict[Tuple[date, date], List[str]] = {}
+        for symbol in (s.upper() for s in symbols):
+            if symbol not in coverage:
+                ranges.setdefault((start, end), []).append(symbol)
+                continue
+            
+            first, last = coverage[symbol]
+            # Small head gaps are just weekends/holidays (or pre-listing), not missing data
+            if (first - start).days > PRICE_STORE_MAX_STALENESS_DAYS:
+                ranges.setdefault((start, first - timedelta(days=1)), []).append(symbol)
+            if last < end:
+                ranges.setdefault((last + timedelta(days=1), end), []).append(symbol)
+        return ranges
+    
+    def ingest(self, symbols: List[str], start: date, end: Optional[date] = None, chunk_size: int = 100) -> int:
+        """Download and store whatever bars are missing, returning the number written"""
+        end = min(end or date.today(), last_completed_session())
+        written = 0
+        for (range_start, range_end), range_symbols in self.missing_ranges(symbols, start, end).items():
+            for i in range(0, len(range_symbols), chunk_size):
+                chunk = range_symbols[i:i + chunk_size]
+                try:
+                    frames = self.provider.download(chunk, range_start, range_end)
+                except Exception as e:
+                    logger.error(f"Error downloading prices for {len(chunk)} symbols: {e}")
+                    continue
+                for symbol, frame in frames.items():
+                    written += self.upsert_bars(symbol, frame)
+        logger.info(f"✓ Stored {written} price bars for {len(symbols)} symbols")
+        return written
+    
+    def ingest_tracked(self, start: date, end: Optional[date] = None) -> int:
+        """Ingest every active StockInfo symbol"""
+        db = self.session_factory()
+        try:
+            symbols = [row.symbol for row in db.query(StockInfo.symbol).filter(StockInfo.is_active == True)]
+        finally:
+            db.close()
+        return self.ingest(symbols, start, end)
+    
+    def upsert_bars(self, symbol: str, frame: pd.DataFrame) -> int:
+        """
+        Insert new bars and overwrite existing ones for the same dates
+        
+        One INSERT ... ON CONFLICT (symbol, date) DO UPDATE, so overlapping
+        ingests (the CLI and the scheduler, or two workers) can't both insert
+        a bar for the same day.
+        """
+        if frame is None or frame.empty:
+            return 0
+        
+        symbol = symbol.upper()
+        bars = {}
+        for index, row in frame.iterrows():
+            if pd.isna(row.get("Close")):
+                continue
+            day = pd.Timestamp(index).to_pydatetime().replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+            bar = {"symbol": symbol, "date": day}
+            for source_column, column in BAR_COLUMNS.items():
+                value = row.get(source_column)
+                if value is None or pd.isna(value):
+                    bar[column] = None
+                elif column == "volume":
+                    bar[column] = int(value)
+                else:
+                    bar[column] = float(value)
+            bars[day] = bar
+        if not bars:
+            return 0
+        
+        db = self.session_factory()
+        try:
+            dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(db.get_bind().dialect.name)
+            if dialect is None:
+                raise NotImplementedError(f"Price upserts need SQLite or Postgres, not {db.get_bind().dialect.name}")
+            statement = dialect.insert(StockPrice)
+            statement = statement.on_conflict_do_update(
+                index_elements=["symbol", "date"],
+                set_={column: statement.excluded[column] for column in BAR_COLUMNS.values()}
+            )
+            db.execute(statement, list(bars.values()))
+            db.commit()
+            return len(bars)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def get_history(self, symbol: str, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+        """Stored bars as a yfinance-shaped DataFrame indexed by Date"""
+        db = self.session_factory()
+        try:
+            query = db.query(StockPrice).filter(StockPrice.symbol == symbol.upper())
+            if start:
+                query = query.filter(StockPrice.date >= datetime.combine(start, datetime.min.time()))
+            if end:
+                query = query.filter(StockPrice.date <= datetime.combine(end, datetime.min.time()))
+            bars = query.order_by(StockPrice.date).all()
+        finally:
+            db.close()
+        
+        frame = pd.DataFrame(
+            [
+                {source_column: getattr(bar, column) for source_column, column in BAR_COLUMNS.items()}
+                for bar in bars
+            ],
+            index=pd.DatetimeIndex([bar.date for bar in bars], name="Date"),
+            columns=list(BAR_COLUMNS)
+        )
+        return frame
+    
+    def get_fresh_history(self, symbol: str, start: Optional[date], today: Optional[date] = None,
+                          max_staleness_days: int = PRICE_STORE_MAX_STALENESS_DAYS) -> Optional[pd.DataFrame]:
+        """
+        Stored bars from start onwards, or None if the store can't answer
+        
+        The store answers when its bars reach back to start (allowing for
+        weekends and holidays) and its latest bar is at most
+        max_staleness_days old.
+        """
+        today = today or date.today()
+        coverage = self.coverage([symbol]).get(symbol.upper())
+        if not coverage:
+            return None
+        
+        first, last = coverage
+        if (today - last).days > max_staleness_days:
+            return None
+        if start and (first - start).days > PRICE_STORE_MAX_STALENESS_DAYS:
+            return None
+        return self.get_history(symbol, start)
+    
+    def get_quote_history(self, symbol: str, start: Optional[date], now: Optional[datetime] = None) -> Optional[pd.DataFrame]:
+        """
+        Stored bars for a quote-style read (current price and change), or None if the store can't answer
+        
+        While a session is trading only upstream has the live price, so the
+        store never answers then. Otherwise it needs the last closed session's bar.
+        """
+        now = now or market_now()
+        if session_open(now):
+            return None
+        return self.get_fresh_history(
+            symbol, start, today=now.date(), max_staleness_days=(now.date() - last_completed_session(now)).days
+        )
+
+# Command line entry point
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Download daily price bars into the stock_prices table")
+    parser.add_argument("--symbols", help="Comma separated symbols (defaults to every active tracked stock)")
+    parser.add_argument("--start", help="First date, YYYY-MM-DD (defaults to two years ago)")
+    parser.add_argument("--end", help="Last date, YYYY-MM-DD (defaults to today)")
+    parser.add_argument("--rebuild-cache", action="store_true", help="Rebuild the memory-mapped price cache afterwards")
+    args = parser.parse_args()
+    
+    start = date.fromisoformat(args.start) if args.start else date.today() - timedelta(days=731)
+    end = date.fromisoformat(args.end) if args.end else None
+    
+    store = PriceStore()
+    if args.symbols:
+        count = store.ingest(args.symbols.split(","), start, end)
+    else:
+        count = store.ingest_tracked(start, end)
+    print(f"✓ Wrote {count} price bars")
+
+    if args.rebuild_cache:
+        from app.services.price_cache import build_price_cache
+        print(f"✓ Price cache written to {build_price_cache()}")
@@ -0,0 +1,623 @@
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import func
+
+from app.core.database import SessionLocal
+from app.models.database import NewsArticle, StockInfo
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Dashboard views and the API budget are shared through Redis so every web worker reaches the scheduler
+REDIS_URL = os.getenv("REDIS_URL")
+VIEWS_KEY = os.getenv("SCHEDULER_VIEWS_KEY", "scheduler:views")
+BUDGET_KEY = os.getenv("SCHEDULER_BUDGET_KEY", "scheduler:budget")
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() == "true"
+# Refresh intervals in seconds: the hottest symbols run every MIN, idle ones every MAX
+SCHEDULER_MIN_INTERVAL = float(os.getenv("SCHEDULER_MIN_INTERVAL", "60"))
+SCHEDULER_MAX_INTERVAL = float(os.getenv("SCHEDULER_MAX_INTERVAL", "14400"))
+SCHEDULER_TICK = float(os.getenv("SCHEDULER_TICK", "15"))
+# NewsAPI requests allowed per day, and requests spent by one refresh (NewsService makes three queries)
+NEWS_API_DAILY_QUOTA = int(os.getenv("NEWS_API_DAILY_QUOTA", "1000"))
+REFRESH_API_COST = int(os.getenv("REFRESH_API_COST", "3"))
+# Dashboard views count this much relative to one article per hour
+VIEW_WEIGHT = float(os.getenv("SCHEDULER_VIEW_WEIGHT", "0.5"))
+# How often tracked symbols and article rates are re-read
+PLAN_REFRESH = float(os.getenv("SCHEDULER_PLAN_REFRESH", "300"))
+# Seconds between runs of each maintenance job (job kind → interval); they cost no API quota
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "86400"))
+MAINTENANCE_JOBS = {
+    "reconcile_stats": STATS_RECONCILE_INTERVAL,
+}
+
+DAY = 86400.0
+VIEW_HALF_LIFE = 3600.0
+# Redis view scores are rebased onto a new sorted set every this many half-lives
+VIEW_EPOCH_HALF_LIVES = 64
+
+class ViewTracker:
+    """Exponentially decayed dashboard views per symbol (one-hour half-life), in this process only"""
+    
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._views: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, symbol: str):
+        now = self.clock()
+        with self._lock:
+            value, at = self._views.get(symbol.upper(), (0.0, now))
+            self._views[symbol.upper()] = (self._decay(value, now - at) + 1.0, now)
+    
+    def per_hour(self, symbol: str) -> float:
+        with self._lock:
+            value, at = self._views.get(symbol.upper(), (0.0, self.clock()))
+        # A decaying sum with half-life h settles at rate × h / ln 2
+        return self._decay(value, self.clock() - at) * math.log(2)
+    
+    def per_hour_many(self, symbols: List[str]) -> Dict[str, float]:
+        return {symbol: self.per_hour(symbol) for symbol in symbols}
+    
+    @staticmethod
+    def _decay(value: float, elapsed: float) -> float:
+        return value * 0.5 ** (max(elapsed, 0.0) / VIEW_HALF_LIFE)
+
+class RedisViewTracker(ViewTracker):
+    """
+    Decayed view counts in a Redis sorted set, shared by every worker
+    
+    Uses forward decay: a view at time t adds 2^((t - base) / half-life) with
+    ZINCRBY, and reading divides by 2^((now - base) / half-life), so nothing
+    is rewritten as counts decay. The base moves to a new sorted set every
+    VIEW_EPOCH_HALF_LIVES half-lives to keep the weights finite; reads add
+    the previous set, and older ones have decayed to nothing and expire.
+    """
+    
+    def __init__(self, redis_client, key: str = VIEWS_KEY, clock: Callable[[], float] = time.time):
+        super().__init__(clock)
+        self.redis = redis_client
+        self.key = key
+        self.epoch_length = VIEW_HALF_LIFE * VIEW_EPOCH_HALF_LIVES
+        self.redis_errors = 0
+    
+    def record(self, symbol: str):
+        # A lost view only costs a little refresh priority, so Redis failures never reach the request
+        now = self.clock()
+        epoch = int(now // self.epoch_length)
+        key = f"{self.key}:{epoch}"
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.zincrby(key, self._weight(now, epoch), symbol.upper())
+            pipeline.expire(key, int(self.epoch_length * 2))
+            pipeline.execute()
+        except Exception as e:
+            self._redis_failed(e)
+    
+    def per_hour(self, symbol: str) -> float:
+        return self.per_hour_many([symbol])[symbol]
+    
+    def per_hour_many(self, symbols: List[str]) -> Dict[str, float]:
+        if not symbols:
+            return {}
+        now = self.clock()
+        epoch = int(now // self.epoch_length)
+        members = [symbol.upper() for symbol in symbols]
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for previous in (epoch - 1, epoch):
+                pipeline.zmscore(f"{self.key}:{previous}", members)
+            older, current = pipeline.execute()
+        except Exception as e:
+            # Plan on article rates alone until Redis is back
+            self._redis_failed(e)
+            return {symbol: 0.0 for symbol in symbols}
+        rates = {}
+        for symbol, old_score, score in zip(symbols, older, current):
+            value = (old_score or 0.0) / self._weight(now, epoch - 1) + (score or 0.0) / self._weight(now, epoch)
+            rates[symbol] = value * math.log(2)
+        return rates
+    
+    def _weight(self, now: float, epoch: int) -> float:
+        return 2.0 ** ((now - epoch * self.epoch_length) / VIEW_HALF_LIFE)
+    
+    def _redis_failed(self, error: Exception):
+        with self._lock:
+            self.redis_errors += 1
+        logger.warning(f"View tracker Redis error: {error}")
+
+def _make_view_tracker() -> ViewTracker:
+    if REDIS_URL:
+        try:
+            import redis
+            return RedisViewTracker(redis.Redis.from_url(REDIS_URL, socket_timeout=0.25))
+        except Exception as e:
+            logger.error(f"Counting dashboard views per process, without Redis: {e}")
+    return ViewTracker()
+
+_views = _make_view_tracker()
+
+class TokenBucket:
+    """
+    The API quota as tokens refilled at quota/day, held in this process
+    
+    Also keeps what manual refreshes took over the last day, which the
+    scheduler takes off the quota its plan has to fit.
+    """
+    
+    def __init__(self, daily_quota: float, capacity: float):
+        self.rate = daily_quota / DAY
+        self.capacity = capacity
+        self.tokens = capacity
+        self._refilled_at: Optional[float] = None
+        self._manual = deque()
+        self._lock = threading.Lock()
+    
+    def take(self, cost: float, now: float, manual: bool = False) -> bool:
+        with self._lock:
+            self._refill(now)
+            if self.tokens < cost:
+                return False
+            self.tokens -= cost
+            if manual:
+                self._manual.append((now, cost))
+            return True
+    
+    def give(self, cost: float, now: float, manual: bool = False):
+        with self._lock:
+            self._refill(now)
+            self.tokens = min(self.capacity, self.tokens + cost)
+            if manual:
+                self._manual.append((now, -cost))
+    
+    def available(self, now: float) -> float:
+        with self._lock:
+            self._refill(now)
+            return self.tokens
+    
+    def manual_spent(self, now: float) -> float:
+        with self._lock:
+            self._refill(now)
+            return sum(cost for _, cost in self._manual)
+    
+    def _refill(self, now: float):
+        if self._refilled_at is not None:
+            self.tokens = min(self.capacity, self.tokens + max(now - self._refilled_at, 0.0) * self.rate)
+        self._refilled_at = now
+        while self._manual and self._manual[0][0] <= now - DAY:
+            self._manual.popleft()
+
+class RedisTokenBucket(TokenBucket):
+    """
+    The bucket in a Redis hash, so the scheduler and every worker's manual refreshes draw on one quota
+    
+    Each take or give refills and updates the hash in a WATCH/MULTI
+    transaction, retried when another process changed it in between.
+    Manual spending goes to hourly counters that expire after a day and are
+    read back as the last 24 of them. While Redis is unreachable the bucket
+    falls back to this process's own tokens.
+    """
+    
+    def __init__(self, redis_client, daily_quota: float, capacity: float, key: str = BUDGET_KEY):
+        super().__init__(daily_quota, capacity)
+        self.redis = redis_client
+        self.key = key
+        self.redis_errors = 0
+    
+    def take(self, cost: float, now: float, manual: bool = False) -> bool:
+        try:
+            return self._update(-cost, now, manual)
+        except Exception as e:
+            self._redis_failed(e)
+            return super().take(cost, now, manual)
+    
+    def give(self, cost: float, now: float, manual: bool = False):
+        try:
+            self._update(cost, now, manual)
+        except Exception as e:
+            self._redis_failed(e)
+            super().give(cost, now, manual)
+    
+    def available(self, now: float) -> float:
+        try:
+            return self._refilled(*self.redis.hmget(self.key, "tokens", "refilled_at"), now)
+        except Exception as e:
+            self._redis_failed(e)
+            return super().available(now)
+    
+    def manual_spent(self, now: float) -> float:
+        hour = int(now // 3600)
+        try:
+            values = self.redis.mget([self._manual_key(h) for h in range(hour - 23, hour + 1)])
+            return sum(float(value or 0) for value in values)
+        except Exception as e:
+            self._redis_failed(e)
+            return super().manual_spent(now)
+    
+    def _update(self, delta: float, now: float, manual: bool) -> bool:
+        def update(pipe):
+            tokens, refilled_at = pipe.hmget(self.key, "tokens", "refilled_at")
+            available = self._refilled(tokens, refilled_at, now)
+            if available + delta < 0:
+                return False
+            pipe.multi()
+            # Never move refilled_at back, or a worker with a slower clock would refill twice
+            pipe.hset(self.key, mapping={
+                "tokens": min(self.capacity, available + delta),
+                "refilled_at": max(now, float(refilled_at or now))
+            })
+            pipe.expire(self.key, int(2 * DAY))
+            if manual:
+                manual_key = self._manual_key(int(now // 3600))
+                pipe.incrbyfloat(manual_key, -delta)
+                pipe.expire(manual_key, int(DAY + 3600))
+            return True
+        return self.redis.transaction(update, self.key, value_from_callable=True)
+    
+    def _refilled(self, tokens, refilled_at, now: float) -> float:
+        if tokens is None:
+            return self.capacity
+        return min(self.capacity, float(tokens) + max(now - float(refilled_at), 0.0) * self.rate)
+    
+    def _manual_key(self, hour: int) -> str:
+        return f"{self.key}:manual:{hour}"
+    
+    def _redis_failed(self, error: Exception):
+        with self._lock:
+            self.redis_errors += 1
+        logger.warning(f"API budget Redis error, using this process's tokens: {error}")
+
+def _make_budget(daily_quota: float, capacity: float) -> TokenBucket:
+    if REDIS_URL:
+        try:
+            import redis
+            return RedisTokenBucket(redis.Redis.from_url(REDIS_URL, socket_timeout=0.25), daily_quota, capacity)
+        except Exception as e:
+            logger.error(f"Keeping the API budget per process, without Redis: {e}")
+    return TokenBucket(daily_quota, capacity)
+
+def record_view(symbol: str):
+    """Count a dashboard view of a symbol towards its refresh priority"""
+    _views.record(symbol)
+
+async def record_view_async(symbol: str):
+    """record_view for async handlers; the Redis round trip runs off the event loop"""
+    if isinstance(_views, RedisViewTracker):
+        await asyncio.to_thread(_views.record, symbol)
+    else:
+        _views.record(symbol)
+
+def recent_article_rates(session_factory=None, hours: int = 24) -> Dict[str, float]:
+    """Articles per hour published for each symbol over the last `hours`"""
+    db = (session_factory or SessionLocal)()
+    try:
+        since = datetime.now() - timedelta(hours=hours)
+        rows = db.query(NewsArticle.symbol, func.count(NewsArticle.id)).filter(
+            NewsArticle.published_at >= since
+        ).group_by(NewsArticle.symbol).all()
+        return {symbol: count / hours for symbol, count in rows}
+    finally:
+        db.close()
+
+def tracked_symbols(session_factory=None) -> List[str]:
+    db = (session_factory or SessionLocal)()
+    try:
+        return [row.symbol for row in db.query(StockInfo.symbol).filter(StockInfo.is_active == True)]
+    finally:
+        db.close()
+
+def dispatch_refresh(symbol: str) -> bool:
+    """Queue a refresh; False when an identical refresh was already pending"""
+    from app.services.job_queue import get_job_queue
+    _, created = get_job_queue().enqueue("refresh", {"symbol": symbol, "days_back": 1})
+    return created
+
+def dispatch_job(kind: str):
+    from app.services.job_queue import get_job_queue
+    get_job_queue().enqueue(kind, {})
+
+class RefreshScheduler:
+    """
+    Refreshes tracked symbols on intervals set by their activity
+    
+    A symbol's heat is its recent article rate plus VIEW_WEIGHT × its
+    dashboard views per hour, and its interval is MAX_INTERVAL / (1 + heat)
+    clamped to [MIN_INTERVAL, MAX_INTERVAL]. When the planned refreshes
+    would spend more than the daily API quota, every interval is stretched
+    by the same factor. A token bucket refilled at quota/day enforces the
+    budget, and when it runs short the hottest due symbols go first.
+    Tokens are only spent on refreshes that queued a new job; dispatch
+    returns False when the queue deduplicated it. Manual refreshes take
+    their tokens through try_spend, and what they used over the last day
+    comes off the quota the plan is stretched to fit. With REDIS_URL set
+    the bucket lives in Redis, so manual refreshes from every web worker
+    and the scheduler share one quota.
+    
+    Maintenance jobs (e.g. the stats reconcile) are dispatched on their
+    own fixed intervals, starting with the first tick.
+    
+    Every time source goes through `clock`, so tests can drive the
+    scheduler with a simulated clock by calling tick().
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.time,
+                 symbols_source: Callable[[], List[str]] = tracked_symbols,
+                 activity_source: Callable[[], Dict[str, float]] = recent_article_rates,
+                 dispatch: Callable[[str], Optional[bool]] = dispatch_refresh,
+                 views: Optional[ViewTracker] = None,
+                 daily_quota: int = NEWS_API_DAILY_QUOTA, refresh_cost: int = REFRESH_API_COST,
+                 min_interval: float = SCHEDULER_MIN_INTERVAL, max_interval: float = SCHEDULER_MAX_INTERVAL,
+                 plan_refresh: float = PLAN_REFRESH,
+                 maintenance: Optional[Dict[str, float]] = None,
+                 dispatch_maintenance: Callable[[str], None] = dispatch_job,
+                 budget: Optional[TokenBucket] = None):
+        self.clock = clock
+        self.symbols_source = symbols_source
+        self.activity_source = activity_source
+        self.dispatch = dispatch
+        self.views = views or _views
+        self.daily_quota = daily_quota
+        self.refresh_cost = refresh_cost
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.plan_refresh = plan_refresh
+        self.dispatch_maintenance = dispatch_maintenance
+        self.maintenance = {
+            kind: {"kind": kind, "interval": interval, "last_run": None, "next_run": clock()}
+            for kind, interval in (MAINTENANCE_JOBS if maintenance is None else maintenance).items()
+            if interval > 0
+        }
+        
+        # Up to an hour of quota can be spent in a burst
+        self.budget = budget or _make_budget(daily_quota, max(daily_quota / 24.0, refresh_cost))
+        # Scheduled spending in this process; manual spending is kept by the budget
+        self._spent = deque()
+        self.deferred = 0
+        self.deduplicated = 0
+        self.manual_refreshes = 0
+        self.rejected_refreshes = 0
+        
+        self.plan: Dict[str, Dict] = {}
+        self.stretch = 1.0
+        self._planned_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    # Planning
+    
+    def interval_for(self, heat: float) -> float:
+        return min(self.max_interval, max(self.min_interval, self.max_interval / (1.0 + heat)))
+    
+    def replan(self):
+        """Recompute heat and intervals for every tracked symbol"""
+        now = self.clock()
+        symbols = self.symbols_source()
+        rates = self.activity_source()
+        
+        views = self.views.per_hour_many(symbols)
+        
+        plan = {}
+        for symbol in symbols:
+            articles_per_hour = rates.get(symbol, 0.0)
+            views_per_hour = views.get(symbol, 0.0)
+            heat = articles_per_hour + VIEW_WEIGHT * views_per_hour
+            previous = self.plan.get(symbol, {})
+            plan[symbol] = {
+                "symbol": symbol,
+                "heat": round(heat, 3),
+                "articles_per_hour": round(articles_per_hour, 3),
+                "views_per_hour": round(views_per_hour, 3),
+                "base_interval": self.interval_for(heat),
+                "last_run": previous.get("last_run"),
+                "next_run": previous.get("next_run", now)
+            }
+        
+        # Stretch every interval evenly if the plan would overspend what manual refreshes left of the quota
+        planned_calls = sum(DAY / entry["base_interval"] * self.refresh_cost for entry in plan.values())
+        quota = max(self.daily_quota - self.budget.manual_spent(now), self.refresh_cost)
+        stretch = max(1.0, planned_calls / quota) if self.daily_quota else 1.0
+        for entry in plan.values():
+            entry["interval"] = entry["base_interval"] * stretch
+            if entry["last_run"] is not None:
+                # A symbol that heated up shouldn't wait out its old, longer interval
+                entry["next_run"] = min(entry["next_run"], entry["last_run"] + entry["interval"])
+        
+        with self._lock:
+            self.plan = plan
+            self.stretch = stretch
+            self._planned_at = now
+    
+    # Budget
+    
+    def _prune(self, now: float):
+        while self._spent and self._spent[0][0] <= now - DAY:
+            self._spent.popleft()
+    
+    def try_spend(self) -> bool:
+        """Take the tokens for one refresh made outside the schedule; False when the budget is short"""
+        taken = self.budget.take(self.refresh_cost, self.clock(), manual=True)
+        with self._lock:
+            if taken:
+                self.manual_refreshes += 1
+            else:
+                self.rejected_refreshes += 1
+        return taken
+    
+    def refund(self):
+        """Return try_spend's tokens for a refresh that made no API calls (the queue deduplicated it)"""
+        self.budget.give(self.refresh_cost, self.clock(), manual=True)
+        with self._lock:
+            self.manual_refreshes -= 1
+    
+    def seconds_until_refresh(self) -> float:
+        """How long until the bucket holds one refresh's tokens"""
+        missing = self.refresh_cost - self.budget.available(self.clock())
+        return max(0.0, missing * DAY / self.daily_quota) if self.daily_quota else 0.0
+    
+    # Running
+    
+    def tick(self) -> List[str]:
+        """Dispatch every due symbol the budget allows; returns the symbols dispatched"""
+        now = self.clock()
+        if self._planned_at is None or now - self._planned_at >= self.plan_refresh:
+            self.replan()
+        
+        dispatched = []
+        with self._lock:
+            self._prune(now)
+            due = sorted(
+                (entry for entry in self.plan.values() if entry["next_run"] <= now),
+                key=lambda entry: (-entry["heat"], entry["next_run"])
+            )
+            maintenance = [job for job in self.maintenance.values() if job["next_run"] <= now]
+            for job in maintenance:
+                job["last_run"] = now
+                job["next_run"] = now + job["interval"]
+        
+        for position, entry in enumerate(due):
+            if not self.budget.take(self.refresh_cost, now):
+                with self._lock:
+                    self.deferred += len(due) - position
+                break
+            with self._lock:
+                entry["last_run"] = now
+                entry["next_run"] = now + entry["interval"]
+            try:
+                created = self.dispatch(entry["symbol"])
+            except Exception as e:
+                logger.error(f"Error dispatching scheduled refresh for {entry['symbol']}: {e}")
+                self.budget.give(self.refresh_cost, now)
+                continue
+            if created is False:
+                # Already queued, so this refresh makes no API calls
+                self.budget.give(self.refresh_cost, now)
+                with self._lock:
+                    self.deduplicated += 1
+                continue
+            with self._lock:
+                self._spent.append((now, self.refresh_cost))
+            dispatched.append(entry["symbol"])
+        
+        for job in maintenance:
+            try:
+                self.dispatch_maintenance(job["kind"])
+            except Exception as e:
+                logger.error(f"Error dispatching {job['kind']} job: {e}")
+        return dispatched
+    
+    def start(self, tick_interval: float = SCHEDULER_TICK):
+        """Run tick() on a background thread"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        
+        def loop():
+            while not self._stop_event.is_set():
+                try:
+                    self.tick()
+                except Exception as e:
+                    logger.error(f"Scheduler tick failed: {e}")
+                self._stop_event.wait(tick_interval)
+        
+        self._thread = threading.Thread(target=loop, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("✓ Refresh scheduler started")
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def snapshot(self) -> Dict:
+        """Current schedule and budget consumption"""
+        now = self.clock()
+        tokens = self.budget.available(now)
+        manual_spent = self.budget.manual_spent(now)
+        with self._lock:
+            self._prune(now)
+            entries = sorted(self.plan.values(), key=lambda entry: entry["next_run"])
+            planned_calls = sum(DAY / entry["interval"] * self.refresh_cost for entry in entries)
+            return {
+                "running": self._thread is not None,
+                "budget": {
+                    "daily_quota": self.daily_quota,
+                    "refresh_cost": self.refresh_cost,
+                    "used_last_24h": sum(cost for _, cost in self._spent) + manual_spent,
+                    "manual_used_last_24h": manual_spent,
+                    "tokens_available": round(tokens, 2),
+                    "planned_calls_per_day": round(planned_calls, 1),
+                    "interval_stretch": round(self.stretch, 3),
+                    "deferred_refreshes": self.deferred,
+                    "deduplicated_refreshes": self.deduplicated,
+                    "manual_refreshes": self.manual_refreshes,
+                    "rejected_manual_refreshes": self.rejected_refreshes
+                },
+                "symbols": [
+                    {
+                        "symbol": entry["symbol"],
+                        "heat": entry["heat"],
+                        "articles_per_hour": entry["articles_per_hour"],
+                        "views_per_hour": entry["views_per_hour"],
+                        "interval_seconds": round(entry["interval"], 1),
+                        "last_run_at": _timestamp(entry["last_run"]),
+                        "next_run_at": _timestamp(entry["next_run"]),
+                        "due_in_seconds": round(max(0.0, entry["next_run"] - now), 1)
+                    }
+                    for entry in entries
+                ],
+                "maintenance": [
+                    {
+                        "kind": job["kind"],
+                        "interval_seconds": job["interval"],
+                        "last_run_at": _timestamp(job["last_run"]),
+                        "next_run_at": _timestamp(job["next_run"])
+                    }
+                    for job in self.maintenance.values()
+                ]
+            }
+
+def _timestamp(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value).isoformat() if value is not None else None
+
+_scheduler: Optional[RefreshScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> RefreshScheduler:
+    global _scheduler
+    if _scheduler is None:
+        # Concurrent first requests must not build two budgets
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RefreshScheduler()
+    return _scheduler
+
+def set_scheduler(scheduler: Optional[RefreshScheduler]):
+    """Replace the process-wide scheduler (None builds a default one on next use)"""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = scheduler
+
+# Command line entry point
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    scheduler = get_scheduler()
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(60)
+            budget = scheduler.snapshot()["budget"]
+            logger.info(f"Scheduler budget: {budget}")
+    except KeyboardInterrupt:
+        scheduler.stop()
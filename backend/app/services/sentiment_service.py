@@ -1,30 +1,50 @@
-from app.ml.sentiment_analyzer import SentimentAnalyzer
+from app.ml.inference_client import INFERENCE_SERVER, InferenceClient, RemoteSentimentAnalyzer
 from app.models.database import NewsArticle
 from app.core.database import SessionLocal
+from app.services.database_service import DatabaseService
 import logging
+import os
+import threading
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
 class SentimentService:
-    def __init__(self, model_type: str = "vader"):
+    def __init__(self, model_type: str = "vader", session_factory=None, inference_server: Optional[str] = None):
         """
         Initialize sentiment service
         
         Args:
             model_type: "finbert", "vader", or "textblob"
+            session_factory: callable returning a DB session (defaults to SessionLocal)
+            inference_server: shared inference server address (defaults to INFERENCE_SERVER; empty loads the model here)
         """
-        self.analyzer = SentimentAnalyzer(model_type=model_type)
-        logger.info(f"✅ Sentiment service initialized with {model_type}")
+        address = INFERENCE_SERVER if inference_server is None else inference_server
+        if address:
+            self.analyzer = RemoteSentimentAnalyzer(model_type, InferenceClient(address))
+        else:
+            # Imported here so processes that score remotely never load torch
+            from app.ml.sentiment_analyzer import SentimentAnalyzer
+            self.analyzer = SentimentAnalyzer(model_type=model_type)
+        self.session_factory = session_factory or SessionLocal
+        logger.info(f"✅ Sentiment service initialized with {model_type}" + (f" via {address}" if address else ""))
     
     def process_unanalyzed_articles(self, batch_size: int = 50):
         """Process articles that don't have sentiment scores yet"""
-        db = SessionLocal()
+        db = self.session_factory()
         
         try:
             # Get unanalyzed articles
-            articles = db.query(NewsArticle).filter(
+            articles = db.query(
+                NewsArticle.id,
+                NewsArticle.symbol,
+                NewsArticle.title,
+                NewsArticle.content,
+                NewsArticle.published_at
+            ).filter(
                 NewsArticle.sentiment_score.is_(None)
             ).limit(batch_size).all()
+            db.close()
             
             if not articles:
                 logger.info("No unanalyzed articles found")
@@ -32,46 +52,82 @@ class SentimentService:
             
             logger.info(f"Processing {len(articles)} articles for sentiment analysis...")
             
-            processed_count = 0
-            for article in articles:
-                try:
-                    # Combine title and content for analysis
-                    text = f"{article.title}"
-                    if article.content:
-                        text += f" {article.content}"
-                    
-                    # Analyze sentiment
-                    result = self.analyzer.analyze_text(text)
-                    
-                    # Update article
-                    article.sentiment_score = result['score']
-                    article.sentiment_label = result['label']
-                    
-                    processed_count += 1
-                    
-                    if processed_count % 10 == 0:
-                        logger.info(f"Processed {processed_count}/{len(articles)} articles")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing article {article.id}: {e}")
-                    continue
+            # Score the whole batch in one inference call
+            texts = [self.article_text(article.title, article.content) for article in articles]
+            results = self.analyzer.analyze_batch(texts)
             
-            # Commit all changes
-            db.commit()
+            # Written under row locks, so an article another scorer got to first isn't counted twice
+            db_service = DatabaseService(self.session_factory)
+            processed_count = db_service.update_article_sentiments([
+                {"id": article.id, "sentiment_score": result['score'], "sentiment_label": result['label']}
+                for article, result in zip(articles, results)
+            ])
             logger.info(f"✅ Successfully processed {processed_count} articles")
+            
+            try:
+                db_service.update_sentiment_summaries((article.symbol, article.published_at) for article in articles)
+            except Exception as e:
+                logger.error(f"Error updating sentiment summaries: {e}")
             return processed_count
             
         except Exception as e:
-            db.rollback()
             logger.error(f"Error in batch processing: {e}")
             return 0
         finally:
             db.close()
     
+    def score_stored_articles(self, rows: List[Dict]) -> int:
+        """
+        Score freshly stored articles and refresh their daily rollups
+        
+        Args:
+            rows: dicts with 'id', 'symbol', 'title', 'content' and 'published_at'
+                  (e.g. the result of DatabaseService.store_articles_bulk)
+        """
+        if not rows:
+            return 0
+        
+        results = self.analyze_batch([self.article_text(row['title'], row.get('content')) for row in rows])
+        db_service = DatabaseService(self.session_factory)
+        db_service.update_article_sentiments([
+            {"id": row['id'], "sentiment_score": result['score'], "sentiment_label": result['label']}
+            for row, result in zip(rows, results)
+        ])
+        db_service.update_sentiment_summaries((row['symbol'], row['published_at']) for row in rows)
+        return len(rows)
+    
     def analyze_single_text(self, text: str):
         """Analyze sentiment of a single text"""
         return self.analyzer.analyze_text(text)
 
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """Analyze sentiment of many texts in one batched inference call"""
+        return self.analyzer.analyze_batch(texts)
+    
+    @staticmethod
+    def article_text(title: Optional[str], content: Optional[str]) -> str:
+        """Combine title and content for analysis"""
+        text = f"{title or ''}"
+        if content:
+            text += f" {content}"
+        return text
+
+# One service per model type, shared by API requests so the model loads once per process
+_shared_services: Dict[str, SentimentService] = {}
+_shared_lock = threading.Lock()
+
+def get_shared_sentiment_service(model_type: Optional[str] = None) -> SentimentService:
+    """Shared service for model_type (defaults to the SENTIMENT_MODEL env var, else VADER)"""
+    model_type = model_type or os.getenv("SENTIMENT_MODEL", "vader")
+    service = _shared_services.get(model_type)
+    if service is None:
+        with _shared_lock:
+            service = _shared_services.get(model_type)
+            if service is None:
+                service = SentimentService(model_type=model_type)
+                _shared_services[model_type] = service
+    return service
+
 # Test function
 if __name__ == "__main__":
     sentiment_service = SentimentService(model_type="vader")
@@ -1,18 +1,100 @@
 import yfinance as yf
 import pandas as pd
-from typing import Dict, List, Optional
+import os
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from app.core.cache import TTLCache
+from app.core.metrics import track_upstream
+from app.services.price_store import PriceStore, period_start
+from app.services.symbol_universe import get_symbol_universe
+
+load_dotenv()
+
+# How long upstream Ticker data is served from memory (seconds)
+STOCK_INFO_TTL = float(os.getenv("STOCK_INFO_TTL", "60"))
+STOCK_HISTORY_TTL = float(os.getenv("STOCK_HISTORY_TTL", "300"))
+STOCK_CACHE_SIZE = int(os.getenv("STOCK_CACHE_SIZE", "2048"))
+
+# Ask yfinance about symbols missing from the local universe; misses are remembered for SYMBOL_MISS_TTL.
+# Can be turned off once the seed file holds the full exchange listing (symbol_universe --refresh-listing).
+SYMBOL_VALIDATE_UPSTREAM = os.getenv("SYMBOL_VALIDATE_UPSTREAM", "true").lower() == "true"
+
+# Shared by every StockService instance in the process
+_info_cache = TTLCache(maxsize=STOCK_CACHE_SIZE, ttl=STOCK_INFO_TTL)
+_history_cache = TTLCache(maxsize=STOCK_CACHE_SIZE, ttl=STOCK_HISTORY_TTL)
+
+# Price changes over up to this many days are computed from one shared "1mo" history
+RECENT_HISTORY_MAX_DAYS = 15
+
+# Builds the Ticker-like object (.info, .history(period=...)) for a symbol; None means yfinance
+_ticker_factory: Optional[Callable[[str], Any]] = None
+
+def set_ticker_factory(factory: Optional[Callable[[str], Any]] = None):
+    """Swap the upstream Ticker source (None restores yfinance) and drop cached upstream data"""
+    global _ticker_factory
+    _ticker_factory = factory
+    _info_cache.clear()
+    _history_cache.clear()
+
+def _ticker(symbol: str):
+    return (_ticker_factory or yf.Ticker)(symbol)
+
+def _fetch_info(symbol: str) -> Dict:
+    with track_upstream("yfinance", "info"):
+        return _ticker(symbol).info
+
+def _fetch_history(symbol: str, period: str) -> pd.DataFrame:
+    with track_upstream("yfinance", "history"):
+        return _ticker(symbol).history(period=period)
 
 class StockService:
-    def __init__(self):
-        pass
+    def __init__(self, price_store: Optional[PriceStore] = None):
+        self.price_store = price_store or PriceStore()
+    
+    def _get_local_history(self, symbol: str, period: str, quote: bool = False) -> Optional[pd.DataFrame]:
+        """
+        History from the local price store, or None if it doesn't cover the period
+        
+        Quote-style reads (quote=True) go upstream while the market is open
+        and otherwise need the last closed session's bar; chart reads accept
+        the store's usual staleness allowance.
+        """
+        start = period_start(period)
+        if start is None:
+            return None
+        try:
+            if quote:
+                return self.price_store.get_quote_history(symbol, start)
+            return self.price_store.get_fresh_history(symbol, start)
+        except Exception as e:
+            print(f"Error reading stored prices for {symbol}: {e}")
+            return None
+    
+    def _get_info(self, symbol: str) -> Dict:
+        """Ticker .info, fetched at most once per TTL per symbol"""
+        symbol = symbol.upper()
+        return _info_cache.get_or_load(symbol, lambda: _fetch_info(symbol))
+    
+    def _get_history(self, symbol: str, period: str, quote: bool = False) -> pd.DataFrame:
+        """History for a period, loaded at most once per TTL per symbol: local store first, then upstream"""
+        symbol = symbol.upper()
+        return _history_cache.get_or_load(
+            (symbol, period, quote),
+            lambda: self._load_history(symbol, period, quote)
+        )
+    
+    def _load_history(self, symbol: str, period: str, quote: bool) -> pd.DataFrame:
+        local = self._get_local_history(symbol, period, quote)
+        if local is not None:
+            return local
+        return _fetch_history(symbol, period)
     
     def get_stock_data(self, symbol: str, period: str = "1mo") -> pd.DataFrame:
         """Get historical stock data"""
         try:
-            stock = yf.Ticker(symbol)
-            hist = stock.history(period=period)
-            return hist
+            # Copy so callers can't modify the cached frame
+            return self._get_history(symbol, period).copy()
         except Exception as e:
             print(f"Error fetching stock data for {symbol}: {e}")
             return pd.DataFrame()
@@ -20,8 +102,7 @@ class StockService:
     def get_current_price(self, symbol: str) -> Optional[float]:
         """Get current stock price"""
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
+            info = self._get_info(symbol)
             return info.get('currentPrice') or info.get('regularMarketPrice')
         except Exception as e:
             print(f"Error fetching current price for {symbol}: {e}")
@@ -30,8 +111,7 @@ class StockService:
     def get_stock_info(self, symbol: str) -> Dict:
         """Get comprehensive stock information"""
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
+            info = self._get_info(symbol)
             
             return {
                 'symbol': symbol,
@@ -51,8 +131,9 @@ class StockService:
     def get_price_change(self, symbol: str, days: int = 1) -> Optional[Dict]:
         """Get price change over specified days"""
         try:
-            stock = yf.Ticker(symbol)
-            hist = stock.history(period=f"{days + 5}d")  # Get extra days to ensure we have data
+            # Get extra days to ensure we have data; short windows share one cached fetch
+            period = "1mo" if days <= RECENT_HISTORY_MAX_DAYS else f"{days + 5}d"
+            hist = self._get_history(symbol, period, quote=True)
             
             if len(hist) < 2:
                 return None
@@ -74,14 +155,29 @@ class StockService:
             return None
     
     def validate_symbol(self, symbol: str) -> bool:
-        """Check if a stock symbol is valid"""
+        """Check if a stock symbol is valid, from the local symbol universe"""
+        universe = get_symbol_universe()
+        if universe.contains(symbol):
+            return True
+        if not SYMBOL_VALIDATE_UPSTREAM or universe.is_unknown(symbol):
+            return False
+        
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
+            info = self._get_info(symbol)
             # Check if we got valid data
-            return 'symbol' in info or 'shortName' in info
+            is_valid = 'symbol' in info or 'shortName' in info
         except:
             return False
+        
+        if is_valid:
+            universe.add(symbol, info.get('longName') or info.get('shortName'), info.get('sector'))
+        else:
+            universe.mark_unknown(symbol)
+        return is_valid
+    
+    def search_symbols(self, query: str, limit: int = 10) -> List[Dict]:
+        """Search known symbols by ticker or company name"""
+        return get_symbol_universe().search(query, limit)
 
 # Test function
 if __name__ == "__main__":
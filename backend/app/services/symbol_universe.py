@@ -0,0 +1,335 @@
+import bisect
+import csv
+import io
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.core.cache import MISSING, TTLCache
+from app.core.database import SessionLocal
+from app.models.database import StockInfo
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_SEED_FILE = os.getenv(
+    "SYMBOL_SEED_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "symbols.csv")
+)
+SYMBOL_UNIVERSE_REFRESH = float(os.getenv("SYMBOL_UNIVERSE_REFRESH", "3600"))
+# Exchange symbol directories written into the seed file by
+#   cd backend && python -m app.services.symbol_universe --refresh-listing
+NASDAQ_LISTED_URL = os.getenv("NASDAQ_LISTED_URL", "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt")
+OTHER_LISTED_URL = os.getenv("OTHER_LISTED_URL", "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt")
+# How long a symbol the upstream fallback didn't recognise is answered as unknown (seconds)
+SYMBOL_MISS_TTL = float(os.getenv("SYMBOL_MISS_TTL", "86400"))
+
+# Fuzzy matches scoring below this (Dice coefficient over trigrams) are dropped
+FUZZY_MIN_SCORE = 0.3
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Common stock and share classes (BRK.B); preferreds, warrants and rights use other characters
+_LISTED_SYMBOL = re.compile(r"[A-Z]{1,5}(\.[A-Z])?")
+
+def _trigrams(text: str) -> List[str]:
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+class SymbolUniverse:
+    """
+    In-memory index of known tickers
+    
+    Exact lookups are a dict hit; prefix search bisects a sorted list of
+    symbols and name words; fuzzy search scores candidates that share
+    trigrams with the query.
+    """
+    
+    def __init__(self, entries: List[Dict]):
+        self.entries: List[Dict] = []
+        self.by_symbol: Dict[str, int] = {}
+        self._prefix_keys: List[tuple] = []
+        self._trigram_index: Dict[str, List[int]] = {}
+        self._entry_grams: List[frozenset] = []
+        # Entries registered through add(), carried over when the universe is reloaded
+        self.runtime_entries: Dict[str, Dict] = {}
+        # Symbols an upstream lookup rejected; dropped on reload so new listings get another chance
+        self._unknown = TTLCache(maxsize=10000, ttl=SYMBOL_MISS_TTL)
+        self._lock = threading.Lock()
+        for entry in entries:
+            self._add(entry)
+        self._prefix_keys = sorted(
+            key for position in range(len(self.entries)) for key in self._keys_for(position)
+        )
+    
+    def _add(self, entry: Dict) -> Optional[int]:
+        """Store an entry and index its trigrams; returns its position if its prefix keys changed"""
+        symbol = entry["symbol"].upper()
+        if symbol in self.by_symbol:
+            # Later sources (e.g. StockInfo) fill in missing details
+            position = self.by_symbol[symbol]
+            existing = self.entries[position]
+            old_name = existing.get("name")
+            existing.update({k: v for k, v in entry.items() if v})
+            existing["symbol"] = symbol
+            if existing.get("name") == old_name:
+                return None
+            self._index_grams(position)
+            return position
+        
+        position = len(self.entries)
+        self.entries.append(dict(entry, symbol=symbol))
+        self.by_symbol[symbol] = position
+        self._entry_grams.append(frozenset())
+        self._index_grams(position)
+        return position
+        
+    def _index_grams(self, position: int):
+        """(Re)index an entry's trigrams, dropping those of a previous name"""
+        entry = self.entries[position]
+        name = (entry.get("name") or "").lower()
+        old = self._entry_grams[position]
+        new = frozenset(_trigrams(f"{entry['symbol'].lower()} {name}"))
+        for gram in old - new:
+            # Copy on write, so concurrent fuzzy searches iterate a stable list
+            self._trigram_index[gram] = [p for p in self._trigram_index[gram] if p != position]
+        for gram in new - old:
+            self._trigram_index[gram] = self._trigram_index.get(gram, []) + [position]
+        self._entry_grams[position] = new
+        
+    def _keys_for(self, position: int) -> List[tuple]:
+        """Prefix keys for an entry; symbol keys sort ahead of name keys for the same prefix"""
+        entry = self.entries[position]
+        name = (entry.get("name") or "").lower()
+        keys = [(entry["symbol"].lower(), 0, position)]
+        keys.extend((word, 1, position) for word in set(_WORD.findall(name)))
+        return keys
+    
+    def add(self, symbol: str, name: Optional[str] = None, sector: Optional[str] = None):
+        """Register a symbol confirmed elsewhere (e.g. by an upstream lookup)"""
+        entry = {"symbol": symbol, "name": name, "sector": sector}
+        with self._lock:
+            self.runtime_entries[symbol.upper()] = entry
+            position = self._add(entry)
+            if position is not None:
+                # Swap in a new list so concurrent readers never see a half-sorted one
+                self._prefix_keys = sorted(
+                    [key for key in self._prefix_keys if key[2] != position] + self._keys_for(position)
+                )
+    
+    def mark_unknown(self, symbol: str):
+        """Remember that an upstream lookup rejected symbol"""
+        self._unknown.set(symbol.upper(), True)
+    
+    def is_unknown(self, symbol: str) -> bool:
+        return self._unknown.get(symbol.upper()) is not MISSING
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def contains(self, symbol: str) -> bool:
+        return symbol.upper() in self.by_symbol
+    
+    def get(self, symbol: str) -> Optional[Dict]:
+        position = self.by_symbol.get(symbol.upper())
+        return None if position is None else self.entries[position]
+    
+    def prefix_search(self, prefix: str, limit: int = 10) -> List[Dict]:
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+        keys = self._prefix_keys
+        seen = {}
+        for i in range(bisect.bisect_left(keys, (prefix,)), len(keys)):
+            key, _, position = keys[i]
+            if not key.startswith(prefix):
+                break
+            seen.setdefault(position, None)
+        # Symbol matches first, then shorter symbols
+        positions = sorted(seen, key=lambda p: (
+            not self.entries[p]["symbol"].lower().startswith(prefix),
+            len(self.entries[p]["symbol"])
+        ))
+        return [self.entries[p] for p in positions[:limit]]
+    
+    def fuzzy_search(self, query: str, limit: int = 10) -> List[Dict]:
+        grams = set(_trigrams(query.lower()))
+        if not grams:
+            return []
+        overlap = Counter()
+        for gram in grams:
+            for position in self._trigram_index.get(gram, ()):
+                overlap[position] += 1
+        
+        scored = []
+        for position, shared in overlap.items():
+            score = 2 * shared / (len(grams) + len(self._entry_grams[position]))
+            if score >= FUZZY_MIN_SCORE:
+                scored.append((score, position))
+        scored.sort(key=lambda item: -item[0])
+        return [dict(self.entries[p], score=round(score, 3)) for score, p in scored[:limit]]
+    
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Exact symbol, then prefix, then fuzzy matches"""
+        query = query.strip()
+        results: List[Dict] = []
+        seen = set()
+        
+        def take(entries: List[Dict], match: str):
+            for entry in entries:
+                if entry["symbol"] not in seen and len(results) < limit:
+                    seen.add(entry["symbol"])
+                    results.append({
+                        "symbol": entry["symbol"],
+                        "name": entry.get("name"),
+                        "sector": entry.get("sector"),
+                        "match": match
+                    })
+        
+        exact = self.get(query)
+        if exact:
+            take([exact], "exact")
+        take(self.prefix_search(query, limit), "prefix")
+        if len(results) < limit:
+            take(self.fuzzy_search(query, limit), "fuzzy")
+        return results
+
+def load_symbol_universe(seed_file: Optional[str] = SYMBOL_SEED_FILE, session_factory=None) -> SymbolUniverse:
+    """Build the universe from the seed file plus every StockInfo row"""
+    entries = []
+    if seed_file and os.path.exists(seed_file):
+        with open(seed_file, newline="", encoding="utf-8") as f:
+            entries.extend(
+                {"symbol": row["symbol"], "name": row.get("name"), "sector": row.get("sector")}
+                for row in csv.DictReader(f)
+                if row.get("symbol")
+            )
+    
+    session_factory = session_factory or SessionLocal
+    try:
+        db = session_factory()
+        try:
+            for stock in db.query(StockInfo.symbol, StockInfo.name, StockInfo.sector):
+                entries.append({"symbol": stock.symbol, "name": stock.name, "sector": stock.sector})
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"Could not load StockInfo into symbol universe: {e}")
+    
+    universe = SymbolUniverse(entries)
+    logger.info(f"✓ Symbol universe loaded: {len(universe)} symbols")
+    return universe
+
+def parse_symbol_directory(text: str, symbol_column: str) -> List[Dict]:
+    """Entries from a NASDAQ Trader symbol directory (pipe separated, with a header and a trailer line)"""
+    entries = []
+    for row in csv.DictReader(io.StringIO(text), delimiter="|"):
+        symbol = (row.get(symbol_column) or "").strip()
+        # The trailer ("File Creation Time: ...") and test issues aren't tradable symbols
+        if row.get("Test Issue") == "Y" or not _LISTED_SYMBOL.fullmatch(symbol):
+            continue
+        # Yahoo writes share classes with a dash (BRK-B)
+        entries.append({"symbol": symbol.replace(".", "-"), "name": (row.get("Security Name") or "").strip()})
+    return entries
+
+def _download(url: str) -> str:
+    import requests
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    return response.text
+
+def refresh_symbol_listing(output: str = SYMBOL_SEED_FILE, fetch: Callable[[str], str] = _download) -> int:
+    """
+    Rewrite the seed file from the NASDAQ and other-exchange (NYSE, NYSE
+    American, Arca, Cboe) symbol directories, keeping the sectors already in it
+    
+    Returns:
+        Number of symbols written
+    """
+    sectors = {}
+    if os.path.exists(output):
+        with open(output, newline="", encoding="utf-8") as f:
+            sectors = {row["symbol"]: row.get("sector") for row in csv.DictReader(f) if row.get("symbol")}
+    
+    entries: Dict[str, Dict] = {}
+    for url, symbol_column in ((NASDAQ_LISTED_URL, "Symbol"), (OTHER_LISTED_URL, "ACT Symbol")):
+        for entry in parse_symbol_directory(fetch(url), symbol_column):
+            entries.setdefault(entry["symbol"], entry)
+    if not entries:
+        raise ValueError("The symbol directories listed no symbols; keeping the current seed file")
+    
+    # Written next to the seed and renamed over it, so readers never see half a file
+    partial = f"{output}.partial"
+    with open(partial, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["symbol", "name", "sector"])
+        for symbol in sorted(entries):
+            writer.writerow([symbol, entries[symbol]["name"], sectors.get(symbol) or ""])
+    os.replace(partial, output)
+    return len(entries)
+
+# Process-wide universe, reloaded in the background once it is older than SYMBOL_UNIVERSE_REFRESH
+_universe: Optional[SymbolUniverse] = None
+_loaded_at = 0.0
+_refreshing = False
+_state_lock = threading.Lock()
+
+def get_symbol_universe() -> SymbolUniverse:
+    global _universe, _loaded_at, _refreshing
+    
+    if _universe is None:
+        with _state_lock:
+            if _universe is None:
+                _universe = load_symbol_universe()
+                _loaded_at = time.monotonic()
+        return _universe
+    
+    if time.monotonic() - _loaded_at > SYMBOL_UNIVERSE_REFRESH and not _refreshing:
+        with _state_lock:
+            if not _refreshing:
+                _refreshing = True
+                threading.Thread(target=_refresh, daemon=True).start()
+    return _universe
+
+def _refresh():
+    global _universe, _loaded_at, _refreshing
+    try:
+        universe = load_symbol_universe()
+        # Symbols confirmed at runtime (e.g. by validate_symbol) aren't in the seed file or StockInfo
+        previous = _universe
+        if previous is not None:
+            with previous._lock:
+                runtime_entries = list(previous.runtime_entries.values())
+            for entry in runtime_entries:
+                universe.add(entry["symbol"], entry.get("name"), entry.get("sector"))
+        _universe = universe
+        _loaded_at = time.monotonic()
+    finally:
+        _refreshing = False
+
+def set_symbol_universe(universe: SymbolUniverse):
+    """Replace the process-wide universe (used by tests and after bulk symbol changes)"""
+    global _universe, _loaded_at
+    _universe = universe
+    _loaded_at = time.monotonic()
+
+# Command line entry point
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Symbol universe utilities")
+    parser.add_argument("--refresh-listing", action="store_true",
+                        help="Download the exchange symbol directories into the seed file")
+    parser.add_argument("--output", default=SYMBOL_SEED_FILE, help="Seed file to write (defaults to SYMBOL_SEED_FILE)")
+    args = parser.parse_args()
+    
+    if args.refresh_listing:
+        print(f"✓ Wrote {refresh_symbol_listing(args.output)} symbols to {args.output}")
+    else:
+        parser.print_help()
@@ -0,0 +1,67 @@
+"""
+Throughput of POST /api/sentiment/analyze/batch against N single /analyze calls
+
+Runs in-process through FastAPI's TestClient, so the numbers include request
+parsing and serialization but not network latency (which only widens the gap).
+    
+    cd backend && python -m benchmarks.analyze_batch --n 256 --model vader
+"""
+import argparse
+import os
+import random
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import sentiment
+from app.services.sentiment_service import get_shared_sentiment_service
+
+HEADLINES = [
+    "{symbol} shares surge after earnings beat expectations",
+    "{symbol} slides as regulators open investigation",
+    "Analysts reiterate neutral rating on {symbol}",
+    "{symbol} announces record buyback and raises dividend",
+    "{symbol} misses revenue estimates, guidance cut",
+    "{symbol} trading flat ahead of Fed decision",
+]
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "META", "JPM", "XOM"]
+
+def make_texts(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [rng.choice(HEADLINES).format(symbol=rng.choice(SYMBOLS)) for _ in range(n)]
+
+def run(n: int, model: str):
+    app = FastAPI()
+    app.include_router(sentiment.router, prefix="/api/sentiment")
+    client = TestClient(app)
+    texts = make_texts(n)
+    
+    # Load the model before timing either path
+    os.environ["SENTIMENT_MODEL"] = model
+    get_shared_sentiment_service()
+    client.post("/api/sentiment/analyze", params={"text": texts[0]})
+    
+    start = time.perf_counter()
+    singles = [client.post("/api/sentiment/analyze", params={"text": text}).json() for text in texts]
+    single_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    batch = client.post("/api/sentiment/analyze/batch", json=texts).json()
+    batch_seconds = time.perf_counter() - start
+    
+    assert [r["sentiment_label"] for r in singles] == [r["sentiment_label"] for r in batch["results"]]
+    
+    print(f"Model: {model}, texts: {n}")
+    print(f"  {n} single calls: {single_seconds:.3f}s ({n / single_seconds:,.0f} texts/s)")
+    print(f"  1 batch call:    {batch_seconds:.3f}s ({n / batch_seconds:,.0f} texts/s)")
+    print(f"  Speedup: {single_seconds / batch_seconds:.1f}x")
+    return {"single_seconds": single_seconds, "batch_seconds": batch_seconds}
+
+# Command line entry point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare batched and single-text sentiment analysis throughput")
+    parser.add_argument("--n", type=int, default=256, help="Number of texts (at most ANALYZE_BATCH_MAX_ITEMS)")
+    parser.add_argument("--model", default="vader", choices=["vader", "textblob", "finbert"])
+    args = parser.parse_args()
+    run(args.n, args.model)
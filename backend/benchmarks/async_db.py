@@ -0,0 +1,159 @@
+"""
+Load test: sync threadpool routes vs async database routes
+
+Serves the /stock/{symbol} read path twice with uvicorn, once through the
+old sync DatabaseService on the threadpool and once through
+AsyncDatabaseService on a per-request AsyncSession, then drives each with the
+same closed-loop load at several concurrency levels and reports sustained
+RPS with p50/p99 latency. Both services run the same daily-aggregation
+query, so the comparison is only sync vs async. The response cache is
+bypassed so every request reaches the database.
+    
+    cd backend && python -m benchmarks.async_db --articles 20000 --duration 10
+    DATABASE_URL=postgresql://... python -m benchmarks.async_db   # against Postgres
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, async_url
+from app.models.database import NewsArticle
+from app.services.async_database_service import AsyncDatabaseService
+from app.services.database_service import DatabaseService
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "META", "GOOGL", "JPM", "XOM", "V"]
+
+def seed(url: str, articles: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(3)
+    now = datetime.now()
+    rows = [
+        {
+            "symbol": rng.choice(SYMBOLS),
+            "title": f"Synthetic headline {i}",
+            "url": f"https://bench.example/{i}",
+            "published_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 10)),
+            "sentiment_score": rng.uniform(-1, 1),
+            "sentiment_label": rng.choice(["positive", "negative", "neutral"])
+        }
+        for i in range(articles)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(NewsArticle), rows)
+    engine.dispose()
+
+def sync_app(url: str) -> FastAPI:
+    engine = create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+    db_service = DatabaseService(sessionmaker(bind=engine))
+    app = FastAPI()
+    
+    @app.get("/stock/{symbol}")
+    def stock(symbol: str, days: int = 7):
+        data = db_service.get_stock_sentiment_data(symbol, days)
+        if not data:
+            raise HTTPException(status_code=404)
+        return data
+    
+    return app
+
+def async_app(url: str) -> FastAPI:
+    session_factory = async_sessionmaker(create_async_engine(async_url(url)), expire_on_commit=False)
+    app = FastAPI()
+    
+    async def get_session():
+        async with session_factory() as session:
+            yield session
+    
+    @app.get("/stock/{symbol}")
+    async def stock(symbol: str, days: int = 7, session: AsyncSession = Depends(get_session)):
+        data = await AsyncDatabaseService(session).get_stock_sentiment_data(symbol, days)
+        if not data:
+            raise HTTPException(status_code=404)
+        return data
+    
+    return app
+
+def serve(app: FastAPI) -> tuple:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+async def drive(base_url: str, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker(seed: int):
+            nonlocal errors
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get(f"/stock/{rng.choice(SYMBOLS)}")
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors
+    }
+
+def run(articles: int, duration: float, levels):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = os.getenv("DATABASE_URL") or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        if url.startswith("sqlite"):
+            seed(url, articles)
+        
+        results = {}
+        for name, factory in (("sync", sync_app), ("async", async_app)):
+            server, thread, base_url = serve(factory(url))
+            asyncio.run(drive(base_url, 4, 1.0))  # warm up
+            results[name] = {level: asyncio.run(drive(base_url, level, duration)) for level in levels}
+            server.should_exit = True
+            thread.join()
+    
+    print(f"{'concurrency':>11} | {'sync rps':>9} {'p50':>7} {'p99':>7} | {'async rps':>9} {'p50':>7} {'p99':>7}")
+    for level in levels:
+        sync, async_ = results["sync"][level], results["async"][level]
+        print(f"{level:>11} | {sync['rps']:>9.0f} {sync['p50_ms']:>6.1f}ms {sync['p99_ms']:>6.1f}ms"
+              f" | {async_['rps']:>9.0f} {async_['p50_ms']:>6.1f}ms {async_['p99_ms']:>6.1f}ms")
+    return results
+
+# Command line entry point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sync and async database routes under load")
+    parser.add_argument("--articles", type=int, default=20000, help="Synthetic articles to seed (SQLite only)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--concurrency", default="8,32,128", help="Comma separated concurrency levels")
+    args = parser.parse_args()
+    run(args.articles, args.duration, [int(level) for level in args.concurrency.split(",")])
@@ -0,0 +1,204 @@
+"""
+Synthetic corpus generator for benchmarks
+
+Fills a database with NewsArticle, StockPrice, StockInfo, SentimentSummary
+and SentimentStats rows at a chosen scale. Article volume per symbol follows
+a Zipf distribution (a handful of mega-caps get most of the coverage, the
+long tail gets a few articles a month), publication times cluster in market
+hours, and a small fraction of articles is left unscored as a backlog.
+Everything is derived from --seed, so the same arguments give the same data.
+    
+    cd backend && python -m benchmarks.corpus --url sqlite:///bench.db --articles 1000000 --symbols 500
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, make_engine
+from app.models.database import NewsArticle, SentimentSummary, StockInfo, StockPrice
+from app.services.database_service import DatabaseService
+
+HEADLINES = [
+    ("{symbol} shares surge after earnings beat expectations", 0.7),
+    ("{symbol} slides as regulators open investigation", -0.6),
+    ("Analysts reiterate neutral rating on {symbol}", 0.0),
+    ("{symbol} announces record buyback and raises dividend", 0.6),
+    ("{symbol} misses revenue estimates, guidance cut", -0.7),
+    ("{symbol} trading flat ahead of Fed decision", 0.0),
+    ("{symbol} unveils new product line to strong reviews", 0.5),
+    ("Lawsuit weighs on {symbol} as investors turn cautious", -0.4),
+]
+SOURCES = ["Reuters", "Bloomberg", "MarketWatch", "CNBC", "Barron's", "Financial Times"]
+SECTORS = ["Technology", "Financials", "Health Care", "Energy", "Industrials", "Consumer Discretionary"]
+UNSCORED_FRACTION = 0.02
+
+def make_symbols(count: int) -> List[str]:
+    """Ticker-like names, most popular first"""
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    symbols = []
+    for i in range(count):
+        name = ""
+        n = i + 26
+        while n:
+            n, r = divmod(n, 26)
+            name = letters[r] + name
+        symbols.append(name[:5])
+    return symbols
+
+def zipf_weights(count: int, exponent: float = 1.1) -> np.ndarray:
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+def sample_texts(n: int, seed: int = 0, symbols: Optional[List[str]] = None) -> List[str]:
+    """Headline + description strings like the ones the scorer sees"""
+    rng = np.random.default_rng(seed)
+    symbols = symbols or make_symbols(50)
+    picks = rng.integers(0, len(HEADLINES), n)
+    owners = rng.integers(0, len(symbols), n)
+    return [
+        HEADLINES[pick][0].format(symbol=symbols[owner]) + ". Shares moved in heavy trading as investors weighed the news."
+        for pick, owner in zip(picks, owners)
+    ]
+
+def article_rows(rng: np.random.Generator, symbols: List[str], weights: np.ndarray, start: datetime,
+                 days: int, first_id: int, n: int) -> List[Dict]:
+    owners = rng.choice(len(symbols), size=n, p=weights)
+    # Mostly US market hours (13:00-21:00 UTC), some overnight coverage
+    day_offsets = rng.integers(0, days, n)
+    hours = np.where(rng.random(n) < 0.8, rng.uniform(13, 21, n), rng.uniform(0, 24, n))
+    picks = rng.integers(0, len(HEADLINES), n)
+    tones = np.array([tone for _, tone in HEADLINES])[picks]
+    scores = np.clip(tones + rng.normal(0, 0.2, n), -1, 1)
+    scored = rng.random(n) >= UNSCORED_FRACTION
+    sources = rng.integers(0, len(SOURCES), n)
+    
+    rows = []
+    for i in range(n):
+        symbol = symbols[owners[i]]
+        score = float(round(scores[i], 4)) if scored[i] else None
+        label = None
+        if score is not None:
+            label = "positive" if score > 0.1 else "negative" if score < -0.1 else "neutral"
+        rows.append({
+            "symbol": symbol,
+            "title": HEADLINES[picks[i]][0].format(symbol=symbol),
+            "content": f"Synthetic coverage of {symbol} from the benchmark corpus.",
+            "url": f"https://corpus.example/{symbol}/{first_id + i}",
+            "published_at": start + timedelta(days=int(day_offsets[i]), hours=float(hours[i])),
+            "sentiment_score": score,
+            "sentiment_label": label,
+            "source": SOURCES[sources[i]],
+            "author": "Benchmark Desk"
+        })
+    return rows
+
+def price_rows(rng: np.random.Generator, symbol: str, days: pd.DatetimeIndex) -> List[Dict]:
+    closes = (20 + rng.random() * 400) * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(days))))
+    opens = closes * (1 + rng.normal(0, 0.004, len(days)))
+    volumes = rng.integers(100_000, 50_000_000, len(days))
+    return [
+        {
+            "symbol": symbol,
+            "date": day.to_pydatetime(),
+            "open_price": float(opens[i]),
+            "high_price": float(max(opens[i], closes[i]) * 1.006),
+            "low_price": float(min(opens[i], closes[i]) * 0.994),
+            "close_price": float(closes[i]),
+            "adj_close": float(closes[i]),
+            "volume": int(volumes[i])
+        }
+        for i, day in enumerate(days)
+    ]
+
+def generate_corpus(url: str, articles: int = 10000, symbols: int = 200, days: int = 365,
+                    seed: int = 42, chunk_size: int = 50000, end: Optional[date] = None,
+                    log=print) -> Dict:
+    """Create the schema at `url` and fill it; returns row counts and timings"""
+    started = time.perf_counter()
+    engine = make_engine(url)
+    Base.metadata.create_all(bind=engine)
+    rng = np.random.default_rng(seed)
+    names = make_symbols(symbols)
+    weights = zipf_weights(symbols)
+    end = end or date.today()
+    start = datetime.combine(end - timedelta(days=days), datetime.min.time())
+    
+    with engine.begin() as conn:
+        conn.execute(insert(StockInfo), [
+            {"symbol": symbol, "name": f"{symbol} Holdings", "sector": SECTORS[i % len(SECTORS)]}
+            for i, symbol in enumerate(names)
+        ])
+    
+    # Daily rollups are accumulated while generating instead of re-reading the articles
+    rollups = {}
+    written = 0
+    while written < articles:
+        n = min(chunk_size, articles - written)
+        rows = article_rows(rng, names, weights, start, days, written, n)
+        with engine.begin() as conn:
+            conn.execute(insert(NewsArticle), rows)
+        frame = pd.DataFrame(rows, columns=["symbol", "published_at", "sentiment_score", "sentiment_label"])
+        frame = frame.dropna(subset=["sentiment_score"])
+        frame["day"] = frame["published_at"].dt.normalize()
+        for (symbol, day, label), group in frame.groupby(["symbol", "day", "sentiment_label"]):
+            entry = rollups.setdefault((symbol, day), {"sum": 0.0, "positive": 0, "negative": 0, "neutral": 0})
+            entry["sum"] += group["sentiment_score"].sum()
+            entry[label] += len(group)
+        written += n
+        log(f"  articles: {written:,}/{articles:,}")
+    
+    summary_rows = []
+    for (symbol, day), entry in rollups.items():
+        count = entry["positive"] + entry["negative"] + entry["neutral"]
+        summary_rows.append({
+            "symbol": symbol, "date": day.to_pydatetime(), "avg_sentiment": entry["sum"] / count,
+            "article_count": count, "positive_count": entry["positive"],
+            "negative_count": entry["negative"], "neutral_count": entry["neutral"]
+        })
+    for i in range(0, len(summary_rows), chunk_size):
+        with engine.begin() as conn:
+            conn.execute(insert(SentimentSummary), summary_rows[i:i + chunk_size])
+    
+    trading_days = pd.bdate_range(start.date(), end)
+    prices = 0
+    batch = []
+    for symbol in names:
+        batch.extend(price_rows(rng, symbol, trading_days))
+        if len(batch) >= chunk_size:
+            with engine.begin() as conn:
+                conn.execute(insert(StockPrice), batch)
+            prices += len(batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert(StockPrice), batch)
+        prices += len(batch)
+    
+    DatabaseService(sessionmaker(bind=engine)).reconcile_sentiment_stats()
+    engine.dispose()
+    return {
+        "articles": articles,
+        "symbols": symbols,
+        "days": days,
+        "summaries": len(summary_rows),
+        "prices": prices,
+        "seconds": round(time.perf_counter() - started, 2)
+    }
+
+# Command line entry point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark corpus")
+    parser.add_argument("--url", required=True, help="Target database URL (tables are created if missing)")
+    parser.add_argument("--articles", type=int, default=10000, help="News articles to generate (10k to 10M)")
+    parser.add_argument("--symbols", type=int, default=200, help="Distinct symbols, Zipf-weighted")
+    parser.add_argument("--days", type=int, default=365, help="Days of history")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per insert transaction")
+    args = parser.parse_args()
+    print(generate_corpus(args.url, args.articles, args.symbols, args.days, args.seed, args.chunk_size))
@@ -0,0 +1,164 @@
+"""
+Concurrent read/write benchmark for the engine configurations
+
+Reader threads run the dashboard's daily-aggregate query while one writer
+thread scores articles in committed batches, the way the sentiment scorer
+does. Each engine configuration runs against a fresh copy of the same
+synthetic database:
+
+    static  - one shared connection (StaticPool), rollback journal: the old setup
+    pooled  - per-thread pooled connections, rollback journal
+    tuned   - make_engine(): pooled connections with WAL and the SQLITE_PRAGMAS
+
+    cd backend && python -m benchmarks.db_concurrency --readers 8 --duration 10
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.core.database import Base, make_engine
+from app.models.database import NewsArticle
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "META", "GOOGL", "JPM", "XOM", "V"]
+
+def seed(path: str, articles: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(5)
+    now = datetime.now()
+    rows = [
+        {
+            "symbol": rng.choice(SYMBOLS),
+            "title": f"Synthetic headline {i}",
+            "url": f"https://bench.example/{i}",
+            "published_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 7)),
+            "sentiment_score": rng.uniform(-1, 1) if i % 2 else None
+        }
+        for i in range(articles)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(NewsArticle), rows)
+    engine.dispose()
+
+def build_engine(name: str, url: str):
+    if name == "static":
+        return create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    if name == "pooled":
+        return create_engine(url, connect_args={"check_same_thread": False, "timeout": 5}, poolclass=QueuePool)
+    return make_engine(url)
+
+def run_config(name: str, path: str, readers: int, duration: float, batch: int) -> dict:
+    engine = build_engine(name, f"sqlite:///{path}")
+    Session = sessionmaker(bind=engine)
+    stop = threading.Event()
+    read_latencies = []
+    counters = {"read_errors": 0, "write_errors": 0, "writes": 0}
+    lock = threading.Lock()
+    since = datetime.now() - timedelta(days=7)
+    
+    def reader(seed: int):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            start = time.perf_counter()
+            db = Session()
+            try:
+                db.query(
+                    func.date(NewsArticle.published_at),
+                    func.avg(NewsArticle.sentiment_score),
+                    func.count(NewsArticle.id)
+                ).filter(
+                    NewsArticle.symbol == rng.choice(SYMBOLS),
+                    NewsArticle.published_at >= since,
+                    NewsArticle.sentiment_score.isnot(None)
+                ).group_by(func.date(NewsArticle.published_at)).all()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    read_latencies.append(elapsed)
+            except Exception:
+                with lock:
+                    counters["read_errors"] += 1
+            finally:
+                db.close()
+    
+    def writer():
+        rng = random.Random(11)
+        while not stop.is_set():
+            db = Session()
+            try:
+                ids = [row.id for row in db.query(NewsArticle.id).filter(
+                    NewsArticle.sentiment_score.is_(None)
+                ).limit(batch)]
+                for article_id in ids:
+                    db.execute(update(NewsArticle).where(NewsArticle.id == article_id).values(
+                        sentiment_score=rng.uniform(-1, 1), sentiment_label="neutral"
+                    ))
+                db.commit()
+                with lock:
+                    counters["writes"] += len(ids)
+            except Exception:
+                db.rollback()
+                with lock:
+                    counters["write_errors"] += 1
+            finally:
+                db.close()
+    
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    
+    read_latencies.sort()
+    return {
+        "reads_per_s": len(read_latencies) / duration,
+        "read_p50_ms": statistics.median(read_latencies) * 1000 if read_latencies else None,
+        "read_p99_ms": read_latencies[int(len(read_latencies) * 0.99) - 1] * 1000 if read_latencies else None,
+        "writes_per_s": counters["writes"] / duration,
+        "read_errors": counters["read_errors"],
+        "write_errors": counters["write_errors"]
+    }
+
+def run(articles: int, readers: int, duration: float, batch: int):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.db")
+        seed(template, articles)
+        with open(template, "rb") as f:
+            data = f.read()
+        
+        for name in ("static", "pooled", "tuned"):
+            path = os.path.join(tmp, f"{name}.db")
+            with open(path, "wb") as f:
+                f.write(data)
+            results[name] = run_config(name, path, readers, duration, batch)
+    
+    print(f"{'engine':>7} | {'reads/s':>8} {'p50':>8} {'p99':>8} | {'writes/s':>8} | errors (read/write)")
+    for name, result in results.items():
+        p50 = f"{result['read_p50_ms']:.1f}ms" if result["read_p50_ms"] is not None else "-"
+        p99 = f"{result['read_p99_ms']:.1f}ms" if result["read_p99_ms"] is not None else "-"
+        print(f"{name:>7} | {result['reads_per_s']:>8.0f} {p50:>8} {p99:>8} | {result['writes_per_s']:>8.0f} |"
+              f" {result['read_errors']}/{result['write_errors']}")
+    return results
+
+# Command line entry point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent read/write throughput per engine configuration")
+    parser.add_argument("--articles", type=int, default=50000, help="Synthetic articles to seed")
+    parser.add_argument("--readers", type=int, default=8, help="Concurrent reader threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per configuration")
+    parser.add_argument("--batch", type=int, default=200, help="Articles scored per writer commit")
+    args = parser.parse_args()
+    run(args.articles, args.readers, args.duration, args.batch)
@@ -0,0 +1,160 @@
+"""
+Partition pruning benchmark for news_articles on Postgres
+
+Fills a Postgres database with the synthetic corpus and measures the
+7-day stock sentiment and 24-hour trending queries on the plain table.
+It then partitions the table with PartitionMaintenance and measures them
+again. The SQL is captured from DatabaseService, exactly as the API runs
+it, and run under EXPLAIN (ANALYZE, BUFFERS). The report gives server-side
+execution time, the partitions scanned out of those attached, and the
+shared buffers touched. Client-side ORM time is left out, since
+partitioning doesn't change it.
+
+    cd backend && python -m benchmarks.partitioning --url postgresql://postgres@localhost/bench --articles 1000000
+"""
+import argparse
+import json
+import statistics
+import sys
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import make_engine
+from app.models.database import NewsArticle
+from app.services.database_service import DatabaseService
+from app.services.partition_maintenance import PartitionMaintenance
+from benchmarks.corpus import generate_corpus
+from benchmarks.suite import percentile
+
+def capture_statements(engine, call: Callable) -> List[Tuple[str, object]]:
+    """SELECTs on news_articles issued while running call()"""
+    captured = []
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "news_articles" in statement:
+            captured.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return captured
+
+def plan_stats(plan: Dict) -> Dict:
+    """Tables scanned, shared buffers and execution time from one EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)"""
+    relations = set()
+    def walk(node):
+        # Partitions pruned at plan time don't appear at all, pruned at run time they are "never executed"
+        if "Relation Name" in node and node.get("Actual Loops", 1):
+            relations.add(node["Relation Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+    walk(plan["Plan"])
+    return {
+        "relations": relations,
+        "shared_buffers": plan["Plan"].get("Shared Hit Blocks", 0) + plan["Plan"].get("Shared Read Blocks", 0),
+        "execution_ms": plan["Execution Time"]
+    }
+
+def measure(engine, queries: Dict[str, Callable], repeat: int, label: str, partitions: int) -> List[Dict]:
+    results = []
+    for name, query in queries.items():
+        statements = capture_statements(engine, query)
+        samples, relations, buffers = [], set(), 0
+        with engine.connect() as connection:
+            for i in range(repeat + 1):
+                elapsed = 0.0
+                for statement, parameters in statements:
+                    stats = plan_stats(connection.exec_driver_sql(
+                        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+                    ).scalar()[0])
+                    elapsed += stats["execution_ms"]
+                    relations |= stats["relations"]
+                    buffers = stats["shared_buffers"] if i == 0 else buffers
+                # The first run warms the cache
+                if i:
+                    samples.append(elapsed)
+        results.append({
+            "layout": label,
+            "name": name,
+            "p50_ms": round(statistics.median(samples), 3),
+            "p95_ms": round(percentile(samples, 0.95), 3),
+            "partitions_scanned": len(relations) if partitions else 0,
+            "partitions": partitions,
+            "shared_buffers": buffers
+        })
+    return results
+
+def vacuum(engine):
+    """Set the visibility map, so both layouts get index-only scans"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("VACUUM ANALYZE news_articles")
+
+def run_benchmark(url: str, articles: int = 1000000, symbols: int = 500, days: int = 365,
+                  repeat: int = 20, skip_corpus: bool = False, log=print) -> Dict:
+    if make_url(url).get_backend_name() != "postgresql":
+        raise ValueError("Partitioning is Postgres only; pass a postgresql:// URL")
+    if not skip_corpus:
+        log(f"Generating {articles:,} articles at {url}...")
+        log(str(generate_corpus(url, articles, symbols, days, log=log)))
+    engine = make_engine(url)
+    service = DatabaseService(sessionmaker(bind=engine))
+    with engine.connect() as connection:
+        # The busiest symbol, where a full index range is most expensive
+        hot = connection.execute(
+            select(NewsArticle.symbol).group_by(NewsArticle.symbol).order_by(func.count().desc()).limit(1)
+        ).scalar()
+    queries = {
+        f"get_stock_sentiment_data.7d.{hot}": lambda: service.get_stock_sentiment_data(hot, days=7),
+        "get_trending_stocks.24h": lambda: service.get_trending_stocks(hours=24)
+    }
+    
+    maintenance = PartitionMaintenance(engine)
+    with engine.connect() as connection:
+        already_partitioned = maintenance.is_partitioned(connection)
+    results = []
+    if not already_partitioned:
+        vacuum(engine)
+        results += measure(engine, queries, repeat, "unpartitioned", 0)
+    started = datetime.now()
+    converted = maintenance.convert_table()
+    report = maintenance.run()
+    log(f"Partition conversion: {converted}, maintenance: {report} in {(datetime.now() - started).total_seconds():.1f}s")
+    vacuum(engine)
+    with engine.connect() as connection:
+        # Monthly partitions plus the default one
+        partitions = len(maintenance.partitions(connection)) + 1
+    results += measure(engine, queries, repeat, "partitioned", partitions)
+    engine.dispose()
+    return {"meta": {"url": make_url(url).render_as_string(hide_password=True), "articles": articles,
+                     "partitions": partitions, "generated_at": datetime.now().isoformat()},
+            "results": results}
+
+def print_results(report: Dict):
+    print(f"{'query':<36} {'layout':<14} {'p50':>10} {'p95':>10} {'partitions':>11} {'buffers':>8}")
+    for row in report["results"]:
+        scanned = f"{row['partitions_scanned']}/{row['partitions']}" if row["partitions"] else "-"
+        print(f"{row['name']:<36} {row['layout']:<14} {row['p50_ms']:>8}ms {row['p95_ms']:>8}ms "
+              f"{scanned:>11} {row['shared_buffers']:>8}")
+
+# Command line entry point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure partition pruning on the recent-window queries")
+    parser.add_argument("--url", required=True, help="Postgres database URL; its news_articles is partitioned")
+    parser.add_argument("--skip-corpus", action="store_true", help="Reuse the corpus already at --url")
+    parser.add_argument("--articles", type=int, default=1000000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per query")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+    
+    report = run_benchmark(args.url, args.articles, args.symbols, args.days, args.repeat, args.skip_corpus,
+                           log=lambda message: print(message, file=sys.stderr))
+    print_results(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,346 @@
+"""
+Benchmark suite: analyzer throughput, ingest rate, DatabaseService queries and API endpoints
+
+Builds (or reuses) a synthetic corpus from benchmarks.corpus, points the app's
+session factories at it, and times each layer separately so a regression can
+be traced to the analyzer, the ingest path, a single query or the HTTP layer.
+Results are written as JSON keyed by commit; --compare prints the change
+against an earlier run.
+    
+    cd backend && python -m benchmarks.suite --articles 100000 --output results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.suite --url sqlite:///bench.db --skip-corpus --compare results/old.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core import response_cache
+from app.core.database import AsyncSessionLocal, SessionLocal, async_url, make_async_engine, make_engine
+from app.ml.sentiment_analyzer import SentimentAnalyzer
+from app.models.database import NewsArticle
+from app.services.async_database_service import AsyncDatabaseService
+from app.services.database_service import DatabaseService
+from benchmarks.corpus import generate_corpus, sample_texts
+
+BACKENDS = ["vader", "textblob", "finbert"]
+GROUPS = ["analyzer", "queries", "endpoints", "ingest"]
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def timed(fn: Callable, repeat: int) -> List[float]:
+    """Milliseconds per call, after one untimed warm-up call"""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def latency_result(group: str, name: str, samples: List[float]) -> Dict:
+    return {
+        "group": group,
+        "name": name,
+        "unit": "ms",
+        "value": round(statistics.median(samples), 3),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(percentile(samples, 0.95), 3),
+        "n": len(samples)
+    }
+
+def rate_result(group: str, name: str, unit: str, count: int, seconds: float) -> Dict:
+    return {"group": group, "name": name, "unit": unit, "value": round(count / seconds, 1), "n": count}
+
+# Analyzer
+
+def bench_analyzer(backends: List[str], texts: int, log=print) -> List[Dict]:
+    results = []
+    corpus = sample_texts(texts, seed=1)
+    for backend in backends:
+        analyzer = SentimentAnalyzer(model_type=backend)
+        if analyzer.model_type != backend:
+            # FinBERT falls back to VADER when transformers or the weights are missing
+            log(f"  analyzer/{backend}: unavailable, fell back to {analyzer.model_type}")
+            results.append({"group": "analyzer", "name": backend, "unit": "texts/s", "value": None,
+                            "skipped": f"fell back to {analyzer.model_type}"})
+            continue
+        analyzer.analyze_batch(corpus[:32])
+        start = time.perf_counter()
+        analyzer.analyze_batch(corpus)
+        results.append(rate_result("analyzer", f"{backend}.batch", "texts/s", texts, time.perf_counter() - start))
+        singles = corpus[:max(1, texts // 10)]
+        start = time.perf_counter()
+        for text in singles:
+            analyzer.analyze_text(text)
+        results.append(rate_result("analyzer", f"{backend}.single", "texts/s", len(singles), time.perf_counter() - start))
+    return results
+
+# Ingest
+
+def bench_ingest(service: DatabaseService, batches: int, batch_size: int = 100) -> List[Dict]:
+    """store_news_articles with NewsAPI-shaped payloads, half of each batch already stored"""
+    stamp = int(time.time() * 1000)
+    published = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    stored = 0
+    start = time.perf_counter()
+    for batch in range(batches):
+        # Refreshes mostly re-see articles from the previous fetch
+        first = batch * batch_size // 2
+        articles = [
+            {
+                "title": f"BENCH ingest article {i}",
+                "description": "Synthetic ingest benchmark article.",
+                "url": f"https://ingest.example/{stamp}/{i}",
+                "publishedAt": published,
+                "source": {"name": "Benchmark"},
+                "author": "Benchmark Desk"
+            }
+            for i in range(first, first + batch_size)
+        ]
+        # store_news_articles prints a line per call
+        with contextlib.redirect_stdout(io.StringIO()):
+            stored += service.store_news_articles("BENCH", {"articles": articles})
+    seconds = time.perf_counter() - start
+    return [
+        rate_result("ingest", "store_news_articles.offered", "articles/s", batches * batch_size, seconds),
+        rate_result("ingest", "store_news_articles.inserted", "articles/s", stored, seconds)
+    ]
+
+# Queries
+
+def hot_and_cold_symbols(session_factory) -> List[str]:
+    db = session_factory()
+    try:
+        counts = db.execute(
+            select(NewsArticle.symbol, func.count()).group_by(NewsArticle.symbol).order_by(func.count().desc())
+        ).all()
+    finally:
+        db.close()
+    if not counts:
+        raise SystemExit("Corpus is empty; drop --skip-corpus")
+    return [counts[0][0], counts[len(counts) // 2][0]]
+
+def bench_queries(service: DatabaseService, async_factory, symbols: List[str], repeat: int) -> List[Dict]:
+    hot, tail = symbols
+    results = []
+    sync_queries = {
+        "get_stock_sentiment_data.hot": lambda: service.get_stock_sentiment_data(hot, days=30),
+        "get_stock_sentiment_data.tail": lambda: service.get_stock_sentiment_data(tail, days=30),
+        "get_trending_stocks": lambda: service.get_trending_stocks(hours=24 * 7),
+        "get_sentiment_stats": service.get_sentiment_stats,
+        "get_unanalyzed_articles": lambda: service.get_unanalyzed_articles(limit=100),
+        "iter_articles.tail": lambda: sum(len(rows) for rows in service.iter_articles(symbols=[tail]))
+    }
+    for name, query in sync_queries.items():
+        results.append(latency_result("queries", f"sync.{name}", timed(query, repeat)))
+    
+    since = datetime.now() - timedelta(days=30)
+    async_queries = {
+        "get_stock_sentiment_data.hot": lambda db: db.get_stock_sentiment_data(hot, days=30),
+        "get_sentiment_distribution.hot": lambda db: db.get_sentiment_distribution(hot, days=30),
+        "get_trending_stocks": lambda db: db.get_trending_stocks(hours=24 * 7),
+        "get_sentiment_stats": lambda db: db.get_sentiment_stats(),
+        "get_articles_page.hot": lambda db: db.get_articles_page(hot, since, 21),
+        "get_tracked_stocks": lambda db: db.get_tracked_stocks(),
+        "search_articles.phrase": lambda db: db.search_articles('"guidance cut"', limit=21),
+        "search_articles.tail": lambda db: db.search_articles("guidance", symbols=[tail], limit=21)
+    }
+    
+    async def run_async(query) -> List[float]:
+        samples = []
+        for i in range(repeat + 1):
+            async with async_factory() as session:
+                start = time.perf_counter()
+                await query(AsyncDatabaseService(session))
+                if i:
+                    samples.append((time.perf_counter() - start) * 1000)
+        return samples
+    
+    for name, query in async_queries.items():
+        results.append(latency_result("queries", f"async.{name}", asyncio.run(run_async(query))))
+    return results
+
+# Endpoints
+
+def bench_endpoints(symbols: List[str], repeat: int) -> List[Dict]:
+    from app.api import analytics, sentiment, stocks
+    app = FastAPI()
+    app.include_router(sentiment.router, prefix="/api/sentiment")
+    app.include_router(stocks.router, prefix="/api/stocks")
+    app.include_router(analytics.router, prefix="/api/analytics")
+    client = TestClient(app)
+    hot, tail = symbols
+    paths = [
+        f"/api/sentiment/stock/{hot}?days=30",
+        f"/api/sentiment/stock/{tail}?days=30",
+        f"/api/sentiment/stock/{hot}/articles?days=30",
+        "/api/sentiment/trending",
+        "/api/sentiment/summary",
+        "/api/stocks/list",
+        f"/api/sentiment/export?symbols={tail}",
+        "/api/sentiment/search?q=regulators%20investigation",
+        "/api/analytics/correlation?days=365"
+    ]
+    cache = response_cache.get_response_cache()
+    results = []
+    for path in paths:
+        def cold():
+            cache.invalidate([response_cache.GLOBAL_TAG, response_cache.symbol_tag(hot), response_cache.symbol_tag(tail)])
+            response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code, response.text[:200])
+            return response
+        
+        results.append(latency_result("endpoints", f"GET {path}", timed(cold, repeat)))
+        if client.get(path).headers.get("X-Cache") == "HIT":
+            results.append(latency_result("endpoints", f"GET {path} (cached)", timed(lambda: client.get(path), repeat)))
+    return results
+
+# Reporting
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(url: Optional[str] = None, articles: int = 10000, symbols: int = 200, days: int = 365,
+              groups: Optional[List[str]] = None, backends: Optional[List[str]] = None, repeat: int = 20,
+              texts: int = 500, skip_corpus: bool = False, log=print) -> Dict:
+    """Run the selected groups against `url` (a fresh temporary SQLite corpus by default)"""
+    groups = groups or GROUPS
+    tmp = None
+    if url is None:
+        tmp = tempfile.mkdtemp(prefix="bench-")
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    
+    meta = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": url.split("://")[0],
+        "scale": {"articles": articles, "symbols": symbols, "days": days},
+        "repeat": repeat
+    }
+    results = []
+    if "analyzer" in groups:
+        log("Analyzer throughput...")
+        results += bench_analyzer(backends or BACKENDS, texts, log=log)
+    
+    database_groups = [group for group in groups if group != "analyzer"]
+    if not database_groups:
+        return {"meta": meta, "results": results}
+    
+    if not skip_corpus:
+        log(f"Generating corpus: {articles:,} articles, {symbols} symbols, {days} days...")
+        meta["corpus"] = generate_corpus(url, articles, symbols, days, log=lambda message: None)
+    
+    engine = make_engine(url)
+    async_engine = make_async_engine(async_url(url))
+    original_binds = (SessionLocal.kw["bind"], AsyncSessionLocal.kw["bind"])
+    SessionLocal.configure(bind=engine)
+    AsyncSessionLocal.configure(bind=async_engine)
+    original_cache = response_cache._response_cache
+    response_cache._response_cache = response_cache.ResponseCache(redis_url=None)
+    try:
+        service = DatabaseService(sessionmaker(bind=engine))
+        hot_tail = hot_and_cold_symbols(service.session_factory)
+        meta["symbols"] = {"hot": hot_tail[0], "tail": hot_tail[1]}
+        if "queries" in groups:
+            log("DatabaseService queries...")
+            results += bench_queries(service, AsyncSessionLocal, hot_tail, repeat)
+        if "endpoints" in groups:
+            log("API endpoints...")
+            results += bench_endpoints(hot_tail, repeat)
+        # Last, since it adds rows the read benchmarks would otherwise see
+        if "ingest" in groups:
+            log("Ingest...")
+            results += bench_ingest(service, batches=repeat)
+    finally:
+        response_cache._response_cache = original_cache
+        SessionLocal.configure(bind=original_binds[0])
+        AsyncSessionLocal.configure(bind=original_binds[1])
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return {"meta": meta, "results": results}
+
+def compare(old: Dict, new: Dict) -> List[Dict]:
+    """Per-benchmark change; positive `change_pct` is always an improvement"""
+    previous = {(r["group"], r["name"]): r for r in old["results"]}
+    rows = []
+    for result in new["results"]:
+        before = previous.get((result["group"], result["name"]))
+        if not before or not before.get("value") or not result.get("value"):
+            continue
+        ratio = result["value"] / before["value"]
+        # Latencies improve downwards, throughputs upwards
+        change = (1 / ratio - 1) if result["unit"] == "ms" else (ratio - 1)
+        rows.append({"group": result["group"], "name": result["name"], "unit": result["unit"],
+                     "before": before["value"], "after": result["value"], "change_pct": round(change * 100, 1)})
+    return rows
+
+def print_results(report: Dict):
+    print(f"{'benchmark':<62} {'value':>12} {'unit':<10} {'p95':>10}")
+    for result in report["results"]:
+        value = "skipped" if result.get("value") is None else f"{result['value']:,}"
+        p95 = f"{result['p95_ms']}ms" if "p95_ms" in result else ""
+        print(f"{result['group'] + '/' + result['name']:<62} {value:>12} {result['unit']:<10} {p95:>10}")
+
+def print_comparison(rows: List[Dict], old_commit: Optional[str]):
+    print(f"\nChange since {old_commit or 'baseline'} (positive is better):")
+    for row in rows:
+        print(f"{row['group'] + '/' + row['name']:<62} {row['before']:>10} -> {row['after']:<10} {row['change_pct']:+.1f}%")
+
+# Command line entry point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and emit JSON results")
+    parser.add_argument("--url", help="Database URL (default: a temporary SQLite file)")
+    parser.add_argument("--skip-corpus", action="store_true", help="Reuse the corpus already at --url")
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--groups", default=",".join(GROUPS), help=f"Comma separated subset of {','.join(GROUPS)}")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Analyzer backends to measure")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per query or endpoint")
+    parser.add_argument("--texts", type=int, default=500, help="Texts per analyzer batch")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Earlier JSON report to diff against")
+    args = parser.parse_args()
+    # TestClient logs every request through httpx
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    
+    report = run_suite(args.url, args.articles, args.symbols, args.days, args.groups.split(","),
+                       args.backends.split(","), args.repeat, args.texts, args.skip_corpus,
+                       log=lambda message: print(message, file=sys.stderr))
+    print_results(report)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        print_comparison(compare(old, report), old["meta"].get("commit"))
@@ -0,0 +1,142 @@
+"""
+Local stand-in for the NewsAPI /v2/everything and /v2/top-headlines endpoints
+
+Articles are synthetic but stable: each symbol gets one new article every
+--article-interval seconds, so repeated refreshes find a few new URLs the
+way the real feed does. Latency and failures are injected per request.
+
+    cd backend && python -m loadtest.fake_newsapi --port 8081 --latency-ms 120 --error-rate 0.02
+    NEWS_API_BASE_URL=http://127.0.0.1:8081/v2 NEWS_API_KEY=loadtest uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import random
+import re
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+import uvicorn
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+HEADLINES = [
+    "{symbol} shares surge after earnings beat expectations",
+    "{symbol} slides as regulators open investigation",
+    "Analysts reiterate neutral rating on {symbol}",
+    "{symbol} announces record buyback and raises dividend",
+    "{symbol} misses revenue estimates, guidance cut",
+    "{symbol} trading flat ahead of Fed decision",
+    "{symbol} unveils new product line to strong reviews",
+    "Lawsuit weighs on {symbol} as investors turn cautious",
+]
+SOURCES = ["Reuters", "Bloomberg", "MarketWatch", "CNBC", "Barron's"]
+
+class FaultInjector:
+    """Added latency (fixed + uniform jitter) and a failure rate shared by the fake upstreams"""
+    
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+    
+    def delay(self) -> float:
+        return (self.latency_ms + self.rng.uniform(0, self.jitter_ms)) / 1000.0
+    
+    def should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            failed = self.rng.random() < self.error_rate
+            self.failures += failed
+            return failed
+
+def _stable_index(*parts, modulo: int) -> int:
+    return zlib.crc32(":".join(str(part) for part in parts).encode()) % modulo
+
+def make_article(symbol: str, slot: int, interval: float) -> dict:
+    published = datetime.fromtimestamp(slot * interval, tz=timezone.utc)
+    return {
+        "source": {"id": None, "name": SOURCES[_stable_index(symbol, slot, "source", modulo=len(SOURCES))]},
+        "author": "Load Test Desk",
+        "title": HEADLINES[_stable_index(symbol, slot, modulo=len(HEADLINES))].format(symbol=symbol),
+        "description": f"Synthetic coverage of {symbol} for load testing.",
+        "url": f"https://fake-news.local/{symbol}/{slot}",
+        "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "content": None
+    }
+
+def create_app(faults: FaultInjector = None, article_interval: float = 600.0) -> FastAPI:
+    faults = faults or FaultInjector()
+    app = FastAPI(title="Fake NewsAPI")
+    app.state.faults = faults
+    
+    async def respond(api_key, build):
+        await asyncio.sleep(faults.delay())
+        if not api_key:
+            return JSONResponse({"status": "error", "code": "apiKeyMissing"}, status_code=401)
+        if faults.should_fail():
+            # Mostly rate limiting, like the real free tier, with the odd server error
+            status = 429 if faults.rng.random() < 0.7 else 500
+            return JSONResponse({"status": "error", "code": "injectedFailure"}, status_code=status)
+        articles = build()
+        return {"status": "ok", "totalResults": len(articles), "articles": articles}
+    
+    @app.get("/v2/everything")
+    async def everything(q: str = "", pageSize: int = Query(20, le=100), apiKey: str = None):
+        match = re.search(r'"?([A-Za-z.\-]{1,10})"?', q)
+        symbol = match.group(1).upper() if match else "MARKET"
+        # Different query phrasings overlap, as they do upstream
+        offset = _stable_index(q, modulo=3)
+        
+        def build():
+            newest = int(time.time() // article_interval)
+            return [make_article(symbol, newest - offset - i, article_interval) for i in range(pageSize)]
+        
+        return await respond(apiKey, build)
+    
+    @app.get("/v2/top-headlines")
+    async def top_headlines(category: str = "business", pageSize: int = Query(20, le=100), apiKey: str = None):
+        def build():
+            newest = int(time.time() // article_interval)
+            return [make_article("MARKET", newest - i, article_interval) for i in range(pageSize)]
+        
+        return await respond(apiKey, build)
+    
+    @app.get("/stats")
+    def stats():
+        return {"requests": faults.requests, "failures": faults.failures}
+    
+    return app
+
+def serve_in_thread(app, host: str = "127.0.0.1", port: int = 0):
+    """Run an ASGI app with uvicorn on a background thread; returns (server, thread, base_url)"""
+    if not port:
+        sock = socket.socket()
+        sock.bind((host, 0))
+        port = sock.getsockname()[1]
+        sock.close()
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.02)
+    return server, thread, f"http://{host}:{port}"
+
+# Command line entry point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake NewsAPI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--article-interval", type=float, default=600.0, help="Seconds between new articles per symbol")
+    args = parser.parse_args()
+    faults = FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate)
+    uvicorn.run(create_app(faults, args.article_interval), host=args.host, port=args.port)
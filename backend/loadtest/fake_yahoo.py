@@ -0,0 +1,100 @@
+"""
+In-process stand-in for the yfinance data used by StockService and PriceStore
+
+yfinance scrapes several Yahoo endpoints with cookies and crumbs, so rather
+than faking them over HTTP this replaces the Ticker object and the bulk
+downloader. Prices are a deterministic random walk per symbol; latency and
+failures come from the same FaultInjector as the fake NewsAPI.
+
+    from app.services.stock_service import set_ticker_factory
+    set_ticker_factory(FakeYahoo(FaultInjector(latency_ms=150, error_rate=0.01)))
+"""
+import time
+import zlib
+from datetime import date, timedelta
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from app.services.price_store import PriceDataProvider, period_start
+from loadtest.fake_newsapi import FaultInjector
+
+class UpstreamError(Exception):
+    """Injected yfinance failure"""
+
+def price_history(symbol: str, start: date, end: date) -> pd.DataFrame:
+    """Business-day OHLCV bars from a random walk seeded by the symbol"""
+    days = pd.bdate_range(start, end)
+    if len(days) == 0:
+        return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+    # Seed from the walk's origin so overlapping ranges agree
+    origin = pd.Timestamp("2000-01-03")
+    offset = len(pd.bdate_range(origin, days[0])) - 1
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    base = 20 + zlib.crc32(symbol.encode()) % 400
+    steps = rng.normal(0.0003, 0.015, offset + len(days))
+    closes = base * np.exp(np.cumsum(steps))[offset:]
+    opens = closes * (1 + rng.normal(0, 0.004, len(days)))
+    frame = pd.DataFrame({
+        "Open": opens,
+        "High": np.maximum(opens, closes) * 1.006,
+        "Low": np.minimum(opens, closes) * 0.994,
+        "Close": closes,
+        "Volume": rng.integers(1_000_000, 50_000_000, len(days))
+    }, index=days)
+    frame.index.name = "Date"
+    return frame
+
+class FakeTicker:
+    def __init__(self, symbol: str, faults: FaultInjector):
+        self.symbol = symbol.upper()
+        self.faults = faults
+    
+    def _call(self):
+        time.sleep(self.faults.delay())
+        if self.faults.should_fail():
+            raise UpstreamError(f"Injected yfinance failure for {self.symbol}")
+    
+    @property
+    def info(self) -> Dict:
+        self._call()
+        close = float(price_history(self.symbol, date.today() - timedelta(days=7), date.today())["Close"].iloc[-1])
+        return {
+            "symbol": self.symbol,
+            "shortName": f"{self.symbol} Inc.",
+            "longName": f"{self.symbol} Incorporated",
+            "currentPrice": round(close, 2),
+            "regularMarketPrice": round(close, 2),
+            "marketCap": float(zlib.crc32(self.symbol.encode()) % 2000) * 1e9,
+            "trailingPE": 12 + zlib.crc32(self.symbol.encode()) % 30,
+            "sector": "Technology",
+            "industry": "Software",
+            "longBusinessSummary": f"{self.symbol} is a synthetic company used for load testing."
+        }
+    
+    def history(self, period: str = "1mo") -> pd.DataFrame:
+        self._call()
+        end = date.today()
+        return price_history(self.symbol, period_start(period, end) or end - timedelta(days=31), end)
+
+class FakeYahoo:
+    """Ticker factory for stock_service.set_ticker_factory"""
+    
+    def __init__(self, faults: FaultInjector = None):
+        self.faults = faults or FaultInjector()
+    
+    def __call__(self, symbol: str) -> FakeTicker:
+        return FakeTicker(symbol, self.faults)
+
+class FakePriceProvider(PriceDataProvider):
+    """Bulk downloader for PriceStore(provider=...); one injected delay per batch, like yf.download"""
+    
+    def __init__(self, faults: FaultInjector = None):
+        self.faults = faults or FaultInjector()
+    
+    def download(self, symbols: List[str], start: date, end: date) -> Dict[str, pd.DataFrame]:
+        time.sleep(self.faults.delay())
+        if self.faults.should_fail():
+            raise UpstreamError(f"Injected yfinance download failure for {len(symbols)} symbols")
+        return {symbol.upper(): price_history(symbol.upper(), start, end) for symbol in symbols}
@@ -0,0 +1,289 @@
+"""
+End-to-end load generator
+
+Starts the fake NewsAPI, swaps yfinance for the fake Ticker source, points
+the API at a fresh SQLite database, serves app.main with uvicorn and
+replays a weighted mix of dashboard reads, news refreshes and sentiment
+analysis calls from asyncio workers. Reports throughput, error counts and
+p50/p95/p99 latency per route.
+
+    cd backend && python -m loadtest.run --duration 30 --concurrency 32
+    python -m loadtest.run --duration 60 --rps 200 --mix dashboard=70,refresh=10,analyze=20 --json out.json
+    python -m loadtest.run --target http://127.0.0.1:8000   # an already running deployment
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest.fake_newsapi import FaultInjector, create_app, serve_in_thread
+from loadtest.fake_yahoo import FakeYahoo
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "META", "GOOGL", "JPM", "XOM", "V",
+           "NFLX", "AMD", "INTC", "DIS", "BA", "KO", "PFE", "WMT", "CRM", "ORCL"]
+
+TEXTS = [
+    "Shares rallied after the company beat earnings estimates",
+    "The stock fell sharply on weak guidance and layoffs",
+    "Analysts expect little change ahead of the Fed meeting",
+    "Record revenue and a raised dividend lifted investor sentiment",
+    "Regulators opened a probe into the accounting practices",
+]
+
+# (route label, method, path template, weight) per traffic category
+SCENARIOS = {
+    "dashboard": [
+        ("GET /api/sentiment/stock/{symbol}", "GET", "/api/sentiment/stock/{symbol}?days=7", 30),
+        ("GET /api/sentiment/stock/{symbol}/articles", "GET", "/api/sentiment/stock/{symbol}/articles?limit=20", 15),
+        ("GET /api/stocks/price/{symbol}", "GET", "/api/stocks/price/{symbol}", 15),
+        ("GET /api/stocks/info/{symbol}", "GET", "/api/stocks/info/{symbol}", 5),
+        ("GET /api/sentiment/trending", "GET", "/api/sentiment/trending", 10),
+        ("GET /api/sentiment/summary", "GET", "/api/sentiment/summary", 10),
+        ("GET /api/stocks/list", "GET", "/api/stocks/list", 5),
+    ],
+    "refresh": [
+        ("POST /api/stocks/refresh/{symbol}", "POST", "/api/stocks/refresh/{symbol}?days_back=1", 1),
+    ],
+    "analyze": [
+        ("POST /api/sentiment/analyze", "POST", "/api/sentiment/analyze", 3),
+        ("POST /api/sentiment/analyze/batch", "POST", "/api/sentiment/analyze/batch", 1),
+    ],
+}
+DEFAULT_MIX = "dashboard=80,refresh=5,analyze=15"
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise ValueError(f"Unknown traffic category {name!r}; choose from {sorted(SCENARIOS)}")
+        weights[name.strip()] = float(weight)
+    return weights
+
+class TrafficMix:
+    """Picks the next request: category by mix weight, route by weight, symbol by popularity"""
+    
+    def __init__(self, mix: Dict[str, float], symbols: List[str], seed: int = 1):
+        self.rng = random.Random(seed)
+        self.routes = []
+        self.weights = []
+        total = sum(mix.values())
+        for category, share in mix.items():
+            route_total = sum(route[3] for route in SCENARIOS[category])
+            for route in SCENARIOS[category]:
+                self.routes.append(route)
+                self.weights.append(share / total * route[3] / route_total)
+        self.symbols = symbols
+        # Zipf-like: a few symbols get most of the dashboard traffic
+        self.symbol_weights = [1.0 / (rank + 1) for rank in range(len(symbols))]
+    
+    def next(self):
+        label, method, template, _ = self.rng.choices(self.routes, self.weights)[0]
+        symbol = self.rng.choices(self.symbols, self.symbol_weights)[0]
+        kwargs = {}
+        if label == "POST /api/sentiment/analyze":
+            kwargs["params"] = {"text": self.rng.choice(TEXTS)}
+        elif label == "POST /api/sentiment/analyze/batch":
+            kwargs["json"] = [self.rng.choice(TEXTS) for _ in range(self.rng.randint(8, 64))]
+        return label, method, template.format(symbol=symbol), kwargs
+
+class RouteStats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+    
+    def record(self, label: str, seconds: float, status: Optional[int]):
+        self.latencies[label].append(seconds)
+        self.statuses[label][str(status) if status else "error"] += 1
+        if status is None or status >= 500 or status == 429:
+            self.errors[label] += 1
+    
+    def report(self, elapsed: float) -> Dict:
+        routes = {}
+        everything = []
+        for label, latencies in sorted(self.latencies.items()):
+            everything.extend(latencies)
+            routes[label] = dict(_summary(latencies, elapsed), errors=self.errors[label],
+                                 statuses=dict(self.statuses[label]))
+        return {"elapsed_s": round(elapsed, 2), "total": dict(_summary(everything, elapsed),
+                                                             errors=sum(self.errors.values())), "routes": routes}
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+def _summary(latencies: List[float], elapsed: float) -> Dict:
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"requests": 0, "rps": 0.0}
+    return {
+        "requests": len(ordered),
+        "rps": round(len(ordered) / elapsed, 1),
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 1),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 1),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 1)
+    }
+
+async def generate(base_url: str, mix: TrafficMix, duration: float, concurrency: int,
+                   rps: float = 0.0) -> Dict:
+    """Closed loop with `concurrency` workers, or open loop at `rps` when given"""
+    stats = RouteStats()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    started = time.perf_counter()
+    deadline = started + duration
+    
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def one():
+            label, method, path, kwargs = mix.next()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = None
+            stats.record(label, time.perf_counter() - start, status)
+        
+        if rps > 0:
+            # Open loop: arrivals on a fixed schedule regardless of response times
+            pending = set()
+            semaphore = asyncio.Semaphore(concurrency)
+            interval = 1.0 / rps
+            next_at = started
+            while next_at < deadline:
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+                await semaphore.acquire()
+                task = asyncio.create_task(one())
+                task.add_done_callback(lambda done: (semaphore.release(), pending.discard(done)))
+                pending.add(task)
+                next_at += interval
+            await asyncio.gather(*pending)
+        else:
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await one()
+            
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+    
+    return stats.report(time.perf_counter() - started)
+
+def start_local_stack(tmp: str, symbols: List[str], news_faults: FaultInjector, yahoo_faults: FaultInjector):
+    """Fake upstreams plus app.main on a fresh SQLite database; returns (base_url, servers)"""
+    news_server, news_thread, news_url = serve_in_thread(create_app(news_faults, article_interval=60.0))
+    os.environ["NEWS_API_BASE_URL"] = f"{news_url}/v2"
+    os.environ["NEWS_API_KEY"] = "loadtest"
+    os.environ.setdefault("SENTIMENT_MODEL", "vader")
+    
+    from app.core.database import AsyncSessionLocal, Base, SessionLocal, async_url, make_async_engine, make_engine
+    from app.main import app
+    from app.models.database import StockInfo
+    from app.services.refresh_scheduler import RefreshScheduler, set_scheduler
+    from app.services.stock_service import set_ticker_factory
+    
+    url = f"sqlite:///{os.path.join(tmp, 'loadtest.db')}"
+    engine = make_engine(url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal.configure(bind=engine)
+    AsyncSessionLocal.configure(bind=make_async_engine(async_url(url)))
+    db = SessionLocal()
+    db.add_all([StockInfo(symbol=symbol, name=f"{symbol} Incorporated") for symbol in symbols])
+    db.commit()
+    db.close()
+    set_ticker_factory(FakeYahoo(yahoo_faults))
+    # The fake NewsAPI has no quota, so refresh traffic shouldn't be turned away by the budget
+    set_scheduler(RefreshScheduler(daily_quota=10 ** 9))
+    
+    app_server, app_thread, app_url = serve_in_thread(app)
+    return app_url, [(app_server, app_thread), (news_server, news_thread)]
+
+def warm_up(base_url: str, symbols: List[str], timeout: float = 60.0):
+    """Refresh every symbol once so dashboard reads have articles to aggregate"""
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        jobs = [client.post(f"/api/stocks/refresh/{symbol}?days_back=1").json()["job_id"] for symbol in symbols]
+        deadline = time.time() + timeout
+        for job_id in jobs:
+            while time.time() < deadline:
+                if client.get(f"/api/stocks/jobs/{job_id}").json().get("status") in ("succeeded", "failed"):
+                    break
+                time.sleep(0.1)
+
+def print_report(report: Dict):
+    print(f"{'route':<46} {'reqs':>7} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for label, route in list(report["routes"].items()) + [("TOTAL", report["total"])]:
+        print(f"{label:<46} {route['requests']:>7} {route['rps']:>7} {route.get('p50_ms', '-'):>6}ms"
+              f" {route.get('p95_ms', '-'):>6}ms {route.get('p99_ms', '-'):>6}ms {route['errors']:>7}")
+
+def run(duration: float = 30.0, concurrency: int = 32, rps: float = 0.0, mix: str = DEFAULT_MIX,
+        symbols: int = 10, target: Optional[str] = None, news_latency_ms: float = 120.0,
+        news_error_rate: float = 0.02, yahoo_latency_ms: float = 150.0, yahoo_error_rate: float = 0.01,
+        warm: bool = True) -> Dict:
+    chosen = SYMBOLS[:symbols]
+    traffic = TrafficMix(parse_mix(mix), chosen)
+    if target:
+        return asyncio.run(generate(target, traffic, duration, concurrency, rps))
+    
+    news_faults = FaultInjector(news_latency_ms, news_latency_ms / 2, news_error_rate, seed=2)
+    yahoo_faults = FaultInjector(yahoo_latency_ms, yahoo_latency_ms / 2, yahoo_error_rate, seed=3)
+    from app.core.database import AsyncSessionLocal, SessionLocal
+    original_binds = (SessionLocal.kw["bind"], AsyncSessionLocal.kw["bind"])
+    original_env = {name: os.environ.get(name) for name in ("NEWS_API_BASE_URL", "NEWS_API_KEY", "SENTIMENT_MODEL")}
+    with tempfile.TemporaryDirectory() as tmp:
+        base_url, servers = start_local_stack(tmp, chosen, news_faults, yahoo_faults)
+        try:
+            if warm:
+                warm_up(base_url, chosen)
+            report = asyncio.run(generate(base_url, traffic, duration, concurrency, rps))
+        finally:
+            from app.services.job_queue import get_job_queue
+            from app.services.refresh_scheduler import set_scheduler
+            from app.services.stock_service import set_ticker_factory
+            get_job_queue().wait(30)
+            set_ticker_factory(None)
+            set_scheduler(None)
+            for server, thread in servers:
+                server.should_exit = True
+                thread.join()
+            SessionLocal.kw["bind"].dispose()
+            SessionLocal.configure(bind=original_binds[0])
+            AsyncSessionLocal.configure(bind=original_binds[1])
+            for name, value in original_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+    report["upstream"] = {
+        "newsapi": {"requests": news_faults.requests, "injected_failures": news_faults.failures},
+        "yfinance": {"requests": yahoo_faults.requests, "injected_failures": yahoo_faults.failures}
+    }
+    return report
+
+# Command line entry point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay dashboard, refresh and analyze traffic against the API")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--concurrency", type=int, default=32, help="Workers (closed loop) or max in flight (open loop)")
+    parser.add_argument("--rps", type=float, default=0.0, help="Open-loop arrival rate; 0 runs closed loop")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Traffic weights per category")
+    parser.add_argument("--symbols", type=int, default=10, help=f"Symbols in play (max {len(SYMBOLS)})")
+    parser.add_argument("--target", help="Base URL of a running API instead of the in-process stack")
+    parser.add_argument("--news-latency-ms", type=float, default=120.0)
+    parser.add_argument("--news-error-rate", type=float, default=0.02)
+    parser.add_argument("--yahoo-latency-ms", type=float, default=150.0)
+    parser.add_argument("--yahoo-error-rate", type=float, default=0.01)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+    
+    report = run(args.duration, args.concurrency, args.rps, args.mix, args.symbols, args.target,
+                 args.news_latency_ms, args.news_error_rate, args.yahoo_latency_ms, args.yahoo_error_rate)
+    print_report(report)
+    if "upstream" in report:
+        print(f"Upstream calls: {report['upstream']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
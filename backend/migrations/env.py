@@ -0,0 +1,75 @@
+"""Alembic environment: migrates DATABASE_URL towards the ORM models in app.models.database"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.database import DATABASE_URL
+from app.core.search_index import is_search_index_object
+from app.models.database import Base
+from app.services.partition_maintenance import PARTITIONED_INDEXES, PartitionMaintenance, is_partition_table
+
+config = context.config
+if config.config_file_name is not None:
+    # Keep the application's loggers when migrations run from init_db
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+def include_name(name, type_, parent_names):
+    # The full-text index and the news_articles partitions are managed outside the models
+    if type_ == "table" and is_partition_table(name):
+        return False
+    return not is_search_index_object(name, type_)
+
+def partitioned_index_filter(partitioned: bool):
+    """On a partitioned news_articles, the id and url indexes differ from the model by design"""
+    def include_object(object, name, type_, reflected, compare_to):
+        return not (partitioned and type_ == "index" and name in PARTITIONED_INDEXES)
+    return include_object
+
+def database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or DATABASE_URL
+
+def run_migrations(connection):
+    # Probe on its own connection; a query here would autobegin the transaction Alembic manages
+    with connection.engine.connect() as probe:
+        partitioned = PartitionMaintenance(connection.engine).is_partitioned(probe)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        include_object=partitioned_index_filter(partitioned),
+        # SQLite can't ALTER most things in place, batch mode recreates the table instead
+        render_as_batch=connection.dialect.name == "sqlite",
+        # Migrations that build indexes concurrently commit part way through
+        transaction_per_migration=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_offline():
+    """Emit the SQL to stdout instead of running it (alembic upgrade head --sql)"""
+    context.configure(url=database_url(), target_metadata=target_metadata, include_name=include_name,
+                      literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    # Callers such as init_db can pass an open connection through the config
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+    engine = create_engine(database_url(), poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            run_migrations(connection)
+    finally:
+        engine.dispose()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
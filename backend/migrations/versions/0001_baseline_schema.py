@@ -0,0 +1,166 @@
+"""Baseline schema, as created by Base.metadata.create_all before migrations existed
+
+Databases created that way are adopted with `alembic stamp 0001` (init_db
+does this automatically) and then upgraded like any other.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# The full-text index as app.core.search_index defined it at this revision,
+# copied here so later edits to that module leave this migration alone
+FTS_TABLE = "news_articles_fts"
+
+SQLITE_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS news_articles_fts USING fts5(
+        title, content, symbol,
+        content='news_articles', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS news_articles_fts_insert AFTER INSERT ON news_articles BEGIN
+        INSERT INTO news_articles_fts(rowid, title, content, symbol) VALUES (new.id, new.title, new.content, new.symbol);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS news_articles_fts_delete AFTER DELETE ON news_articles BEGIN
+        INSERT INTO news_articles_fts(news_articles_fts, rowid, title, content, symbol)
+        VALUES ('delete', old.id, old.title, old.content, old.symbol);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS news_articles_fts_update AFTER UPDATE OF title, content, symbol ON news_articles BEGIN
+        INSERT INTO news_articles_fts(news_articles_fts, rowid, title, content, symbol)
+        VALUES ('delete', old.id, old.title, old.content, old.symbol);
+        INSERT INTO news_articles_fts(rowid, title, content, symbol) VALUES (new.id, new.title, new.content, new.symbol);
+    END""",
+]
+
+POSTGRES_SEARCH_DDL = [
+    """ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(content, '')), 'B')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_news_articles_search_vector ON news_articles USING GIN (search_vector)",
+]
+
+def create_search_index():
+    # news_articles was just created, so there is nothing to backfill
+    ddl = {"sqlite": SQLITE_SEARCH_DDL, "postgresql": POSTGRES_SEARCH_DDL}.get(op.get_context().dialect.name, [])
+    for statement in ddl:
+        op.execute(statement)
+
+def upgrade():
+    op.create_table(
+        "news_articles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("symbol", sa.String(10), nullable=False),
+        sa.Column("title", sa.String(500), nullable=False),
+        sa.Column("content", sa.Text()),
+        sa.Column("url", sa.String(1000)),
+        sa.Column("published_at", sa.DateTime()),
+        sa.Column("sentiment_score", sa.Float(), nullable=True),
+        sa.Column("sentiment_label", sa.String(20), nullable=True),
+        sa.Column("source", sa.String(100)),
+        sa.Column("author", sa.String(200)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index("ix_news_articles_id", "news_articles", ["id"])
+    op.create_index("ix_news_articles_symbol", "news_articles", ["symbol"])
+    op.create_index("ix_news_articles_url", "news_articles", ["url"], unique=True)
+    op.create_index("ix_news_articles_published_at", "news_articles", ["published_at"])
+    op.create_index("idx_symbol_published", "news_articles", ["symbol", "published_at"])
+    op.create_index("idx_sentiment_created", "news_articles", ["sentiment_score", "created_at"])
+    create_search_index()
+    
+    op.create_table(
+        "stock_prices",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("symbol", sa.String(10), nullable=False),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("open_price", sa.Float()),
+        sa.Column("high_price", sa.Float()),
+        sa.Column("low_price", sa.Float()),
+        sa.Column("close_price", sa.Float()),
+        sa.Column("volume", sa.Integer()),
+        sa.Column("adj_close", sa.Float()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index("ix_stock_prices_id", "stock_prices", ["id"])
+    op.create_index("ix_stock_prices_symbol", "stock_prices", ["symbol"])
+    op.create_index("ix_stock_prices_date", "stock_prices", ["date"])
+    op.create_index("idx_symbol_date", "stock_prices", ["symbol", "date"])
+    
+    op.create_table(
+        "stock_info",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("symbol", sa.String(10), nullable=False),
+        sa.Column("name", sa.String(200)),
+        sa.Column("sector", sa.String(100)),
+        sa.Column("industry", sa.String(200)),
+        sa.Column("market_cap", sa.Float()),
+        sa.Column("description", sa.Text()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("last_updated", sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index("ix_stock_info_id", "stock_info", ["id"])
+    op.create_index("ix_stock_info_symbol", "stock_info", ["symbol"], unique=True)
+    
+    op.create_table(
+        "sentiment_summaries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("symbol", sa.String(10), nullable=False),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("avg_sentiment", sa.Float()),
+        sa.Column("article_count", sa.Integer()),
+        sa.Column("positive_count", sa.Integer()),
+        sa.Column("negative_count", sa.Integer()),
+        sa.Column("neutral_count", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index("ix_sentiment_summaries_id", "sentiment_summaries", ["id"])
+    op.create_index("ix_sentiment_summaries_symbol", "sentiment_summaries", ["symbol"])
+    op.create_index("ix_sentiment_summaries_date", "sentiment_summaries", ["date"])
+    op.create_index("idx_symbol_date_summary", "sentiment_summaries", ["symbol", "date"])
+    
+    op.create_table(
+        "sentiment_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("scored_articles", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Float(), nullable=False),
+        sa.Column("positive_count", sa.Integer(), nullable=False),
+        sa.Column("negative_count", sa.Integer(), nullable=False),
+        sa.Column("neutral_count", sa.Integer(), nullable=False),
+        sa.Column("stocks_tracked", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    
+    op.create_table(
+        "symbol_stats",
+        sa.Column("symbol", sa.String(10), primary_key=True),
+        sa.Column("scored_articles", sa.Integer(), nullable=False)
+    )
+    
+    op.create_table(
+        "archived_sentiment",
+        sa.Column("symbol", sa.String(10), primary_key=True),
+        sa.Column("date", sa.DateTime(), primary_key=True),
+        sa.Column("article_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Float(), nullable=False),
+        sa.Column("positive_count", sa.Integer(), nullable=False),
+        sa.Column("negative_count", sa.Integer(), nullable=False),
+        sa.Column("neutral_count", sa.Integer(), nullable=False)
+    )
+
+def downgrade():
+    for table in ("archived_sentiment", "symbol_stats", "sentiment_stats", "sentiment_summaries",
+                  "stock_info", "stock_prices"):
+        op.drop_table(table)
+    if op.get_context().dialect.name == "sqlite":
+        # The triggers go with news_articles, the virtual table does not
+        op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    op.drop_table("news_articles")
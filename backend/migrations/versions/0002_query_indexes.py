@@ -0,0 +1,57 @@
+"""Match the news_articles indexes to the queries the API actually runs
+
+- ix_news_articles_unscored: partial index over the scoring backlog
+  (sentiment_score IS NULL), so the scorer and the backlog gauge stop
+  scanning the whole table for the few percent of rows left to score
+- ix_news_articles_symbol_published: (symbol, published_at) carrying
+  sentiment_score and sentiment_label, so the per-stock sentiment,
+  distribution and article list queries are answered from the index
+- ix_news_articles_published_symbol: published_at first, for /trending and
+  the other all-symbol time range queries
+
+idx_symbol_published and ix_news_articles_symbol are prefixes of the new
+symbol index, ix_news_articles_published_at is a prefix of the new
+published_at index, ix_news_articles_id duplicates the primary key and
+idx_sentiment_created serves no query, so all five are dropped. The table
+is analyzed afterwards: without statistics SQLite tends to scan the whole
+symbol index for GROUP BY symbol instead of searching a time range.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+UNSCORED = sa.text("sentiment_score IS NULL")
+
+def create_index(name, columns, **kw):
+    if op.get_bind().dialect.name == "postgresql":
+        # Build without blocking ingestion writes on a large table
+        with op.get_context().autocommit_block():
+            op.create_index(name, "news_articles", columns, postgresql_concurrently=True, **kw)
+    else:
+        op.create_index(name, "news_articles", columns, **kw)
+
+def upgrade():
+    create_index("ix_news_articles_unscored", ["id"], sqlite_where=UNSCORED, postgresql_where=UNSCORED)
+    create_index("ix_news_articles_symbol_published", ["symbol", "published_at", "sentiment_score", "sentiment_label"])
+    create_index("ix_news_articles_published_symbol", ["published_at", "symbol", "sentiment_score"])
+    for name in ("idx_sentiment_created", "idx_symbol_published", "ix_news_articles_symbol",
+                 "ix_news_articles_published_at", "ix_news_articles_id"):
+        op.drop_index(name, table_name="news_articles")
+    op.execute("ANALYZE news_articles")
+
+def downgrade():
+    op.create_index("ix_news_articles_id", "news_articles", ["id"])
+    op.create_index("ix_news_articles_symbol", "news_articles", ["symbol"])
+    op.create_index("ix_news_articles_published_at", "news_articles", ["published_at"])
+    op.create_index("idx_symbol_published", "news_articles", ["symbol", "published_at"])
+    op.create_index("idx_sentiment_created", "news_articles", ["sentiment_score", "created_at"])
+    for name in ("ix_news_articles_published_symbol", "ix_news_articles_symbol_published", "ix_news_articles_unscored"):
+        op.drop_index(name, table_name="news_articles")
@@ -0,0 +1,71 @@
+"""Seed the sentiment_stats row
+
+apply_score_changes only keeps the global totals current once the single
+stats row exists, and until then every /summary cache miss scans
+news_articles. The row used to come only from the scheduled or CLI
+reconcile, and the scheduler is off by default, so it is now created
+here from whatever is already stored (zeros on a fresh database), along
+with symbol_stats.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Frozen copies of the tables and of the reconcile's totals as of this
+# revision, so later changes to the models or the stats code leave it alone
+STATS_ROW_ID = 1
+
+sentiment_stats = sa.table("sentiment_stats", sa.column("id", sa.Integer))
+symbol_stats = sa.table("symbol_stats", sa.column("symbol", sa.String))
+
+SEED_SYMBOL_STATS = """
+    INSERT INTO symbol_stats (symbol, scored_articles)
+    SELECT symbol, SUM(scored_articles) FROM (
+        SELECT symbol, COUNT(*) AS scored_articles
+        FROM news_articles WHERE sentiment_score IS NOT NULL GROUP BY symbol
+        UNION ALL
+        SELECT symbol, SUM(article_count) FROM archived_sentiment GROUP BY symbol
+    ) AS counts
+    GROUP BY symbol
+"""
+
+SEED_SENTIMENT_STATS = f"""
+    INSERT INTO sentiment_stats (
+        id, scored_articles, score_sum, positive_count, negative_count, neutral_count, stocks_tracked
+    )
+    SELECT {STATS_ROW_ID}, COALESCE(SUM(scored_articles), 0), COALESCE(SUM(score_sum), 0.0),
+           COALESCE(SUM(positive_count), 0), COALESCE(SUM(negative_count), 0), COALESCE(SUM(neutral_count), 0),
+           (SELECT COUNT(*) FROM symbol_stats)
+    FROM (
+        SELECT COUNT(*) AS scored_articles,
+               SUM(sentiment_score) AS score_sum,
+               SUM(CASE WHEN sentiment_label = 'positive' THEN 1 ELSE 0 END) AS positive_count,
+               SUM(CASE WHEN sentiment_label = 'negative' THEN 1 ELSE 0 END) AS negative_count,
+               SUM(CASE WHEN sentiment_label = 'neutral' OR sentiment_label IS NULL THEN 1 ELSE 0 END) AS neutral_count
+        FROM news_articles WHERE sentiment_score IS NOT NULL
+        UNION ALL
+        SELECT SUM(article_count), SUM(score_sum), SUM(positive_count), SUM(negative_count), SUM(neutral_count)
+        FROM archived_sentiment
+    ) AS totals
+"""
+
+def upgrade():
+    # Offline (--sql) runs can't look for an existing row, so they always seed
+    if op.get_context().as_sql or op.get_bind().execute(
+        sa.select(sentiment_stats.c.id).where(sentiment_stats.c.id == STATS_ROW_ID)
+    ).first() is None:
+        op.execute(sa.delete(symbol_stats))
+        op.execute(SEED_SYMBOL_STATS)
+        op.execute(SEED_SENTIMENT_STATS)
+
+def downgrade():
+    op.execute(sa.delete(symbol_stats))
+    op.execute(sa.delete(sentiment_stats).where(sentiment_stats.c.id == STATS_ROW_ID))
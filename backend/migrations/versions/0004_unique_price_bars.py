@@ -0,0 +1,29 @@
+"""One stock_prices bar per symbol and day
+
+PriceStore.upsert_bars used to look up existing bars and then insert the
+missing ones, so two overlapping ingests could both insert the same day.
+Duplicates are collapsed to the most recently written bar, and a unique
+(symbol, date) index replaces idx_symbol_date so upserts can use
+INSERT ... ON CONFLICT.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute(
+        "DELETE FROM stock_prices WHERE id NOT IN (SELECT MAX(id) FROM stock_prices GROUP BY symbol, date)"
+    )
+    op.create_index("uq_stock_prices_symbol_date", "stock_prices", ["symbol", "date"], unique=True)
+    op.drop_index("idx_symbol_date", table_name="stock_prices")
+
+def downgrade():
+    op.create_index("idx_symbol_date", "stock_prices", ["symbol", "date"])
+    op.drop_index("uq_stock_prices_symbol_date", table_name="stock_prices")
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.database import NewsArticle, SentimentSummary, StockPrice
+from app.services.analytics_service import AnalyticsService, Panel, analyze_panel, rolling_correlation
+
+def _synthetic_panel(n_dates, n_symbols, lead=2, seed=7):
+    """Returns respond to sentiment `lead` days later"""
+    rng = np.random.default_rng(seed)
+    sentiment = rng.normal(0, 1, (n_dates, n_symbols))
+    returns = rng.normal(0, 0.01, (n_dates, n_symbols))
+    returns[lead:] += 0.01 * sentiment[:-lead]
+    # Most days have no news
+    sentiment[rng.random((n_dates, n_symbols)) < 0.4] = np.nan
+    dates = np.arange(n_dates).astype("datetime64[D]")
+    counts = np.where(np.isnan(sentiment), 0, 1).astype(float)
+    return Panel(dates, [f"S{i}" for i in range(n_symbols)], returns, sentiment, counts)
+
+def test_rolling_correlation_matches_pandas():
+    print("Testing vectorized rolling correlation against pandas...")
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=(200, 3))
+    y = x * 0.5 + rng.normal(size=(200, 3))
+    x[rng.random((200, 3)) < 0.2] = np.nan
+    ours = rolling_correlation(x, y, window=20, min_periods=10)
+    for j in range(3):
+        expected = pd.Series(x[:, j]).rolling(20, min_periods=10).corr(pd.Series(y[:, j])).values
+        mask = ~np.isnan(expected)
+        assert np.allclose(ours[mask, j], expected[mask], atol=1e-8)
+    print("✓ Matches pandas rolling().corr()")
+
+def test_lead_lag_universe_speed():
+    print("Testing lead/lag analytics on 1,000 symbols × 3 years...")
+    panel = _synthetic_panel(756, 1000)
+    started = time.perf_counter()
+    results = analyze_panel(panel, window=30, max_lag=5)
+    elapsed = time.perf_counter() - started
+    
+    best_lags = [v["best_lag"] for v in results["lead_lag"].values()]
+    assert np.mean(np.array(best_lags) == 2) > 0.95
+    assert max(results["universe_lead_lag"], key=lambda k: results["universe_lead_lag"][k]) == 2
+    assert results["event_study"]["positive"]["events"] > 0
+    assert elapsed < 10
+    print(f"✓ Analyzed universe in {elapsed:.2f}s, sentiment leads returns by 2 days")
+
+def test_panel_from_database():
+    print("Testing panel loading from stored prices and rollups...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'analytics.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        db = session_factory()
+        start = date.today() - timedelta(days=120)
+        days = pd.bdate_range(start, date.today())
+        for i, day in enumerate(days):
+            db.add(StockPrice(symbol="AAPL", date=day.to_pydatetime(), close_price=100 + i, adj_close=100 + i))
+        # A Saturday rollup is credited to the following Monday
+        saturday = next(d for d in pd.date_range(start, periods=7) if d.weekday() == 5)
+        db.add(SentimentSummary(symbol="AAPL", date=saturday.to_pydatetime(), avg_sentiment=0.5, article_count=2))
+        # Articles for a day that is already rolled up are not counted twice
+        db.add(NewsArticle(symbol="AAPL", title="Covered", url="https://example.com/covered",
+                           published_at=saturday.to_pydatetime() + timedelta(hours=10), sentiment_score=-0.9))
+        # A day without a rollup yet is aggregated from its articles
+        uncovered = days[-5]
+        for i, score in enumerate((0.2, 0.4)):
+            db.add(NewsArticle(symbol="AAPL", title=f"Late #{i}", url=f"https://example.com/late/{i}",
+                               published_at=uncovered.to_pydatetime() + timedelta(hours=9), sentiment_score=score))
+        db.commit()
+        db.close()
+        
+        panel = AnalyticsService(session_factory).load_panel(start)
+        assert panel.symbols == ["AAPL"] and len(panel.dates) == len(days)
+        monday = np.datetime64((saturday + pd.Timedelta(days=2)).date(), "D")
+        row = int(np.searchsorted(panel.dates, monday))
+        assert panel.sentiment[row, 0] == 0.5 and panel.article_counts[row, 0] == 2
+        row = int(np.searchsorted(panel.dates, np.datetime64(uncovered.date(), "D")))
+        assert abs(panel.sentiment[row, 0] - 0.3) < 1e-9 and panel.article_counts[row, 0] == 2
+        assert (panel.article_counts > 0).sum() == 2
+        print("✓ Panel aligned to trading days, articles fill the days without rollups")
+
+if __name__ == "__main__":
+    test_rolling_correlation_matches_pandas()
+    test_lead_lag_universe_speed()
+    test_panel_from_database()
@@ -0,0 +1,32 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import sentiment
+
+def test_analyze_batch():
+    print("Testing batch text analysis endpoint...")
+    app = FastAPI()
+    app.include_router(sentiment.router, prefix="/api/sentiment")
+    client = TestClient(app)
+    
+    texts = ["Apple shares soar on record profits", "ok", 42, "Terrible losses, Tesla stock crashes in awful selloff"]
+    response = client.post("/api/sentiment/analyze/batch", json=texts)
+    assert response.status_code == 200
+    body = response.json()
+    results = body["results"]
+    
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert results[0]["sentiment_label"] == "positive" and results[3]["sentiment_label"] == "negative"
+    assert "error" in results[1] and "error" in results[2]
+    assert body["analyzed"] == 2 and body["errors"] == 2
+    
+    # Batched scores match the single-text endpoint
+    single = client.post("/api/sentiment/analyze", params={"text": texts[0]}).json()
+    assert single["sentiment_score"] == results[0]["sentiment_score"]
+    
+    assert client.post("/api/sentiment/analyze/batch", json=[]).status_code == 400
+    too_many = ["Stocks rally"] * (sentiment.ANALYZE_BATCH_MAX_ITEMS + 1)
+    assert client.post("/api/sentiment/analyze/batch", json=too_many).status_code == 413
+    print(f"✓ Batch endpoint scores in order with per-item errors: {results}")
+
+if __name__ == "__main__":
+    test_analyze_batch()
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.api import sentiment
+from app.core.database import Base, SessionLocal
+from app.models.database import NewsArticle, SentimentSummary
+from app.services import article_archive
+from app.services.article_archive import ArticleArchive, RetentionService, iter_all_articles
+from app.services.database_service import DatabaseService
+
+TODAY = date(2024, 6, 15)
+
+def _seed(db_service):
+    rows = []
+    for i in range(60):
+        # Two symbols over Jan-Jun; a few articles per day so daily rollups span delete batches
+        rows.append({"symbol": ["AAPL", "MSFT"][i % 2], "title": f"Story {i}", "url": f"https://x/{i}",
+                     "published_at": datetime(2024, 1, 1, 14) + timedelta(days=i * 3, hours=i % 3),
+                     "content": "Body text"})
+    stored = db_service.store_articles_bulk(rows)
+    db_service.update_article_sentiments([
+        {"id": row["id"], "sentiment_score": round((i % 5 - 2) / 4, 2),
+         "sentiment_label": ["negative", "negative", "neutral", "positive", "positive"][i % 5]}
+        # Leave one old article unscored
+        for i, row in enumerate(stored) if i != 4
+    ])
+    db_service.update_sentiment_summaries((row["symbol"], row["published_at"]) for row in rows)
+
+def _summaries(session_factory):
+    db = session_factory()
+    try:
+        return sorted((s.symbol, s.date, s.avg_sentiment, s.article_count, s.positive_count)
+                      for s in db.query(SentimentSummary))
+    finally:
+        db.close()
+
+def test_retention_and_archive_reads():
+    print("Testing article retention to Parquet...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'archive.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        db_service = DatabaseService(session_factory)
+        _seed(db_service)
+        before_rows = [row for chunk in db_service.iter_articles() for row in chunk]
+        before_summaries = _summaries(session_factory)
+        before_stats = db_service.reconcile_sentiment_stats()
+        
+        archive = ArticleArchive(os.path.join(tmp, "archive"))
+        service = RetentionService(session_factory, archive, retention_days=60, batch_size=4)
+        report = service.run(today=TODAY)
+        # Articles before 2024-04-16 go, except the unscored one
+        db = session_factory()
+        remaining = db.query(NewsArticle).all()
+        db.close()
+        assert report["archived"] == 35 and report["held_back_unscored"] == 1
+        assert len(remaining) == 25 and all(a.published_at >= service.cutoff(TODAY) or a.sentiment_score is None
+                                           for a in remaining)
+        assert archive.months() == ["2024-01", "2024-02", "2024-03", "2024-04"]
+        assert os.path.isdir(os.path.join(archive.root, "month=2024-02", "symbol=MSFT"))
+        
+        # Rollups and stats still count the archived articles, even after being rebuilt
+        assert _summaries(session_factory) == before_summaries
+        db_service.update_sentiment_summaries((s[0], s[1]) for s in before_summaries)
+        assert _summaries(session_factory) == before_summaries
+        assert db_service.reconcile_sentiment_stats() == before_stats
+        
+        # Reads merge both tiers back in order, even with rows archived twice by an interrupted run
+        archive.write("AAPL", datetime(2024, 1, 1), [row for row in before_rows if row["symbol"] == "AAPL"][:3])
+        merged = [row for chunk in iter_all_articles(db_service, archive, chunk_size=7) for row in chunk]
+        assert [row["id"] for row in merged] == [row["id"] for row in before_rows]
+        assert merged[0]["title"] == before_rows[0]["title"] and merged[0]["symbol"] == before_rows[0]["symbol"]
+        march = [row for chunk in iter_all_articles(db_service, archive, symbols=["MSFT"], start=datetime(2024, 3, 1),
+                                                    end=datetime(2024, 4, 1)) for row in chunk]
+        assert march and all(row["symbol"] == "MSFT" and row["published_at"].month == 3 for row in march)
+        
+        assert service.run(today=TODAY)["archived"] == 0
+        print(f"✓ Archived {report['archived']} articles; rollups, stats and ordered reads unchanged")
+        
+        original_bind = SessionLocal.kw["bind"]
+        SessionLocal.configure(bind=engine)
+        article_archive._archive = archive
+        try:
+            app = FastAPI()
+            app.include_router(sentiment.router, prefix="/api/sentiment")
+            exported = TestClient(app).get("/api/sentiment/export", params={"symbols": "AAPL", "start": "2024-01-01"})
+            ids = [json.loads(line)["id"] for line in exported.text.splitlines()]
+            assert ids == [row["id"] for row in before_rows if row["symbol"] == "AAPL"]
+            print(f"✓ Export streams {len(ids)} AAPL articles across the archive and the hot table")
+        finally:
+            article_archive._archive = None
+            SessionLocal.configure(bind=original_bind)
+            engine.dispose()
+
+if __name__ == "__main__":
+    test_retention_and_archive_reads()
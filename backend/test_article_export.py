@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.api import sentiment
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.database import AsyncSessionLocal, Base, SessionLocal
+from app.services.database_service import DatabaseService
+
+def _seed(db_service):
+    base = datetime.now() - timedelta(days=1)
+    rows = []
+    for i in range(25):
+        # Groups of five share a timestamp so pages have to break ties on id
+        rows.append({"symbol": "AAPL", "title": f"Apple {i}", "url": f"https://x/aapl/{i}",
+                     "published_at": base - timedelta(hours=i // 5), "source": "Wire"})
+    rows.append({"symbol": "MSFT", "title": "Microsoft", "url": "https://x/msft/0", "published_at": base})
+    rows.append({"symbol": "AAPL", "title": "Unscored", "url": "https://x/aapl/unscored", "published_at": base})
+    stored = db_service.store_articles_bulk(rows)
+    db_service.update_article_sentiments([
+        {"id": row["id"], "sentiment_score": 0.1, "sentiment_label": "positive"}
+        for row in stored if row["title"] != "Unscored"
+    ])
+
+def test_pagination_and_export():
+    print("Testing keyset pagination and streaming export...")
+    original_bind = SessionLocal.kw["bind"]
+    original_async_bind = AsyncSessionLocal.kw["bind"]
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'export.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal.configure(bind=engine)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'export.db')}")
+        AsyncSessionLocal.configure(bind=async_engine)
+        try:
+            _seed(DatabaseService())
+            app = FastAPI()
+            app.include_router(sentiment.router, prefix="/api/sentiment")
+            client = TestClient(app)
+            
+            seen, cursor, pages = [], None, 0
+            while True:
+                params = {"limit": 10}
+                if cursor:
+                    params["cursor"] = cursor
+                page = client.get("/api/sentiment/stock/AAPL/articles", params=params)
+                assert page.status_code == 200
+                seen.extend(article["id"] for article in page.json())
+                pages += 1
+                cursor = page.headers.get("x-next-cursor")
+                if not cursor:
+                    break
+                assert 'rel="next"' in page.headers["link"]
+            assert pages == 3 and len(seen) == 25 and len(set(seen)) == 25
+            assert client.get("/api/sentiment/stock/AAPL/articles", params={"cursor": "bogus"}).status_code == 400
+            print(f"✓ Paged 25 articles in {pages} pages with no gaps or repeats")
+            
+            ndjson = client.get("/api/sentiment/export", params={"symbols": "AAPL,MSFT"})
+            lines = [json.loads(line) for line in ndjson.text.splitlines()]
+            assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+            assert len(lines) == 26 and {line["symbol"] for line in lines} == {"AAPL", "MSFT"}
+            assert [line["published_at"] for line in lines] == sorted(line["published_at"] for line in lines)
+            
+            exported = client.get("/api/sentiment/export", params={
+                "symbols": "aapl", "format": "csv", "scored_only": "false"
+            })
+            rows = list(csv.DictReader(io.StringIO(exported.text)))
+            assert len(rows) == 26 and rows[0].keys() >= {"id", "title", "sentiment_label"}
+            
+            empty = client.get("/api/sentiment/export", params={"symbols": "NONE", "format": "csv"})
+            assert empty.text.strip() == ",".join(sentiment.EXPORT_COLUMNS)
+            print("✓ NDJSON and CSV exports stream every matching row")
+        finally:
+            SessionLocal.configure(bind=original_bind)
+            AsyncSessionLocal.configure(bind=original_async_bind)
+            engine.dispose()
+
+def test_iter_articles_chunks():
+    print("Testing chunked article iteration...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'iter.db')}")
+        Base.metadata.create_all(bind=engine)
+        db_service = DatabaseService(sessionmaker(bind=engine))
+        _seed(db_service)
+        
+        chunks = list(db_service.iter_articles(columns=["id", "symbol"], chunk_size=7))
+        assert [len(chunk) for chunk in chunks] == [7, 7, 7, 5]
+        assert set(chunks[0][0]) == {"id", "symbol"}
+        print(f"✓ Streamed {sum(map(len, chunks))} rows in {len(chunks)} chunks")
+        engine.dispose()
+
+if __name__ == "__main__":
+    test_pagination_and_export()
+    test_iter_articles_chunks()
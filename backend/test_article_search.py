@@ -0,0 +1,171 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.api import sentiment
+from app.core.database import AsyncSessionLocal, Base, SessionLocal
+from app.core.search_index import SEARCH_RANK_WINDOW, create_search_index, fts5_query
+from app.models.database import NewsArticle
+from app.services import async_database_service
+from app.services.database_service import DatabaseService
+
+def _seed(db_service):
+    base = datetime.now() - timedelta(days=1)
+    rows = [
+        {"symbol": "AAPL", "title": "Apple guidance cut after weak iPhone demand", "url": "https://x/1",
+         "published_at": base, "content": "Shares fell."},
+        {"symbol": "MSFT", "title": "Microsoft beats estimates", "url": "https://x/2",
+         "published_at": base, "content": "The company did not cut guidance this quarter."},
+        {"symbol": "TSLA", "title": "Tesla deliveries rise", "url": "https://x/3",
+         "published_at": base - timedelta(days=5), "content": "No guidance change."},
+    ]
+    # Ties on score and time, so pages have to break them on id
+    rows += [{"symbol": "NVDA", "title": "Nvidia guidance cut", "url": f"https://x/nvda/{i}",
+              "published_at": base - timedelta(days=i % 3)} for i in range(12)]
+    # Older coverage, stored before the recent articles above
+    rows = [{"symbol": "AMD", "title": "AMD guidance", "url": f"https://x/amd/{i}",
+             "published_at": base - timedelta(days=10 + i)} for i in range(8)] + rows
+    stored = db_service.store_articles_bulk(rows)
+    db_service.update_article_sentiments([
+        {"id": row["id"], "sentiment_score": -0.5, "sentiment_label": "negative"}
+        for row in stored if row["symbol"] != "MSFT"
+    ])
+
+def test_fts5_query():
+    print("Testing FTS5 query translation...")
+    assert fts5_query('guidance cut') == '"guidance" "cut"'
+    assert fts5_query('"guidance cut" OR downgrade*') == '"guidance cut" OR "downgrade"*'
+    # Syntax characters are quoted, dangling operators dropped
+    assert fts5_query('OR NEAR( a"b - *') == '"NEAR(" "a""b"'
+    assert fts5_query('- * OR') == ""
+    assert fts5_query("cut", ["AAPL", "BRK.B"]) == '("cut") AND symbol : ("AAPL" OR "BRK.B")'
+    print("✓ User input always becomes a valid MATCH expression")
+
+def test_search_endpoint():
+    print("Testing full-text article search...")
+    original_bind = SessionLocal.kw["bind"]
+    original_async_bind = AsyncSessionLocal.kw["bind"]
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'search.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal.configure(bind=engine)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'search.db')}")
+        AsyncSessionLocal.configure(bind=async_engine)
+        try:
+            _seed(DatabaseService())
+            app = FastAPI()
+            app.include_router(sentiment.router, prefix="/api/sentiment")
+            client = TestClient(app)
+            
+            results = client.get("/api/sentiment/search", params={"q": '"guidance cut"', "limit": 100}).json()
+            # Phrases must match in order, so MSFT's "cut guidance" is not a hit
+            assert len(results) == 13 and "MSFT" not in {r["symbol"] for r in results}
+            assert "<mark>" in results[0]["snippet"] and results[0]["score"] >= results[-1]["score"]
+            
+            filtered = client.get("/api/sentiment/search", params={
+                "q": "guidance", "symbols": "aapl,msft", "sentiment_filter": "negative"
+            }).json()
+            assert [r["symbol"] for r in filtered] == ["AAPL"]
+            recent = client.get("/api/sentiment/search", params={
+                "q": "guidance", "start": (datetime.now() - timedelta(days=2)).date().isoformat(), "sort": "recent"
+            }).json()
+            assert "TSLA" not in {r["symbol"] for r in recent}
+            assert [r["published_at"] for r in recent] == sorted((r["published_at"] for r in recent), reverse=True)
+            
+            for sort in ("relevance", "recent"):
+                seen, cursor = [], None
+                while True:
+                    params = {"q": "guidance", "limit": 4, "sort": sort}
+                    if cursor:
+                        params["cursor"] = cursor
+                    page = client.get("/api/sentiment/search", params=params)
+                    seen.extend(r["id"] for r in page.json())
+                    cursor = page.headers.get("x-next-cursor")
+                    if not cursor:
+                        break
+                assert len(seen) == 23 and len(set(seen)) == 23, sort
+                assert page.headers["x-ranked-truncated"] == "false"
+            
+            # Broad queries only rank the most recently stored matches
+            async_database_service.SEARCH_RANK_WINDOW = 5
+            try:
+                windowed = client.get("/api/sentiment/search", params={"q": "guidance", "limit": 100})
+                # The response says older matches were left out, on every page
+                assert windowed.headers["x-ranked-truncated"] == "true"
+                windowed = windowed.json()
+                narrow = client.get("/api/sentiment/search", params={"q": "guidance", "symbols": "MSFT"})
+                assert narrow.headers["x-ranked-truncated"] == "false"
+                
+                # An older date range with more matches than the window still fills it
+                old_range = {"q": "guidance", "end": (datetime.now() - timedelta(days=3)).date().isoformat()}
+                older = client.get("/api/sentiment/search", params=dict(old_range, limit=100)).json()
+                
+                # Articles stored mid-pagination don't shift the window under later pages
+                first = client.get("/api/sentiment/search", params={"q": "guidance", "limit": 2, "sort": "recent"})
+                paged = [r["id"] for r in first.json()]
+                DatabaseService().store_articles_bulk([
+                    {"symbol": "NVDA", "title": f"Nvidia guidance update {i}", "url": f"https://x/late/{i}",
+                     "published_at": datetime.now()} for i in range(3)
+                ])
+                cursor = first.headers["x-next-cursor"]
+                while cursor:
+                    page = client.get("/api/sentiment/search", params={
+                        "q": "guidance", "limit": 2, "sort": "recent", "cursor": cursor
+                    })
+                    paged.extend(r["id"] for r in page.json())
+                    assert page.headers["x-ranked-truncated"] == "true"
+                    cursor = page.headers.get("x-next-cursor")
+            finally:
+                async_database_service.SEARCH_RANK_WINDOW = SEARCH_RANK_WINDOW
+            assert sorted(r["id"] for r in windowed) == sorted(seen)[-5:]
+            assert len(older) == 5 and all(r["published_at"][:10] <= old_range["end"] for r in older), older
+            assert sorted(paged) == sorted(seen)[-5:], paged
+            
+            assert client.get("/api/sentiment/search", params={"q": "- *"}).status_code == 400
+            assert client.get("/api/sentiment/search", params={"q": "cut", "cursor": "bogus"}).status_code == 400
+            
+            # Title edits are reindexed by the triggers, deletes drop out
+            db = SessionLocal()
+            db.query(NewsArticle).filter(NewsArticle.url == "https://x/1").update({"title": "Apple raises outlook"})
+            db.query(NewsArticle).filter(NewsArticle.url == "https://x/3").delete()
+            db.commit()
+            db.close()
+            symbols = {r["symbol"] for r in client.get("/api/sentiment/search", params={"q": "guidance", "limit": 100}).json()}
+            assert symbols == {"AMD", "MSFT", "NVDA"}
+            assert client.get("/api/sentiment/search", params={"q": "outlook"}).json()[0]["symbol"] == "AAPL"
+            print("✓ Ranked, filtered and paginated search stays in sync with writes")
+        finally:
+            SessionLocal.configure(bind=original_bind)
+            AsyncSessionLocal.configure(bind=original_async_bind)
+            engine.dispose()
+
+def test_backfill_existing_database():
+    print("Testing search index backfill on an existing database...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'old.db')}")
+        Base.metadata.create_all(bind=engine)
+        _seed(DatabaseService(sessionmaker(bind=engine)))
+        with engine.begin() as connection:
+            # Simulate a database created before search existed
+            connection.execute(text("DROP TABLE news_articles_fts"))
+            for trigger in ("insert", "delete", "update"):
+                connection.execute(text(f"DROP TRIGGER news_articles_fts_{trigger}"))
+        for _ in range(2):
+            with engine.begin() as connection:
+                create_search_index(connection)
+        with engine.connect() as connection:
+            matches = connection.execute(text(
+                "SELECT count(*) FROM news_articles_fts WHERE news_articles_fts MATCH 'guidance'"
+            )).scalar()
+        assert matches == 23
+        print(f"✓ Rebuilt the index over {matches} existing matches")
+        engine.dispose()
+
+if __name__ == "__main__":
+    test_fts5_query()
+    test_search_endpoint()
+    test_backfill_existing_database()
@@ -0,0 +1,191 @@
+import csv
+import json
+import os
+import tempfile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.database import NewsArticle
+from app.services.database_service import DatabaseService
+from app.services.backfill_service import BackfillService, DumpReader
+
+def _article(i):
+    return {
+        "symbol": "AAPL" if i % 2 else "MSFT",
+        "title": f"Shares rally on strong results #{i}",
+        "description": "Record revenue and raised guidance",
+        "url": f"https://example.com/archive/{i}",
+        "publishedAt": f"2021-01-{1 + i % 28:02d}T09:30:00Z",
+        "source": {"name": "Archive"},
+        "author": "Desk"
+    }
+
+def _session_factory(tmp):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, 'backfill.db')}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+def test_jsonl_backfill_resumes_from_checkpoint():
+    print("Testing JSONL backfill with checkpoint restart...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        session_factory = _session_factory(tmp)
+        dump_path = os.path.join(tmp, "dump.jsonl")
+        with open(dump_path, "w") as f:
+            for i in range(25):
+                f.write(json.dumps(_article(i)) + "\n")
+        
+        # Pretend an earlier run checkpointed 10 rows, then stored 5 more but died before scoring them
+        offsets = [offset for _, offset in DumpReader(dump_path).read()]
+        db_service = DatabaseService(session_factory)
+        db_service.store_articles_bulk([
+            db_service.normalize_article(a["symbol"], a) for a in map(_article, range(10, 15))
+        ])
+        checkpoint_path = os.path.join(tmp, "ckpt.json")
+        with open(checkpoint_path, "w") as f:
+            json.dump({"files": {os.path.abspath(dump_path): {"offset": offsets[9], "rows": 10,
+                                                              "pending": offsets[19]}}}, f)
+        
+        service = BackfillService(db_service, batch_size=10, checkpoint_path=checkpoint_path)
+        stats = service.run([dump_path])
+        
+        db = session_factory()
+        try:
+            # Rows before the checkpoint are not re-read
+            assert db.query(NewsArticle).count() == 15
+            assert db.query(NewsArticle).filter(NewsArticle.sentiment_score.is_(None)).count() == 0
+        finally:
+            db.close()
+        
+        with open(checkpoint_path) as f:
+            entry = json.load(f)["files"][os.path.abspath(dump_path)]
+        assert entry["done"] and entry["offset"] == os.path.getsize(dump_path)
+        
+        # A finished file is skipped entirely on the next run
+        assert BackfillService(db_service, checkpoint_path=checkpoint_path).run([dump_path])[0]["items_in"] == 0
+        for s in stats:
+            print(f"  {s['stage']}: {s['items_in']} rows, {s['busy_items_per_sec']} rows/s")
+        print("✓ Backfill resumed from checkpoint")
+
+class CrashingBackfillService(BackfillService):
+    """Dies while scoring, after its batch has been stored"""
+    
+    def _score(self, texts):
+        raise KeyboardInterrupt("killed")
+
+def test_crash_mid_batch_rescored_with_smaller_batches():
+    print("Testing recovery of rows stored by a run that died before scoring...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        session_factory = _session_factory(tmp)
+        dump_path = os.path.join(tmp, "dump.jsonl")
+        with open(dump_path, "w") as f:
+            for i in range(40):
+                f.write(json.dumps(_article(i)) + "\n")
+        db_service = DatabaseService(session_factory)
+        checkpoint_path = os.path.join(tmp, "ckpt.json")
+        
+        try:
+            CrashingBackfillService(db_service, batch_size=25, checkpoint_path=checkpoint_path).run([dump_path])
+            assert False, "expected the run to die"
+        except KeyboardInterrupt:
+            pass
+        
+        # The restart uses smaller batches, so the crashed batch spans several of them
+        BackfillService(db_service, batch_size=5, checkpoint_path=checkpoint_path).run([dump_path])
+        db = session_factory()
+        try:
+            assert db.query(NewsArticle).count() == 40
+            assert db.query(NewsArticle).filter(NewsArticle.sentiment_score.is_(None)).count() == 0
+        finally:
+            db.close()
+        print("✓ Every row stored before the crash was rescored")
+
+def test_csv_backfill_with_worker_pool():
+    print("Testing CSV backfill with parallel scoring...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        session_factory = _session_factory(tmp)
+        dump_path = os.path.join(tmp, "dump.csv")
+        with open(dump_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["symbol", "title", "description", "url", "publishedAt", "source_name", "author"])
+            for i in range(12):
+                a = _article(i)
+                # Embedded newline inside a quoted field
+                writer.writerow([a["symbol"], a["title"], "Line one\nline two", a["url"],
+                                 a["publishedAt"], "Archive", a["author"]])
+        
+        service = BackfillService(DatabaseService(session_factory), batch_size=5, score_batch_size=2, workers=2)
+        service.run([dump_path])
+        
+        db = session_factory()
+        try:
+            articles = db.query(NewsArticle).all()
+            assert len(articles) == 12
+            assert all(a.sentiment_score is not None for a in articles)
+            assert articles[0].content == "Line one\nline two"
+            assert articles[0].source == "Archive"
+        finally:
+            db.close()
+        print("✓ CSV dump loaded and scored")
+
+def test_jsonl_envelopes_are_flattened():
+    print("Testing NewsAPI response envelopes in a JSONL dump...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        session_factory = _session_factory(tmp)
+        dump_path = os.path.join(tmp, "dump.jsonl")
+        envelope = {
+            "status": "ok",
+            "totalResults": 3,
+            "symbol": "TSLA",
+            "articles": [dict(_article(i), symbol=None) for i in range(3)]
+        }
+        with open(dump_path, "w") as f:
+            f.write(json.dumps(envelope) + "\n")
+            f.write(json.dumps(_article(3)) + "\n")
+        
+        # Only the envelope's last article moves the resume offset past its line
+        offsets = [offset for _, offset in DumpReader(dump_path).read()]
+        envelope_end = len(json.dumps(envelope)) + 1
+        assert offsets == [0, 0, envelope_end, os.path.getsize(dump_path)]
+        
+        # Batches of two split the envelope
+        BackfillService(DatabaseService(session_factory), batch_size=2).run([dump_path])
+        db = session_factory()
+        try:
+            symbols = sorted(a.symbol for a in db.query(NewsArticle).all())
+            assert symbols == ["AAPL", "TSLA", "TSLA", "TSLA"]
+            assert db.query(NewsArticle).filter(NewsArticle.sentiment_score.is_(None)).count() == 0
+        finally:
+            db.close()
+        print("✓ Envelope articles loaded under the envelope's symbol")
+
+def test_records_without_symbol_are_skipped():
+    print("Testing records without a symbol and no default...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        session_factory = _session_factory(tmp)
+        dump_path = os.path.join(tmp, "dump.jsonl")
+        with open(dump_path, "w") as f:
+            for i in range(7):
+                f.write(json.dumps(dict(_article(i), symbol=None) if i % 3 == 0 else _article(i)) + "\n")
+        
+        stats = BackfillService(DatabaseService(session_factory), batch_size=2).run([dump_path])
+        parse = next(s for s in stats if s["stage"] == "parse")
+        # Records 0, 3 and 6 are read and reported, but not stored
+        assert parse["items_in"] == 7 and parse["items_out"] == 4
+        db = session_factory()
+        try:
+            assert db.query(NewsArticle).count() == 4
+        finally:
+            db.close()
+        print("✓ Skipped records show up in the parse stats")
+
+if __name__ == "__main__":
+    test_jsonl_backfill_resumes_from_checkpoint()
+    test_crash_mid_batch_rescored_with_smaller_batches()
+    test_csv_backfill_with_worker_pool()
+    test_jsonl_envelopes_are_flattened()
+    test_records_without_symbol_are_skipped()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+from app.core.database import make_engine
+from app.models.database import NewsArticle, SentimentSummary, StockPrice
+from app.services.database_service import DatabaseService
+from benchmarks.corpus import generate_corpus
+from benchmarks.suite import compare, run_suite
+
+def test_corpus_generator():
+    print("Testing synthetic corpus generator...")
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'corpus.db')}"
+        counts = generate_corpus(url, articles=3000, symbols=30, days=60, chunk_size=1000, log=lambda message: None)
+        engine = make_engine(url)
+        db = sessionmaker(bind=engine)()
+        try:
+            per_symbol = [count for _, count in db.query(NewsArticle.symbol, func.count()).group_by(NewsArticle.symbol)
+                          .order_by(func.count().desc())]
+            assert sum(per_symbol) == 3000
+            # Zipf skew: the top symbol dwarfs the median one
+            assert per_symbol[0] > 5 * per_symbol[len(per_symbol) // 2]
+            assert db.query(SentimentSummary).count() == counts["summaries"] > 0
+            assert db.query(StockPrice).count() == counts["prices"] >= 30 * 40
+            stats = DatabaseService(sessionmaker(bind=engine)).get_sentiment_stats()
+            assert 0 < stats["total_articles_analyzed"] < 3000 and stats["stocks_tracked"] == 30
+        finally:
+            db.close()
+            engine.dispose()
+    print(f"✓ Generated {counts['articles']} articles, {counts['prices']} prices, {counts['summaries']} rollups")
+
+def test_suite_report():
+    print("Testing benchmark suite report...")
+    report = run_suite(articles=2000, symbols=20, days=60, groups=["queries", "endpoints", "ingest"],
+                       repeat=2, log=lambda message: None)
+    names = {(result["group"], result["name"]) for result in report["results"]}
+    assert ("queries", "async.get_trending_stocks") in names
+    assert ("endpoints", "GET /api/sentiment/trending (cached)") in names
+    assert all(result["value"] > 0 for result in report["results"])
+    assert report["meta"]["scale"]["articles"] == 2000
+    
+    # A slower query and a faster ingest both count as a change for the worse/better
+    slower = {"results": [dict(result, value=result["value"] * 2) for result in report["results"]]}
+    deltas = {(row["group"], row["name"]): row["change_pct"] for row in compare(report, slower)}
+    assert deltas[("queries", "async.get_trending_stocks")] == -50.0
+    assert deltas[("ingest", "store_news_articles.offered")] == 100.0
+    print(f"✓ {len(report['results'])} benchmarks reported and compared")
+
+if __name__ == "__main__":
+    test_corpus_generator()
+    test_suite_report()
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import queue
+import tempfile
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.services import broadcaster as broadcaster_module
+from app.services.broadcaster import SentimentBroadcaster, event_stream
+from app.services.database_service import DatabaseService
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+    
+    def publish(self, channel, data):
+        self.commands.append((channel, data))
+    
+    def execute(self):
+        self.redis.round_trips += 1
+        for channel, data in self.commands:
+            self.redis.messages.put({"type": "message", "channel": channel, "data": data})
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+    
+    def subscribe(self, channel):
+        self.redis.subscriptions += 1
+    
+    def listen(self):
+        # The first subscription loses its connection after one message
+        if self.redis.subscriptions == 1:
+            yield self.redis.messages.get()
+            raise ConnectionError("Connection reset by peer")
+        while True:
+            yield self.redis.messages.get()
+    
+    def close(self):
+        pass
+
+class FakeRedis:
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.subscriptions = 0
+        self.round_trips = 0
+    
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+    
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+def _publish_from_thread(broadcaster, events):
+    thread = threading.Thread(target=lambda: [broadcaster.publish(event) for event in events])
+    thread.start()
+    thread.join()
+
+def test_fan_out():
+    print("Testing broadcaster fan-out...")
+    
+    async def scenario():
+        broadcaster = SentimentBroadcaster(redis_url=None, queue_size=3)
+        aapl = broadcaster.subscribe(["aapl"])
+        everything = broadcaster.subscribe()
+        msft = broadcaster.subscribe(["MSFT"])
+        
+        _publish_from_thread(broadcaster, [{"type": "article", "symbol": "AAPL", "id": 1}])
+        await asyncio.sleep(0.05)
+        assert (await aapl.queue.get())["id"] == 1
+        assert (await everything.queue.get())["id"] == 1
+        assert msft.queue.empty()
+        
+        # A slow client keeps only the newest events
+        _publish_from_thread(broadcaster, [{"type": "article", "symbol": "AAPL", "id": i} for i in range(5)])
+        await asyncio.sleep(0.05)
+        assert aapl.queue.qsize() == 3 and aapl.dropped == 2
+        assert (await aapl.queue.get())["id"] == 2
+        
+        broadcaster.unsubscribe(aapl)
+        assert "AAPL" not in broadcaster.by_symbol
+        print(f"✓ Events reach only matching subscribers: {broadcaster.stats()}")
+        
+        # Thousands of idle subscribers cost nothing when their symbols are quiet
+        idle = [broadcaster.subscribe([f"S{i}"]) for i in range(5000)]
+        start = time.perf_counter()
+        for i in range(1000):
+            broadcaster.publish({"type": "article", "symbol": "S1", "id": i})
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.05)
+        assert idle[1].queue.qsize() == 3 and idle[2].queue.empty()
+        print(f"✓ 1000 publishes with 5000 idle subscribers took {elapsed * 1000:.1f}ms")
+    
+    asyncio.run(scenario())
+
+def test_event_stream():
+    print("Testing SSE formatting...")
+    
+    async def scenario():
+        broadcaster = SentimentBroadcaster(redis_url=None)
+        subscriber = broadcaster.subscribe(["AAPL"])
+        stream = event_stream(subscriber, heartbeat=0.01)
+        assert (await stream.__anext__()).startswith("retry:")
+        assert await stream.__anext__() == ": keep-alive\n\n"
+        broadcaster.publish({"type": "rollup", "symbol": "AAPL", "avg_sentiment": 0.2})
+        chunk = await stream.__anext__()
+        assert chunk.startswith("event: rollup\ndata: ") and '"avg_sentiment": 0.2' in chunk
+        await stream.aclose()
+        print("✓ Stream sends keep-alives and named events")
+    
+    asyncio.run(scenario())
+
+def test_scoring_publishes():
+    print("Testing scoring paths publish events...")
+    original = broadcaster_module._broadcaster
+    broadcaster_module._broadcaster = SentimentBroadcaster(redis_url=None)
+    
+    async def scenario(db_service):
+        subscriber = broadcaster_module.get_broadcaster().subscribe(["TSLA"])
+        stored = db_service.store_articles_bulk([
+            {"symbol": "TSLA", "title": "Tesla deliveries beat", "url": "https://x/t1",
+             "published_at": datetime(2024, 3, 1, 9)}
+        ])
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: db_service.update_article_sentiments([
+            {"id": stored[0]["id"], "sentiment_score": 0.7, "sentiment_label": "positive"}
+        ]))
+        await loop.run_in_executor(None, lambda: db_service.update_sentiment_summaries([
+            ("TSLA", datetime(2024, 3, 1))
+        ]))
+        article = await asyncio.wait_for(subscriber.queue.get(), 1)
+        rollup = await asyncio.wait_for(subscriber.queue.get(), 1)
+        assert article["type"] == "article" and article["title"] == "Tesla deliveries beat"
+        assert rollup["type"] == "rollup" and rollup["article_count"] == 1
+        print(f"✓ Received {article['type']} and {rollup['type']} events")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'events.db')}")
+        Base.metadata.create_all(bind=engine)
+        try:
+            asyncio.run(scenario(DatabaseService(sessionmaker(bind=engine))))
+        finally:
+            broadcaster_module._broadcaster = original
+            engine.dispose()
+
+def test_redis_relay():
+    print("Testing the Redis relay...")
+    original = broadcaster_module._broadcaster
+    broadcaster_module._broadcaster = broadcaster = SentimentBroadcaster(redis_url=None)
+    broadcaster.redis = FakeRedis()
+    
+    async def scenario():
+        subscriber = broadcaster.subscribe(["AAPL"])
+        broadcaster_module.publish_scored_articles([
+            {"symbol": "AAPL", "id": i, "sentiment_score": 0.1, "sentiment_label": "neutral"} for i in range(3)
+        ])
+        # One pipelined round trip for the whole scoring batch
+        assert broadcaster.redis.round_trips == 1
+        # The relay resubscribes after Redis drops it, and the later events still arrive
+        ids = [(await asyncio.wait_for(subscriber.queue.get(), 5))["id"] for _ in range(3)]
+        assert ids == [0, 1, 2] and broadcaster.redis.subscriptions == 2, ids
+        print(f"✓ Relay resubscribed after a dropped connection and delivered {ids}")
+    
+    try:
+        asyncio.run(scenario())
+    finally:
+        broadcaster_module._broadcaster = original
+
+if __name__ == "__main__":
+    test_fan_out()
+    test_event_stream()
+    test_scoring_publishes()
+    test_redis_relay()
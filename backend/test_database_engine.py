@@ -0,0 +1,59 @@
+import asyncio
+import os
+import tempfile
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+from app.core.database import engine_options, make_async_engine, make_engine
+
+def test_sqlite_engine():
+    print("Testing SQLite engine configuration...")
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'engine.db')}"
+        engine = make_engine(url)
+        try:
+            assert isinstance(engine.pool, QueuePool)
+            with engine.connect() as conn:
+                assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+                assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+            with engine.begin() as conn:
+                conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, v INTEGER)"))
+                conn.execute(text("INSERT INTO t (v) VALUES (1)"))
+            
+            # A reader sees the last committed value while a write transaction is open
+            writer = engine.connect()
+            writer.begin()
+            writer.execute(text("UPDATE t SET v = 2"))
+            with engine.connect() as reader:
+                assert reader.execute(text("SELECT v FROM t")).scalar() == 1
+            writer.commit()
+            writer.close()
+            
+            async_engine = make_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:"))
+            
+            async def read_async():
+                async with async_engine.connect() as conn:
+                    timeout = (await conn.exec_driver_sql("PRAGMA busy_timeout")).scalar()
+                    value = (await conn.execute(text("SELECT v FROM t"))).scalar()
+                await async_engine.dispose()
+                return timeout, value
+            
+            assert asyncio.run(read_async()) == (5000, 2)
+        finally:
+            engine.dispose()
+    
+    # In-memory databases must keep a single shared connection
+    assert engine_options("sqlite://")["poolclass"] is StaticPool
+    print("✓ WAL pragmas applied on sync and async connections; readers don't block on writers")
+
+def test_postgres_options():
+    print("Testing Postgres pool options...")
+    options = engine_options("postgresql://postgres@localhost/sentiment_db")
+    assert options["pool_pre_ping"] and options["pool_recycle"] > 0
+    assert "statement_timeout" in options["connect_args"]["options"]
+    async_options = engine_options("postgresql+asyncpg://postgres@localhost/sentiment_db", async_driver=True)
+    assert "statement_timeout" in async_options["connect_args"]["server_settings"]
+    print(f"✓ Pool options: {options}")
+
+if __name__ == "__main__":
+    test_sqlite_engine()
+    test_postgres_options()
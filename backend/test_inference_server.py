@@ -0,0 +1,205 @@
+import os
+import socket
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import sentiment
+from app.ml import inference_client, inference_server
+from app.ml.inference_client import (
+    FRAME_HEADER, MAX_FRAME_SIZE, InferenceClient, InferenceRequestError, InferenceUnavailable,
+    RemoteSentimentAnalyzer, _recv_exactly, decode_payload, encode_frame
+)
+from app.ml.inference_server import InferenceServer
+from app.ml.sentiment_analyzer import SentimentAnalyzer
+from app.services import sentiment_service
+from app.services.sentiment_service import SentimentService
+
+TEXTS = [
+    "Apple shares soar on record profits",
+    "Terrible losses, Tesla stock crashes in awful selloff",
+    "Microsoft releases quarterly report",
+    "",
+]
+
+def test_inference_server_batches_workers():
+    print("Testing the shared inference server...")
+    with tempfile.TemporaryDirectory() as tmp:
+        address = os.path.join(tmp, "inference.sock")
+        server = InferenceServer(address, models=["vader"], threads=1, max_wait_ms=20)
+        server.start_background()
+        try:
+            client = InferenceClient(address)
+            assert client.ping()["models"] == ["vader"]
+            remote = RemoteSentimentAnalyzer("vader", client)
+            expected = SentimentAnalyzer("vader").analyze_batch(TEXTS)
+            
+            # Many worker threads at once, each with its own connection, share batches on the server
+            def score(i):
+                texts = TEXTS[i % len(TEXTS):] + TEXTS[:i % len(TEXTS)]
+                return texts, remote.analyze_batch(texts)
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                for texts, results in pool.map(score, range(64)):
+                    assert results == [expected[TEXTS.index(text)] for text in texts]
+            assert remote.analyze_text(TEXTS[0]) == expected[0] and remote.analyze_batch([]) == []
+            
+            stats = client.stats()["stats"]["models"]["vader"]
+            assert stats["requests"] == 65 and stats["batches"] < stats["requests"]
+            
+            # Other models load on first use
+            assert RemoteSentimentAnalyzer("textblob", client).analyze_text(TEXTS[1])["label"] == "negative"
+            assert set(client.ping()["models"]) == {"vader", "textblob"}
+            print(f"✓ {stats['requests']} requests scored in {stats['batches']} batches, in order")
+        finally:
+            server.stop()
+        
+        # A restarted server is picked up again on the next request
+        server = InferenceServer(address, models=["vader"], threads=1)
+        server.start_background()
+        try:
+            assert remote.analyze_batch(TEXTS) == expected
+        finally:
+            server.stop()
+        print("✓ Clients reconnect after a server restart")
+
+def test_analyze_endpoint_uses_inference_server():
+    print("Testing /analyze through the inference server...")
+    original_services = dict(sentiment_service._shared_services)
+    with tempfile.TemporaryDirectory() as tmp:
+        address = os.path.join(tmp, "inference.sock")
+        server = InferenceServer(address, models=["vader"], threads=1)
+        server.start_background()
+        try:
+            service = SentimentService(model_type="vader", inference_server=address)
+            assert isinstance(service.analyzer, RemoteSentimentAnalyzer)
+            sentiment_service._shared_services["vader"] = service
+            app = FastAPI()
+            app.include_router(sentiment.router, prefix="/api/sentiment")
+            client = TestClient(app)
+            
+            response = client.post("/api/sentiment/analyze/batch", json=TEXTS[:2])
+            assert response.status_code == 200
+            assert [r["sentiment_label"] for r in response.json()["results"]] == ["positive", "negative"]
+            
+            server.stop()
+            server = None
+            assert client.post("/api/sentiment/analyze", params={"text": TEXTS[0]}).status_code == 503
+            assert client.post("/api/sentiment/analyze/batch", json=TEXTS[:2]).status_code == 503
+            try:
+                service.analyze_batch(TEXTS)
+                assert False, "expected InferenceUnavailable"
+            except InferenceUnavailable:
+                pass
+            print("✓ Endpoints score remotely and answer 503 while the server is down")
+        finally:
+            if server is not None:
+                server.stop()
+            sentiment_service._shared_services.clear()
+            sentiment_service._shared_services.update(original_services)
+
+def test_request_errors():
+    print("Testing malformed and invalid inference requests...")
+    with tempfile.TemporaryDirectory() as tmp:
+        address = os.path.join(tmp, "inference.sock")
+        server = InferenceServer(address, models=["vader"], threads=1)
+        server.start_background()
+        try:
+            # A frame that isn't JSON gets an error frame, and the connection keeps working
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(5)
+            sock.connect(address)
+            for payload in (b"{not json", b"[1, 2]"):
+                sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+                (size,) = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+                assert decode_payload(_recv_exactly(sock, size))["error_type"] == "invalid_request"
+            sock.sendall(encode_frame({"id": 1, "op": "ping"}))
+            (size,) = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+            assert decode_payload(_recv_exactly(sock, size))["ok"]
+            sock.close()
+            
+            # Request errors are not outages
+            for message in ({"op": "analyze", "texts": "not a list"}, {"op": "reload"}):
+                try:
+                    InferenceClient(address).request(message)
+                    assert False, "expected InferenceRequestError"
+                except InferenceRequestError:
+                    pass
+            
+            # Unknown model names are rejected rather than served by a fresh VADER fallback each
+            for model_type in ("bogus1", "bogus2", "bogus3"):
+                try:
+                    InferenceClient(address).analyze_batch(TEXTS[:1], model_type)
+                    assert False, "expected InferenceRequestError"
+                except InferenceRequestError as e:
+                    assert "Unknown model" in str(e)
+            assert list(server.batchers) == ["vader"]
+            
+            # A model that falls back to VADER shares the VADER batcher instead of starting its own
+            original_analyzer = inference_server.SentimentAnalyzer
+            inference_server.SentimentAnalyzer = lambda model_type: SentimentAnalyzer("vader")
+            try:
+                for _ in range(2):
+                    _, model = InferenceClient(address).analyze_batch(TEXTS[:1], "textblob")
+                    assert model == "vader"
+            finally:
+                inference_server.SentimentAnalyzer = original_analyzer
+            assert list(server.batchers) == ["vader"]
+            
+            original_services = dict(sentiment_service._shared_services)
+            sentiment_service._shared_services["vader"] = SentimentService(model_type="vader", inference_server=address)
+            inference_client.MAX_FRAME_SIZE = 256
+            try:
+                app = FastAPI()
+                app.include_router(sentiment.router, prefix="/api/sentiment")
+                client = TestClient(app)
+                assert client.post("/api/sentiment/analyze", params={"text": TEXTS[0]}).status_code == 200
+                # Too large for one frame: the request is at fault, not the server
+                response = client.post("/api/sentiment/analyze/batch", json=TEXTS[:2] * 10)
+                assert response.status_code == 400, response.text
+            finally:
+                inference_client.MAX_FRAME_SIZE = MAX_FRAME_SIZE
+                sentiment_service._shared_services.clear()
+                sentiment_service._shared_services.update(original_services)
+            print("✓ Malformed frames get an error reply and request errors answer 400")
+        finally:
+            server.stop()
+
+def test_timeout_not_resent():
+    print("Testing that timed out requests are not resent...")
+    with tempfile.TemporaryDirectory() as tmp:
+        address = os.path.join(tmp, "slow.sock")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(address)
+        listener.listen()
+        received = []
+        
+        # Reads requests and never answers, like a server stuck on a huge batch
+        def serve():
+            while True:
+                try:
+                    connection, _ = listener.accept()
+                except OSError:
+                    return
+                (size,) = FRAME_HEADER.unpack(_recv_exactly(connection, FRAME_HEADER.size))
+                received.append(decode_payload(_recv_exactly(connection, size)))
+        
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        try:
+            client = InferenceClient(address, timeout=0.3)
+            try:
+                client.analyze_batch(TEXTS, "vader")
+                assert False, "expected InferenceUnavailable"
+            except InferenceUnavailable as e:
+                assert "timed out" in str(e)
+            assert len(received) == 1, received
+            print("✓ The request reached the server once and was not sent again")
+        finally:
+            listener.close()
+
+if __name__ == "__main__":
+    test_inference_server_batches_workers()
+    test_analyze_endpoint_uses_inference_server()
+    test_request_errors()
+    test_timeout_not_resent()
@@ -0,0 +1,178 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.database import NewsArticle, SentimentSummary
+from app.services.database_service import DatabaseService
+from app.services.sentiment_service import SentimentService
+from app.services.ingestion_pipeline import ArticleSource, IngestionPipeline, JsonlSpoolSource
+
+def _spool_article(symbol, i, title):
+    return {
+        "symbol": symbol,
+        "title": title,
+        "description": f"Article {i} about {symbol}",
+        "url": f"https://example.com/{symbol}/{i}",
+        "publishedAt": f"2024-03-0{1 + i % 3}T12:00:00Z",
+        "source": {"name": "Spool"},
+        "author": "Tester"
+    }
+
+def test_spool_pipeline():
+    print("Testing ingestion pipeline with a JSONL spool...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'pipeline.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        
+        spool_dir = os.path.join(tmp, "spool")
+        os.makedirs(spool_dir)
+        with open(os.path.join(spool_dir, "batch1.jsonl"), "w") as f:
+            for i in range(30):
+                f.write(json.dumps(_spool_article("AAPL", i, "Apple shares surge on great earnings")) + "\n")
+            # Envelope form, including a duplicate URL that must be dropped
+            f.write(json.dumps({"symbol": "TSLA", "articles": [
+                _spool_article("TSLA", 0, "Tesla stock plunges after terrible recall"),
+                _spool_article("TSLA", 0, "Tesla stock plunges after terrible recall"),
+            ]}) + "\n")
+        
+        pipeline = IngestionPipeline(
+            [JsonlSpoolSource(spool_dir)],
+            db_service=DatabaseService(session_factory),
+            sentiment_service=SentimentService(model_type="vader", session_factory=session_factory),
+            store_batch_size=8,
+            score_batch_size=8,
+            queue_size=4
+        )
+        stats = pipeline.run(report_interval=60)
+        
+        db = session_factory()
+        try:
+            articles = db.query(NewsArticle).all()
+            assert len(articles) == 31
+            assert all(article.sentiment_score is not None for article in articles)
+            
+            summaries = db.query(SentimentSummary).all()
+            assert {s.symbol for s in summaries} == {"AAPL", "TSLA"}
+            assert sum(s.article_count for s in summaries) == 31
+        finally:
+            db.close()
+        
+        assert os.path.exists(os.path.join(spool_dir, "processed", "batch1.jsonl"))
+        by_stage = {s["stage"]: s for s in stats}
+        assert by_stage["store"]["items_out"] == 31
+        assert by_stage["score"]["items_in"] == 31
+        print(f"✓ Stored and scored {len(articles)} articles")
+        for s in stats:
+            print(f"  {s['stage']}: {s['items_in']} in, {s['items_per_sec']}/s, queue={s['queue_depth']}")
+
+class FlakyDatabaseService(DatabaseService):
+    """Fails its first store batch, like a dropped connection mid-run"""
+    
+    def __init__(self, session_factory):
+        super().__init__(session_factory)
+        self.failures = 1
+    
+    def store_articles_bulk(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("connection lost")
+        return super().store_articles_bulk(rows)
+
+def test_spool_file_kept_until_stored():
+    print("Testing that spool files stay put until their articles are stored...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'pipeline.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        spool_dir = os.path.join(tmp, "spool")
+        os.makedirs(spool_dir)
+        with open(os.path.join(spool_dir, "batch1.jsonl"), "w") as f:
+            for i in range(20):
+                f.write(json.dumps(_spool_article("AAPL", i, "Apple shares surge on great earnings")) + "\n")
+        
+        pipeline = IngestionPipeline(
+            [JsonlSpoolSource(spool_dir)],
+            db_service=FlakyDatabaseService(session_factory),
+            sentiment_service=SentimentService(model_type="vader", session_factory=session_factory),
+            store_batch_size=8,
+            queue_size=4
+        )
+        pipeline.run(report_interval=60)
+        db = session_factory()
+        try:
+            assert db.query(NewsArticle).count() < 20
+            assert os.path.exists(os.path.join(spool_dir, "batch1.jsonl"))
+            assert not os.path.exists(os.path.join(spool_dir, "processed", "batch1.jsonl"))
+            
+            # The failed batch's URLs were never marked as seen, so the next pass stores them
+            pipeline.run(report_interval=60)
+            assert db.query(NewsArticle).count() == 20
+        finally:
+            db.close()
+        assert os.path.exists(os.path.join(spool_dir, "processed", "batch1.jsonl"))
+        print("✓ Failed store batch kept the file for the next pass")
+
+class CountingSource(ArticleSource):
+    name = "counting"
+    
+    def __init__(self, total):
+        self.total = total
+        self.yielded = 0
+    
+    def fetch(self):
+        for i in range(self.total):
+            self.yielded += 1
+            yield _spool_article("AAPL", i, "Apple shares surge on great earnings")
+
+class BlockingDatabaseService(DatabaseService):
+    def __init__(self, session_factory):
+        super().__init__(session_factory)
+        self.release = threading.Event()
+    
+    def store_articles_bulk(self, rows):
+        self.release.wait()
+        return super().store_articles_bulk(rows)
+
+def test_fetch_backpressure():
+    print("Testing that a slow store stage throttles fetching...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'pipeline.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        source = CountingSource(2000)
+        db_service = BlockingDatabaseService(session_factory)
+        pipeline = IngestionPipeline(
+            [source],
+            db_service=db_service,
+            sentiment_service=SentimentService(model_type="vader", session_factory=session_factory),
+            store_batch_size=8,
+            queue_size=4
+        )
+        runner = threading.Thread(target=pipeline.run, kwargs={"report_interval": 60})
+        runner.start()
+        time.sleep(1.0)
+        # Only what fits in the queues and in-flight batches has been read
+        blocked_at = source.yielded
+        db_service.release.set()
+        runner.join()
+        assert blocked_at < 100, blocked_at
+        assert source.yielded == 2000
+        db = session_factory()
+        try:
+            assert db.query(NewsArticle).count() == 2000
+        finally:
+            db.close()
+        print(f"✓ Fetch stopped at {blocked_at} articles while the store stage was blocked")
+
+if __name__ == "__main__":
+    test_spool_pipeline()
+    test_spool_file_kept_until_stored()
+    test_fetch_backpressure()
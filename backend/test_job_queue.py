@@ -0,0 +1,152 @@
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from app.api import stocks
+from app.core.database import Base, SessionLocal
+from app.models.database import NewsArticle, StockInfo
+from app.services import job_queue
+from app.services.job_queue import CeleryJobQueue, InProcessJobQueue, set_job_queue
+from app.services.refresh_scheduler import RefreshScheduler, set_scheduler
+
+release = threading.Event()
+calls = []
+
+class FakeNewsService:
+    def get_stock_news(self, symbol, days_back=7):
+        calls.append(symbol)
+        release.wait(5)
+        published = (datetime.now() - timedelta(hours=2)).isoformat() + "Z"
+        return {"articles": [
+            {"title": f"{symbol} beats earnings estimates", "description": "Strong growth",
+             "url": f"https://news.example/{symbol}/{i}", "publishedAt": published,
+             "source": {"name": "Wire"}}
+            for i in range(3)
+        ]}
+
+def test_refresh_jobs():
+    print("Testing background refresh jobs...")
+    original_bind = SessionLocal.kw["bind"]
+    original_news = job_queue.NewsService
+    job_queue.NewsService = FakeNewsService
+    queue = InProcessJobQueue(workers=2)
+    set_job_queue(queue)
+    # Room for three manual refreshes of 3 API calls each
+    scheduler = RefreshScheduler(symbols_source=list, activity_source=dict, daily_quota=216, refresh_cost=3,
+                                 maintenance={})
+    set_scheduler(scheduler)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'jobs.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal.configure(bind=engine)
+        try:
+            db = SessionLocal()
+            db.add_all([StockInfo(symbol="AAPL", name="Apple"), StockInfo(symbol="MSFT", name="Microsoft"),
+                        StockInfo(symbol="OLD", name="Delisted", is_active=False)])
+            db.commit()
+            db.close()
+            
+            app = FastAPI()
+            app.include_router(stocks.router, prefix="/api/stocks")
+            client = TestClient(app)
+            
+            first = client.post("/api/stocks/refresh/aapl")
+            assert first.status_code == 202 and not first.json()["deduplicated"]
+            duplicate = client.post("/api/stocks/refresh/AAPL").json()
+            assert duplicate["deduplicated"] and duplicate["job_id"] == first.json()["job_id"]
+            
+            bulk = client.post("/api/stocks/refresh-all").json()
+            assert {job["symbol"] for job in bulk["jobs"]} == {"AAPL", "MSFT"}
+            assert bulk["enqueued"] == 1 and bulk["deduplicated"] == 1
+            
+            release.set()
+            queue.wait(10)
+            status = client.get(first.json()["status_url"]).json()
+            assert status["status"] == "succeeded", status
+            assert status["result"]["new_articles_found"] == 3 and status["result"]["articles_scored"] == 3
+            assert sorted(calls) == ["AAPL", "MSFT"]
+            
+            db = SessionLocal()
+            unscored = db.query(NewsArticle).filter(NewsArticle.sentiment_score.is_(None)).count()
+            db.close()
+            assert unscored == 0
+            
+            # Once finished, the same refresh can be queued again
+            assert not client.post("/api/stocks/refresh/AAPL").json()["deduplicated"]
+            queue.wait(10)
+            assert client.get("/api/stocks/jobs/missing").status_code == 404
+            
+            # Only the three new jobs were charged, and the budget is now spent
+            budget = scheduler.snapshot()["budget"]
+            assert budget["manual_refreshes"] == 3 and budget["manual_used_last_24h"] == 9, budget
+            over = client.post("/api/stocks/refresh/MSFT")
+            assert over.status_code == 429 and int(over.headers["Retry-After"]) > 0
+            assert client.post("/api/stocks/refresh-all").status_code == 429
+            print(f"✓ Refresh jobs deduplicate, run in the background and score: {status['result']}")
+        finally:
+            SessionLocal.configure(bind=original_bind)
+            job_queue.NewsService = original_news
+            set_job_queue(None)
+            set_scheduler(None)
+            engine.dispose()
+
+class FakeRedis:
+    """The SET/GET/DELETE subset CeleryJobQueue uses; expire_before_get drops a key between SET NX and GET"""
+    
+    def __init__(self):
+        self.values = {}
+        self.expire_before_get = False
+    
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value.encode() if isinstance(value, str) else value
+        return True
+    
+    def get(self, key):
+        if self.expire_before_get and key.startswith("job:pending:"):
+            self.expire_before_get = False
+            self.values.pop(key, None)
+        return self.values.get(key)
+    
+    def delete(self, key):
+        self.values.pop(key, None)
+
+class FakeTask:
+    def __init__(self):
+        self.submitted = []
+    
+    def apply_async(self, args, task_id):
+        self.submitted.append((task_id, args))
+
+def test_celery_job_records():
+    print("Testing Celery job records and dedupe keys...")
+    from celery import Celery
+    app = Celery("test", broker="memory://", backend="cache+memory://")
+    task = FakeTask()
+    queue = CeleryJobQueue(app, task)
+    queue.redis = FakeRedis()
+    
+    job, created = queue.enqueue("refresh", {"symbol": "AAPL"})
+    again, created_again = queue.enqueue("refresh", {"symbol": "AAPL"})
+    assert created and not created_again and again["id"] == job["id"]
+    assert queue.get(job["id"])["status"] == "queued" and queue.get(job["id"])["kind"] == "refresh"
+    # Celery calls every unknown id PENDING; without a record it is unknown
+    assert queue.get("no-such-job") is None
+    assert len([key for key in queue.redis.values if key.startswith("job:record:")]) == 1
+    
+    # The pending key expires between a failed SET NX and the GET: the job is claimed again, with a key
+    queue.redis.expire_before_get = True
+    retry, retry_created = queue.enqueue("refresh", {"symbol": "AAPL"})
+    assert retry_created and retry["id"] != job["id"]
+    assert queue.redis.values["job:pending:refresh:symbol=AAPL"] == retry["id"].encode()
+    assert [task_id for task_id, _ in task.submitted] == [job["id"], retry["id"]]
+    print("✓ Unknown ids return None and expired dedupe keys are re-claimed before submitting")
+
+if __name__ == "__main__":
+    test_refresh_jobs()
+    test_celery_job_records()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+from datetime import date, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.core.metrics import UPSTREAM_ERRORS
+from app.services.news_service import NewsService
+from app.services.price_store import PriceStore
+from app.services.stock_service import StockService, set_ticker_factory
+from loadtest.fake_newsapi import FaultInjector, create_app, serve_in_thread
+from loadtest.fake_yahoo import FakePriceProvider, FakeYahoo
+from loadtest.run import run
+
+def test_fake_upstreams():
+    print("Testing fake NewsAPI and yfinance stand-ins...")
+    faults = FaultInjector(latency_ms=5, seed=1)
+    server, thread, base_url = serve_in_thread(create_app(faults, article_interval=60.0))
+    try:
+        news = NewsService(api_key="test", base_url=f"{base_url}/v2")
+        articles = news.get_stock_news("AAPL", days_back=1)["articles"]
+        # Three overlapping queries, deduplicated by URL
+        assert 20 <= len(articles) <= 50 and all("AAPL" in article["title"] for article in articles)
+        assert news.get_trending_news()["articles"]
+        
+        failures_before = UPSTREAM_ERRORS.labels("newsapi", "everything").value
+        faults.error_rate = 1.0
+        assert news.get_stock_news("AAPL", days_back=1)["articles"] == []
+        assert UPSTREAM_ERRORS.labels("newsapi", "everything").value == failures_before + 3
+    finally:
+        server.should_exit = True
+        thread.join()
+    
+    set_ticker_factory(FakeYahoo(FaultInjector(seed=1)))
+    with tempfile.TemporaryDirectory() as tmp:
+        # An empty price store on a temp database, so prices come from the fake Ticker
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'prices.db')}")
+        Base.metadata.create_all(bind=engine)
+        try:
+            stock_service = StockService(PriceStore(session_factory=sessionmaker(bind=engine)))
+            assert stock_service.get_current_price("FAKE") > 0
+            change = stock_service.get_price_change("FAKE", days=1)
+            assert change and change["previous_price"] > 0
+        finally:
+            set_ticker_factory(None)
+            engine.dispose()
+    
+    bars = FakePriceProvider().download(["FAKE"], date.today() - timedelta(days=30), date.today())["FAKE"]
+    assert len(bars) >= 15 and (bars["High"] >= bars["Low"]).all()
+    print(f"✓ Fake upstreams serve {len(articles)} articles and {len(bars)} daily bars with fault injection")
+
+def test_load_generator():
+    print("Testing load generator against the in-process stack...")
+    report = run(duration=2.0, concurrency=4, symbols=3, news_latency_ms=5, news_error_rate=0.0,
+                 yahoo_latency_ms=5, yahoo_error_rate=0.0)
+    assert report["total"]["requests"] > 20 and report["total"]["errors"] == 0, report["total"]
+    assert "GET /api/sentiment/stock/{symbol}" in report["routes"]
+    assert report["upstream"]["newsapi"]["requests"] >= 9
+    print(f"✓ {report['total']['requests']} requests at {report['total']['rps']} rps, p99 {report['total']['p99_ms']}ms")
+
+if __name__ == "__main__":
+    test_fake_upstreams()
+    test_load_generator()
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import tempfile
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from app.core.database import make_engine
+from app.core.metrics import (
+    DB_QUERY_DURATION, INFERENCE_TEXTS, UPSTREAM_ERRORS, Histogram, MetricsMiddleware,
+    render_metrics, track_upstream
+)
+from app.ml.sentiment_analyzer import SentimentAnalyzer
+from app.models.database import Base
+from app.services import database_service
+
+def test_metrics_exposition():
+    print("Testing /metrics exposition...")
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+    
+    client = TestClient(app)
+    for item_id in range(3):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    client.get("/missing")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'metrics.db')}")
+        before = DB_QUERY_DURATION.labels("select").snapshot()[2]
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        engine.dispose()
+        assert DB_QUERY_DURATION.labels("select").snapshot()[2] == before + 1
+    
+    try:
+        with track_upstream("newsapi", "everything"):
+            raise ConnectionError("upstream down")
+    except ConnectionError:
+        pass
+    assert UPSTREAM_ERRORS.labels("newsapi", "everything").value >= 1
+    
+    scored_before = INFERENCE_TEXTS.labels("vader").value
+    SentimentAnalyzer(model_type="vader").analyze_batch(["Great quarter", "Awful guidance", ""])
+    assert INFERENCE_TEXTS.labels("vader").value == scored_before + 2
+    
+    # The scoring backlog collector queries the database; keep it off the working-tree one
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'backlog.db')}")
+        Base.metadata.create_all(bind=engine)
+        original_session = database_service.SessionLocal
+        database_service.SessionLocal = sessionmaker(bind=engine)
+        try:
+            body = render_metrics()
+        finally:
+            database_service.SessionLocal = original_session
+            engine.dispose()
+    # One series per route template, not per concrete path
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"} 3' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/items/{item_id}",status="200",le="+Inf"} 3' in body
+    assert 'upstream_errors_total{service="newsapi",operation="everything"}' in body
+    assert 'inference_batch_size_bucket{backend="vader",le="2"}' in body
+    assert 'inference_texts_per_second{backend="vader"}' in body
+    assert "scoring_backlog_articles 0" in body
+    print("✓ Route, upstream, DB and inference metrics rendered in Prometheus text format")
+
+def test_instrumentation_overhead():
+    print("Testing instrumentation overhead...")
+    n = 20000
+    histogram = Histogram("overhead_test_seconds", "Overhead test", ["route"])
+    start = time.perf_counter()
+    for _ in range(n):
+        histogram.labels("/items/{item_id}").observe(0.003)
+    per_observe = (time.perf_counter() - start) / n
+    
+    async def bare(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+    
+    async def noop_send(message):
+        pass
+    
+    async def drive(app):
+        scope = {"type": "http", "method": "GET", "path": "/"}
+        start = time.perf_counter()
+        for _ in range(n):
+            await app(scope, None, noop_send)
+        return (time.perf_counter() - start) / n
+    
+    baseline = asyncio.run(drive(bare))
+    instrumented = asyncio.run(drive(MetricsMiddleware(bare)))
+    overhead = instrumented - baseline
+    # Budget: well under 1% of even a 5ms request
+    assert per_observe < 20e-6, per_observe
+    assert overhead < 30e-6, overhead
+    print(f"✓ observe(): {per_observe * 1e6:.2f}µs, middleware: +{overhead * 1e6:.2f}µs per request")
+
+if __name__ == "__main__":
+    test_metrics_exposition()
+    test_instrumentation_overhead()
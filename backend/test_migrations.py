@@ -0,0 +1,223 @@
+import os
+import re
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.api import sentiment
+from app.core import response_cache
+from app.core.database import AsyncSessionLocal, Base, SessionLocal
+from app.core.init_db import BASELINE_REVISION, alembic_config, upgrade_database
+from app.core.search_index import is_search_index_object
+from app.services import database_service
+from app.services.database_service import DatabaseService
+
+def _schema_diff(engine):
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={
+            "include_name": lambda name, type_, parent_names: not is_search_index_object(name, type_)
+        })
+        return compare_metadata(context, Base.metadata)
+
+def _indexes(engine):
+    return {index["name"] for index in inspect(engine).get_indexes("news_articles")}
+
+def test_migrations_match_models():
+    print("Testing migrations against the ORM models...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'migrated.db')}")
+        upgrade_database(engine)
+        assert _schema_diff(engine) == []
+        assert "ix_news_articles_unscored" in _indexes(engine)
+        assert "idx_sentiment_created" not in _indexes(engine)
+        # Prefixes of the new composite indexes only cost writes
+        assert not _indexes(engine) & {"ix_news_articles_published_at", "ix_news_articles_symbol", "idx_symbol_published"}
+        
+        # Downgrade and upgrade again, both directions have to apply cleanly
+        with engine.connect() as connection:
+            command.downgrade(alembic_config(connection), "base")
+        assert inspect(engine).get_table_names() == ["alembic_version"]
+        upgrade_database(engine)
+        assert _schema_diff(engine) == []
+        print("✓ alembic upgrade head produces exactly the models' schema")
+        engine.dispose()
+
+def test_adopt_legacy_database():
+    print("Testing adoption of a database created before migrations...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'legacy.db')}")
+        upgrade_database(engine, BASELINE_REVISION)
+        with engine.begin() as connection:
+            # What create_all used to leave behind: the old indexes, no version table, a table missing
+            connection.execute(text("DROP TABLE alembic_version"))
+            connection.execute(text("DROP TABLE archived_sentiment"))
+            connection.execute(text(
+                "INSERT INTO news_articles (symbol, title, url, published_at) VALUES ('AAPL', 'Old news', 'https://x/old', '2024-01-02')"
+            ))
+        assert "idx_sentiment_created" in _indexes(engine)
+        
+        upgrade_database(engine)
+        assert _schema_diff(engine) == []
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT count(*) FROM news_articles")).scalar() == 1
+        print("✓ Legacy database stamped at the baseline and upgraded in place")
+        engine.dispose()
+
+def test_stats_seeded_from_existing_articles():
+    print("Testing the sentiment stats seed on a database with articles...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'seeded.db')}")
+        upgrade_database(engine, "0002")
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO news_articles (symbol, title, url, published_at, sentiment_score, sentiment_label) VALUES "
+                "('AAPL', 'Up', 'https://x/1', '2024-01-02', 0.5, 'positive'), "
+                "('AAPL', 'Down', 'https://x/2', '2024-01-02', -0.5, 'negative'), "
+                "('MSFT', 'Flat', 'https://x/3', '2024-01-02', 0.0, NULL), "
+                "('TSLA', 'Unscored', 'https://x/4', '2024-01-02', NULL, NULL)"
+            ))
+            connection.execute(text(
+                "INSERT INTO archived_sentiment VALUES ('NVDA', '2023-01-02', 4, 1.2, 3, 0, 1), "
+                "('AAPL', '2023-01-02', 2, 0.4, 1, 1, 0)"
+            ))
+        
+        upgrade_database(engine)
+        db_service = DatabaseService(sessionmaker(bind=engine))
+        seeded = db_service.get_sentiment_stats()
+        with engine.connect() as connection:
+            per_symbol = dict(connection.execute(text("SELECT symbol, scored_articles FROM symbol_stats")).all())
+        assert seeded == db_service.reconcile_sentiment_stats(), seeded
+        assert seeded["total_articles_analyzed"] == 9 and seeded["stocks_tracked"] == 3, seeded
+        assert per_symbol == {"AAPL": 4, "MSFT": 1, "NVDA": 4}, per_symbol
+        print(f"✓ Migration 0003 seeded the same totals a reconcile computes: {seeded}")
+        engine.dispose()
+
+def test_duplicate_price_bars_collapsed():
+    print("Testing the unique price bar migration...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'prices.db')}")
+        upgrade_database(engine, "0003")
+        with engine.begin() as connection:
+            # Two overlapping ingests wrote the same day twice
+            connection.execute(text(
+                "INSERT INTO stock_prices (symbol, date, close_price) VALUES "
+                "('AAPL', '2024-01-02 00:00:00', 100.0), ('AAPL', '2024-01-02 00:00:00', 101.0), "
+                "('AAPL', '2024-01-03 00:00:00', 102.0)"
+            ))
+        
+        upgrade_database(engine)
+        with engine.connect() as connection:
+            rows = connection.execute(text("SELECT date, close_price FROM stock_prices ORDER BY date")).all()
+        assert [close for _, close in rows] == [101.0, 102.0], rows
+        assert "uq_stock_prices_symbol_date" in {index["name"] for index in inspect(engine).get_indexes("stock_prices")}
+        print("✓ Duplicate bars collapsed to the latest write")
+        engine.dispose()
+
+def _plan(db_path, statement, parameters):
+    connection = sqlite3.connect(db_path)
+    try:
+        return [row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())]
+    finally:
+        connection.close()
+
+def test_endpoint_queries_use_indexes():
+    print("Testing query plans of the endpoint queries...")
+    original_bind = SessionLocal.kw["bind"]
+    original_async_bind = AsyncSessionLocal.kw["bind"]
+    original_cache = response_cache._response_cache
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "plans.db")
+        engine = create_engine(f"sqlite:///{db_path}")
+        upgrade_database(engine)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        SessionLocal.configure(bind=engine)
+        AsyncSessionLocal.configure(bind=async_engine)
+        response_cache._response_cache = response_cache.ResponseCache(redis_url=None)
+        try:
+            db_service = DatabaseService()
+            now = datetime.now()
+            symbols = ["AAPL", "MSFT", "TSLA", "NVDA"] + [f"T{i:03d}" for i in range(36)]
+            stored = db_service.store_articles_bulk([
+                {"symbol": symbol, "title": f"{symbol} guidance update {i}", "url": f"https://x/{symbol}/{i}",
+                 "published_at": now - timedelta(hours=i * 29 + n), "content": "Quarterly results."}
+                for n, symbol in enumerate(symbols) for i in range(25)
+            ])
+            db_service.update_article_sentiments([
+                {"id": row["id"], "sentiment_score": 0.4, "sentiment_label": "positive"}
+                for row in stored if row["id"] % 10
+            ])
+            # Planner statistics, as the migration leaves them
+            with engine.begin() as connection:
+                connection.execute(text("ANALYZE news_articles"))
+            
+            captured = []
+            def capture(conn, cursor, statement, parameters, context, executemany):
+                if statement.lstrip().upper().startswith("SELECT") and "news_articles" in statement:
+                    captured.append((statement, parameters))
+            event.listen(engine, "before_cursor_execute", capture)
+            event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+            
+            app = FastAPI()
+            app.include_router(sentiment.router, prefix="/api/sentiment")
+            client = TestClient(app)
+            start = (now - timedelta(days=3)).date().isoformat()
+            queries = {}
+            for name, call in [
+                ("stock sentiment", lambda: client.get("/api/sentiment/stock/AAPL")),
+                ("trending", lambda: client.get("/api/sentiment/trending")),
+                ("articles", lambda: client.get("/api/sentiment/stock/AAPL/articles", params={"limit": 5})),
+                ("articles filtered", lambda: client.get("/api/sentiment/stock/AAPL/articles",
+                                                         params={"sentiment_filter": "positive"})),
+                ("search", lambda: client.get("/api/sentiment/search", params={"q": "guidance", "symbols": "AAPL"})),
+                ("export symbol", lambda: client.get("/api/sentiment/export", params={"symbols": "AAPL", "start": start})),
+                ("export range", lambda: client.get("/api/sentiment/export", params={"start": start})),
+                ("scoring backlog", lambda: db_service.get_unanalyzed_articles()),
+                ("backlog gauge", database_service._scoring_backlog_metrics),
+            ]:
+                del captured[:]
+                result = call()
+                assert getattr(result, "status_code", 200) == 200, (name, result.text)
+                assert captured, name
+                queries[name] = [_plan(db_path, statement, parameters) for statement, parameters in captured]
+            
+            for name, plans in queries.items():
+                for plan in plans:
+                    steps = [step for step in plan if re.search(r"\bnews_articles\b", step)]
+                    for step in steps:
+                        # A SCAN of the table itself reads every row; anything else goes through an index
+                        assert "INDEX" in step or "PRIMARY KEY" in step or "VIRTUAL TABLE" in step, (name, plan)
+                        # Only the backlog queries may read a whole index, and theirs holds just the unscored rows
+                        assert step.startswith("SEARCH") or "ix_news_articles_unscored" in step, (name, plan)
+                    print(f"  {name}: {'; '.join(steps)}")
+            
+            def uses(name, index):
+                return any(index in step for plan in queries[name] for step in plan)
+            assert uses("stock sentiment", "COVERING INDEX ix_news_articles_symbol_published")
+            assert uses("trending", "COVERING INDEX")
+            assert uses("articles", "ix_news_articles_symbol_published")
+            assert uses("export range", "ix_news_articles_published_symbol")
+            assert uses("scoring backlog", "ix_news_articles_unscored")
+            # Time range queries are served by the composite index, not the dropped published_at one
+            assert not any("ix_news_articles_published_at" in step
+                           for plans in queries.values() for plan in plans for step in plan)
+            assert uses("backlog gauge", "ix_news_articles_unscored")
+            print("✓ Every endpoint query reads news_articles through an index")
+        finally:
+            SessionLocal.configure(bind=original_bind)
+            AsyncSessionLocal.configure(bind=original_async_bind)
+            response_cache._response_cache = original_cache
+            engine.dispose()
+
+if __name__ == "__main__":
+    test_migrations_match_models()
+    test_adopt_legacy_database()
+    test_stats_seeded_from_existing_articles()
+    test_duplicate_price_bars_collapsed()
+    test_endpoint_queries_use_indexes()
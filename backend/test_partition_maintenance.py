@@ -0,0 +1,154 @@
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core.init_db import upgrade_database
+from app.services.article_archive import ArticleArchive, RetentionService
+from app.services.database_service import DatabaseService
+from app.services.partition_maintenance import (
+    PartitionMaintenance, PartitionMaintenanceTimer, is_partition_table, partition_name
+)
+
+# Postgres for the partitioning test, e.g. postgresql://postgres@localhost/sentiment_test (its schema is wiped)
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+def test_sqlite_keeps_plain_table():
+    print("Testing partition maintenance on SQLite...")
+    assert partition_name(datetime(2024, 3, 1)) == "news_articles_2024_03"
+    assert is_partition_table("news_articles_2024_03") and is_partition_table("news_articles_default")
+    assert not is_partition_table("news_articles_fts") and not is_partition_table("news_articles")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'plain.db')}")
+        upgrade_database(engine)
+        assert not PartitionMaintenance(engine).convert_table()
+        report = PartitionMaintenance(engine).run()
+        assert report == {"created": [], "dropped": [], "held_back": {}}
+        with engine.connect() as connection:
+            assert not PartitionMaintenance(engine).is_partitioned(connection)
+        print("✓ SQLite deployments keep the unpartitioned table")
+        engine.dispose()
+
+class CountingMaintenance:
+    def __init__(self):
+        self.runs = 0
+        self.ran = threading.Event()
+    
+    def run(self):
+        self.runs += 1
+        self.ran.set()
+        if self.runs == 1:
+            raise RuntimeError("database unavailable")
+        return {"created": []}
+
+def test_timer_runs_without_scheduler():
+    print("Testing partition maintenance on its own timer...")
+    maintenance = CountingMaintenance()
+    timer = PartitionMaintenanceTimer(maintenance, interval=0.05)
+    timer.start()
+    try:
+        # Runs at start, and keeps running after a failed run
+        assert maintenance.ran.wait(5)
+        deadline = time.time() + 5
+        while maintenance.runs < 3 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        timer.stop()
+    runs = maintenance.runs
+    assert runs >= 3 and timer.last_report == {"created": []}
+    time.sleep(0.2)
+    assert maintenance.runs == runs
+    print(f"✓ Maintenance ran {runs} times and stopped with the timer")
+
+def test_postgres_partitioning():
+    print("Testing monthly partitioning on Postgres...")
+    if not TEST_POSTGRES_URL:
+        print("⚠ TEST_POSTGRES_URL is not set, skipping")
+        return
+    engine = create_engine(TEST_POSTGRES_URL)
+    with engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA public CASCADE"))
+        connection.execute(text("CREATE SCHEMA public"))
+    upgrade_database(engine)
+    db_service = DatabaseService(sessionmaker(bind=engine))
+    today = date.today()
+    now = datetime.combine(today, datetime.min.time()) + timedelta(hours=12)
+    rows = [
+        {"symbol": "AAPL", "title": f"Apple update {i}", "url": f"https://x/{i}",
+         "published_at": now - timedelta(days=i * 30), "content": "Guidance raised."}
+        for i in range(16)
+    ]
+    rows.append({"symbol": "AAPL", "title": "Undated", "url": "https://x/undated", "published_at": None})
+    stored = db_service.store_articles_bulk(rows)
+    db_service.update_article_sentiments([
+        {"id": row["id"], "sentiment_score": 0.5, "sentiment_label": "positive"} for row in stored
+    ])
+    stats = db_service.get_sentiment_stats()
+    
+    maintenance = PartitionMaintenance(engine, months_ahead=2, retention_days=365)
+    # The regular run leaves the conversion to the explicit step
+    assert maintenance.run(today) == {"created": [], "dropped": [], "held_back": {}}
+    with engine.connect() as connection:
+        assert not maintenance.is_partitioned(connection)
+    assert maintenance.convert_table(today) and not maintenance.convert_table(today)
+    report = maintenance.run(today)
+    assert report["dropped"] == []
+    cutoff = datetime.combine(today - timedelta(days=365), datetime.min.time())
+    with engine.connect() as connection:
+        assert maintenance.is_partitioned(connection)
+        months = maintenance.partitions(connection)
+        # Months wholly before the cutoff still hold their (scored, not yet archived) rows
+        expired = {partition_name(m) for m in months if (m + timedelta(days=32)).replace(day=1) <= cutoff}
+        assert expired and set(report["held_back"]) == expired
+        assert connection.execute(text("SELECT count(*) FROM news_articles_default")).scalar() == 1
+        # Recent windows only touch the newest partitions
+        plan = "\n".join(connection.execute(text(
+            "EXPLAIN SELECT count(*) FROM news_articles WHERE symbol = 'AAPL' AND published_at >= :start"
+        ), {"start": now - timedelta(days=7)}).scalars())
+        assert partition_name(months[0]) not in plan and partition_name(months[-1]) in plan
+    
+    # Same queries, same results; URLs are still deduplicated and ids continue
+    assert db_service.get_sentiment_stats() == stats
+    assert db_service.get_stock_sentiment_data("AAPL", days=7)["total_articles"] == 1
+    new = db_service.store_articles_bulk(rows + [{"symbol": "MSFT", "title": "New", "url": "https://x/new",
+                                                  "published_at": now}])
+    assert [row["url"] for row in new] == ["https://x/new"] and new[0]["id"] > max(r["id"] for r in stored)
+    
+    # A row beyond the prepared months waits in the default partition until its month is created
+    far = datetime(today.year + 1, today.month, 1) + timedelta(days=3)
+    db_service.store_articles_bulk([{"symbol": "MSFT", "title": "Dated ahead", "url": "https://x/ahead",
+                                     "published_at": far}])
+    later = PartitionMaintenance(engine, months_ahead=13, retention_days=365).run(today)
+    assert partition_name(far) in later["created"]
+    with engine.connect() as connection:
+        assert connection.execute(text(f"SELECT count(*) FROM {partition_name(far)}")).scalar() == 1
+    
+    # So does a back-dated row older than every partition; the regular run gives its month a partition
+    past = (months[0] - timedelta(days=45)).replace(day=5, hour=12)
+    back_dated = db_service.store_articles_bulk([{"symbol": "MSFT", "title": "Back-dated", "url": "https://x/past",
+                                                  "published_at": past}])
+    db_service.update_article_sentiments([
+        {"id": back_dated[0]["id"], "sentiment_score": 0.1, "sentiment_label": "neutral"}
+    ])
+    stats = db_service.get_sentiment_stats()
+    assert partition_name(past) in maintenance.run(today)["created"]
+    with engine.connect() as connection:
+        assert connection.execute(text(f"SELECT count(*) FROM {partition_name(past)}")).scalar() == 1
+        assert connection.execute(text("SELECT count(*) FROM news_articles_default")).scalar() == 1
+    expired.add(partition_name(past))
+    
+    # Expired partitions go once the archive job has emptied them
+    with tempfile.TemporaryDirectory() as tmp:
+        RetentionService(sessionmaker(bind=engine), ArticleArchive(tmp), retention_days=365).run(today)
+        report = maintenance.run(today)
+    assert report["held_back"] == {} and set(report["dropped"]) == expired
+    assert db_service.get_sentiment_stats()["total_articles_analyzed"] == stats["total_articles_analyzed"]
+    print(f"✓ Partitioned, pruned and retired {len(report['dropped'])} expired partitions")
+    engine.dispose()
+
+if __name__ == "__main__":
+    test_sqlite_keeps_plain_table()
+    test_timer_runs_without_scheduler()
+    test_postgres_partitioning()
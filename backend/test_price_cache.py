@@ -0,0 +1,86 @@
+import os
+import tempfile
+import time
+from datetime import date
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.database import StockPrice
+from app.services.analytics_service import AnalyticsService
+from app.services.price_cache import PriceCache, build_price_cache
+
+def test_build_from_price_store():
+    print("Testing price cache build from stock_prices...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'prices.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        db = session_factory()
+        days = pd.bdate_range("2024-01-01", "2024-03-29")
+        for i, day in enumerate(days):
+            db.add(StockPrice(symbol="AAPL", date=day.to_pydatetime(), close_price=100 + i,
+                              adj_close=100 + i, volume=3_000_000_000))
+            if i % 2 == 0:
+                db.add(StockPrice(symbol="MSFT", date=day.to_pydatetime(), close_price=300 + i, adj_close=300 + i))
+        db.commit()
+        db.close()
+        
+        root = os.path.join(tmp, "cache")
+        build_price_cache(root, session_factory)
+        cache = PriceCache.open(root)
+        
+        assert cache.symbols == ["AAPL", "MSFT"]
+        assert isinstance(cache.fields["close"], np.memmap)
+        assert cache.fields["close"].dtype == np.float32
+        # Volumes beyond float32 precision survive exactly
+        assert cache.series("AAPL", field="volume")[0] == 3_000_000_000
+        
+        window = cache.slice("2024-02-01", "2024-02-29")
+        assert np.shares_memory(window, cache.fields["close"])
+        assert len(window) == len(pd.bdate_range("2024-02-01", "2024-02-29"))
+        assert np.isnan(cache.series("MSFT", "2024-01-02", "2024-01-02")[0])
+        
+        # Analytics reads closes straight from the cache
+        panel = AnalyticsService(session_factory, price_cache_dir=root).load_panel(date(2024, 1, 1), date(2024, 3, 29))
+        assert panel.symbols == ["AAPL", "MSFT"] and len(panel.dates) == len(days)
+        
+        # Bars stored after the cache was built still reach the panel, from the database
+        db = session_factory()
+        later = pd.bdate_range("2024-04-01", "2024-04-05")
+        for i, day in enumerate(later):
+            db.add(StockPrice(symbol="AAPL", date=day.to_pydatetime(), close_price=200 + i, adj_close=200 + i))
+            db.add(StockPrice(symbol="NVDA", date=day.to_pydatetime(), close_price=500 + i, adj_close=500 + i))
+        db.commit()
+        db.close()
+        panel = AnalyticsService(session_factory, price_cache_dir=root).load_panel(date(2024, 3, 1), date(2024, 4, 5))
+        assert panel.symbols == ["AAPL", "MSFT", "NVDA"]
+        assert panel.dates[-1] == np.datetime64("2024-04-05") and len(panel.dates) == len(days[days >= "2024-03-01"]) + 5
+        assert np.isclose(panel.returns[-1, 0], np.log(204 / 203))
+        
+        # Rebuilding swaps versions atomically and prunes old ones
+        build_price_cache(root, session_factory)
+        build_price_cache(root, session_factory)
+        assert len([d for d in os.listdir(root) if d.startswith("v")]) == 2
+        print("✓ Cache built, mapped and sliced without copying")
+
+def test_open_large_universe_is_fast():
+    print("Testing open + slice of 1,000 symbols × 10 years...")
+    with tempfile.TemporaryDirectory() as tmp:
+        dates = np.arange(np.datetime64("2015-01-01"), np.datetime64("2015-01-01") + 2520).astype("datetime64[D]")
+        closes = np.random.default_rng(0).random((len(dates), 1000)).astype(np.float32)
+        PriceCache.write(tmp, dates, [f"S{i}" for i in range(1000)], {"close": closes})
+        
+        started = time.perf_counter()
+        cache = PriceCache.open(tmp)
+        window = cache.slice("2020-01-01", "2021-12-31")
+        elapsed = time.perf_counter() - started
+        
+        assert window.shape[1] == 1000
+        assert elapsed < 0.5
+        print(f"✓ Opened and sliced in {elapsed * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    test_build_from_price_store()
+    test_open_large_universe_is_fast()
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import tempfile
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.api import admin
+from app.core import profiling
+from app.core.profiling import ProfileStore, ProfilingMiddleware, sql_listeners_attached
+
+def slow_aggregate(engine):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT count(*) FROM sqlite_master")).scalar()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    return {"ok": True}
+
+def _app(engine, store, seen):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store)
+    app.include_router(admin.router, prefix="/api/admin")
+    
+    @app.get("/stock/{symbol}")
+    def stock(symbol: str):
+        seen.append(sql_listeners_attached())
+        return slow_aggregate(engine)
+    
+    return app
+
+def test_profiling_hook():
+    print("Testing on-demand request profiling...")
+    original = (profiling.ADMIN_TOKEN, profiling.PROFILE_MODE, profiling._store)
+    store = ProfileStore()
+    profiling._store = store
+    seen = []
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'profile.db')}")
+        client = TestClient(_app(engine, store, seen))
+        try:
+            # No token configured: the header is ignored and admin routes don't exist
+            profiling.ADMIN_TOKEN = None
+            assert "x-profile-id" not in client.get("/stock/AAPL", headers={"X-Profile": "anything"}).headers
+            assert client.get("/api/admin/profiles").status_code == 404
+            
+            profiling.ADMIN_TOKEN = "secret"
+            plain = client.get("/stock/AAPL")
+            wrong = client.get("/stock/AAPL", headers={"X-Profile": "guess"})
+            assert "x-profile-id" not in plain.headers and "x-profile-id" not in wrong.headers
+            assert seen == [False, False, False] and not sql_listeners_attached()
+            
+            profiling.PROFILE_MODE = "cprofile"
+            profiled = client.get("/stock/AAPL", headers={"X-Profile": "secret"})
+            assert profiled.status_code == 200 and seen[-1] is True
+            assert not sql_listeners_attached()
+            
+            profiling.PROFILE_MODE = "sampling"
+            sampled = client.get("/stock/MSFT", headers={"X-Profile": "secret"})
+            
+            assert client.get("/api/admin/profiles", headers={"X-Admin-Token": "nope"}).status_code == 403
+            listing = client.get("/api/admin/profiles", headers={"X-Admin-Token": "secret"}).json()
+            assert listing["count"] == 2 and listing["profiles"][0]["path"] == "/stock/MSFT"
+            
+            report = client.get(
+                f"/api/admin/profiles/{profiled.headers['x-profile-id']}", headers={"X-Admin-Token": "secret"}
+            ).json()
+            assert report["route"] == "/stock/{symbol}" and report["status"] == 200
+            assert report["sql_count"] == 1 and "sqlite_master" in report["sql"][0]["statement"]
+            assert report["duration_ms"] >= 50 and "function calls" in report["profile"]
+            
+            # cProfile can't see the threadpool; the stack sampler can
+            sampled_report = store.get(sampled.headers["x-profile-id"])
+            assert "slow_aggregate" in sampled_report["profile"], sampled_report["profile"][:500]
+            
+            assert client.delete("/api/admin/profiles", headers={"X-Admin-Token": "secret"}).json()["deleted"] == 2
+            print(f"✓ Profiled on demand: {report['sql_count']} SQL statement(s), {report['duration_ms']}ms")
+        finally:
+            profiling.ADMIN_TOKEN, profiling.PROFILE_MODE, profiling._store = original
+            engine.dispose()
+
+def test_untriggered_overhead():
+    print("Testing overhead of untriggered requests...")
+    n = 20000
+    original = profiling.ADMIN_TOKEN
+    profiling.ADMIN_TOKEN = "secret"
+    
+    async def bare(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+    
+    async def noop_send(message):
+        pass
+    
+    async def drive(app):
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept", b"*/*")] * 8}
+        start = time.perf_counter()
+        for _ in range(n):
+            await app(scope, None, noop_send)
+        return (time.perf_counter() - start) / n
+    
+    try:
+        overhead = asyncio.run(drive(ProfilingMiddleware(bare))) - asyncio.run(drive(bare))
+    finally:
+        profiling.ADMIN_TOKEN = original
+    assert overhead < 10e-6, overhead
+    print(f"✓ Untriggered requests: +{overhead * 1e6:.2f}µs, no profiler or SQL listeners")
+
+if __name__ == "__main__":
+    test_profiling_hook()
+    test_untriggered_overhead()
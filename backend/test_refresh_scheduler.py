@@ -0,0 +1,272 @@
+from collections import Counter
+from app.services.refresh_scheduler import RedisTokenBucket, RedisViewTracker, RefreshScheduler, ViewTracker
+
+class FakeClock:
+    def __init__(self, start: float = 1_700_000_000.0):
+        self.now = start
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+def _run(scheduler, clock, hours, step=15):
+    for _ in range(int(hours * 3600 / step)):
+        scheduler.tick()
+        clock.advance(step)
+
+def test_adaptive_intervals():
+    print("Testing adaptive refresh intervals...")
+    clock = FakeClock()
+    views = ViewTracker(clock=clock)
+    runs = Counter()
+    rates = {"NVDA": 240.0, "AAPL": 3.0}
+    scheduler = RefreshScheduler(
+        clock=clock,
+        symbols_source=lambda: ["NVDA", "AAPL", "IDLE"],
+        activity_source=lambda: rates,
+        dispatch=lambda symbol: runs.update([symbol]),
+        views=views,
+        daily_quota=100000, refresh_cost=3,
+        maintenance={"reconcile_stats": 3600},
+        dispatch_maintenance=lambda kind: runs.update([kind])
+    )
+    
+    _run(scheduler, clock, hours=4)
+    # Hot: every minute; warm: every hour (14400 / (1 + 3)); idle: once per four hours
+    assert 230 <= runs["NVDA"] <= 241, runs
+    assert 4 <= runs["AAPL"] <= 5, runs
+    assert runs["IDLE"] == 1, runs
+    # Maintenance jobs run on their fixed interval, from the first tick
+    assert runs["reconcile_stats"] == 4, runs
+    assert scheduler.snapshot()["maintenance"][0]["interval_seconds"] == 3600
+    
+    # Dashboard views heat a symbol up
+    for _ in range(600):
+        views.record("IDLE")
+    scheduler.replan()
+    idle = next(s for s in scheduler.snapshot()["symbols"] if s["symbol"] == "IDLE")
+    assert idle["interval_seconds"] < 100, idle
+    print(f"✓ Refreshes follow activity over 4 simulated hours: {dict(runs)}")
+
+def test_quota_budget():
+    print("Testing API quota budget...")
+    clock = FakeClock()
+    runs = Counter()
+    symbols = [f"S{i}" for i in range(50)]
+    scheduler = RefreshScheduler(
+        clock=clock,
+        symbols_source=lambda: symbols,
+        activity_source=lambda: {symbol: 100.0 for symbol in symbols},
+        dispatch=lambda symbol: runs.update([symbol]),
+        views=ViewTracker(clock=clock),
+        daily_quota=1200, refresh_cost=3,
+        maintenance={}
+    )
+    
+    _run(scheduler, clock, hours=24, step=60)
+    spent = sum(runs.values()) * 3
+    snapshot = scheduler.snapshot()
+    budget = snapshot["budget"]
+    # One hour of burst capacity on top of a day's refill
+    assert spent <= 1200 + 1200 / 24, spent
+    assert budget["interval_stretch"] > 1 and budget["planned_calls_per_day"] <= 1200.5
+    assert min(runs.values()) >= 6, runs
+    assert len(snapshot["symbols"]) == 50
+    print(f"✓ 24 simulated hours spent {spent} of 1200 API calls: {budget}")
+
+def test_deduplicated_refreshes_are_free():
+    print("Testing that deduplicated refreshes cost no quota...")
+    clock = FakeClock()
+    runs = Counter()
+    
+    def dispatch(symbol):
+        runs.update([symbol])
+        # DUP always has a refresh pending already
+        return symbol != "DUP"
+    
+    scheduler = RefreshScheduler(
+        clock=clock,
+        symbols_source=lambda: ["DUP", "NEW"],
+        activity_source=lambda: {},
+        dispatch=dispatch,
+        views=ViewTracker(clock=clock),
+        daily_quota=24, refresh_cost=1,
+        maintenance={}
+    )
+    assert scheduler.tick() == ["NEW"]
+    budget = scheduler.snapshot()["budget"]
+    assert budget["used_last_24h"] == 1 and budget["deduplicated_refreshes"] == 1
+    assert budget["deferred_refreshes"] == 0 and budget["tokens_available"] == 0
+    print(f"✓ Only the new refresh was charged: {budget}")
+
+def test_manual_refreshes_share_the_budget():
+    print("Testing manual refreshes against the scheduler's budget...")
+    clock = FakeClock()
+    runs = Counter()
+    symbols = [f"S{i}" for i in range(10)]
+    scheduler = RefreshScheduler(
+        clock=clock,
+        symbols_source=lambda: symbols,
+        activity_source=lambda: {symbol: 100.0 for symbol in symbols},
+        dispatch=lambda symbol: runs.update([symbol]),
+        views=ViewTracker(clock=clock),
+        daily_quota=240, refresh_cost=3,
+        maintenance={}
+    )
+    scheduler.replan()
+    stretch = scheduler.stretch
+    
+    # A burst of manual refreshes drains the bucket, a deduplicated one is given back
+    accepted = 0
+    while scheduler.try_spend():
+        accepted += 1
+    scheduler.refund()
+    assert accepted == 3 and scheduler.try_spend() and not scheduler.try_spend()
+    assert scheduler.tick() == []
+    budget = scheduler.snapshot()["budget"]
+    assert budget["manual_used_last_24h"] == 9 and budget["rejected_manual_refreshes"] == 2
+    assert budget["deferred_refreshes"] == 10
+    assert 0 < scheduler.seconds_until_refresh() <= 3 * 86400 / 240
+    
+    # What manual refreshes used comes off the quota the plan has to fit in
+    scheduler.replan()
+    assert scheduler.stretch > stretch
+    print(f"✓ Manual refreshes were charged and deferred the schedule: {budget}")
+
+class FakeRedisPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.results = []
+    
+    def hmget(self, key, *fields):
+        return self.redis.hmget(key, *fields)
+    
+    def multi(self):
+        pass
+    
+    def hset(self, key, mapping):
+        self.redis.hashes.setdefault(key, {}).update({field: str(value).encode() for field, value in mapping.items()})
+    
+    def incrbyfloat(self, key, amount):
+        self.redis.values[key] = str(float(self.redis.values.get(key, 0)) + amount).encode()
+    
+    def zincrby(self, key, amount, member):
+        scores = self.redis.sets.setdefault(key, {})
+        scores[member] = scores.get(member, 0.0) + amount
+        self.results.append(scores[member])
+    
+    def expire(self, key, seconds):
+        self.results.append(True)
+    
+    def zmscore(self, key, members):
+        scores = self.redis.sets.get(key, {})
+        self.results.append([scores.get(member) for member in members])
+    
+    def execute(self):
+        return self.results
+
+class FakeRedis:
+    def __init__(self):
+        self.sets = {}
+        self.hashes = {}
+        self.values = {}
+    
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self)
+    
+    def hmget(self, key, *fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+    
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+    
+    def transaction(self, func, *watches, value_from_callable=False):
+        # Single-threaded, so the watched keys never change underneath
+        value = func(FakeRedisPipeline(self))
+        return value if value_from_callable else []
+
+def test_views_shared_through_redis():
+    print("Testing dashboard views shared through Redis...")
+    clock = FakeClock()
+    redis = FakeRedis()
+    # Two web workers record views; the scheduler process reads them
+    workers = [RedisViewTracker(redis, clock=clock) for _ in range(2)]
+    scheduler_views = RedisViewTracker(redis, clock=clock)
+    local = ViewTracker(clock=clock)
+    
+    # Views spread over an epoch boundary of the sorted sets
+    for i in range(400):
+        workers[i % 2].record("AAPL")
+        local.record("AAPL")
+        clock.advance(30 * 60 * 64 / 400 + 17)
+    shared = scheduler_views.per_hour_many(["AAPL", "IDLE"])
+    assert abs(shared["AAPL"] - local.per_hour("AAPL")) < 1e-6 * local.per_hour("AAPL"), shared
+    assert shared["IDLE"] == 0.0 and len(redis.sets) == 2
+    print(f"✓ Views from every worker add up: {shared['AAPL']:.2f} views/hour")
+
+def test_budget_shared_through_redis():
+    print("Testing the API budget shared through Redis...")
+    clock = FakeClock()
+    redis = FakeRedis()
+    symbols = [f"S{i}" for i in range(10)]
+    
+    def scheduler():
+        return RefreshScheduler(
+            clock=clock,
+            symbols_source=lambda: symbols,
+            activity_source=lambda: {symbol: 100.0 for symbol in symbols},
+            dispatch=lambda symbol: True,
+            views=ViewTracker(clock=clock),
+            daily_quota=240, refresh_cost=3,
+            maintenance={},
+            budget=RedisTokenBucket(redis, 240, 10)
+        )
+    
+    # Two web workers and the scheduler process draw on one bucket of 10 tokens
+    workers = [scheduler(), scheduler()]
+    schedule = scheduler()
+    schedule.replan()
+    stretch = schedule.stretch
+    accepted = sum(worker.try_spend() for worker in workers for _ in range(3))
+    assert accepted == 3, accepted
+    workers[0].refund()
+    assert workers[1].try_spend() and not workers[0].try_spend()
+    assert schedule.tick() == []
+    
+    # Manual spending from every worker comes off the quota the schedule plans for
+    budget = schedule.snapshot()["budget"]
+    assert budget["manual_used_last_24h"] == 9 and budget["tokens_available"] == 1, budget
+    schedule.replan()
+    assert schedule.stretch > stretch
+    print(f"✓ Workers and the scheduler shared one quota: {budget}")
+
+class DownRedis:
+    def __getattr__(self, name):
+        def unavailable(*args, **kwargs):
+            raise ConnectionError("Redis unavailable")
+        return unavailable
+
+def test_view_tracker_survives_redis_outage():
+    print("Testing dashboard views while Redis is down...")
+    views = RedisViewTracker(DownRedis(), clock=FakeClock())
+    # Views are dropped and counted rather than failing the dashboard request
+    views.record("AAPL")
+    assert views.per_hour_many(["AAPL"]) == {"AAPL": 0.0}
+    assert views.redis_errors == 2
+    
+    # The budget falls back to this process's tokens
+    budget = RedisTokenBucket(DownRedis(), 240, 10)
+    assert budget.take(3, 0.0, manual=True) and budget.manual_spent(0.0) == 3
+    assert budget.redis_errors > 0
+    print("✓ Redis errors were counted, not raised")
+
+if __name__ == "__main__":
+    test_adaptive_intervals()
+    test_quota_budget()
+    test_deduplicated_refreshes_are_free()
+    test_manual_refreshes_share_the_budget()
+    test_views_shared_through_redis()
+    test_budget_shared_through_redis()
+    test_view_tracker_survives_redis_outage()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from app.api import sentiment
+from app.core import response_cache
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.database import AsyncSessionLocal, Base, SessionLocal
+from app.core.response_cache import ResponseCache, symbol_tag
+from app.services.database_service import DatabaseService
+
+def test_generations():
+    print("Testing response cache invalidation...")
+    cache = ResponseCache(redis_url=None)
+    builds = []
+    
+    def build(value):
+        builds.append(value)
+        return {"value": value}
+    
+    body, etag, hit = cache.get_or_build("route", {"a": 1}, [symbol_tag("aapl")], lambda: build(1))
+    assert not hit and body == b'{"value":1}'
+    assert cache.get_or_build("route", {"a": 1}, [symbol_tag("AAPL")], lambda: build(2)) == (body, etag, True)
+    
+    # Other symbols keep their entries; the invalidated one rebuilds
+    cache.get_or_build("route", {"a": 1}, [symbol_tag("MSFT")], lambda: build(3))
+    cache.invalidate([symbol_tag("AAPL")])
+    assert cache.get_or_build("route", {"a": 1}, [symbol_tag("AAPL")], lambda: build(4))[2] is False
+    assert cache.get_or_build("route", {"a": 1}, [symbol_tag("MSFT")], lambda: build(5))[2] is True
+    assert builds == [1, 3, 4]
+    
+    stats = cache.stats()
+    assert stats["misses"] == 3 and stats["memory_hits"] == 2 and stats["redis_enabled"] is False
+    print(f"✓ Per-symbol invalidation works: {stats}")
+
+def test_api_etags():
+    print("Testing cached sentiment endpoints...")
+    original_bind = SessionLocal.kw["bind"]
+    original_async_bind = AsyncSessionLocal.kw["bind"]
+    response_cache._response_cache = ResponseCache(redis_url=None)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'cache.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal.configure(bind=engine)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'cache.db')}")
+        AsyncSessionLocal.configure(bind=async_engine)
+        try:
+            app = FastAPI()
+            app.include_router(sentiment.router, prefix="/api/sentiment")
+            client = TestClient(app)
+            db_service = DatabaseService()
+            
+            now = datetime.now() - timedelta(hours=1)
+            stored = db_service.store_articles_bulk([
+                {"symbol": "AAPL", "title": "Apple up", "url": "https://x/1", "published_at": now},
+                {"symbol": "MSFT", "title": "Microsoft flat", "url": "https://x/2", "published_at": now},
+            ])
+            db_service.update_article_sentiments([
+                {"id": row["id"], "sentiment_score": 0.5, "sentiment_label": "positive"} for row in stored
+            ])
+            db_service.update_sentiment_summaries([(row["symbol"], now) for row in stored])
+            
+            first = client.get("/api/sentiment/summary")
+            assert first.status_code == 200 and first.headers["x-cache"] == "MISS"
+            assert first.json()["total_articles_analyzed"] == 2
+            etag = first.headers["etag"]
+            
+            repeat = client.get("/api/sentiment/summary", headers={"If-None-Match": etag})
+            assert repeat.status_code == 304 and repeat.headers["x-cache"] == "HIT"
+            
+            msft = client.get("/api/sentiment/stock/MSFT")
+            assert msft.status_code == 200 and msft.json()["total_articles"] == 1
+            client.get("/api/sentiment/stock/AAPL")
+            
+            # A newly scored AAPL article changes AAPL and the summary, not MSFT
+            new = db_service.store_articles_bulk([
+                {"symbol": "AAPL", "title": "Apple again", "url": "https://x/3", "published_at": now}
+            ])
+            db_service.update_article_sentiments([
+                {"id": new[0]["id"], "sentiment_score": -0.5, "sentiment_label": "negative"}
+            ])
+            db_service.update_sentiment_summaries([("AAPL", now)])
+            
+            changed = client.get("/api/sentiment/summary", headers={"If-None-Match": etag})
+            assert changed.status_code == 200 and changed.json()["total_articles_analyzed"] == 3
+            assert client.get("/api/sentiment/stock/AAPL").json()["total_articles"] == 2
+            assert client.get("/api/sentiment/stock/MSFT").headers["x-cache"] == "HIT"
+            
+            # Scoring alone retires the summary, even with no rollup day to recompute
+            undated = db_service.store_articles_bulk([
+                {"symbol": "MSFT", "title": "Microsoft undated", "url": "https://x/4", "published_at": None}
+            ])
+            assert client.get("/api/sentiment/summary").json()["total_articles_analyzed"] == 3
+            db_service.update_article_sentiments([
+                {"id": undated[0]["id"], "sentiment_score": 0.1, "sentiment_label": "neutral"}
+            ])
+            assert db_service.update_sentiment_summaries([("MSFT", None)]) == 0
+            assert client.get("/api/sentiment/summary").json()["total_articles_analyzed"] == 4
+            
+            assert client.get("/api/sentiment/stock/NONE").status_code == 404
+            stats = client.get("/api/sentiment/cache/stats").json()
+            assert stats["not_modified"] == 1
+            print(f"✓ ETags and ingest invalidation work: {stats}")
+        finally:
+            SessionLocal.configure(bind=original_bind)
+            AsyncSessionLocal.configure(bind=original_async_bind)
+            response_cache._response_cache = None
+            engine.dispose()
+
+if __name__ == "__main__":
+    test_generations()
+    test_api_etags()
@@ -0,0 +1,189 @@
+import os
+import tempfile
+import threading
+from datetime import datetime
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.api import sentiment
+from app.core import response_cache
+from app.core.database import AsyncSessionLocal, Base, SessionLocal
+from app.core.init_db import upgrade_database
+from app.models.database import NewsArticle, SentimentStats
+from app.services import async_database_service, database_service
+from app.services.database_service import STATS_ROW_ID, DatabaseService, apply_score_changes
+from app.services.sentiment_service import SentimentService
+
+def _rows(symbol, start, count):
+    return [
+        {"symbol": symbol, "title": f"{symbol} headline {i}", "content": "Shares rallied strongly",
+         "url": f"https://example.com/{symbol}/{i}", "published_at": datetime(2024, 1, 2)}
+        for i in range(start, start + count)
+    ]
+
+def test_incremental_stats():
+    print("Testing incrementally maintained sentiment stats...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'stats.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        db_service = DatabaseService(session_factory)
+        
+        # Articles scored before the stats row exists are picked up by the first read
+        stored = db_service.store_articles_bulk(_rows("AAPL", 0, 3))
+        db_service.update_article_sentiments([
+            {"id": row["id"], "sentiment_score": 0.6, "sentiment_label": "positive"} for row in stored
+        ])
+        assert db_service.get_sentiment_stats()["total_articles_analyzed"] == 3
+        # Reads never write; the row comes from the scheduled (or CLI) reconcile
+        with session_factory() as db:
+            assert db.get(SentimentStats, STATS_ROW_ID) is None
+        assert db_service.reconcile_sentiment_stats()["total_articles_analyzed"] == 3
+        
+        # Bulk scoring path
+        stored = db_service.store_articles_bulk(_rows("MSFT", 0, 2))
+        db_service.update_article_sentiments([
+            {"id": stored[0]["id"], "sentiment_score": -0.4, "sentiment_label": "negative"},
+            {"id": stored[1]["id"], "sentiment_score": 0.0, "sentiment_label": "neutral"},
+        ])
+        
+        # Re-scoring an article replaces its old contribution
+        db_service.update_article_sentiment(stored[0]["id"], 0.2, "positive")
+        
+        # Service scoring path
+        db_service.store_articles_bulk(_rows("TSLA", 0, 2))
+        assert SentimentService("vader", session_factory=session_factory).process_unanalyzed_articles() == 2
+        
+        incremental = db_service.get_sentiment_stats()
+        reconciled = db_service.reconcile_sentiment_stats()
+        assert incremental == reconciled, (incremental, reconciled)
+        assert incremental["total_articles_analyzed"] == 7 and incremental["stocks_tracked"] == 3
+        assert incremental["sentiment_distribution"]["positive"] >= 4
+        print(f"✓ Incremental stats match a full recompute: {incremental}")
+        engine.dispose()
+
+def test_reconcile_waits_for_scorers():
+    print("Testing reconcile against a concurrent scorer...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'stats.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        db_service = DatabaseService(session_factory)
+        stored = db_service.store_articles_bulk(_rows("AAPL", 0, 2))
+        db_service.reconcile_sentiment_stats()
+        
+        # A scorer has written a score and its delta but not committed yet
+        scorer = session_factory()
+        scorer.execute(update(NewsArticle).where(NewsArticle.id == stored[0]["id"]).values(
+            sentiment_score=0.5, sentiment_label="positive"
+        ))
+        apply_score_changes(scorer, [("AAPL", None, None, 0.5, "positive")])
+        
+        reconcile = threading.Thread(target=db_service.reconcile_sentiment_stats)
+        reconcile.start()
+        reconcile.join(timeout=0.5)
+        assert reconcile.is_alive(), "reconcile should wait for the scorer's transaction"
+        scorer.commit()
+        scorer.close()
+        reconcile.join()
+        
+        # The delta is counted exactly once, whichever side applied it
+        stats = db_service.get_sentiment_stats()
+        assert stats["total_articles_analyzed"] == 1 and stats["stocks_tracked"] == 1, stats
+        assert stats == db_service.reconcile_sentiment_stats()
+        print(f"✓ Reconcile waited for the scorer and kept its delta: {stats}")
+        engine.dispose()
+
+class RacingAnalyzer:
+    """Lets another scorer score the batch between the backlog scorer's read and its write"""
+    
+    def __init__(self, other_scorer):
+        self.other_scorer = other_scorer
+    
+    def analyze_batch(self, texts):
+        self.other_scorer()
+        return [{"score": 0.3, "label": "positive"} for _ in texts]
+
+def test_concurrent_scorers_count_once():
+    print("Testing two scorers that both saw an article unscored...")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'stats.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        db_service = DatabaseService(session_factory)
+        stored = db_service.store_articles_bulk(_rows("AAPL", 0, 2))
+        db_service.reconcile_sentiment_stats()
+        
+        # A refresh job scores the articles while the backlog scorer is running inference on them
+        service = SentimentService("vader", session_factory=session_factory)
+        service.analyzer = RacingAnalyzer(lambda: db_service.update_article_sentiments([
+            {"id": row["id"], "sentiment_score": -0.5, "sentiment_label": "negative"} for row in stored
+        ]))
+        assert service.process_unanalyzed_articles() == 2
+        
+        stats = db_service.get_sentiment_stats()
+        assert stats == db_service.reconcile_sentiment_stats(), stats
+        assert stats["total_articles_analyzed"] == 2 and stats["sentiment_distribution"] == {"positive": 2}, stats
+        
+        # A scorer holding the article locks makes the next one wait instead of reading the old score
+        holder = session_factory()
+        database_service.lock_articles_for_scoring(holder, [stored[0]["id"]])
+        scorer = threading.Thread(target=db_service.update_article_sentiments, args=([
+            {"id": stored[0]["id"], "sentiment_score": 0.1, "sentiment_label": "neutral"}
+        ],))
+        scorer.start()
+        scorer.join(timeout=0.5)
+        assert scorer.is_alive(), "the second scorer should wait for the first one's locks"
+        holder.rollback()
+        holder.close()
+        scorer.join()
+        assert db_service.get_sentiment_stats() == db_service.reconcile_sentiment_stats()
+        print(f"✓ Each article was counted once: {stats}")
+        engine.dispose()
+
+def _no_scan(db):
+    raise AssertionError("summary scanned news_articles instead of reading the stats row")
+
+def test_migrated_database_maintains_stats():
+    print("Testing stats on a freshly migrated database, without a reconcile...")
+    original_bind = SessionLocal.kw["bind"]
+    original_async_bind = AsyncSessionLocal.kw["bind"]
+    original_cache = response_cache._response_cache
+    original_totals = (database_service.sentiment_totals, async_database_service.sentiment_totals)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "migrated.db")
+        engine = create_engine(f"sqlite:///{db_path}")
+        upgrade_database(engine)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        SessionLocal.configure(bind=engine)
+        AsyncSessionLocal.configure(bind=async_engine)
+        response_cache._response_cache = response_cache.ResponseCache(redis_url=None)
+        try:
+            session_factory = sessionmaker(bind=engine)
+            db_service = DatabaseService(session_factory)
+            stored = db_service.store_articles_bulk(_rows("AAPL", 0, 3) + _rows("MSFT", 0, 1))
+            db_service.update_article_sentiments([
+                {"id": row["id"], "sentiment_score": 0.5, "sentiment_label": "positive"} for row in stored
+            ])
+            
+            database_service.sentiment_totals = async_database_service.sentiment_totals = _no_scan
+            app = FastAPI()
+            app.include_router(sentiment.router, prefix="/api/sentiment")
+            summary = TestClient(app).get("/api/sentiment/summary").json()
+            assert summary["total_articles_analyzed"] == 4 and summary["stocks_tracked"] == 2, summary
+            assert summary["sentiment_distribution"] == {"positive": 4}
+            print(f"✓ /summary read the seeded stats row: {summary}")
+        finally:
+            database_service.sentiment_totals, async_database_service.sentiment_totals = original_totals
+            SessionLocal.configure(bind=original_bind)
+            AsyncSessionLocal.configure(bind=original_async_bind)
+            response_cache._response_cache = original_cache
+            engine.dispose()
+
+if __name__ == "__main__":
+    test_incremental_stats()
+    test_reconcile_waits_for_scorers()
+    test_concurrent_scorers_count_once()
+    test_migrated_database_maintains_stats()
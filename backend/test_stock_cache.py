@@ -0,0 +1,96 @@
+import os
+import tempfile
+import threading
+import time
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.cache import TTLCache, MISSING
+from app.core.database import Base
+from app.services import stock_service
+from app.services.price_store import PriceStore
+from app.services.stock_service import StockService
+from app.services.symbol_universe import load_symbol_universe, set_symbol_universe
+
+class FakeTicker:
+    calls = {"info": 0, "history": 0}
+    
+    def __init__(self, symbol):
+        self.symbol = symbol
+    
+    @property
+    def info(self):
+        FakeTicker.calls["info"] += 1
+        time.sleep(0.05)  # Slow upstream so concurrent misses overlap
+        return {"symbol": self.symbol, "shortName": "Fake", "currentPrice": 101.0, "longName": "Fake Corp"}
+    
+    def history(self, period="1mo"):
+        FakeTicker.calls["history"] += 1
+        return pd.DataFrame({"Close": [float(p) for p in range(90, 102)]})
+
+class FakeYF:
+    Ticker = FakeTicker
+
+def test_ttl_cache_expiry():
+    print("Testing TTL cache expiry and LRU bound...")
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # Evicts least recently used "b"
+    assert cache.get("b") is MISSING
+    now[0] = 11
+    assert cache.get("a") is MISSING
+    print("✓ Entries expire and evict")
+
+def test_stock_service_single_flight():
+    print("Testing shared, single-flight Ticker cache...")
+    original_yf = stock_service.yf
+    stock_service.yf = FakeYF
+    stock_service._info_cache.clear()
+    stock_service._history_cache.clear()
+    FakeTicker.calls.update(info=0, history=0)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # An empty price store on a temp database, so reads fall through to the fake Ticker
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'prices.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        price_store = PriceStore(session_factory=session_factory)
+        set_symbol_universe(load_symbol_universe(session_factory=session_factory))
+        
+        try:
+            service = StockService(price_store)
+            prices = []
+            threads = [
+                threading.Thread(target=lambda: prices.append(StockService(price_store).get_current_price("aapl")))
+                for _ in range(20)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            
+            assert prices == [101.0] * 20
+            assert FakeTicker.calls["info"] == 1
+            
+            # The other info consumers reuse the same cached entry
+            assert service.validate_symbol("AAPL")
+            assert service.get_stock_info("AAPL")["name"] == "Fake Corp"
+            assert FakeTicker.calls["info"] == 1
+            
+            # Price changes over short windows share one history fetch
+            assert service.get_price_change("AAPL", days=1)["change"] == 1.0
+            assert service.get_price_change("AAPL", days=5)["change"] == 5.0
+            assert FakeTicker.calls["history"] == 1
+            print("✓ 20 concurrent requests caused 1 info fetch and 1 history fetch")
+        finally:
+            stock_service.yf = original_yf
+            stock_service._info_cache.clear()
+            stock_service._history_cache.clear()
+            engine.dispose()
+
+if __name__ == "__main__":
+    test_ttl_cache_expiry()
+    test_stock_service_single_flight()
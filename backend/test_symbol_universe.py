@@ -0,0 +1,166 @@
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.database import StockInfo
+from app.services import stock_service, symbol_universe
+from app.services.stock_service import StockService
+from app.services.symbol_universe import load_symbol_universe, set_symbol_universe
+
+class NoNetworkYF:
+    class Ticker:
+        def __init__(self, symbol):
+            raise AssertionError("validate_symbol went upstream")
+
+class CountingYF:
+    calls = []
+    
+    class Ticker:
+        def __init__(self, symbol):
+            CountingYF.calls.append(symbol)
+            self.info = {"symbol": symbol, "shortName": "Newly Listed"} if symbol == "NEWL" else {}
+
+def _universe():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'universe.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        db = session_factory()
+        db.add(StockInfo(symbol="ZZZT", name="Zeta Test Holdings", sector="Testing"))
+        db.commit()
+        db.close()
+        return load_symbol_universe(session_factory=session_factory)
+
+def test_search():
+    print("Testing symbol universe search...")
+    universe = _universe()
+    
+    assert universe.contains("aapl") and universe.contains("ZZZT")
+    assert universe.search("MSFT")[0] == {
+        "symbol": "MSFT", "name": "Microsoft Corporation", "sector": "Technology", "match": "exact"
+    }
+    assert universe.search("zeta")[0]["symbol"] == "ZZZT"
+    assert [r["symbol"] for r in universe.search("nvid")] == ["NVDA"]
+    
+    fuzzy = universe.search("mircosoft")
+    assert fuzzy[0]["symbol"] == "MSFT" and fuzzy[0]["match"] == "fuzzy"
+    
+    started = time.perf_counter()
+    for _ in range(10000):
+        universe.contains("GOOGL")
+        universe.prefix_search("app", 10)
+    per_call_us = (time.perf_counter() - started) / 10000 * 1e6
+    assert per_call_us < 100
+    print(f"✓ Exact + prefix lookup in {per_call_us:.1f}µs")
+
+def test_validate_without_upstream():
+    print("Testing validate_symbol served locally...")
+    original_yf = stock_service.yf
+    stock_service.yf = NoNetworkYF
+    stock_service.SYMBOL_VALIDATE_UPSTREAM = False
+    set_symbol_universe(_universe())
+    try:
+        assert StockService().validate_symbol("tsla")
+        assert StockService().validate_symbol("ZZZT")
+        assert StockService().search_symbols("tes", 5)[0]["symbol"] == "TSLA"
+        # Unknown symbols are answered locally too
+        stock_service.yf = CountingYF
+        CountingYF.calls.clear()
+        assert not StockService().validate_symbol("AAPLL")
+        assert CountingYF.calls == []
+    finally:
+        stock_service.yf = original_yf
+        stock_service.SYMBOL_VALIDATE_UPSTREAM = True
+        symbol_universe._universe = None
+    print("✓ Symbols validated without upstream calls")
+
+def test_upstream_fallback_caches_misses():
+    print("Testing the upstream fallback...")
+    original_yf = stock_service.yf
+    stock_service.yf = CountingYF
+    stock_service._info_cache.clear()
+    CountingYF.calls.clear()
+    set_symbol_universe(_universe())
+    try:
+        assert not StockService().validate_symbol("AAPLL")
+        assert StockService().validate_symbol("NEWL")
+        assert CountingYF.calls == ["AAPLL", "NEWL"]
+        
+        # Misses are remembered by the universe, not just the info cache
+        stock_service._info_cache.clear()
+        assert not StockService().validate_symbol("aapll")
+        assert StockService().validate_symbol("NEWL")
+        assert CountingYF.calls == ["AAPLL", "NEWL"]
+    finally:
+        stock_service.yf = original_yf
+        stock_service._info_cache.clear()
+        symbol_universe._universe = None
+    print("✓ Each unknown symbol went upstream once")
+
+NASDAQ_LISTED = """Symbol|Security Name|Market Category|Test Issue|Financial Status|Round Lot Size|ETF|NextShares
+AAPL|Apple Inc. - Common Stock|Q|N|N|100|N|N
+ROKU|Roku, Inc. - Class A Common Stock|Q|N|N|100|N|N
+ZXZZT|NASDAQ TEST STOCK|G|Y|N|100|N|N
+File Creation Time: 1019202608:01|||||||
+"""
+
+OTHER_LISTED = """ACT Symbol|Security Name|Exchange|CQS Symbol|ETF|Round Lot Size|Test Issue|NASDAQ Symbol
+BRK.B|Berkshire Hathaway Inc. Class B|N|BRK.B|N|100|N|BRK.B
+ABR$D|Arbor Realty Trust Preferred Series D|N|ABRpD|N|100|N|ABR-D
+File Creation Time: 1019202608:01|||||||
+"""
+
+def test_refresh_listing():
+    print("Testing the exchange listing refresh...")
+    with tempfile.TemporaryDirectory() as tmp:
+        seed = os.path.join(tmp, "symbols.csv")
+        with open(seed, "w") as f:
+            f.write("symbol,name,sector\nAAPL,Apple Inc.,Technology\n")
+        listings = {symbol_universe.NASDAQ_LISTED_URL: NASDAQ_LISTED, symbol_universe.OTHER_LISTED_URL: OTHER_LISTED}
+        assert symbol_universe.refresh_symbol_listing(seed, fetch=listings.__getitem__) == 3
+        
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'universe.db')}")
+        Base.metadata.create_all(bind=engine)
+        universe = load_symbol_universe(seed, session_factory=sessionmaker(bind=engine))
+        engine.dispose()
+        # Test issues, preferreds and the trailer are left out; known sectors are kept
+        assert sorted(entry["symbol"] for entry in universe.entries) == ["AAPL", "BRK-B", "ROKU"]
+        assert universe.get("AAPL")["sector"] == "Technology"
+        assert universe.search("roku")[0]["symbol"] == "ROKU"
+    print("✓ Seed file rebuilt from the symbol directories")
+
+def test_runtime_symbols_reindexed_and_kept():
+    print("Testing runtime-added symbols across renames and reloads...")
+    universe = _universe()
+    universe.add("QQQX", "Quuxly Widgets")
+    assert universe.search("quuxly")[0]["symbol"] == "QQQX"
+    
+    # A new name replaces the old one in every index
+    universe.add("qqqx", "Blorp Dynamics")
+    assert universe.search("blorp")[0]["symbol"] == "QQQX"
+    assert universe.search("blrop dynamics")[0]["symbol"] == "QQQX"
+    assert all(r["symbol"] != "QQQX" for r in universe.search("quuxly widgets"))
+    assert universe.prefix_search("quux") == []
+    
+    # The background reload keeps symbols that were only ever confirmed at runtime
+    original_loader = symbol_universe.load_symbol_universe
+    symbol_universe.load_symbol_universe = lambda: _universe()
+    set_symbol_universe(universe)
+    try:
+        symbol_universe._refresh()
+        reloaded = symbol_universe.get_symbol_universe()
+        assert reloaded is not universe
+        assert reloaded.get("QQQX")["name"] == "Blorp Dynamics" and reloaded.contains("ZZZT")
+    finally:
+        symbol_universe.load_symbol_universe = original_loader
+        symbol_universe._universe = None
+    print("✓ Renamed symbols reindexed and runtime symbols survive a reload")
+
+if __name__ == "__main__":
+    test_search()
+    test_validate_without_upstream()
+    test_upstream_fallback_caches_misses()
+    test_refresh_listing()
+    test_runtime_symbols_reindexed_and_kept()